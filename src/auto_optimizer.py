@@ -0,0 +1,461 @@
+import argparse
+import concurrent.futures
+import logging
+import math
+import multiprocessing
+import os
+import random
+import re
+import sys
+import tempfile
+from collections import namedtuple
+
+
+logger = logging.getLogger("auto_optimizer")
+
+# Which drivetrain sensors decide whether a Parameter is used.  ENCODER and GYRO values are only used by
+# commands that read those sensors, and TIMED_DRIVE and TIMED_TURN values only by the timed commands run
+# in their place when the sensors are disabled.
+ENCODER = "encoder"
+GYRO = "gyro"
+TIMED_DRIVE = "timed drive"
+TIMED_TURN = "timed turn"
+
+# A value in autonomous.ini searched by the optimizer, between low and high inclusive.  sensor is ENCODER,
+# GYRO, TIMED_DRIVE or TIMED_TURN for a value only used with the drivetrain sensors enabled or disabled,
+# or None for a value always used.
+Parameter = namedtuple("Parameter", ["section", "key", "low", "high", "sensor"])
+
+# One simulated autonomous run of a candidate.  overrides is a tuple of ((section, key), value) pairs.
+# completion_time is None if the program did not finish within the autonomous period.  x, y and angle
+# are the final field position in feet and degrees.
+Evaluation = namedtuple("Evaluation", ["overrides", "completed", "completion_time", "x", "y", "angle"])
+
+# A candidate run, as sent to a worker process.  subsystems_configfile is None for the robot's own.
+Task = namedtuple("Task", ["program", "position", "overrides", "configfile", "autonomous_period",
+                           "subsystems_configfile"])
+
+_APPROACH = (Parameter("Approach", "APPROACH_SPEED", -1.0, -0.3, None),
+             Parameter("Approach", "APPROACH_ENCODER_COUNTS", 400, 500, ENCODER),
+             Parameter("Approach", "APPROACH_ENCODER_THRESHOLD", 5, 60, ENCODER),
+             Parameter("Approach", "APPROACH_TIME", 0.5, 2.0, TIMED_DRIVE))
+
+# Values each program's search varies.  Speeds keep their sign, so the robot drives the same way.
+# get_search_space() picks the ones used with the robot's sensors.
+SEARCH_SPACES = {
+    "AutonomousCrossLine": _APPROACH + (
+        Parameter("Cross", "CROSS_SPEED", -1.0, -0.3, None),
+        Parameter("Cross", "CROSS_ENCODER_THRESHOLD", 5, 60, ENCODER),
+        Parameter("Cross", "CROSS_TIME", 0.6, 2.0, TIMED_DRIVE),
+        Parameter("Cross", "CROSS_ANGLE_THRESHOLD", 1.0, 8.0, GYRO),
+        Parameter("Cross", "CROSS_CENTER_TURN_SPEED", 0.3, 1.0, None),
+        Parameter("Cross", "CROSS_CENTER_TURN_TIME", 0.2, 1.0, TIMED_TURN),
+        Parameter("Cross", "CROSS_CENTER_DRIVE_SPEED", 0.3, 1.0, None),
+        Parameter("Cross", "CROSS_CENTER_DRIVE_TIME", 0.2, 1.0, TIMED_DRIVE)),
+    "AutonomousHangCenter": _APPROACH + (
+        Parameter("Hang", "HANG_CENTER_APPROACH_SPEED", -1.0, -0.1, None),
+        Parameter("Hang", "HANG_CENTER_APPROACH_TIME", 1.0, 3.0, None)),
+    "AutonomousHangGear": _APPROACH + (
+        Parameter("Hang", "HANG_CENTER_APPROACH_SPEED", -1.0, -0.1, ENCODER),
+        Parameter("Hang", "HANG_CENTER_SPEED", 0.3, 1.0, TIMED_DRIVE),
+        Parameter("Hang", "HANG_CENTER_APPROACH_TIME", 1.0, 3.0, TIMED_DRIVE),
+        Parameter("Hang", "HANG_SIDE_POSITIONING_SPEED", 0.3, 1.0, None),
+        Parameter("Hang", "HANG_SIDE_POSITIONING_ENCODER_THRESHOLD", 5, 60, ENCODER),
+        Parameter("Hang", "HANG_SIDE_POSITIONING_TIME", 0.2, 1.0, TIMED_DRIVE),
+        Parameter("Hang", "HANG_SIDE_TURN_ANGLE", 55.0, 65.0, GYRO),
+        Parameter("Hang", "HANG_SIDE_TURN_SPEED", 0.3, 1.0, None),
+        Parameter("Hang", "HANG_SIDE_TURN_ANGLE_THRESHOLD", 1.0, 8.0, GYRO),
+        Parameter("Hang", "HANG_SIDE_TURN_TIME", 0.2, 1.0, TIMED_TURN),
+        Parameter("Hang", "HANG_SIDE_APPROACH_SPEED", -1.0, -0.3, None),
+        Parameter("Hang", "HANG_SIDE_APPROACH_ENCODER_THRESHOLD", 5, 60, ENCODER),
+        Parameter("Hang", "HANG_SIDE_APPROACH_TIME", 0.2, 1.0, TIMED_DRIVE),
+        # Paths are only followed with the encoders enabled
+        Parameter("FollowPath", "SPEED", 0.3, 1.0, ENCODER),
+        Parameter("FollowPath", "LOOKAHEAD", 0.75, 3.0, ENCODER),
+        Parameter("FollowPath", "THRESHOLD", 0.1, 0.5, ENCODER)),
+}
+
+_POSITION_NAMES = {1: "Left", 2: "Center", 3: "Right"}
+
+
+def get_program_class(program):
+    """Return the autonomous command group class named program."""
+    from commands.autonomous_cross_line import AutonomousCrossLine
+    from commands.autonomous_hang_center import AutonomousHangCenter
+    from commands.autonomous_hang_gear import AutonomousHangGear
+    programs = {"AutonomousCrossLine": AutonomousCrossLine, "AutonomousHangCenter": AutonomousHangCenter,
+                "AutonomousHangGear": AutonomousHangGear}
+    return programs[program]
+
+
+def get_search_space(program, subsystems_configfile=None):
+    """Return the Parameters of a program's SEARCH_SPACES that it uses with the drivetrain sensors it has.
+
+    With the encoders or the gyro disabled, the program runs timed drives or turns in place of the
+    commands reading them, so only their times can change how it runs.
+
+    Args:
+        program: Name of the autonomous command group class, a key of SEARCH_SPACES.
+        subsystems_configfile: Path of the subsystem configuration file the robot reads, or None for
+            MyRobot.subsystems_config_file.
+    """
+    from config_store import ConfigStore
+    from subsystems.drivetrain import DrivetrainConfig
+    if subsystems_configfile is None:
+        from robot import MyRobot
+        subsystems_configfile = MyRobot.subsystems_config_file
+    config = ConfigStore.get_instance().get(DrivetrainConfig, subsystems_configfile)
+    encoder = config.left_encoder_enabled or config.right_encoder_enabled
+    used = {None: True, ENCODER: encoder, TIMED_DRIVE: not encoder, GYRO: config.gyro_enabled,
+            TIMED_TURN: not config.gyro_enabled}
+    return tuple(parameter for parameter in SEARCH_SPACES[program] if used[parameter.sensor])
+
+
+def get_parameter_type(parameter):
+    """Return int or float, the type autonomous_config reads a parameter as."""
+    from commands.autonomous_config import AutonomousConfig
+    for field in AutonomousConfig.schema:
+        if field.section == parameter.section and field.key == parameter.key:
+            return field.type
+    raise ValueError("[%s] %s is not an autonomous configuration value" % (parameter.section, parameter.key))
+
+
+def write_candidate_config(configfile, overrides, path):
+    """Write a copy of a configuration file with some values replaced.
+
+    Lines are copied as they are, so the candidate diffs cleanly against the original.
+
+    Args:
+        configfile: Path of the configuration file to copy.
+        overrides: Sequence of ((section, key), value) pairs.
+        path: Path of the file to write.
+
+    Raises:
+        ValueError: A value to replace is not in the configuration file.
+    """
+    values = dict(overrides)
+    replaced = set()
+    section = None
+    lines = []
+    with open(configfile) as config:
+        for line in config:
+            header = re.match(r"\s*\[(.+)\]", line)
+            if header:
+                section = header.group(1)
+            else:
+                option = re.match(r"(\s*)([^:=\s]+)(\s*[:=]\s*)", line)
+                if option and (section, option.group(2)) in values:
+                    key = (section, option.group(2))
+                    line = "%s%s%s%s\n" % (option.group(1), option.group(2), option.group(3), values[key])
+                    replaced.add(key)
+            lines.append(line)
+    missing = set(values) - replaced
+    if missing:
+        raise ValueError("%s does not have %s" % (configfile, ", ".join("[%s] %s" % key for key in sorted(missing))))
+    with open(path, "w") as candidate:
+        candidate.writelines(lines)
+
+
+def simulate_autonomous(program, position, configfile, autonomous_period=15.0, noise=None, loop_jitter=0.0, seed=0,
+                        subsystems_configfile=None):
+    """Run an autonomous program in the headless simulator.
+
+    The robot is started in a fresh simulation, so this must not be called from a process
+    that is already simulating the robot, such as the test runner.  noise, loop_jitter and
+    seed are passed to the SimRunner.  The robot and the physics model read the subsystems
+    from subsystems_configfile, or from MyRobot.subsystems_config_file if it is None.
+
+    Return:
+        (completion_time, x, y, angle): completion_time is the time from the start of the
+        program until it finished, or None if it did not finish within the autonomous period.
+    """
+    from config_store import ConfigStore
+    from robot import MyRobot
+    from sim_runner import SimRunner, start_simulation, stop_simulation
+
+    fake_time = start_simulation()
+    try:
+        robot = MyRobot()
+        robot.autonomous_config_file = configfile
+        if subsystems_configfile is not None:
+            robot.subsystems_config_file = subsystems_configfile
+        robot.autonomous_programs = {1: get_program_class(program)}
+        times = []
+
+        def on_step(now):
+            command = robot.autonomous_command
+            if command is None:
+                return True
+            if not times:
+                times.append(now)
+            elif not command.isRunning():
+                times.append(now)
+                # Nothing is left to do, so save the rest of the period
+                return False
+            return True
+
+        runner = SimRunner(robot, fake_time, disabled_period=0.1, autonomous_period=autonomous_period,
+                           teleop_period=0.0, position_choice=_POSITION_NAMES[position], on_step=on_step,
+                           noise=noise, loop_jitter=loop_jitter, seed=seed)
+        result = runner.run()
+    finally:
+        stop_simulation(fake_time)
+        ConfigStore.get_instance().clear()
+    completion_time = times[1] - times[0] if len(times) == 2 else None
+    return completion_time, result.x, result.y, result.angle
+
+
+def evaluate(task):
+    """Simulate one candidate.  Runs in a worker process."""
+    descriptor, path = tempfile.mkstemp(suffix=".ini", prefix="autonomous_")
+    os.close(descriptor)
+    try:
+        write_candidate_config(task.configfile, task.overrides, path)
+        completion_time, x, y, angle = simulate_autonomous(task.program, task.position, path, task.autonomous_period,
+                                                           subsystems_configfile=task.subsystems_configfile)
+    finally:
+        os.remove(path)
+    return Evaluation(task.overrides, completion_time is not None, completion_time, x, y, angle)
+
+
+class AutonomousOptimizer(object):
+    """Searches autonomous.ini for the values that finish an autonomous program fastest.
+
+    The first round simulates the current configuration, which sets the target: a
+    candidate succeeds if the program finishes and the robot stops within a tolerance of
+    where the current configuration stops it.  The rest of the first round samples the
+    search space at random.  Each later round samples around the fastest successful
+    candidates so far, closer every round.  Each round's runs are spread across a pool of
+    processes, one simulation per process at a time.
+
+    If every run of the first round finishes at the same time, or none of them finishes,
+    the values searched do not change how fast the program runs, most likely because it
+    uses none of them with the sensors the robot has, and any candidate ranked best would be
+    an arbitrary pick.  The search stops there.
+
+    """
+    _program = None
+    _position = None
+    _configfile = None
+    _subsystems_configfile = None
+    _space = None
+    _distance_tolerance = None
+    _angle_tolerance = None
+    _autonomous_period = None
+    _random = None
+    _evaluate = None
+
+    _types = None
+    _baseline = None
+    _evaluations = None
+
+    def __init__(self, program, position, configfile, space=None, distance_tolerance=0.5, angle_tolerance=5.0,
+                 autonomous_period=15.0, seed=0, evaluate=evaluate, subsystems_configfile=None):
+        """Create an AutonomousOptimizer.
+
+        Args:
+            program: Name of the autonomous command group class, a key of SEARCH_SPACES.
+            position: Starting position, 1 (left), 2 (center) or 3 (right).
+            configfile: Path of the autonomous configuration file to start from.
+            space: Sequence of Parameters to search.  Defaults to those of the program's SEARCH_SPACES
+                that it uses with the robot's sensors, as get_search_space() returns.
+            distance_tolerance: Largest distance in feet from the target stopping point that succeeds.
+            angle_tolerance: Largest difference in degrees from the target heading that succeeds.
+            autonomous_period: Time in seconds the program has to finish.
+            seed: Seed of the random sampling, so a search can be repeated.
+            evaluate: Function simulating a Task and returning its Evaluation.
+            subsystems_configfile: Path of the subsystem configuration file the robot and the physics model
+                read, or None for MyRobot.subsystems_config_file.
+        """
+        self._program = program
+        self._position = position
+        self._configfile = configfile
+        self._subsystems_configfile = subsystems_configfile
+        self._space = tuple(space if space is not None else get_search_space(program, subsystems_configfile))
+        self._distance_tolerance = distance_tolerance
+        self._angle_tolerance = angle_tolerance
+        self._autonomous_period = autonomous_period
+        self._random = random.Random(seed)
+        self._evaluate = evaluate
+        self._types = [get_parameter_type(parameter) for parameter in self._space]
+        self._evaluations = []
+
+    def run(self, rounds=4, candidates=32, keep=4, processes=None):
+        """Run the search.
+
+        Args:
+            rounds: Number of rounds of candidates.
+            candidates: Number of candidates simulated each round.
+            keep: Number of the fastest successful candidates each later round samples around.
+            processes: Number of worker processes, None for one per CPU, or 1 to run in this process.
+
+        Return:
+            The ranked list of every Evaluation, as get_ranking() returns.
+
+        Raises:
+            RuntimeError: Every run of the first round finished at the same time, or none finished.
+        """
+        executor = None
+        if processes != 1:
+            # Fresh worker processes, since a forked copy of a process with a running robot cannot start another
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=processes,
+                                                              mp_context=multiprocessing.get_context("spawn"))
+        try:
+            for round_number in range(rounds):
+                batch = []
+                if round_number == 0:
+                    batch.append(())
+                while len(batch) < candidates:
+                    batch.append(self._sample(round_number, keep))
+                tasks = [Task(self._program, self._position, overrides, self._configfile, self._autonomous_period,
+                              self._subsystems_configfile) for overrides in batch]
+                results = list(executor.map(self._evaluate, tasks) if executor else map(self._evaluate, tasks))
+                if round_number == 0:
+                    self._baseline = results[0]
+                    if len(results) > 1 and all(_same_completion(self._baseline, result) for result in results[1:]):
+                        raise RuntimeError("All %d runs of %s from position %d took %s, so the values searched do "
+                                           "not change how fast it runs.  Check that they are the ones it uses with "
+                                           "the sensors enabled in the subsystem configuration." % (
+                                               len(results), self._program, self._position,
+                                               _format_time(self._baseline.completion_time)))
+                self._evaluations.extend(results)
+                best = self.get_ranking()[0]
+                logger.info("Round %d: best %s in %s", round_number + 1,
+                            "succeeded" if self.is_success(best) else "failed", _format_time(best.completion_time))
+        finally:
+            if executor:
+                executor.shutdown()
+        return self.get_ranking()
+
+    def get_baseline(self):
+        """Return the Evaluation of the configuration file as it is."""
+        return self._baseline
+
+    def is_success(self, evaluation):
+        """Return True if a run finished where the current configuration stops the robot."""
+        if not evaluation.completed:
+            return False
+        baseline = self._baseline
+        distance = math.hypot(evaluation.x - baseline.x, evaluation.y - baseline.y)
+        angle = abs((evaluation.angle - baseline.angle + 180.0) % 360.0 - 180.0)
+        return distance <= self._distance_tolerance and angle <= self._angle_tolerance
+
+    def get_ranking(self):
+        """Return every Evaluation, successful runs first, fastest first."""
+        return sorted(self._evaluations, key=lambda evaluation: (
+            not self.is_success(evaluation), not evaluation.completed,
+            evaluation.completion_time if evaluation.completed else 0.0))
+
+    def write_report(self, path, count=20):
+        """Write the fastest runs and the values they used to a text file."""
+        baseline = self._baseline
+        lines = ["Autonomous optimizer report: %s from position %d, %d runs" % (self._program, self._position,
+                                                                                len(self._evaluations)),
+                 "Baseline %s: %s, stopped at x %.2f ft, y %.2f ft, angle %.1f deg" % (
+                     self._configfile, _format_time(baseline.completion_time), baseline.x, baseline.y,
+                     baseline.angle),
+                 ""]
+        for rank, evaluation in enumerate(self.get_ranking()[:count], 1):
+            status = "ok" if self.is_success(evaluation) else ("off target" if evaluation.completed else "unfinished")
+            lines.append("%3d. %-10s %-10s x %6.2f  y %6.2f  angle %6.1f" % (
+                rank, _format_time(evaluation.completion_time), status, evaluation.x, evaluation.y, evaluation.angle))
+            values = dict(evaluation.overrides)
+            lines.append("     " + ", ".join("%s=%s" % (parameter.key,
+                                                        values.get((parameter.section, parameter.key), "-"))
+                                             for parameter in self._space))
+        with open(path, "w") as report:
+            report.write("\n".join(lines) + "\n")
+
+    def write_best_config(self, path):
+        """Write the configuration file with the values of the fastest successful run.
+
+        Return:
+            The Evaluation written, or None if no run succeeded and nothing was written.
+        """
+        best = self.get_ranking()[0]
+        if not self.is_success(best):
+            return None
+        write_candidate_config(self._configfile, best.overrides, path)
+        return best
+
+    def _sample(self, round_number, keep):
+        ranking = self.get_ranking()
+        parents = [evaluation for evaluation in ranking[:keep] if self.is_success(evaluation)]
+        if round_number == 0 or not parents:
+            return tuple(((parameter.section, parameter.key), self._cast(i, self._random.uniform(parameter.low,
+                                                                                              parameter.high)))
+                         for i, parameter in enumerate(self._space))
+        # Sample around one of the best, half as far each round
+        parent = dict(self._random.choice(parents).overrides)
+        spread = 0.25 * 0.5 ** (round_number - 1)
+        overrides = []
+        for i, parameter in enumerate(self._space):
+            key = (parameter.section, parameter.key)
+            center = parent.get(key, (parameter.low + parameter.high) / 2)
+            value = self._random.gauss(center, spread * (parameter.high - parameter.low))
+            overrides.append((key, self._cast(i, max(parameter.low, min(parameter.high, value)))))
+        return tuple(overrides)
+
+    def _cast(self, index, value):
+        if self._types[index] is int:
+            return int(round(value))
+        return round(value, 3)
+
+
+def _same_completion(first, second, tolerance=1e-6):
+    """Return True if two Evaluations finished at the same time, or neither finished."""
+    if first.completed != second.completed:
+        return False
+    return not first.completed or abs(first.completion_time - second.completion_time) <= tolerance
+
+
+def _format_time(completion_time):
+    return "%.2f s" % completion_time if completion_time is not None else "unfinished"
+
+
+def main():
+    """Search autonomous.ini for faster values from the command line."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Search for the fastest autonomous values that still succeed.")
+    parser.add_argument("--program", default="AutonomousHangGear", choices=sorted(SEARCH_SPACES))
+    parser.add_argument("--position", type=int, default=2, choices=sorted(_POSITION_NAMES))
+    parser.add_argument("--config", default=os.path.join(directory, "configs", "autonomous.ini"),
+                        help="autonomous configuration file to start from")
+    parser.add_argument("--subsystems", default=os.path.join(directory, "configs", "subsystems.ini"),
+                        help="subsystem configuration file, whose drivetrain sensors decide the values searched")
+    parser.add_argument("--output", default="optimizer", help="directory to write the report and candidate to")
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--candidates", type=int, default=32, help="runs per round")
+    parser.add_argument("--keep", type=int, default=4, help="best runs each later round samples around")
+    parser.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="feet from the baseline stopping point")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    # Only the optimizer's own progress is of interest, not every simulated robot's
+    logging.getLogger().setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    optimizer = AutonomousOptimizer(args.program, args.position, os.path.abspath(args.config),
+                                    distance_tolerance=args.tolerance, seed=args.seed,
+                                    subsystems_configfile=os.path.abspath(args.subsystems))
+    try:
+        optimizer.run(args.rounds, args.candidates, args.keep, args.processes)
+    except RuntimeError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+    os.makedirs(args.output, exist_ok=True)
+    report_path = os.path.join(args.output, "report.txt")
+    optimizer.write_report(report_path)
+    logger.info("Wrote %s", report_path)
+    config_path = os.path.join(args.output, "autonomous.ini")
+    best = optimizer.write_best_config(config_path)
+    if best is None:
+        logger.warning("No candidate succeeded, so no configuration was written")
+    else:
+        logger.info("Wrote %s: %s, baseline %s", config_path, _format_time(best.completion_time),
+                    _format_time(optimizer.get_baseline().completion_time))
+
+
+if __name__ == "__main__":
+    main()
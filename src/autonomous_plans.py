@@ -0,0 +1,104 @@
+import importlib
+import logging
+from commands.do_nothing import DoNothing
+
+
+logger = logging.getLogger("autonomous_plans")
+
+
+class AutonomousPlans(object):
+    """Builds and caches the autonomous command for every program and starting position.
+
+    Building an autonomous command group parses its configuration and
+    constructs all of its child commands, which is too slow to do when
+    autonomous starts.  Plans are built ahead of time, one per call to
+    build_next() while the robot is disabled, so that autonomousInit only has
+    to look one up.
+
+    Programs can be given by the import path of their class, so their
+    modules are only imported when the first plan is built, after startup.
+
+    """
+    # Program and starting position values match the OI choosers
+    PROGRAMS = {1: "commands.autonomous_cross_line.AutonomousCrossLine",
+                2: "commands.autonomous_hang_center.AutonomousHangCenter"}
+    POSITIONS = (1, 2, 3)
+
+    _robot = None
+    _configfile = None
+    _programs = None
+    _plans = None
+    _unbuilt = None
+    _do_nothing = None
+
+    def __init__(self, robot, configfile="/home/lvuser/py/configs/autonomous.ini", programs=None):
+        """Create an AutonomousPlans.
+
+        Args:
+            robot: Robot the plans drive.
+            configfile: Path of the autonomous configuration file.
+            programs: Dict of program value to command group class, or to the import path of the class.
+                Defaults to PROGRAMS.
+        """
+        self._robot = robot
+        self._configfile = configfile
+        self._programs = programs if programs is not None else AutonomousPlans.PROGRAMS
+        self._plans = {}
+        self._unbuilt = [(program, position) for program in sorted(self._programs)
+                         for position in AutonomousPlans.POSITIONS]
+
+    def build_next(self):
+        """Build one plan that has not been built yet.
+
+        Return:
+            True if a plan was built or failed to build, False if every plan is already built.
+        """
+        if not self._unbuilt:
+            return False
+        program, position = self._unbuilt.pop(0)
+        self._build(program, position)
+        return True
+
+    def build_all(self):
+        """Build every plan that has not been built yet."""
+        while self.build_next():
+            pass
+
+    def is_complete(self):
+        return not self._unbuilt
+
+    def get_plan(self, program, position):
+        """Return the autonomous command for a program and starting position.
+
+        Plans that have not been built yet are built now.  Unknown programs and
+        plans that failed to build return a command that does nothing.
+        """
+        key = (program, position)
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+        if key in self._unbuilt:
+            self._unbuilt.remove(key)
+            plan = self._build(program, position)
+            if plan is not None:
+                return plan
+        if self._do_nothing is None:
+            self._do_nothing = DoNothing(self._robot)
+        return self._do_nothing
+
+    def _build(self, program, position):
+        try:
+            program_class = self._programs[program]
+            if isinstance(program_class, str):
+                module_name, class_name = program_class.rsplit(".", 1)
+                program_class = getattr(importlib.import_module(module_name), class_name)
+            plan = program_class(self._robot, self._configfile)
+            plan.set_match_configuration(position)
+        except Exception:
+            logger.exception("Could not build autonomous program %s for starting position %s", program, position)
+            return None
+        if not plan.commands:
+            logger.error("Autonomous program %s for starting position %s has no commands", program, position)
+            return None
+        self._plans[(program, position)] = plan
+        return plan
@@ -0,0 +1,608 @@
+"""Simulate many robots at once for parameter studies.
+
+The pyfrc simulation runs one robot through the real robot code, which is
+the only way to test the commands themselves but takes a second or so per
+match.  This module simulates the drivetrain of thousands of robots together
+with NumPy arrays, each robot with its own motor scaling, friction, starting
+pose and sensor noise, and runs batch versions of the drive and turn commands
+on all of them in the same array operations.  Command parameters can be
+arrays too, so one run can also try a different speed or threshold on every
+robot.
+
+The batch commands follow the logic of DriveTime, TurnTime, DriveEncoderCounts
+and TurnDegrees, including their PID controllers, but not motion profiles,
+heading hold or path following; candidates found here should be checked with
+sim_runner.py or auto_optimizer.py.
+
+NumPy is only needed here and is not installed on the robot:
+
+    pip install numpy
+    python batch_sim.py --robots 10000
+
+"""
+import argparse
+import logging
+import os
+import time
+from collections import namedtuple
+from config_store import ConfigStore
+from commands.autonomous_config import AutonomousConfig, distance_pid_gains, turn_gains
+from subsystems.drivetrain import DrivetrainConfig
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+logger = logging.getLogger("batch_sim")
+
+# Outcome of a batch run, with one entry per robot.  completed is whether the robot got through every
+# command, some of which may have ended by timing out, and completion_time is when, or NaN if it did
+# not.  The pose is where each robot stopped, with heading in degrees.
+BatchResult = namedtuple("BatchResult", ["completed", "completion_time", "x", "y", "heading"])
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError("The batch simulator needs NumPy (pip install numpy)")
+
+
+def arcade_outputs(move, rotate):
+    """Return the left and right side outputs of RobotDrive.arcadeDrive without squared inputs, for arrays."""
+    move = numpy.clip(move, -1.0, 1.0)
+    rotate = numpy.clip(rotate, -1.0, 1.0)
+    left = numpy.where(move > 0.0,
+                       numpy.where(rotate > 0.0, move - rotate, numpy.maximum(move, -rotate)),
+                       numpy.where(rotate > 0.0, -numpy.maximum(-move, rotate), move - rotate))
+    right = numpy.where(move > 0.0,
+                        numpy.where(rotate > 0.0, numpy.maximum(move, rotate), move + rotate),
+                        numpy.where(rotate > 0.0, move + rotate, -numpy.maximum(-move, -rotate)))
+    return numpy.clip(left, -1.0, 1.0), numpy.clip(right, -1.0, 1.0)
+
+
+def wrap_degrees(angle):
+    """Return angles in degrees normalized to the range (-180, 180], like turn_controller.wrap_degrees."""
+    angle = numpy.mod(angle, 360.0)
+    return numpy.where(angle > 180.0, angle - 360.0, angle)
+
+
+class BatchDrivetrain(object):
+    """Simulates the drivetrains of many robots, one array entry per robot.
+
+    The motion is that of PhysicsEngine: each side moves at its output times
+    the full output speed, in the drivetrain's sign convention where a
+    negative output drives forward.  Each robot's output is first reduced by
+    its friction (an output fraction, like kS) and scaled by its motor
+    scaling.  The pose has x forward and y to the right of the field origin,
+    with the heading in degrees clockwise like the gyro and Odometry.
+
+    Like the drivetrain's sensor snapshot, the sensors are read once per
+    step, so the commands of a loop all see the same noisy readings.
+
+    """
+    _count = None
+    _random = None
+    _distance_per_count = None
+    _track_width = None
+    _speed = None
+    _left_scale = None
+    _right_scale = None
+    _friction = None
+    _encoder_noise = None
+    _gyro_noise = None
+
+    _x = None
+    _y = None
+    _heading = None
+    _start_heading = None
+    _left_travel = None
+    _right_travel = None
+    _left_output = None
+    _right_output = None
+    _timestamp = 0.0
+
+    _left_encoder = None
+    _right_encoder = None
+    _gyro_angle = None
+
+    def __init__(self, count, distance_per_count, track_width, speed=5.0, left_scale=1.0, right_scale=1.0,
+                 friction=0.0, x=0.0, y=0.0, heading=0.0, encoder_noise=0.0, gyro_noise=0.0, seed=0):
+        """Create and initialize a BatchDrivetrain.
+
+        Every parameter after count can be a single value for all robots or an array with one per robot.
+
+        Args:
+            count: Number of robots.
+            distance_per_count: Distance travelled per encoder count, in feet.
+            track_width: Distance between the left and right wheels, in feet.
+            speed: Speed of a side at full output, in feet per second.
+            left_scale: Left side speed as a fraction of the full output speed.
+            right_scale: Right side speed as a fraction of the full output speed.
+            friction: Output lost to friction on each side.
+            x: Starting x, in feet.
+            y: Starting y, in feet.
+            heading: Starting heading, in degrees.
+            encoder_noise: Standard deviation of the encoder readings, in counts.
+            gyro_noise: Standard deviation of the gyro readings, in degrees.
+            seed: Seed of the sensor noise.
+
+        Raises:
+            ImportError: NumPy is not installed.
+        """
+        _require_numpy()
+        self._count = count
+        self._random = numpy.random.default_rng(seed)
+        self._distance_per_count = self.broadcast(distance_per_count)
+        self._track_width = self.broadcast(track_width)
+        self._speed = self.broadcast(speed)
+        self._left_scale = self.broadcast(left_scale)
+        self._right_scale = self.broadcast(right_scale)
+        self._friction = self.broadcast(friction)
+        self._encoder_noise = self.broadcast(encoder_noise)
+        self._gyro_noise = self.broadcast(gyro_noise)
+        self.reset(x, y, heading)
+
+    def broadcast(self, value):
+        """Return a value as a float array with one entry per robot."""
+        return numpy.array(numpy.broadcast_to(numpy.asarray(value, dtype=float), (self._count,)))
+
+    def reset(self, x=0.0, y=0.0, heading=0.0):
+        """Place every robot at its starting pose with its sensors and outputs at zero."""
+        self._x = self.broadcast(x)
+        self._y = self.broadcast(y)
+        self._heading = self.broadcast(heading)
+        self._start_heading = self._heading.copy()
+        self._left_travel = numpy.zeros(self._count)
+        self._right_travel = numpy.zeros(self._count)
+        self._left_output = numpy.zeros(self._count)
+        self._right_output = numpy.zeros(self._count)
+        self._timestamp = 0.0
+        self._read_sensors()
+
+    def get_count(self):
+        return self._count
+
+    def get_timestamp(self):
+        return self._timestamp
+
+    def tank_drive(self, left, right, mask=None):
+        """Set the side outputs, of every robot or of those selected by a boolean mask."""
+        self._set_outputs(self.broadcast(left), self.broadcast(right), mask)
+
+    def arcade_drive(self, move, rotate, mask=None):
+        """Set the outputs like Drivetrain.arcade_drive without squared inputs."""
+        left, right = arcade_outputs(self.broadcast(move), self.broadcast(rotate))
+        self._set_outputs(left, right, mask)
+
+    def step(self, dt):
+        """Move every robot for dt seconds at its current outputs, then read the sensors."""
+        left = -self._get_speed(self._left_output, self._left_scale)
+        right = -self._get_speed(self._right_output, self._right_scale)
+        forward = (left + right) * 0.5
+        turn = numpy.degrees((left - right) / self._track_width)
+        # Move along the heading halfway through the step
+        heading = numpy.radians(self._heading + turn * dt * 0.5)
+        self._x += forward * dt * numpy.cos(heading)
+        self._y += forward * dt * numpy.sin(heading)
+        self._heading += turn * dt
+        self._left_travel += left * dt / self._distance_per_count
+        self._right_travel += right * dt / self._distance_per_count
+        self._timestamp += dt
+        self._read_sensors()
+
+    def get_left_encoder_value(self):
+        return self._left_encoder
+
+    def get_right_encoder_value(self):
+        return self._right_encoder
+
+    def get_encoder_value(self):
+        """Return the average of the two encoders, like the drivetrain with an encoder pair."""
+        return numpy.round((self._left_encoder + self._right_encoder) / 2.0)
+
+    def get_gyro_angle(self):
+        return self._gyro_angle
+
+    def get_pose(self):
+        """Return the x, y and heading arrays."""
+        return self._x, self._y, self._heading
+
+    def _get_speed(self, output, scale):
+        output = numpy.sign(output) * numpy.maximum(numpy.abs(output) - self._friction, 0.0)
+        return output * scale * self._speed
+
+    def _set_outputs(self, left, right, mask):
+        if mask is None:
+            self._left_output[:] = left
+            self._right_output[:] = right
+        else:
+            self._left_output[mask] = left[mask]
+            self._right_output[mask] = right[mask]
+
+    def _read_sensors(self):
+        self._left_encoder = numpy.floor(self._left_travel + self._noise(self._encoder_noise))
+        self._right_encoder = numpy.floor(self._right_travel + self._noise(self._encoder_noise))
+        self._gyro_angle = self._heading - self._start_heading + self._noise(self._gyro_noise)
+
+    def _noise(self, deviation):
+        if not deviation.any():
+            return 0.0
+        return self._random.normal(0.0, 1.0, self._count) * deviation
+
+
+class BatchPIDController(object):
+    """PIDFController for many robots, one array entry per robot.
+
+    Each robot starts its move when it is reset, so robots at different
+    stages of a command sequence can share one controller.  With
+    turn_gains instead of gains it behaves like a TurnController, which
+    wraps the error unless wrap is False.
+
+    """
+    _gains = None
+    _tolerance = None
+    _max_output = None
+    _min_output = 0.0
+    _rate_limit = 0.0
+    _turn = False
+    _wrap = False
+
+    _setpoint = None
+    _integral = None
+    _last_error = None
+    _last_time = None
+    _last_output = None
+    _in_tolerance_since = None
+
+    def __init__(self, count, gains, tolerance, max_output=1.0, turn_gains=None, wrap=True):
+        """Create and initialize a BatchPIDController.
+
+        Args:
+            count: Number of robots.
+            gains: PIDGains to use, or None with turn_gains.
+            tolerance: Largest error that counts as on target, for all robots or per robot.
+            max_output: Largest output magnitude, for all robots or per robot.
+            turn_gains: TurnGains to use instead of gains, for turning to a gyro angle.
+            wrap: With turn_gains, True to turn the short way to a heading or False to turn by the whole angle.
+        """
+        _require_numpy()
+        if turn_gains is not None:
+            self._min_output = numpy.minimum(turn_gains.min_output, max_output)
+            self._rate_limit = turn_gains.rate_limit
+            self._turn = True
+            self._wrap = wrap
+            gains = turn_gains
+        self._gains = gains
+        self._tolerance = numpy.broadcast_to(numpy.asarray(tolerance, dtype=float), (count,))
+        self._max_output = numpy.abs(numpy.broadcast_to(numpy.asarray(max_output, dtype=float), (count,)))
+        self._setpoint = numpy.zeros(count)
+        self._integral = numpy.zeros(count)
+        self._last_error = numpy.full(count, numpy.nan)
+        self._last_time = numpy.zeros(count)
+        self._last_output = numpy.zeros(count)
+        self._in_tolerance_since = numpy.full(count, numpy.nan)
+
+    def reset(self, setpoint, now, mask):
+        """Start a new move toward the setpoints of the robots selected by a mask."""
+        self._setpoint[mask] = numpy.broadcast_to(setpoint, self._setpoint.shape)[mask]
+        self._integral[mask] = 0.0
+        self._last_error[mask] = numpy.nan
+        self._last_time[mask] = now
+        self._last_output[mask] = 0.0
+        self._in_tolerance_since[mask] = numpy.nan
+
+    def calculate(self, measurement, now, mask):
+        """Return every robot's output for its measurement, updating the state of the robots in the mask."""
+        gains = self._gains
+        error = self._setpoint - measurement
+        if self._wrap:
+            error = wrap_degrees(error)
+        dt = now - self._last_time
+        stepped = mask & (dt > 0.0)
+        derivative = numpy.where(stepped & ~numpy.isnan(self._last_error),
+                                 (error - self._last_error) / numpy.where(dt > 0.0, dt, 1.0), 0.0)
+        if gains.ki != 0.0:
+            limit = self._max_output / abs(gains.ki)
+            integral = numpy.clip(self._integral + error * dt, -limit, limit)
+            self._integral = numpy.where(stepped, integral, self._integral)
+        self._last_error = numpy.where(mask, error, self._last_error)
+        self._last_time = numpy.where(mask, now, self._last_time)
+
+        output = gains.kp * error + gains.ki * self._integral + gains.kd * derivative
+        outside = numpy.abs(error) > self._tolerance
+        if not self._turn:
+            output += numpy.where(outside, numpy.copysign(gains.kf, error), 0.0)
+        output = numpy.clip(output, -self._max_output, self._max_output)
+        if self._turn:
+            output = numpy.where(outside & (numpy.abs(output) < self._min_output),
+                                 numpy.copysign(self._min_output, error), output)
+            if self._rate_limit > 0.0:
+                step = self._rate_limit * numpy.maximum(dt, 0.0)
+                output = numpy.clip(output, self._last_output - step, self._last_output + step)
+            self._last_output = numpy.where(mask, output, self._last_output)
+
+        entered = mask & ~outside & numpy.isnan(self._in_tolerance_since)
+        self._in_tolerance_since[entered] = now
+        self._in_tolerance_since[mask & outside] = numpy.nan
+        return output
+
+    def is_settled(self, now):
+        """Return whether each robot's error has stayed within tolerance for the settle time."""
+        with numpy.errstate(invalid='ignore'):
+            return now - self._in_tolerance_since >= self._gains.settle_time
+
+
+class BatchCommand(object):
+    """A command run by many robots, each starting it when its previous command finishes.
+
+    Subclasses set the outputs of the robots selected by a boolean mask.
+    Parameters may be single values or arrays with one entry per robot.
+
+    """
+    timeout = 15.0
+
+    def initialize(self, drivetrain, mask):
+        """Called for the robots in the mask before they run the command for the first time."""
+        pass
+
+    def execute(self, drivetrain, mask):
+        """Called every loop for the robots in the mask that are running the command"""
+        pass
+
+    def is_finished(self, drivetrain, elapsed):
+        """Return whether each robot is done, given how long each has been running the command."""
+        return elapsed >= self.timeout
+
+    def end(self, drivetrain, mask):
+        """Called once for the robots in the mask that have finished"""
+        drivetrain.arcade_drive(0.0, 0.0, mask)
+
+
+class BatchDriveTime(BatchCommand):
+    _duration = None
+    _speed = None
+
+    def __init__(self, duration, speed, timeout=15.0):
+        """Constructor"""
+        self._duration = duration
+        self._speed = speed
+        self.timeout = timeout
+
+    def execute(self, drivetrain, mask):
+        drivetrain.arcade_drive(self._speed, 0.0, mask)
+
+    def is_finished(self, drivetrain, elapsed):
+        return (elapsed >= self._duration) | (elapsed >= self.timeout)
+
+
+class BatchTurnTime(BatchCommand):
+    _duration = None
+    _speed = None
+
+    def __init__(self, duration, speed, timeout=15.0):
+        """Constructor"""
+        self._duration = duration
+        self._speed = speed
+        self.timeout = timeout
+
+    def execute(self, drivetrain, mask):
+        drivetrain.arcade_drive(0.0, self._speed, mask)
+
+    def is_finished(self, drivetrain, elapsed):
+        return (elapsed >= self._duration) | (elapsed >= self.timeout)
+
+
+class BatchDriveEncoderCounts(BatchCommand):
+    _encoder_change = None
+    _speed = None
+    _threshold = None
+    _pid_gains = None
+    _controller = None
+    _target = None
+
+    def __init__(self, encoder_change, speed, threshold, timeout=15.0, pid_gains=None):
+        """Constructor
+
+        Without pid_gains each robot drives at its speed until it is within its threshold, as
+        DriveEncoderCounts does.  With pid_gains a PID controller limited to the speed brings it there.
+        """
+        self._encoder_change = encoder_change
+        self._speed = speed
+        self._threshold = threshold
+        self._pid_gains = pid_gains
+        self.timeout = timeout
+
+    def initialize(self, drivetrain, mask):
+        if self._target is None:
+            self._target = numpy.zeros(drivetrain.get_count())
+            if self._pid_gains is not None:
+                self._controller = BatchPIDController(drivetrain.get_count(), self._pid_gains, self._threshold,
+                                                      self._speed)
+        target = drivetrain.get_encoder_value() + drivetrain.broadcast(self._encoder_change)
+        self._target[mask] = target[mask]
+        if self._controller:
+            self._controller.reset(self._target, drivetrain.get_timestamp(), mask)
+
+    def execute(self, drivetrain, mask):
+        speed = drivetrain.broadcast(self._speed)
+        if self._controller:
+            output = self._controller.calculate(drivetrain.get_encoder_value(), drivetrain.get_timestamp(), mask)
+            move = -numpy.copysign(1.0, speed) * output
+        else:
+            move = numpy.where(self._target - drivetrain.get_encoder_value() >= 0, -speed, speed)
+        drivetrain.arcade_drive(move, 0.0, mask)
+
+    def is_finished(self, drivetrain, elapsed):
+        if self._controller:
+            done = self._controller.is_settled(drivetrain.get_timestamp())
+        else:
+            done = numpy.abs(self._target - drivetrain.get_encoder_value()) <= self._threshold
+        return done | (elapsed >= self.timeout)
+
+
+class BatchTurnDegrees(BatchCommand):
+    _degrees_change = None
+    _speed = None
+    _threshold = None
+    _turn_gains = None
+    _controller = None
+    _target = None
+
+    def __init__(self, degrees_change, speed, threshold, timeout=15.0, turn_gains=None):
+        """Constructor
+
+        Without turn_gains each robot turns at its speed until it is within its threshold, as
+        TurnDegrees does.  With turn_gains it turns like a TurnController limited to the speed.
+        """
+        self._degrees_change = degrees_change
+        self._speed = speed
+        self._threshold = threshold
+        self._turn_gains = turn_gains
+        self.timeout = timeout
+
+    def initialize(self, drivetrain, mask):
+        if self._target is None:
+            self._target = numpy.zeros(drivetrain.get_count())
+            if self._turn_gains is not None:
+                self._controller = BatchPIDController(drivetrain.get_count(), None, self._threshold, self._speed,
+                                                      turn_gains=self._turn_gains, wrap=False)
+        target = drivetrain.get_gyro_angle() + drivetrain.broadcast(self._degrees_change)
+        self._target[mask] = target[mask]
+        if self._controller:
+            self._controller.reset(self._target, drivetrain.get_timestamp(), mask)
+
+    def execute(self, drivetrain, mask):
+        if self._controller:
+            turn = self._controller.calculate(drivetrain.get_gyro_angle(), drivetrain.get_timestamp(), mask)
+        else:
+            speed = drivetrain.broadcast(self._speed)
+            turn = numpy.where(self._target - drivetrain.get_gyro_angle() >= 0, speed, -speed)
+        drivetrain.arcade_drive(0.0, turn, mask)
+
+    def is_finished(self, drivetrain, elapsed):
+        if self._controller:
+            done = self._controller.is_settled(drivetrain.get_timestamp())
+        else:
+            done = numpy.abs(self._target - drivetrain.get_gyro_angle()) <= self._threshold
+        return done | (elapsed >= self.timeout)
+
+
+def run_commands(drivetrain, commands, period=0.02, time_limit=15.0):
+    """Run a sequence of batch commands on every robot, like a CommandGroup of sequential commands.
+
+    Each loop runs the command each robot is on, then steps the simulation.  A robot that finishes a
+    command starts the next one in the same loop, as the command scheduler does.
+
+    Args:
+        drivetrain: BatchDrivetrain to drive.
+        commands: BatchCommands to run in order.
+        period: Loop period in seconds.
+        time_limit: Time in seconds after which robots that are not done are stopped.
+
+    Return:
+        BatchResult of the robots.
+    """
+    count = drivetrain.get_count()
+    stage = numpy.zeros(count, dtype=int)
+    started = numpy.zeros(count, dtype=bool)
+    start_time = numpy.zeros(count)
+    completion_time = numpy.full(count, numpy.nan)
+    for loop in range(int(round(time_limit / period)) + 1):
+        now = drivetrain.get_timestamp()
+        for i, command in enumerate(commands):
+            active = stage == i
+            if not active.any():
+                continue
+            starting = active & ~started
+            if starting.any():
+                command.initialize(drivetrain, starting)
+                start_time[starting] = now
+                started[starting] = True
+            command.execute(drivetrain, active)
+            finished = active & command.is_finished(drivetrain, now - start_time)
+            if finished.any():
+                command.end(drivetrain, finished)
+                stage[finished] += 1
+                started[finished] = False
+        done = stage == len(commands)
+        completion_time[done & numpy.isnan(completion_time)] = now
+        if done.all() or loop * period >= time_limit:
+            break
+        drivetrain.step(period)
+    drivetrain.arcade_drive(0.0, 0.0)
+    x, y, heading = drivetrain.get_pose()
+    return BatchResult(done, completion_time, x.copy(), y.copy(), heading.copy())
+
+
+def side_lift_commands(config, position, speed):
+    """Return batch commands that drive to a side lift with the encoder counts and turn in autonomous.ini.
+
+    Each drive runs at the speed toward increasing encoder counts, as DriveEncoderCounts does with a
+    positive speed, and the turn is the hang side turn toward the lift.
+
+    Args:
+        config: AutonomousConfig to read the values from.
+        position: Starting position, 1 (left) or 3 (right).
+        speed: Drive speed, for all robots or per robot.
+    """
+    direction = 1.0 if position == 1 else -1.0
+    pid_gains = distance_pid_gains(config)
+    return [BatchDriveEncoderCounts(config.approach_encoder_counts + config.hang_side_positioning_encoder_counts,
+                                    speed, config.approach_encoder_threshold, pid_gains=pid_gains),
+            BatchTurnDegrees(config.hang_side_turn_angle * direction, config.hang_side_turn_speed,
+                             config.hang_side_turn_angle_threshold, turn_gains=turn_gains(config)),
+            BatchDriveEncoderCounts(config.hang_side_approach_encoder_counts, speed,
+                                    config.hang_side_approach_encoder_threshold, pid_gains=pid_gains)]
+
+
+def main():
+    configs = os.path.join(os.path.dirname(os.path.abspath(__file__)), "configs")
+    parser = argparse.ArgumentParser(description="Drive many simulated robots, each with its own motors and "
+                                                 "drive speed, to a side lift.")
+    parser.add_argument("--robots", type=int, default=10000)
+    parser.add_argument("--position", type=int, choices=[1, 3], default=1)
+    parser.add_argument("--config", default=os.path.join(configs, "autonomous.ini"),
+                        help="autonomous configuration file")
+    parser.add_argument("--subsystems", default=os.path.join(configs, "subsystems.ini"),
+                        help="subsystem configuration file")
+    parser.add_argument("--min-speed", type=float, default=0.2)
+    parser.add_argument("--max-speed", type=float, default=1.0)
+    parser.add_argument("--scale-spread", type=float, default=0.1,
+                        help="largest difference of a side's motor scaling from 1.0")
+    parser.add_argument("--friction", type=float, default=0.1, help="largest friction output")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    _require_numpy()
+
+    store = ConfigStore.get_instance()
+    config = store.get(AutonomousConfig, args.config)
+    drivetrain_config = store.get(DrivetrainConfig, args.subsystems)
+    random = numpy.random.default_rng(args.seed)
+    speed = random.uniform(args.min_speed, args.max_speed, args.robots)
+    drivetrain = BatchDrivetrain(args.robots, drivetrain_config.distance_per_count, drivetrain_config.track_width,
+                                 left_scale=1.0 + random.uniform(-args.scale_spread, args.scale_spread, args.robots),
+                                 right_scale=1.0 + random.uniform(-args.scale_spread, args.scale_spread, args.robots),
+                                 friction=random.uniform(0.0, args.friction, args.robots),
+                                 encoder_noise=1.0, gyro_noise=0.2, seed=args.seed)
+    start = time.perf_counter()
+    result = run_commands(drivetrain, side_lift_commands(config, args.position, speed))
+    elapsed = time.perf_counter() - start
+    logger.info("Simulated %d robots in %.2f s", args.robots, elapsed)
+    edges = numpy.linspace(args.min_speed, args.max_speed, 5)
+    for low, high in zip(edges[:-1], edges[1:]):
+        selected = (speed >= low) & (speed <= high)
+        completed = result.completed[selected]
+        if not completed.any():
+            logger.info("Speed %.2f-%.2f: none of %d finished", low, high, selected.sum())
+            continue
+        times = result.completion_time[selected][completed]
+        logger.info("Speed %.2f-%.2f: %5.1f%% of %d finished, in %.2f s on average (%.2f-%.2f s), "
+                    "heading %.1f +/- %.1f deg", low, high, 100.0 * completed.mean(), selected.sum(),
+                    times.mean(), times.min(), times.max(), result.heading[selected][completed].mean(),
+                    result.heading[selected][completed].std())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import argparse
+import gc
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+
+logger = logging.getLogger("benchmarks")
+
+# A function timed by the suite, called with no arguments
+Benchmark = namedtuple("Benchmark", ["name", "function"])
+
+# Timing of one benchmark.  per_call is the median over the repeats and best the fastest repeat, both in
+# seconds per call.  alloc_bytes is the most memory allocated at once during a call, and retained_blocks
+# the memory blocks still allocated after each call, which is 0 unless the function keeps what it allocates.
+BenchmarkResult = namedtuple("BenchmarkResult", ["name", "calls", "per_call", "best", "alloc_bytes",
+                                                 "retained_blocks"])
+
+# A benchmark that got worse than its baseline.  metric is "per_call" or "alloc_bytes", and change is the
+# increase as a fraction of the baseline.
+Regression = namedtuple("Regression", ["name", "metric", "baseline", "current", "change"])
+
+
+def time_function(function, calls, repeats, clock=time.perf_counter):
+    """Call a function repeatedly and return its (median, best) time per call in seconds.
+
+    Args:
+        function: Function to time, called with no arguments.
+        calls: Number of calls timed together, so the clock's own cost is spread over them.
+        repeats: Number of times the calls are timed.
+        clock: Function returning the current time in seconds.
+    """
+    samples = []
+    calls_range = range(calls)
+    for i in range(repeats):
+        start = clock()
+        for j in calls_range:
+            function()
+        samples.append((clock() - start) / calls)
+    samples.sort()
+    return samples[len(samples) // 2], samples[0]
+
+
+def measure_allocations(function, calls):
+    """Return the (peak bytes allocated during one call, blocks retained per call) of a function.
+
+    The blocks are counted with the garbage collector off, so memory freed only by a collection counts
+    as retained.
+    """
+    gc_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        # Only memory allocated since tracing started is traced, so the peak is the call's own
+        tracemalloc.start()
+        try:
+            function()
+            current, alloc_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        blocks = sys.getallocatedblocks()
+        for i in range(calls):
+            function()
+        retained_blocks = (sys.getallocatedblocks() - blocks) / calls
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return alloc_bytes, max(0.0, retained_blocks)
+
+
+def run_benchmarks(benchmarks, calls=1000, repeats=5, clock=time.perf_counter):
+    """Time every benchmark and measure its allocations.
+
+    Return:
+        List of BenchmarkResult, in the order of the benchmarks.
+    """
+    results = []
+    for benchmark in benchmarks:
+        # Warm up caches and lazily created objects first
+        benchmark.function()
+        per_call, best = time_function(benchmark.function, calls, repeats, clock)
+        alloc_bytes, retained_blocks = measure_allocations(benchmark.function, calls)
+        results.append(BenchmarkResult(benchmark.name, calls, per_call, best, alloc_bytes, retained_blocks))
+    return results
+
+
+def create_benchmarks(robot):
+    """Return the benchmarks of the robot's per-loop hot paths.
+
+    The robot must have run robotInit().  It is put in enabled teleop with its
+    inputs polled and sensors sampled, as they are while the scheduler runs, and
+    the subsystems' default commands are installed by a first scheduler run.
+    """
+    from hal_impl import mode_helpers
+    from wpilib.command import Scheduler
+    from oi import JoystickAxis, UserController
+    from sim_runner import PyfrcHooks
+
+    mode_helpers.set_mode("teleop", True)
+    PyfrcHooks.update_driver_station()
+    scheduler = Scheduler.getInstance()
+    scheduler.run()
+    oi = robot.oi
+    drivetrain = robot.drivetrain
+    winch = robot.winch
+    tank_drive = drivetrain.getDefaultCommand()
+
+    def prepare_loop():
+        oi.update_inputs()
+        drivetrain.update_sensor_snapshot()
+        tank_drive.initialize()
+
+    prepare_loop()
+    # The full robot loop polls and then expires the inputs, so it comes last
+    return [Benchmark("oi_update_inputs", oi.update_inputs),
+            Benchmark("oi_get_axis", lambda: oi.get_axis(UserController.DRIVER, JoystickAxis.LEFTY)),
+            Benchmark("drivetrain_tank_drive", lambda: drivetrain.tank_drive(0.5, -0.5)),
+            Benchmark("drivetrain_arcade_drive", lambda: drivetrain.arcade_drive(0.5, 0.2)),
+            Benchmark("winch_move_winch", lambda: winch.move_winch(0.5)),
+            Benchmark("tank_drive_execute", tank_drive.execute),
+            Benchmark("scheduler_run", scheduler.run),
+            Benchmark("robot_loop", robot.teleopPeriodic)]
+
+
+def save_results(results, path):
+    """Write results to a JSON baseline file."""
+    data = {"python": platform.python_version(),
+            "machine": platform.machine(),
+            "benchmarks": {result.name: result._asdict() for result in results}}
+    with open(path, "w") as baseline_file:
+        json.dump(data, baseline_file, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """Read the results saved in a JSON baseline file.
+
+    Return:
+        Dict of benchmark name to BenchmarkResult.
+    """
+    with open(path) as baseline_file:
+        data = json.load(baseline_file)
+    return {name: BenchmarkResult(**values) for name, values in data["benchmarks"].items()}
+
+
+def compare_results(results, baseline, threshold=0.2, min_alloc_bytes=64):
+    """Return a Regression for every result slower or allocating more than its baseline by the threshold.
+
+    Args:
+        results: List of BenchmarkResult.
+        baseline: Dict of benchmark name to BenchmarkResult, as load_results() returns.
+            Benchmarks not in it are skipped.
+        threshold: Largest increase, as a fraction of the baseline, that is not a regression.
+        min_alloc_bytes: Allocations this many bytes or fewer above the baseline are not a regression.
+    """
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            continue
+        if result.per_call > previous.per_call * (1.0 + threshold):
+            regressions.append(Regression(result.name, "per_call", previous.per_call, result.per_call,
+                                          result.per_call / previous.per_call - 1.0))
+        if result.alloc_bytes - previous.alloc_bytes > max(min_alloc_bytes, previous.alloc_bytes * threshold):
+            change = result.alloc_bytes / previous.alloc_bytes - 1.0 if previous.alloc_bytes else float("inf")
+            regressions.append(Regression(result.name, "alloc_bytes", previous.alloc_bytes, result.alloc_bytes,
+                                          change))
+    return regressions
+
+
+def main():
+    """Run the benchmarks in simulation from the command line, optionally saving or comparing a baseline.
+
+    Exits with status 1 if any benchmark regressed against the compared baseline.
+    """
+    parser = argparse.ArgumentParser(description="Time the robot's per-loop hot paths.")
+    parser.add_argument("--calls", type=int, default=1000, help="calls timed together")
+    parser.add_argument("--repeats", type=int, default=5, help="times the calls are timed")
+    parser.add_argument("--save", help="write the results to this JSON baseline file")
+    parser.add_argument("--compare", help="compare the results with this JSON baseline file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="largest increase over the baseline, as a fraction, that is not a regression")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from robot import MyRobot
+    from sim_runner import start_simulation, stop_simulation
+
+    fake_time = start_simulation()
+    robot = MyRobot()
+    robot.robotInit()
+    results = run_benchmarks(create_benchmarks(robot), args.calls, args.repeats)
+    stop_simulation(fake_time)
+
+    for result in results:
+        logger.info("%-24s %9.2f us/call (best %.2f)  %6d bytes peak  %.2f blocks retained", result.name,
+                    result.per_call * 1e6, result.best * 1e6, result.alloc_bytes, result.retained_blocks)
+    if args.save:
+        save_results(results, args.save)
+        logger.info("Wrote %s", args.save)
+    if args.compare:
+        regressions = compare_results(results, load_results(args.compare), args.threshold)
+        for regression in regressions:
+            logger.warning("%s %s regressed by %.0f%%: %.4g, baseline %.4g", regression.name, regression.metric,
+                           regression.change * 100, regression.current, regression.baseline)
+        if regressions:
+            sys.exit(1)
+        logger.info("No regressions against %s", args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import functools
+import importlib
+import inspect
+import logging
+import pkgutil
+import time
+from wpilib.command.command import Command
+
+
+logger = logging.getLogger("command_profiler")
+
+
+class CommandProfiler(object):
+    """Times the initialize, execute, isFinished and end methods of Command classes.
+
+    Profiling is opt-in: nothing is changed until install() is called, which
+    replaces the profiled methods on each Command class with timing wrappers.
+    uninstall() puts the original methods back.
+
+    """
+    PROFILED_METHODS = ("initialize", "execute", "isFinished", "end")
+
+    # Indexes into each stats list
+    _CALLS = 0
+    _TOTAL = 1
+    _MAX = 2
+
+    _clock = None
+    _stats = None
+    _originals = None
+
+    def __init__(self, clock=time.perf_counter):
+        """Create and initialize a CommandProfiler.
+
+        Args:
+            clock: Function returning the current time in seconds.
+        """
+        self._clock = clock
+        self._stats = {}
+        self._originals = []
+
+    @staticmethod
+    def find_command_classes(package_name="commands"):
+        """Return every Command subclass defined in the modules of a package."""
+        package = importlib.import_module(package_name)
+        classes = []
+        for module_info in pkgutil.iter_modules(package.__path__):
+            module = importlib.import_module(package_name + "." + module_info.name)
+            for name, cls in inspect.getmembers(module, inspect.isclass):
+                if issubclass(cls, Command) and cls.__module__ == module.__name__:
+                    classes.append(cls)
+        return classes
+
+    def install(self, command_classes=None):
+        """Wrap the profiled methods of the given classes (default: the commands package)."""
+        if command_classes is None:
+            command_classes = CommandProfiler.find_command_classes()
+        for cls in command_classes:
+            for method_name in CommandProfiler.PROFILED_METHODS:
+                # Only wrap methods the class defines itself, so inherited methods are not counted twice
+                method = cls.__dict__.get(method_name)
+                if method is None:
+                    continue
+                stats = self._stats.setdefault((cls.__name__, method_name), [0, 0.0, 0.0])
+                setattr(cls, method_name, self._wrap(method, stats))
+                self._originals.append((cls, method_name, method))
+
+    def uninstall(self):
+        """Restore the original methods of every wrapped class."""
+        for cls, method_name, method in reversed(self._originals):
+            setattr(cls, method_name, method)
+        self._originals = []
+
+    def is_installed(self):
+        return len(self._originals) > 0
+
+    def reset(self):
+        """Clear the recorded statistics."""
+        for stats in self._stats.values():
+            stats[CommandProfiler._CALLS] = 0
+            stats[CommandProfiler._TOTAL] = 0.0
+            stats[CommandProfiler._MAX] = 0.0
+
+    def get_stats(self, class_name, method_name):
+        """Return (calls, total seconds, max seconds) for one method of a command class."""
+        stats = self._stats.get((class_name, method_name))
+        if stats is None:
+            return 0, 0.0, 0.0
+        return tuple(stats)
+
+    def log_report(self):
+        """Log the statistics of every called method, most total time first."""
+        called = [(key, stats) for key, stats in self._stats.items() if stats[CommandProfiler._CALLS] > 0]
+        called.sort(key=lambda item: item[1][CommandProfiler._TOTAL], reverse=True)
+        for (class_name, method_name), (calls, total, maximum) in called:
+            logger.info("%s.%s: %d calls, total %.2f ms, mean %.3f ms, max %.3f ms", class_name, method_name,
+                        calls, total * 1000, total * 1000 / calls, maximum * 1000)
+
+    def _wrap(self, method, stats):
+        clock = self._clock
+
+        @functools.wraps(method)
+        def profiled(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                stats[0] += 1
+                stats[1] += elapsed
+                if elapsed > stats[2]:
+                    stats[2] = elapsed
+        return profiled
@@ -0,0 +1,118 @@
+from config_store import ConfigField, config_record
+from heading_hold import HeadingGains
+from motion_profile import MotionLimits
+from path_planner import Waypoint
+from pid_controller import PIDGains
+from turn_controller import TurnGains
+
+
+AutonomousConfig = config_record("AutonomousConfig", [
+    ConfigField("approach_speed", "Approach", "APPROACH_SPEED", float),
+    ConfigField("approach_encoder_counts", "Approach", "APPROACH_ENCODER_COUNTS", int),
+    ConfigField("approach_encoder_threshold", "Approach", "APPROACH_ENCODER_THRESHOLD", int),
+    ConfigField("approach_time", "Approach", "APPROACH_TIME", float),
+    ConfigField("initial_wait_time", "Approach", "INITIAL_WAIT_TIME", float),
+    ConfigField("cross_encoder_threshold", "Cross", "CROSS_ENCODER_THRESHOLD", int),
+    ConfigField("cross_angle_threshold", "Cross", "CROSS_ANGLE_THRESHOLD", float),
+    ConfigField("cross_speed", "Cross", "CROSS_SPEED", float),
+    ConfigField("cross_encoder_counts", "Cross", "CROSS_ENCODER_COUNTS", int),
+    ConfigField("cross_time", "Cross", "CROSS_TIME", float),
+    ConfigField("cross_center_turn_speed", "Cross", "CROSS_CENTER_TURN_SPEED", float),
+    ConfigField("cross_center_turn_angle", "Cross", "CROSS_CENTER_TURN_ANGLE", float),
+    ConfigField("cross_center_turn_time", "Cross", "CROSS_CENTER_TURN_TIME", float),
+    ConfigField("cross_center_drive_speed", "Cross", "CROSS_CENTER_DRIVE_SPEED", float),
+    ConfigField("cross_center_drive_encoder_counts", "Cross", "CROSS_CENTER_DRIVE_ENCODER_COUNTS", int),
+    ConfigField("cross_center_drive_time", "Cross", "CROSS_CENTER_DRIVE_TIME", float),
+    ConfigField("hang_center_encoder_counts", "Hang", "HANG_CENTER_ENCODER_COUNTS", int),
+    ConfigField("hang_center_encoder_threshold", "Hang", "HANG_CENTER_ENCODER_THRESHOLD", int),
+    ConfigField("hang_center_approach_speed", "Hang", "HANG_CENTER_APPROACH_SPEED", float),
+    ConfigField("hang_center_approach_time", "Hang", "HANG_CENTER_APPROACH_TIME", float),
+    ConfigField("hang_center_speed", "Hang", "HANG_CENTER_SPEED", float),
+    ConfigField("hang_side_positioning_encoder_counts", "Hang", "HANG_SIDE_POSITIONING_ENCODER_COUNTS", int),
+    ConfigField("hang_side_positioning_speed", "Hang", "HANG_SIDE_POSITIONING_SPEED", float),
+    ConfigField("hang_side_positioning_encoder_threshold", "Hang", "HANG_SIDE_POSITIONING_ENCODER_THRESHOLD", int),
+    ConfigField("hang_side_positioning_time", "Hang", "HANG_SIDE_POSITIONING_TIME", float),
+    ConfigField("hang_side_turn_angle", "Hang", "HANG_SIDE_TURN_ANGLE", float),
+    ConfigField("hang_side_turn_speed", "Hang", "HANG_SIDE_TURN_SPEED", float),
+    ConfigField("hang_side_turn_time", "Hang", "HANG_SIDE_TURN_TIME", float),
+    ConfigField("hang_side_turn_angle_threshold", "Hang", "HANG_SIDE_TURN_ANGLE_THRESHOLD", float),
+    ConfigField("hang_side_approach_encoder_counts", "Hang", "HANG_SIDE_APPROACH_ENCODER_COUNTS", int),
+    ConfigField("hang_side_approach_speed", "Hang", "HANG_SIDE_APPROACH_SPEED", float),
+    ConfigField("hang_side_approach_encoder_threshold", "Hang", "HANG_SIDE_APPROACH_ENCODER_THRESHOLD", int),
+    ConfigField("hang_side_approach_time", "Hang", "HANG_SIDE_APPROACH_TIME", float),
+    ConfigField("hang_gear_timeout", "Hang", "HANG_GEAR_TIMEOUT", float),
+    ConfigField("distance_pid_enabled", "DistancePID", "ENABLED", bool, False),
+    ConfigField("distance_kp", "DistancePID", "KP", float, enabled_by="distance_pid_enabled"),
+    ConfigField("distance_ki", "DistancePID", "KI", float, 0.0),
+    ConfigField("distance_kd", "DistancePID", "KD", float, 0.0),
+    ConfigField("distance_kf", "DistancePID", "KF", float, 0.0),
+    ConfigField("distance_settle_time", "DistancePID", "SETTLE_TIME", float, 0.1),
+    ConfigField("profile_enabled", "MotionProfile", "ENABLED", bool, False),
+    ConfigField("profile_max_velocity", "MotionProfile", "MAX_VELOCITY", float, enabled_by="profile_enabled"),
+    ConfigField("profile_max_acceleration", "MotionProfile", "MAX_ACCELERATION", float,
+                enabled_by="profile_enabled"),
+    ConfigField("profile_max_jerk", "MotionProfile", "MAX_JERK", float, 0.0),
+    ConfigField("heading_hold_enabled", "HeadingHold", "ENABLED", bool, False),
+    ConfigField("heading_gyro_kp", "HeadingHold", "GYRO_KP", float, enabled_by="heading_hold_enabled"),
+    ConfigField("heading_gyro_kd", "HeadingHold", "GYRO_KD", float, 0.0),
+    ConfigField("heading_encoder_kp", "HeadingHold", "ENCODER_KP", float, enabled_by="heading_hold_enabled"),
+    ConfigField("heading_encoder_kd", "HeadingHold", "ENCODER_KD", float, 0.0),
+    ConfigField("heading_max_correction", "HeadingHold", "MAX_CORRECTION", float, 0.3),
+    ConfigField("turn_pid_enabled", "TurnPID", "ENABLED", bool, False),
+    ConfigField("turn_kp", "TurnPID", "KP", float, enabled_by="turn_pid_enabled"),
+    ConfigField("turn_ki", "TurnPID", "KI", float, 0.0),
+    ConfigField("turn_kd", "TurnPID", "KD", float, 0.0),
+    ConfigField("turn_min_output", "TurnPID", "MIN_OUTPUT", float, 0.0),
+    ConfigField("turn_settle_time", "TurnPID", "SETTLE_TIME", float, 0.1),
+    ConfigField("turn_rate_limit", "TurnPID", "RATE_LIMIT", float, 0.0),
+    ConfigField("path_enabled", "FollowPath", "ENABLED", bool, False),
+    ConfigField("path_speed", "FollowPath", "SPEED", float, enabled_by="path_enabled"),
+    ConfigField("path_lookahead", "FollowPath", "LOOKAHEAD", float, enabled_by="path_enabled"),
+    ConfigField("path_threshold", "FollowPath", "THRESHOLD", float, enabled_by="path_enabled"),
+    ConfigField("path_spacing", "FollowPath", "SPACING", float, 0.05),
+    ConfigField("path_side_lift_x", "FollowPath", "SIDE_LIFT_X", float, enabled_by="path_enabled"),
+    ConfigField("path_side_lift_y", "FollowPath", "SIDE_LIFT_Y", float, enabled_by="path_enabled"),
+    ConfigField("path_side_lift_heading", "FollowPath", "SIDE_LIFT_HEADING", float, enabled_by="path_enabled"),
+])
+
+
+def distance_pid_gains(config):
+    """Return the PIDGains for driving a distance, or None if PID distance control is disabled."""
+    if not config.distance_pid_enabled:
+        return None
+    return PIDGains(config.distance_kp, config.distance_ki, config.distance_kd, config.distance_kf,
+                    config.distance_settle_time)
+
+
+def motion_limits(config):
+    """Return the MotionLimits for profiled drives, or None if motion profiles are disabled."""
+    if not config.profile_enabled:
+        return None
+    return MotionLimits(config.profile_max_velocity, config.profile_max_acceleration, config.profile_max_jerk)
+
+
+def heading_gains(config):
+    """Return the HeadingGains for heading-hold, or None if heading-hold is disabled."""
+    if not config.heading_hold_enabled:
+        return None
+    return HeadingGains(PIDGains(config.heading_gyro_kp, 0.0, config.heading_gyro_kd, 0.0, 0.0),
+                        PIDGains(config.heading_encoder_kp, 0.0, config.heading_encoder_kd, 0.0, 0.0),
+                        config.heading_max_correction)
+
+
+def turn_gains(config):
+    """Return the TurnGains for gyro turns, or None if the turn PID is disabled."""
+    if not config.turn_pid_enabled:
+        return None
+    return TurnGains(config.turn_kp, config.turn_ki, config.turn_kd, config.turn_min_output, config.turn_settle_time,
+                     config.turn_rate_limit)
+
+
+def hang_gear_waypoints(config, starting_position):
+    """Return the Waypoints from a side starting position to its gear lift.
+
+    The left position (1) turns right, toward the airship, and the right position (3) mirrors it.
+    """
+    side = 1.0 if starting_position == 1 else -1.0
+    return (Waypoint(0.0, 0.0, 0.0),
+            Waypoint(config.path_side_lift_x, config.path_side_lift_y * side, config.path_side_lift_heading * side))
@@ -1,38 +1,21 @@
-import configparser
 from wpilib.command import CommandGroup
+from commands.autonomous_config import AutonomousConfig, distance_pid_gains, heading_gains, motion_limits, turn_gains
 from commands.drive_encoder_counts import DriveEncoderCounts
 from commands.drive_time import DriveTime
 from commands.abort_commands import Abort
 from commands.turn_degrees import TurnDegrees
 from commands.turn_time import TurnTime
+from config_store import ConfigStore
 
 
 class AutonomousCrossLine(CommandGroup):
-    _approach_section = "Approach"
-    _approach_speed_key = "APPROACH_SPEED"
-    _approach_encoder_counts_key = "APPROACH_ENCODER_COUNTS"
-    _approach_encoder_threshold_key = "APPROACH_ENCODER_THRESHOLD"
-    _approach_time_key = "APPROACH_TIME"
-    _initial_wait_time_key = "INITIAL_WAIT_TIME"
-
-    _cross_section = "Cross"
-    _cross_encoder_threshold_key = "CROSS_ENCODER_THRESHOLD"
-    _cross_angle_threshold_key = "CROSS_ANGLE_THRESHOLD"
-
-    _cross_speed_key = "CROSS_SPEED"
-    _cross_encoder_counts_key = "CROSS_ENCODER_COUNTS"
-    _cross_time_key = "CROSS_TIME"
-
-    _cross_center_turn_speed_key = "CROSS_CENTER_TURN_SPEED"
-    _cross_center_turn_angle_key = "CROSS_CENTER_TURN_ANGLE"
-    _cross_center_turn_time_key = "CROSS_CENTER_TURN_TIME"
-    _cross_center_drive_speed_key = "CROSS_CENTER_DRIVE_SPEED"
-    _cross_center_drive_encoder_counts_key = "CROSS_CENTER_DRIVE_ENCODER_COUNTS"
-    _cross_center_drive_time_key = "CROSS_CENTER_DRIVE_TIME"
-
     _robot = None
     _config = None
     _default_timeout = 15
+    _distance_pid_gains = None
+    _motion_limits = None
+    _heading_gains = None
+    _turn_gains = None
 
     _starting_position = None
 
@@ -57,8 +40,7 @@ class AutonomousCrossLine(CommandGroup):
     def __init__(self, robot, configfile="/home/lvuser/py/configs/autonomous.ini"):
         super().__init__()
         self._robot = robot
-        self._config = configparser.ConfigParser()
-        self._config.read(configfile)
+        self._config = ConfigStore.get_instance().get(AutonomousConfig, configfile)
         self._init_commands()
 
     def set_match_configuration(self, starting_position):
@@ -72,51 +54,45 @@ class AutonomousCrossLine(CommandGroup):
         self.addSequential(Abort(self._robot))
 
     def _init_commands(self):
-        self._approach_speed = self._config.getfloat(AutonomousCrossLine._approach_section,
-                                                     AutonomousCrossLine._approach_speed_key)
-        self._approach_encoder_counts = self._config.getint(AutonomousCrossLine._approach_section,
-                                                            AutonomousCrossLine._approach_encoder_counts_key)
-        self._approach_encoder_threshold = self._config.getint(AutonomousCrossLine._approach_section,
-                                                               AutonomousCrossLine._approach_encoder_threshold_key)
-        self._approach_time = self._config.getfloat(AutonomousCrossLine._approach_section,
-                                                    AutonomousCrossLine._approach_time_key)
-        self._initial_wait_time = self._config.getfloat(AutonomousCrossLine._approach_section,
-                                                        AutonomousCrossLine._initial_wait_time_key)
-
-        self._cross_encoder_threshold = self._config.getint(AutonomousCrossLine._cross_section,
-                                                            AutonomousCrossLine._cross_encoder_threshold_key)
-        self._cross_angle_threshold = self._config.getfloat(AutonomousCrossLine._cross_section,
-                                                            AutonomousCrossLine._cross_angle_threshold_key)
-        self._cross_speed = self._config.getfloat(AutonomousCrossLine._cross_section,
-                                                  AutonomousCrossLine._cross_speed_key)
-        self._cross_encoder_counts = self._config.getint(AutonomousCrossLine._cross_section,
-                                                         AutonomousCrossLine._cross_encoder_counts_key)
-        self._cross_time = self._config.getfloat(AutonomousCrossLine._cross_section,
-                                                 AutonomousCrossLine._cross_time_key)
-        self._cross_center_turn_speed = self._config.getfloat(AutonomousCrossLine._cross_section,
-                                                              AutonomousCrossLine._cross_center_turn_speed_key)
-        self._cross_center_turn_angle = self._config.getfloat(AutonomousCrossLine._cross_section,
-                                                              AutonomousCrossLine._cross_center_turn_angle_key)
-        self._cross_center_turn_time = self._config.getfloat(AutonomousCrossLine._cross_section,
-                                                             AutonomousCrossLine._cross_center_turn_time_key)
-        self._cross_center_drive_speed = self._config.getfloat(AutonomousCrossLine._cross_section,
-                                                               AutonomousCrossLine._cross_center_drive_speed_key)
-        self._cross_center_drive_encoder_counts = self._config.getint(
-            AutonomousCrossLine._cross_section, AutonomousCrossLine._cross_center_drive_encoder_counts_key)
-        self._cross_center_drive_time = self._config.getfloat(AutonomousCrossLine._cross_section,
-                                                              AutonomousCrossLine._cross_center_drive_time_key)
+        self._distance_pid_gains = distance_pid_gains(self._config)
+        self._motion_limits = motion_limits(self._config)
+        self._heading_gains = heading_gains(self._config)
+        self._turn_gains = turn_gains(self._config)
+        self._approach_speed = self._config.approach_speed
+        self._approach_encoder_counts = self._config.approach_encoder_counts
+        self._approach_encoder_threshold = self._config.approach_encoder_threshold
+        self._approach_time = self._config.approach_time
+        self._initial_wait_time = self._config.initial_wait_time
+        self._cross_encoder_threshold = self._config.cross_encoder_threshold
+        self._cross_angle_threshold = self._config.cross_angle_threshold
+        self._cross_speed = self._config.cross_speed
+        self._cross_encoder_counts = self._config.cross_encoder_counts
+        self._cross_time = self._config.cross_time
+        self._cross_center_turn_speed = self._config.cross_center_turn_speed
+        self._cross_center_turn_angle = self._config.cross_center_turn_angle
+        self._cross_center_turn_time = self._config.cross_center_turn_time
+        self._cross_center_drive_speed = self._config.cross_center_drive_speed
+        self._cross_center_drive_encoder_counts = self._config.cross_center_drive_encoder_counts
+        self._cross_center_drive_time = self._config.cross_center_drive_time
 
     def _add_approach_commands(self, use_encoder=False, use_gyro=False):
         approach_commands = CommandGroup()
-        approach_commands.addSequential(DriveTime(self._robot, self._initial_wait_time, 0.0), self._default_timeout)
+        approach_commands.addSequential(DriveTime(self._robot, self._initial_wait_time, 0.0,
+                                                  motion_limits=self._motion_limits,
+                                                  heading_gains=self._heading_gains), self._default_timeout)
         # Drive up to the tower, just before the line
         if use_encoder:
             approach_commands.addSequential(DriveEncoderCounts(self._robot, self._approach_encoder_counts,
                                                                self._approach_speed,
-                                                               self._approach_encoder_threshold),
+                                                               self._approach_encoder_threshold,
+                                                               pid_gains=self._distance_pid_gains,
+                                                               motion_limits=self._motion_limits,
+                                                               heading_gains=self._heading_gains),
                                             self._default_timeout)
         else:
-            approach_commands.addSequential(DriveTime(self._robot, self._approach_time, self._approach_speed),
+            approach_commands.addSequential(DriveTime(self._robot, self._approach_time, self._approach_speed,
+                                                      motion_limits=self._motion_limits,
+                                                      heading_gains=self._heading_gains),
                                             self._default_timeout)
         self.addSequential(approach_commands)
 
@@ -128,7 +104,8 @@ class AutonomousCrossLine(CommandGroup):
             if use_gyro:
                 cross_line_commands.addSequential(TurnDegrees(self._robot, self._cross_center_turn_angle,
                                                               self._cross_center_turn_speed,
-                                                              self._cross_angle_threshold),
+                                                              self._cross_angle_threshold,
+                                                              turn_gains=self._turn_gains),
                                                   self._default_timeout)
             else:
                 cross_line_commands.addSequential(TurnTime(self._robot, self._cross_center_turn_time,
@@ -139,17 +116,23 @@ class AutonomousCrossLine(CommandGroup):
                 cross_line_commands.addSequential(DriveEncoderCounts(self._robot,
                                                                      self._cross_center_drive_encoder_counts,
                                                                      self._cross_center_drive_speed,
-                                                                     self._approach_encoder_threshold),
+                                                                     self._approach_encoder_threshold,
+                                                                     pid_gains=self._distance_pid_gains,
+                                                                     motion_limits=self._motion_limits,
+                                                                     heading_gains=self._heading_gains),
                                                   self._default_timeout)
             else:
                 cross_line_commands.addSequential(DriveTime(self._robot, self._cross_center_drive_time,
-                                                            self._cross_center_drive_speed),
+                                                            self._cross_center_drive_speed,
+                                                            motion_limits=self._motion_limits,
+                                                            heading_gains=self._heading_gains),
                                                   self._default_timeout)
             # Turn back to facing forward
             if use_gyro:
                 cross_line_commands.addSequential(TurnDegrees(self._robot, self._cross_center_turn_angle * -1.0,
                                                               self._cross_center_turn_speed,
-                                                              self._cross_angle_threshold),
+                                                              self._cross_angle_threshold,
+                                                              turn_gains=self._turn_gains),
                                                   self._default_timeout)
             else:
                 cross_line_commands.addSequential(TurnTime(self._robot, self._cross_center_turn_time,
@@ -159,10 +142,15 @@ class AutonomousCrossLine(CommandGroup):
         if use_encoder:
             cross_line_commands.addSequential(DriveEncoderCounts(self._robot, self._cross_encoder_counts,
                                                                  self._cross_speed,
-                                                                 self._cross_encoder_threshold),
+                                                                 self._cross_encoder_threshold,
+                                                                 pid_gains=self._distance_pid_gains,
+                                                                 motion_limits=self._motion_limits,
+                                                                 heading_gains=self._heading_gains),
                                               self._default_timeout)
         else:
-            cross_line_commands.addSequential(DriveTime(self._robot, self._cross_time, self._cross_speed),
+            cross_line_commands.addSequential(DriveTime(self._robot, self._cross_time, self._cross_speed,
+                                                        motion_limits=self._motion_limits,
+                                                        heading_gains=self._heading_gains),
                                               self._default_timeout)
 
         self.addSequential(cross_line_commands)
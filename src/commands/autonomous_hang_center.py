@@ -1,25 +1,18 @@
-import configparser
 from wpilib.command import CommandGroup
+from commands.autonomous_config import AutonomousConfig, distance_pid_gains, heading_gains, motion_limits
 from commands.drive_encoder_counts import DriveEncoderCounts
 from commands.drive_time import DriveTime
 from commands.abort_commands import Abort
+from config_store import ConfigStore
 
 
 class AutonomousHangCenter(CommandGroup):
-    _approach_section = "Approach"
-    _approach_speed_key = "APPROACH_SPEED"
-    _approach_encoder_counts_key = "APPROACH_ENCODER_COUNTS"
-    _approach_encoder_threshold_key = "APPROACH_ENCODER_THRESHOLD"
-    _approach_time_key = "APPROACH_TIME"
-    _initial_wait_time_key = "INITIAL_WAIT_TIME"
-
-    _hang_section = "Hang"
-    _hang_center_approach_speed_key = "HANG_CENTER_APPROACH_SPEED"
-    _hang_center_approach_time_key = "HANG_CENTER_APPROACH_TIME"
-
     _robot = None
     _config = None
     _default_timeout = 15
+    _distance_pid_gains = None
+    _motion_limits = None
+    _heading_gains = None
 
     _starting_position = None
 
@@ -35,8 +28,7 @@ class AutonomousHangCenter(CommandGroup):
     def __init__(self, robot, configfile="/home/lvuser/py/configs/autonomous.ini"):
         super().__init__()
         self._robot = robot
-        self._config = configparser.ConfigParser()
-        self._config.read(configfile)
+        self._config = ConfigStore.get_instance().get(AutonomousConfig, configfile)
         self._init_commands()
 
     def set_match_configuration(self, starting_position):
@@ -50,40 +42,44 @@ class AutonomousHangCenter(CommandGroup):
         self.addSequential(Abort(self._robot))
 
     def _init_commands(self):
-        self._approach_speed = self._config.getfloat(AutonomousHangCenter._approach_section,
-                                                     AutonomousHangCenter._approach_speed_key)
-        self._approach_encoder_counts = self._config.getint(AutonomousHangCenter._approach_section,
-                                                            AutonomousHangCenter._approach_encoder_counts_key)
-        self._approach_encoder_threshold = self._config.getint(AutonomousHangCenter._approach_section,
-                                                               AutonomousHangCenter._approach_encoder_threshold_key)
-        self._approach_time = self._config.getfloat(AutonomousHangCenter._approach_section,
-                                                    AutonomousHangCenter._approach_time_key)
-        self._initial_wait_time = self._config.getfloat(AutonomousHangCenter._approach_section,
-                                                        AutonomousHangCenter._initial_wait_time_key)
-
-        self._hang_center_approach_speed = self._config.getfloat(AutonomousHangCenter._hang_section,
-                                                                 AutonomousHangCenter._hang_center_approach_speed_key)
-        self._hang_center_approach_time = self._config.getfloat(AutonomousHangCenter._hang_section,
-                                                                AutonomousHangCenter._hang_center_approach_time_key)
+        self._distance_pid_gains = distance_pid_gains(self._config)
+        self._motion_limits = motion_limits(self._config)
+        self._heading_gains = heading_gains(self._config)
+        self._approach_speed = self._config.approach_speed
+        self._approach_encoder_counts = self._config.approach_encoder_counts
+        self._approach_encoder_threshold = self._config.approach_encoder_threshold
+        self._approach_time = self._config.approach_time
+        self._initial_wait_time = self._config.initial_wait_time
+        self._hang_center_approach_speed = self._config.hang_center_approach_speed
+        self._hang_center_approach_time = self._config.hang_center_approach_time
 
     def _add_approach_commands(self, use_encoder=False, use_gyro=False):
         approach_commands = CommandGroup()
-        approach_commands.addSequential(DriveTime(self._robot, self._initial_wait_time, 0.0), self._default_timeout)
+        approach_commands.addSequential(DriveTime(self._robot, self._initial_wait_time, 0.0,
+                                                  motion_limits=self._motion_limits,
+                                                  heading_gains=self._heading_gains), self._default_timeout)
         # Drive up to the tower, just before the line
         if use_encoder:
             approach_commands.addSequential(DriveEncoderCounts(self._robot, self._approach_encoder_counts,
                                                                self._approach_speed,
-                                                               self._approach_encoder_threshold),
+                                                               self._approach_encoder_threshold,
+                                                               pid_gains=self._distance_pid_gains,
+                                                               motion_limits=self._motion_limits,
+                                                               heading_gains=self._heading_gains),
                                             self._default_timeout)
         else:
-            approach_commands.addSequential(DriveTime(self._robot, self._approach_time, self._approach_speed),
+            approach_commands.addSequential(DriveTime(self._robot, self._approach_time, self._approach_speed,
+                                                      motion_limits=self._motion_limits,
+                                                      heading_gains=self._heading_gains),
                                             self._default_timeout)
         self.addSequential(approach_commands)
 
     def _add_hang_center_commands(self, use_encoder=False, use_gyro=False):
         hang_commands = CommandGroup()
         hang_commands.addSequential(DriveTime(self._robot, self._hang_center_approach_time,
-                                              self._hang_center_approach_speed), self._default_timeout)
+                                              self._hang_center_approach_speed,
+                                              motion_limits=self._motion_limits,
+                                              heading_gains=self._heading_gains), self._default_timeout)
         self.addSequential(hang_commands)
 
     def initialize(self):
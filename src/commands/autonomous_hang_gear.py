@@ -1,59 +1,28 @@
-import configparser
+import os
 from wpilib.command import CommandGroup
+from commands.autonomous_config import AutonomousConfig, distance_pid_gains, hang_gear_waypoints, heading_gains, \
+    motion_limits, turn_gains
 from commands.drive_encoder_counts import DriveEncoderCounts
 from commands.drive_time import DriveTime
+from commands.follow_path import FollowPath
 from commands.abort_commands import Abort
 from commands.turn_time import TurnTime
 from commands.turn_degrees import TurnDegrees
 from commands.release_gear import ReleaseGear
+from config_store import ConfigStore
+from path_planner import load_path
 
 class AutonomousHangGear(CommandGroup):
-    _approach_section = "Approach"
-    _approach_speed_key = "APPROACH_SPEED"
-    _approach_encoder_counts_key = "APPROACH_ENCODER_COUNTS"
-    _approach_encoder_threshold_key = "APPROACH_ENCODER_THRESHOLD"
-    _approach_time_key = "APPROACH_TIME"
-
-    _hang_section = "Hang"
-    _hang_center_encoder_counts_key = "HANG_CENTER_ENCODER_COUNTS"
-    _hang_center_encoder_threshold_key = "HANG_CENTER_ENCODER_THRESHOLD"
-    _hang_center_approach_speed_key = "HANG_CENTER_APPROACH_SPEED"
-    _hang_center_approach_time_key = "HANG_CENTER_APPROACH_TIME"
-    _hang_center_speed_key = "HANG_CENTER_SPEED"
-
-    _hang_side_positioning_encoder_counts_key = "HANG_SIDE_POSITIONING_ENCODER_COUNTS"
-    _hang_side_positioning_speed_key = "HANG_SIDE_POSITIONING_SPEED"
-    _hang_side_positioning_encoder_threshold_key = "HANG_SIDE_POSITIONING_ENCODER_THRESHOLD"
-    _hang_side_positioning_time_key = "HANG_SIDE_POSITIONING_TIME"
-
-    _hang_side_turn_angle_key = "HANG_SIDE_TURN_ANGLE"
-    _hang_side_turn_speed_key = "HANG_SIDE_TURN_SPEED"
-    _hang_side_turn_time_key = "HANG_SIDE_TURN_TIME"
-    _hang_side_turn_angle_threshold_key = "HANG_SIDE_TURN_ANGLE_THRESHOLD"
-
-    _hang_side_approach_encoder_counts_key = "HANG_SIDE_APPROACH_ENCODER_COUNTS"
-    _hang_side_approach_speed_key = "HANG_SIDE_APPROACH_SPEED"
-    _hang_side_approach_encoder_threshold_key = "HANG_SIDE_APPROACH_ENCODER_THRESHOLD"
-    _hang_side_approach_time_key = "HANG_SIDE_APPROACH_TIME"
-
-    _hang_gear_timeout_key = "HANG_GEAR_TIMEOUT"
-
-    _cross_section = "Cross"
-    _cross_encoder_threshold_key = "CROSS_ENCODER_THRESHOLD"
-    _cross_angle_threshold_key = "CROSS_ANGLE_THRESHOLD"
-    _cross_speed_key = "CROSS_SPEED"
-    _cross_encoder_counts_key = "CROSS_ENCODER_COUNTS"
-    _cross_time_key = "CROSS_TIME"
-    _cross_center_turn_speed_key = "CROSS_CENTER_TURN_SPEED"
-    _cross_center_turn_angle_key = "CROSS_CENTER_TURN_ANGLE"
-    _cross_center_turn_time_key = "CROSS_CENTER_TURN_TIME"
-    _cross_center_drive_speed_key = "CROSS_CENTER_DRIVE_SPEED"
-    _cross_center_drive_encoder_counts_key = "CROSS_CENTER_DRIVE_ENCODER_COUNTS"
-    _cross_center_drive_time_key = "CROSS_CENTER_DRIVE_TIME"
+    # Paths are generated into this cache when the plans are built while disabled, and read back from it after
+    path_cache_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "paths")
 
     _robot = None
     _config = None
     _default_timeout = 15
+    _distance_pid_gains = None
+    _motion_limits = None
+    _heading_gains = None
+    _turn_gains = None
 
     _starting_position = None
 
@@ -100,8 +69,7 @@ class AutonomousHangGear(CommandGroup):
     def __init__(self, robot, configfile="/home/lvuser/py/configs/autonomous.ini"):
         super().__init__()
         self._robot = robot
-        self._config = configparser.ConfigParser()
-        self._config.read(configfile)
+        self._config = ConfigStore.get_instance().get(AutonomousConfig, configfile)
         self._init_commands()
 
     def set_match_configuration(self, starting_position):
@@ -117,72 +85,43 @@ class AutonomousHangGear(CommandGroup):
         self.addSequential(Abort(self._robot))
 
     def _init_commands(self):
-        self._approach_speed = self._config.getfloat(AutonomousHangGear._approach_section,
-                                                     AutonomousHangGear._approach_speed_key)
-        self._approach_encoder_counts = self._config.getint(AutonomousHangGear._approach_section,
-                                                            AutonomousHangGear._approach_encoder_counts_key)
-        self._approach_encoder_threshold = self._config.getint(AutonomousHangGear._approach_section,
-                                                               AutonomousHangGear._approach_encoder_threshold_key)
-        self._approach_time = self._config.getfloat(AutonomousHangGear._approach_section,
-                                                    AutonomousHangGear._approach_time_key)
-        self._hang_center_encoder_counts = self._config.getint(AutonomousHangGear._hang_section,
-                                                               AutonomousHangGear._hang_center_encoder_counts_key)
-        self._hang_center_encoder_threshold = self._config.getint(AutonomousHangGear._hang_section,
-                                                                  AutonomousHangGear._hang_center_encoder_threshold_key)
-        self._hang_center_approach_speed = self._config.getfloat(AutonomousHangGear._hang_section,
-                                                                 AutonomousHangGear._hang_center_approach_speed_key)
-        self._hang_center_approach_time = self._config.getfloat(AutonomousHangGear._hang_section,
-                                                                AutonomousHangGear._hang_center_approach_time_key)
-        self._hang_center_speed = self._config.getfloat(AutonomousHangGear._hang_section,
-                                                        AutonomousHangGear._hang_center_speed_key)
-        self._hang_side_positioning_encoder_counts = self._config.getint(AutonomousHangGear._hang_section,
-                                                                         AutonomousHangGear._hang_side_positioning_encoder_counts_key)
-        self._hang_side_positioning_speed = self._config.getfloat(AutonomousHangGear._hang_section,
-                                                                  AutonomousHangGear._hang_side_positioning_speed_key)
-        self._hang_side_positioning_encoder_threshold = self._config.getint(AutonomousHangGear._hang_section,
-                                                                            AutonomousHangGear._hang_side_positioning_encoder_threshold_key)
-        self._hang_side_positioning_time = self._config.getfloat(AutonomousHangGear._hang_section,
-                                                                 AutonomousHangGear._hang_side_positioning_time_key)
-        self._hang_side_turn_angle = self._config.getfloat(AutonomousHangGear._hang_section,
-                                                           AutonomousHangGear._hang_side_turn_angle_key)
-        self._hang_side_turn_speed = self._config.getfloat(AutonomousHangGear._hang_section,
-                                                           AutonomousHangGear._hang_side_turn_speed_key)
-        self._hang_side_turn_time = self._config.getfloat(AutonomousHangGear._hang_section,
-                                                          AutonomousHangGear._hang_side_turn_time_key)
-        self._hang_side_turn_angle_threshold = self._config.getfloat(AutonomousHangGear._hang_section,
-                                                                     AutonomousHangGear._hang_side_turn_angle_threshold_key)
-        self._hang_side_approach_encoder_counts = self._config.getint(AutonomousHangGear._hang_section,
-                                                                      AutonomousHangGear._hang_side_approach_encoder_counts_key)
-        self._hang_side_approach_speed = self._config.getfloat(AutonomousHangGear._hang_section,
-                                                               AutonomousHangGear._hang_side_approach_speed_key)
-        self._hang_side_approach_encoder_threshold = self._config.getint(AutonomousHangGear._hang_section,
-                                                                         AutonomousHangGear._hang_side_approach_encoder_threshold_key)
-        self._hang_side_approach_time = self._config.getfloat(AutonomousHangGear._hang_section,
-                                                              AutonomousHangGear._hang_side_approach_time_key)
-        self._hang_gear_timeout = self._config.getfloat(AutonomousHangGear._hang_section,
-                                                        AutonomousHangGear._hang_gear_timeout_key)
-        self._cross_encoder_threshold = self._config.getint(AutonomousHangGear._cross_section,
-                                                            AutonomousHangGear._cross_encoder_threshold_key)
-        self._cross_angle_threshold = self._config.getfloat(AutonomousHangGear._cross_section,
-                                                            AutonomousHangGear._cross_angle_threshold_key)
-        self._cross_speed = self._config.getfloat(AutonomousHangGear._cross_section,
-                                                  AutonomousHangGear._cross_speed_key)
-        self._cross_encoder_counts = self._config.getint(AutonomousHangGear._cross_section,
-                                                         AutonomousHangGear._cross_encoder_counts_key)
-        self._cross_time = self._config.getfloat(AutonomousHangGear._cross_section,
-                                                 AutonomousHangGear._cross_time_key)
-        self._cross_center_turn_speed = self._config.getfloat(AutonomousHangGear._cross_section,
-                                                              AutonomousHangGear._cross_center_turn_speed_key)
-        self._cross_center_turn_angle = self._config.getfloat(AutonomousHangGear._cross_section,
-                                                              AutonomousHangGear._cross_center_turn_angle_key)
-        self._cross_center_turn_time = self._config.getfloat(AutonomousHangGear._cross_section,
-                                                             AutonomousHangGear._cross_center_turn_time_key)
-        self._cross_center_drive_speed = self._config.getfloat(AutonomousHangGear._cross_section,
-                                                               AutonomousHangGear._cross_center_drive_speed_key)
-        self._cross_center_drive_encoder_counts = self._config.getint(
-            AutonomousHangGear._cross_section, AutonomousHangGear._cross_center_drive_encoder_counts_key)
-        self._cross_center_drive_time = self._config.getfloat(AutonomousHangGear._cross_section,
-                                                              AutonomousHangGear._cross_center_drive_time_key)
+        self._distance_pid_gains = distance_pid_gains(self._config)
+        self._motion_limits = motion_limits(self._config)
+        self._heading_gains = heading_gains(self._config)
+        self._turn_gains = turn_gains(self._config)
+        self._approach_speed = self._config.approach_speed
+        self._approach_encoder_counts = self._config.approach_encoder_counts
+        self._approach_encoder_threshold = self._config.approach_encoder_threshold
+        self._approach_time = self._config.approach_time
+        self._hang_center_encoder_counts = self._config.hang_center_encoder_counts
+        self._hang_center_encoder_threshold = self._config.hang_center_encoder_threshold
+        self._hang_center_approach_speed = self._config.hang_center_approach_speed
+        self._hang_center_approach_time = self._config.hang_center_approach_time
+        self._hang_center_speed = self._config.hang_center_speed
+        self._hang_side_positioning_encoder_counts = self._config.hang_side_positioning_encoder_counts
+        self._hang_side_positioning_speed = self._config.hang_side_positioning_speed
+        self._hang_side_positioning_encoder_threshold = self._config.hang_side_positioning_encoder_threshold
+        self._hang_side_positioning_time = self._config.hang_side_positioning_time
+        self._hang_side_turn_angle = self._config.hang_side_turn_angle
+        self._hang_side_turn_speed = self._config.hang_side_turn_speed
+        self._hang_side_turn_time = self._config.hang_side_turn_time
+        self._hang_side_turn_angle_threshold = self._config.hang_side_turn_angle_threshold
+        self._hang_side_approach_encoder_counts = self._config.hang_side_approach_encoder_counts
+        self._hang_side_approach_speed = self._config.hang_side_approach_speed
+        self._hang_side_approach_encoder_threshold = self._config.hang_side_approach_encoder_threshold
+        self._hang_side_approach_time = self._config.hang_side_approach_time
+        self._hang_gear_timeout = self._config.hang_gear_timeout
+        self._cross_encoder_threshold = self._config.cross_encoder_threshold
+        self._cross_angle_threshold = self._config.cross_angle_threshold
+        self._cross_speed = self._config.cross_speed
+        self._cross_encoder_counts = self._config.cross_encoder_counts
+        self._cross_time = self._config.cross_time
+        self._cross_center_turn_speed = self._config.cross_center_turn_speed
+        self._cross_center_turn_angle = self._config.cross_center_turn_angle
+        self._cross_center_turn_time = self._config.cross_center_turn_time
+        self._cross_center_drive_speed = self._config.cross_center_drive_speed
+        self._cross_center_drive_encoder_counts = self._config.cross_center_drive_encoder_counts
+        self._cross_center_drive_time = self._config.cross_center_drive_time
 
     def _add_approach_commands(self, use_encoder=False, use_gyro=False):
         approach_commands = CommandGroup()
@@ -190,10 +129,15 @@ class AutonomousHangGear(CommandGroup):
         if use_encoder:
             approach_commands.addSequential(DriveEncoderCounts(self._robot, self._approach_encoder_counts,
                                                                self._approach_speed,
-                                                               self._approach_encoder_threshold),
+                                                               self._approach_encoder_threshold,
+                                                               pid_gains=self._distance_pid_gains,
+                                                               motion_limits=self._motion_limits,
+                                                               heading_gains=self._heading_gains),
                                             self._default_timeout)
         else:
-            approach_commands.addSequential(DriveTime(self._robot, self._approach_time, self._approach_speed),
+            approach_commands.addSequential(DriveTime(self._robot, self._approach_time, self._approach_speed,
+                                                      motion_limits=self._motion_limits,
+                                                      heading_gains=self._heading_gains),
                                             self._default_timeout)
         self.addSequential(approach_commands)
 
@@ -205,29 +149,49 @@ class AutonomousHangGear(CommandGroup):
             if use_encoder:
                 hang_gear_commands.addSequential(DriveEncoderCounts(self._robot, self._hang_center_encoder_counts,
                                                                     self._hang_center_approach_speed,
-                                                                    self._hang_center_encoder_threshold),
+                                                                    self._hang_center_encoder_threshold,
+                                                                    pid_gains=self._distance_pid_gains,
+                                                                    motion_limits=self._motion_limits,
+                                                                    heading_gains=self._heading_gains),
                                                  self._default_timeout)
             else:
                 hang_gear_commands.addSequential(DriveTime(self._robot, self._hang_center_approach_time,
-                                                           self._hang_center_speed), self._default_timeout)
+                                                           self._hang_center_speed,
+                                                           motion_limits=self._motion_limits,
+                                                           heading_gains=self._heading_gains), self._default_timeout)
+
+        elif self._config.path_enabled and use_encoder and \
+                (use_gyro or self._robot.drivetrain.is_encoder_pair_enabled()):
+            # drive to the lift in one continuous motion, hook gear, if odometry can track the heading
+            path = load_path(hang_gear_waypoints(self._config, self._starting_position), self._config.path_spacing,
+                             self.path_cache_directory)
+            hang_gear_commands.addSequential(FollowPath(self._robot, path, self._config.path_speed,
+                                                        self._config.path_lookahead, self._config.path_threshold),
+                                             self._default_timeout)
 
         else:
             # drive to turning point
             if use_encoder:
                 hang_gear_commands.addSequential(DriveEncoderCounts(self._robot, self._hang_side_positioning_encoder_counts,
                                                                     self._hang_side_positioning_speed,
-                                                                    self._hang_side_positioning_encoder_threshold),
+                                                                    self._hang_side_positioning_encoder_threshold,
+                                                                    pid_gains=self._distance_pid_gains,
+                                                                    motion_limits=self._motion_limits,
+                                                                    heading_gains=self._heading_gains),
                                                  self._default_timeout)
             else:
                 hang_gear_commands.addSequential(DriveTime(self._robot, self._hang_side_positioning_time,
-                                                           self._hang_side_positioning_speed), self._default_timeout)
+                                                           self._hang_side_positioning_speed,
+                                                           motion_limits=self._motion_limits,
+                                                           heading_gains=self._heading_gains), self._default_timeout)
             # turn toward lift
             if self._starting_position == 1:
                 # TODO: set _hang_side_turn_angle and _hang_side_turn_speed based on starting position, pass into single if/else use_gyro
                 if use_gyro:
                     hang_gear_commands.addSequential(TurnDegrees(self._robot, self._hang_side_turn_angle,
                                                                  self._hang_side_turn_speed,
-                                                                 self._hang_side_turn_angle_threshold),
+                                                                 self._hang_side_turn_angle_threshold,
+                                                                 turn_gains=self._turn_gains),
                                                      self._default_timeout)
                 else:
                     hang_gear_commands.addSequential(TurnTime(self._robot, self._hang_side_turn_time,
@@ -237,7 +201,8 @@ class AutonomousHangGear(CommandGroup):
                 if use_gyro:
                     hang_gear_commands.addSequential(TurnDegrees(self._robot, self._hang_side_turn_angle * -1.0,
                                                                  self._hang_side_turn_speed,
-                                                                 self._hang_side_turn_angle_threshold),
+                                                                 self._hang_side_turn_angle_threshold,
+                                                                 turn_gains=self._turn_gains),
                                                      self._default_timeout)
                 else:
                     hang_gear_commands.addSequential(TurnTime(self._robot, self._hang_side_turn_time,
@@ -247,11 +212,16 @@ class AutonomousHangGear(CommandGroup):
             if use_encoder:
                 hang_gear_commands.addSequential(DriveEncoderCounts(self._robot, self._hang_side_approach_encoder_counts,
                                                                     self._hang_side_approach_speed,
-                                                                    self._hang_side_approach_encoder_threshold),
+                                                                    self._hang_side_approach_encoder_threshold,
+                                                                    pid_gains=self._distance_pid_gains,
+                                                                    motion_limits=self._motion_limits,
+                                                                    heading_gains=self._heading_gains),
                                                  self._default_timeout)
             else:
                 hang_gear_commands.addSequential(DriveTime(self._robot, self._hang_side_approach_time,
-                                                           self._hang_side_approach_speed), self._default_timeout)
+                                                           self._hang_side_approach_speed,
+                                                           motion_limits=self._motion_limits,
+                                                           heading_gains=self._heading_gains), self._default_timeout)
 
         # retract pneumatic arm
         hang_gear_commands.addParallel(ReleaseGear(self._robot, self._hang_gear_timeout), self._default_timeout)
@@ -260,11 +230,16 @@ class AutonomousHangGear(CommandGroup):
         if use_encoder:
             hang_gear_commands.addParallel(DriveEncoderCounts(self._robot, self._hang_side_approach_encoder_counts,
                                                                 self._hang_side_approach_speed * -1.0,
-                                                                self._hang_side_approach_encoder_threshold),
+                                                                self._hang_side_approach_encoder_threshold,
+                                                              pid_gains=self._distance_pid_gains,
+                                                              motion_limits=self._motion_limits,
+                                                              heading_gains=self._heading_gains),
                                              self._default_timeout)
         else:
             hang_gear_commands.addParallel(DriveTime(self._robot, self._hang_side_approach_time,
-                                                       self._hang_side_approach_speed * -1.0), self._default_timeout)
+                                                       self._hang_side_approach_speed * -1.0,
+                                                     motion_limits=self._motion_limits,
+                                                     heading_gains=self._heading_gains), self._default_timeout)
 
         self.addSequential(hang_gear_commands)
 
@@ -276,7 +251,8 @@ class AutonomousHangGear(CommandGroup):
             if use_gyro:
                 cross_line_commands.addSequential(TurnDegrees(self._robot, self._cross_center_turn_angle,
                                                               self._cross_center_turn_speed,
-                                                              self._cross_angle_threshold),
+                                                              self._cross_angle_threshold,
+                                                              turn_gains=self._turn_gains),
                                                   self._default_timeout)
             else:
                 cross_line_commands.addSequential(TurnTime(self._robot, self._cross_center_turn_time,
@@ -287,17 +263,23 @@ class AutonomousHangGear(CommandGroup):
                 cross_line_commands.addSequential(DriveEncoderCounts(self._robot,
                                                                      self._cross_center_drive_encoder_counts,
                                                                      self._cross_center_drive_speed,
-                                                                     self._approach_encoder_threshold),
+                                                                     self._approach_encoder_threshold,
+                                                                     pid_gains=self._distance_pid_gains,
+                                                                     motion_limits=self._motion_limits,
+                                                                     heading_gains=self._heading_gains),
                                                   self._default_timeout)
             else:
                 cross_line_commands.addSequential(DriveTime(self._robot, self._cross_center_drive_time,
-                                                            self._cross_center_drive_speed),
+                                                            self._cross_center_drive_speed,
+                                                            motion_limits=self._motion_limits,
+                                                            heading_gains=self._heading_gains),
                                                   self._default_timeout)
             # Turn back to facing forward
             if use_gyro:
                 cross_line_commands.addSequential(TurnDegrees(self._robot, self._cross_center_turn_angle * -1.0,
                                                               self._cross_center_turn_speed,
-                                                              self._cross_angle_threshold),
+                                                              self._cross_angle_threshold,
+                                                              turn_gains=self._turn_gains),
                                                   self._default_timeout)
             else:
                 cross_line_commands.addSequential(TurnTime(self._robot, self._cross_center_turn_time,
@@ -307,10 +289,15 @@ class AutonomousHangGear(CommandGroup):
         if use_encoder:
             cross_line_commands.addSequential(DriveEncoderCounts(self._robot, self._cross_encoder_counts,
                                                                  self._cross_speed,
-                                                                 self._cross_encoder_threshold),
+                                                                 self._cross_encoder_threshold,
+                                                                 pid_gains=self._distance_pid_gains,
+                                                                 motion_limits=self._motion_limits,
+                                                                 heading_gains=self._heading_gains),
                                               self._default_timeout)
         else:
-            cross_line_commands.addSequential(DriveTime(self._robot, self._cross_time, self._cross_speed),
+            cross_line_commands.addSequential(DriveTime(self._robot, self._cross_time, self._cross_speed,
+                                                        motion_limits=self._motion_limits,
+                                                        heading_gains=self._heading_gains),
                                               self._default_timeout)
 
         self.addSequential(cross_line_commands)
@@ -0,0 +1,74 @@
+import logging
+from wpilib.command.command import Command
+from stopwatch import Stopwatch
+from sysid import CharacterizationData, DEFAULT_SCHEDULE, fit, get_schedule_output
+
+
+logger = logging.getLogger("characterize_drivetrain")
+
+
+class CharacterizeDrivetrain(Command):
+    """Drives the characterization run of the sysid tool and fits its results.
+
+    The drivetrain needs about 20 feet of open floor in front of and behind it.
+    The flight recorder logs the run for fitting offline, and the fit is also
+    logged when the run ends.
+
+    """
+    _stopwatch = None
+    _schedule = None
+    _data = None
+    _finished = False
+
+    def __init__(self, robot, schedule=DEFAULT_SCHEDULE, name=None, timeout=60):
+        """Constructor"""
+        super().__init__(name, timeout)
+        self.robot = robot
+        self.requires(robot.drivetrain)
+        self._stopwatch = Stopwatch()
+        self._schedule = schedule
+
+    def initialize(self):
+        """Called before the Command is run for the first time."""
+        self._stopwatch.start()
+        self._data = CharacterizationData()
+        self._finished = False
+        return Command.initialize(self)
+
+    def execute(self):
+        """Called repeatedly when this Command is scheduled to run"""
+        outputs = get_schedule_output(self._schedule, self._stopwatch.elapsed_time_in_secs())
+        if outputs is None:
+            self._finished = True
+            self.robot.drivetrain.tank_drive(0.0, 0.0)
+        else:
+            sensors = self.robot.drivetrain.get_sensor_snapshot()
+            self._data.append(sensors.timestamp, outputs[0], outputs[1], sensors.left_encoder,
+                              sensors.right_encoder, sensors.gyro_angle)
+            # The schedule's outputs are negated drivetrain outputs
+            self.robot.drivetrain.tank_drive(-outputs[0], -outputs[1])
+        return Command.execute(self)
+
+    def isFinished(self):
+        """Returns true when the Command no longer needs to be run"""
+        return self._finished or self.isTimedOut()
+
+    def end(self):
+        """Called once after isFinished returns true"""
+        self.robot.drivetrain.tank_drive(0.0, 0.0)
+        try:
+            result = fit(self._data, self.robot.drivetrain.get_distance_per_count())
+        except ValueError:
+            logger.exception("Could not fit the characterization")
+            return
+        logger.info("Characterization: KS %.4f, KV %.6f, KA %.6f, track width %.3f ft, r squared %.3f",
+                    result.feedforward.ks, result.feedforward.kv, result.feedforward.ka, result.track_width,
+                    result.r_squared)
+
+    def interrupted(self):
+        """Called when another command which requires one or more of the same subsystems is scheduled to run"""
+        self.robot.drivetrain.tank_drive(0.0, 0.0)
+
+    def get_data(self):
+        """Return the CharacterizationData recorded by the last run."""
+        return self._data
@@ -1,5 +1,12 @@
 from wpilib.command.command import Command
+import logging
 import math
+from heading_hold import HeadingHold
+from motion_profile import MotionProfile
+from pid_controller import PIDFController
+
+
+logger = logging.getLogger("drive_encoder_counts")
 
 
 class DriveEncoderCounts(Command):
@@ -7,50 +14,110 @@ class DriveEncoderCounts(Command):
     _encoder_threshold = None
     _encoder_change = None
     _target_position = None
+    _controller = None
+    _profile = None
+    _heading_hold = None
+    _start_position = None
+    _start_time = None
 
-    def __init__(self, robot, encoder_change, speed, threshold, name=None, timeout=15):
-        """Constructor"""
+    def __init__(self, robot, encoder_change, speed, threshold, name=None, timeout=15, pid_gains=None,
+                 motion_limits=None, heading_gains=None):
+        """Constructor
+
+        Without pid_gains the drivetrain runs at the given speed until it is within the threshold.
+        With pid_gains a PID controller, limited to the speed, brings it to the target.
+        With MotionLimits, the encoder change is profiled up to the speed's share of the maximum
+        velocity: the drivetrain follows the profile's velocity and the PID controller (if any)
+        tracks the profile's position.  Once the profile is done it finishes the move as above.
+        With heading_gains, the drivetrain is also turned to hold the heading it had when the
+        command started.
+        """
         super().__init__(name, timeout)
         self.robot = robot
         self.requires(robot.drivetrain)
         self._encoder_change = encoder_change
         self._speed = speed
         self._encoder_threshold = threshold
+        if pid_gains is not None:
+            self._controller = PIDFController(pid_gains, threshold, abs(speed))
+        if motion_limits is not None and speed != 0.0:
+            self._profile = MotionProfile(encoder_change, abs(speed) * motion_limits.max_velocity,
+                                          motion_limits.max_acceleration, motion_limits.max_jerk)
+        if heading_gains is not None:
+            self._heading_hold = HeadingHold(heading_gains)
 
     def initialize(self):
         """Called before the Command is run for the first time."""
         # Get initial position
-        current = self.robot.drivetrain.get_encoder_value()
+        sensors = self.robot.drivetrain.get_sensor_snapshot()
+        current = sensors.encoder
         # Calculate and store target
         self._target_position = current + self._encoder_change
+        self._start_position = current
+        self._start_time = sensors.timestamp
+        if self._controller:
+            self._controller.reset(self._target_position, current, sensors.timestamp)
+        if self._heading_hold:
+            self._heading_hold.reset(self.robot.drivetrain, sensors)
         return Command.initialize(self)
 
     def execute(self):
         """Called repeatedly when this Command is scheduled to run"""
         # Get encoder count
-        current = self.robot.drivetrain.get_encoder_value()
-        distance_left = self._target_position - current
-        # Determine direction using target and current encoder values
-        if distance_left >= 0:
-            direction = -1.0
+        sensors = self.robot.drivetrain.get_sensor_snapshot()
+        current = sensors.encoder
+        elapsed = sensors.timestamp - self._start_time
+        if self._profile and elapsed < self._profile.get_duration():
+            output = abs(self._speed) * self._profile.get_velocity(elapsed) / self._profile.get_max_velocity()
+            if self._controller:
+                self._controller.set_setpoint(self._start_position + self._profile.get_position(elapsed))
+                output += self._controller.calculate(current, sensors.timestamp)
+            output = max(-1.0, min(1.0, output))
+            linear_drive_amount = -math.copysign(1.0, self._speed) * output
+        elif self._controller:
+            # Same direction convention as below: the sign of the speed flips the drive direction
+            self._controller.set_setpoint(self._target_position)
+            output = self._controller.calculate(current, sensors.timestamp)
+            linear_drive_amount = -math.copysign(1.0, self._speed) * output
         else:
-            direction = 1.0
-        linear_drive_amount = self._speed * direction
+            distance_left = self._target_position - current
+            # Determine direction using target and current encoder values
+            if distance_left >= 0:
+                direction = -1.0
+            else:
+                direction = 1.0
+            linear_drive_amount = self._speed * direction
+        turn_amount = 0.0
+        if self._heading_hold:
+            turn_amount = self._heading_hold.calculate(sensors)
         # Set drivetrain using speed and direction
-        self.robot.drivetrain.arcade_drive(linear_drive_amount, 0.0, False)
+        self.robot.drivetrain.arcade_drive(linear_drive_amount, turn_amount, False)
         return Command.execute(self)
 
     def isFinished(self):
         """Returns true when the Command no longer needs to be run"""
+        if self.isTimedOut():
+            return True
+        sensors = self.robot.drivetrain.get_sensor_snapshot()
+        if self._profile and sensors.timestamp - self._start_time < self._profile.get_duration():
+            return False
+        if self._controller:
+            return self._controller.is_settled(sensors.timestamp)
         # Get encoder count
-        current = self.robot.drivetrain.get_encoder_value()
+        current = sensors.encoder
         # If abs(target - current) < threshold then return true
-        return math.fabs(self._target_position - current) <= self._encoder_threshold or self.isTimedOut()
+        return math.fabs(self._target_position - current) <= self._encoder_threshold
 
     def end(self):
         """Called once after isFinished returns true"""
         # Stop driving
         self.robot.drivetrain.arcade_drive(0.0, 0.0)
+        if self._controller and self._controller.get_settle_time() is not None:
+            logger.info("Settled in %.2f s, overshoot %d counts", self._controller.get_settle_time(),
+                        self._controller.get_overshoot())
+
+    def get_controller(self):
+        return self._controller
 
     def interrupted(self):
         """Called when another command which requires one or more of the same subsystems is scheduled to run"""
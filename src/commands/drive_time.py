@@ -1,4 +1,6 @@
 from wpilib.command.command import Command
+from heading_hold import HeadingHold
+from motion_profile import MotionProfile
 from stopwatch import Stopwatch
 
 
@@ -7,26 +9,50 @@ class DriveTime(Command):
     _start_time = None
     _duration = None
     _speed = None
+    _profile = None
+    _heading_hold = None
 
-    def __init__(self, robot, duration, speed, name=None, timeout=15):
-        """Constructor"""
+    def __init__(self, robot, duration, speed, name=None, timeout=15, motion_limits=None, heading_gains=None):
+        """Constructor
+
+        With MotionLimits, the drive is profiled over the distance it would cover at the speed for
+        the duration: the speed ramps up and down with the profile's velocity, and the command
+        runs for the profile's duration instead.
+        With heading_gains, the drivetrain is also turned to hold the heading it had when the
+        command started.
+        """
         super().__init__(name, timeout)
         self.robot = robot
         self.requires(robot.drivetrain)
         self._stopwatch = Stopwatch()
         self._duration = duration
         self._speed = speed
+        if motion_limits is not None and speed != 0.0:
+            max_velocity = abs(speed) * motion_limits.max_velocity
+            self._profile = MotionProfile(max_velocity * duration, max_velocity, motion_limits.max_acceleration,
+                                          motion_limits.max_jerk)
+            self._duration = self._profile.get_duration()
+        if heading_gains is not None and speed != 0.0:
+            self._heading_hold = HeadingHold(heading_gains)
 
     def initialize(self):
         """Called before the Command is run for the first time."""
         # Start stopwatch
         self._stopwatch.start()
+        if self._heading_hold:
+            self._heading_hold.reset(self.robot.drivetrain, self.robot.drivetrain.get_sensor_snapshot())
         return Command.initialize(self)
 
     def execute(self):
         """Called repeatedly when this Command is scheduled to run"""
         speed = self._speed
-        self.robot.drivetrain.arcade_drive(speed, 0.0, False)
+        if self._profile:
+            elapsed = self._stopwatch.elapsed_time_in_secs()
+            speed *= abs(self._profile.get_velocity(elapsed)) / self._profile.get_max_velocity()
+        turn = 0.0
+        if self._heading_hold:
+            turn = self._heading_hold.calculate(self.robot.drivetrain.get_sensor_snapshot())
+        self.robot.drivetrain.arcade_drive(speed, turn, False)
         return Command.execute(self)
 
     def isFinished(self):
@@ -0,0 +1,105 @@
+from wpilib.command.command import Command
+import math
+
+
+class FollowPath(Command):
+    """Follows a Path with pure pursuit, starting from the pose the robot is in when it starts.
+
+    Each loop the robot steers along the arc that passes through the point
+    one lookahead distance further along the path.  It drives forward as
+    Drivetrain defines it, which is the direction the odometry pose moves
+    forward in.
+
+    """
+    _path = None
+    _speed = None
+    _lookahead = None
+    _lookahead_points = None
+    _threshold = None
+    _track_width = None
+
+    _start_x = None
+    _start_y = None
+    _start_heading = None
+    _index = 0
+
+    def __init__(self, robot, path, speed, lookahead, threshold, name=None, timeout=15):
+        """Constructor
+
+        Args:
+            path: Path to follow, relative to the starting pose.
+            speed: Drive speed, slowing down over the last lookahead distance.
+            lookahead: Distance in feet along the path to steer towards.
+            threshold: Distance in feet from the end of the path that counts as arrived.
+        """
+        super().__init__(name, timeout)
+        self.robot = robot
+        self.requires(robot.drivetrain)
+        self._path = path
+        self._speed = abs(speed)
+        self._lookahead = lookahead
+        self._lookahead_points = max(1, int(round(lookahead / path.get_spacing())))
+        self._threshold = threshold
+        self._track_width = robot.drivetrain.get_track_width()
+
+    def initialize(self):
+        """Called before the Command is run for the first time."""
+        pose = self.robot.drivetrain.get_pose()
+        if pose is None:
+            self._start_x, self._start_y, self._start_heading = 0.0, 0.0, 0.0
+        else:
+            self._start_x, self._start_y, self._start_heading = pose.x, pose.y, pose.heading
+        self._index = 0
+        return Command.initialize(self)
+
+    def execute(self):
+        """Called repeatedly when this Command is scheduled to run"""
+        x, y, heading = self._get_relative_pose()
+        path = self._path
+        # The closest point only moves forward, so only the points ahead of it need searching
+        self._index = path.get_closest_index(x, y, self._index, 2 * self._lookahead_points + 1)
+        target_x, target_y = path.get_point(self._index + self._lookahead_points)
+
+        # Target in the robot's frame, then the curvature of the arc through it
+        dx = target_x - x
+        dy = target_y - y
+        cos_heading = math.cos(math.radians(heading))
+        sin_heading = math.sin(math.radians(heading))
+        forward = dx * cos_heading + dy * sin_heading
+        right = dy * cos_heading - dx * sin_heading
+        distance_squared = forward * forward + right * right
+        curvature = 2.0 * right / distance_squared if distance_squared > 0.0 else 0.0
+
+        remaining = (len(path) - 1 - self._index) * path.get_spacing()
+        speed = self._speed * max(0.25, min(1.0, remaining / self._lookahead))
+        turn = max(-1.0, min(1.0, curvature * self._track_width * speed))
+        self.robot.drivetrain.arcade_drive(-speed, turn, False)
+        return Command.execute(self)
+
+    def isFinished(self):
+        """Returns true when the Command no longer needs to be run"""
+        if self.isTimedOut():
+            return True
+        x, y, heading = self._get_relative_pose()
+        end_x, end_y = self._path.get_point(len(self._path) - 1)
+        return math.hypot(end_x - x, end_y - y) <= self._threshold
+
+    def end(self):
+        """Called once after isFinished returns true"""
+        # Stop driving
+        self.robot.drivetrain.arcade_drive(0.0, 0.0)
+
+    def interrupted(self):
+        """Called when another command which requires one or more of the same subsystems is scheduled to run"""
+        self.end()
+
+    def _get_relative_pose(self):
+        pose = self.robot.drivetrain.get_pose()
+        if pose is None:
+            return 0.0, 0.0, 0.0
+        dx = pose.x - self._start_x
+        dy = pose.y - self._start_y
+        cos_heading = math.cos(math.radians(self._start_heading))
+        sin_heading = math.sin(math.radians(self._start_heading))
+        return (dx * cos_heading + dy * sin_heading, dy * cos_heading - dx * sin_heading,
+                pose.heading - self._start_heading)
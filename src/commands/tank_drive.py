@@ -1,19 +1,43 @@
 from wpilib.command.command import Command
+from feedforward import calculate_feedforward
 from oi import JoystickAxis, UserController, JoystickButtons
+from pid_controller import PIDFController
 
 
 class TankDrive(Command):
+    _max_velocity = None
+    _feedforward = None
+    _left_controller = None
+    _right_controller = None
 
-    def __init__(self, robot, name=None, modifier_scaling=0.5, dpad_scaling=0.4, timeout=15):
-        """Constructor"""
+    def __init__(self, robot, name=None, modifier_scaling=0.5, dpad_scaling=0.4, timeout=15, velocity_gains=None,
+                 max_velocity=None, feedforward=None):
+        """Constructor
+
+        Without velocity_gains each stick sets its side's motor output.  With velocity_gains each
+        stick sets its side's wheel velocity, as a fraction of max_velocity (in encoder counts per
+        second): a PID controller on the encoder rate corrects the output the velocity needs on its
+        own, so the robot drives the same on a low battery or while being pushed.  With a
+        characterized Feedforward, the controller corrects the feedforward's output instead.
+        """
         super().__init__(name, timeout)
         self.robot = robot
         self.requires(robot.drivetrain)
         self._dpad_scaling = dpad_scaling
         self._stick_scaling = modifier_scaling
+        if velocity_gains is not None:
+            self._max_velocity = max_velocity
+            self._feedforward = feedforward
+            self._left_controller = PIDFController(velocity_gains, 0.0)
+            self._right_controller = PIDFController(velocity_gains, 0.0)
 
     def initialize(self):
         """Called before the Command is run for the first time."""
+        if self._left_controller:
+            now = self.robot.drivetrain.get_sensor_snapshot().timestamp
+            left_rate, right_rate = self.robot.drivetrain.get_encoder_rates()
+            self._left_controller.reset(left_rate, left_rate, now)
+            self._right_controller.reset(right_rate, right_rate, now)
         return Command.initialize(self)
 
     def execute(self):
@@ -26,11 +50,28 @@ class TankDrive(Command):
             left_track = self.robot.oi.get_axis(UserController.DRIVER, JoystickAxis.LEFTY)
             right_track = self.robot.oi.get_axis(UserController.DRIVER, JoystickAxis.RIGHTY)
             if modifier:
-                self.robot.drivetrain.tank_drive(self._stick_scaling * left_track, self._stick_scaling * right_track)
-            else:
-                self.robot.drivetrain.tank_drive(left_track, right_track)
+                left_track *= self._stick_scaling
+                right_track *= self._stick_scaling
+            if self._left_controller:
+                left_track, right_track = self._velocity_outputs(left_track, right_track)
+            self.robot.drivetrain.tank_drive(left_track, right_track)
         return Command.execute(self)
 
+    def _velocity_outputs(self, left_track, right_track):
+        # The rate targets are negated track values (see Drivetrain)
+        now = self.robot.drivetrain.get_sensor_snapshot().timestamp
+        left_rate, right_rate = self.robot.drivetrain.get_encoder_rates()
+        left_target = -left_track * self._max_velocity
+        right_target = -right_track * self._max_velocity
+        if self._feedforward:
+            left_track = -calculate_feedforward(self._feedforward, left_target)
+            right_track = -calculate_feedforward(self._feedforward, right_target)
+        self._left_controller.set_setpoint(left_target)
+        self._right_controller.set_setpoint(right_target)
+        left = left_track - self._left_controller.calculate(left_rate, now)
+        right = right_track - self._right_controller.calculate(right_rate, now)
+        return max(-1.0, min(1.0, left)), max(-1.0, min(1.0, right))
+
     def isFinished(self):
         """Returns true when the Command no longer needs to be run"""
         return False
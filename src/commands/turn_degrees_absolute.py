@@ -1,41 +1,59 @@
 from wpilib.command.command import Command
 import math
+from turn_controller import TurnController
 
 
 class TurnDegreesAbsolute(Command):
     _speed = None
     _degree_threshold = None
     _target_degrees = None
+    _controller = None
 
-    def __init__(self, robot, degrees_target, speed, threshold, name=None, timeout=15):
-        """Constructor"""
+    def __init__(self, robot, degrees_target, speed, threshold, name=None, timeout=15, turn_gains=None):
+        """Constructor
+
+        Without turn_gains the drivetrain turns at the given speed until it is within the threshold.
+        With turn_gains a TurnController, limited to the speed, turns it the short way to the target
+        and the command finishes once it has settled there.
+        """
         super().__init__(name, timeout)
         self.robot = robot
         self.requires(robot.drivetrain)
         self._target_degrees = degrees_target
         self._speed = speed
         self._degree_threshold = threshold
+        if turn_gains is not None:
+            self._controller = TurnController(turn_gains, threshold, abs(speed))
 
     def initialize(self):
         """Called before the Command is run for the first time."""
+        if self._controller:
+            sensors = self.robot.drivetrain.get_sensor_snapshot()
+            self._controller.reset(self._target_degrees, sensors.gyro_angle, sensors.timestamp)
         return Command.initialize(self)
 
     def execute(self):
         """Called repeatedly when this Command is scheduled to run"""
-        current = self.robot.drivetrain.get_gyro_angle()
-        degrees_left = self._target_degrees - current
-        if degrees_left >= 0:
-            direction = 1.0
+        sensors = self.robot.drivetrain.get_sensor_snapshot()
+        if self._controller:
+            turn_speed = self._controller.calculate(sensors.gyro_angle, sensors.timestamp)
         else:
-            direction = -1.0
-        turn_speed = self._speed * direction
+            degrees_left = self._target_degrees - sensors.gyro_angle
+            if degrees_left >= 0:
+                direction = 1.0
+            else:
+                direction = -1.0
+            turn_speed = self._speed * direction
         # Set drivetrain using speed and direction
         self.robot.drivetrain.arcade_drive(0.0, turn_speed, False)
         return Command.execute(self)
 
     def isFinished(self):
         """Returns true when the Command no longer needs to be run"""
-        current = self.robot.drivetrain.get_gyro_angle()
+        sensors = self.robot.drivetrain.get_sensor_snapshot()
+        if self._controller:
+            return self._controller.is_settled(sensors.timestamp) or self.isTimedOut()
+        current = sensors.gyro_angle
         # If abs(target - current) < threshold then return true
         return math.fabs(self._target_degrees - current) <= self._degree_threshold or self.isTimedOut()
 
@@ -44,6 +62,9 @@ class TurnDegreesAbsolute(Command):
         # Stop driving
         self.robot.drivetrain.arcade_drive(0.0, 0.0)
 
+    def get_controller(self):
+        return self._controller
+
     def interrupted(self):
         """Called when another command which requires one or more of the same subsystems is scheduled to run"""
         self.end()
@@ -0,0 +1,121 @@
+import configparser
+import time
+from collections import namedtuple
+
+
+# Default value of fields that must be present in the configuration file
+REQUIRED = object()
+
+_getters = {
+    int: configparser.ConfigParser.getint,
+    float: configparser.ConfigParser.getfloat,
+    bool: configparser.ConfigParser.getboolean,
+    str: configparser.ConfigParser.get,
+}
+
+
+class ConfigField(namedtuple("ConfigField", ["name", "section", "key", "type", "default", "enabled_by"])):
+    """Describes one typed value in a configuration file.
+
+    Args:
+        name: Name of the value in the record.
+        section: Section of the configuration file.  None uses the section the record is loaded from.
+        key: Key within the section.
+        type: One of int, float, bool or str.
+        default: Value used when the key is missing.  REQUIRED makes a missing key an error.
+        enabled_by: Name of an earlier bool field.  If that field is False, a missing key is read as None.
+    """
+    __slots__ = ()
+
+    def __new__(cls, name, section, key, type, default=REQUIRED, enabled_by=None):
+        return super().__new__(cls, name, section, key, type, default, enabled_by)
+
+
+def config_record(name, fields):
+    """Create an immutable record class holding the values described by a list of ConfigFields."""
+    record_class = namedtuple(name, [field.name for field in fields])
+    record_class.schema = tuple(fields)
+    return record_class
+
+
+class ConfigStore(object):
+    """Parses each configuration file once and hands out typed, immutable records.
+
+    Records are cached by record class, file and section, so every subsystem
+    and command asking for the same configuration shares one record.
+
+    """
+    _instance = None
+
+    _parsers = None
+    _records = None
+    _parse_time = 0.0
+
+    @staticmethod
+    def get_instance():
+        """Return the shared ConfigStore instance, creating it if needed."""
+        if ConfigStore._instance is None:
+            ConfigStore._instance = ConfigStore()
+        return ConfigStore._instance
+
+    def __init__(self):
+        """Create and initialize an empty ConfigStore."""
+        self._parsers = {}
+        self._records = {}
+        self._parse_time = 0.0
+
+    def get(self, record_class, configfile, section=None):
+        """Return the record of a configuration file.
+
+        Args:
+            record_class: Record class created by config_record().
+            configfile: Path of the configuration file.
+            section: Section used by fields that do not name one.
+
+        Raises:
+            ValueError: A required value is missing or has the wrong type.
+        """
+        record_key = (record_class, configfile, section)
+        record = self._records.get(record_key)
+        if record is None:
+            start = time.perf_counter()
+            record = self._load(record_class, self._get_parser(configfile), configfile, section)
+            self._parse_time += time.perf_counter() - start
+            self._records[record_key] = record
+        return record
+
+    def get_parse_time(self):
+        """Return the total time in seconds spent parsing files and building records."""
+        return self._parse_time
+
+    def clear(self):
+        """Forget every parsed file and record so they are read again on next use."""
+        self._parsers = {}
+        self._records = {}
+
+    def _get_parser(self, configfile):
+        parser = self._parsers.get(configfile)
+        if parser is None:
+            parser = configparser.ConfigParser()
+            parser.read(configfile)
+            self._parsers[configfile] = parser
+        return parser
+
+    @staticmethod
+    def _load(record_class, parser, configfile, section):
+        values = {}
+        for field in record_class.schema:
+            field_section = field.section if field.section is not None else section
+            if parser.has_option(field_section, field.key):
+                try:
+                    values[field.name] = _getters[field.type](parser, field_section, field.key)
+                except ValueError:
+                    raise ValueError("%s: [%s] %s must be of type %s" % (configfile, field_section, field.key,
+                                                                         field.type.__name__))
+            elif field.enabled_by is not None and not values[field.enabled_by]:
+                values[field.name] = None
+            elif field.default is not REQUIRED:
+                values[field.name] = field.default
+            else:
+                raise ValueError("%s: [%s] %s is missing" % (configfile, field_section, field.key))
+        return record_class(**values)
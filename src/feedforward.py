@@ -0,0 +1,20 @@
+import math
+from collections import namedtuple
+
+
+# Feedforward constants of a drivetrain side, measured with the sysid tool.  ks is the output needed to
+# overcome static friction, kv the output per encoder count per second and ka the output per count per
+# second squared.  Outputs are motor output fractions, since the drivetrain has no voltage compensation.
+Feedforward = namedtuple("Feedforward", ["ks", "kv", "ka"])
+
+
+def calculate_feedforward(feedforward, velocity, acceleration=0.0):
+    """Return the output that drives a side at a velocity and acceleration, in counts per second.
+
+    The output has the sign of the velocity, like the outputs recorded by the sysid tool, so it
+    is a negated drivetrain output (see Drivetrain).
+    """
+    if velocity == 0.0 and acceleration == 0.0:
+        return 0.0
+    direction = velocity if velocity != 0.0 else acceleration
+    return math.copysign(feedforward.ks, direction) + feedforward.kv * velocity + feedforward.ka * acceleration
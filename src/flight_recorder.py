@@ -0,0 +1,294 @@
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from oi import JoystickAxis, UserController
+
+
+logger = logging.getLogger("flight_recorder")
+
+# File layout: header, the name of each field, then one record of little-endian doubles per loop.
+# The header holds the format version, which changes whenever the layout does.
+_MAGIC = b"FLTLOG\0\0"
+_HEADER = struct.Struct("<8sIII")
+_FIELD_NAME = struct.Struct("<32s")
+_VALUE = struct.Struct("<d")
+FORMAT_VERSION = 1
+
+_CONTROLLER_NAMES = ("driver", "scoring")
+_AXIS_NAMES = ("left_x", "left_y", "right_x", "right_y", "dpad_x", "dpad_y")
+
+
+class FlightRecorder(object):
+    """Records the inputs and outputs of every robot loop into a ring buffer.
+
+    Each loop's values are written into a preallocated array of doubles, so
+    recording costs a handful of reads and stores and the buffer never grows.  Once
+    started, a background thread periodically appends the new records to a
+    binary log file that can be memory-mapped with FlightLog.  If the thread
+    falls more than a full buffer behind, the oldest records are dropped.
+
+    Every input the robot code reads is recorded along with its outputs, so a
+    log can be replayed through the robot code with MatchReplay.
+
+    """
+    FIELDS = (("timestamp",) +
+              tuple(controller + "_" + axis for controller in _CONTROLLER_NAMES for axis in _AXIS_NAMES) +
+              ("left_output", "right_output", "left_encoder", "right_encoder", "gyro_angle", "winch_speed",
+               "gear_release") +
+              tuple(controller + "_buttons" for controller in _CONTROLLER_NAMES) +
+              ("mode", "auto_choice", "position_choice"))
+
+    # Values of the mode field
+    MODE_AUTONOMOUS = 1.0
+    MODE_TELEOP = 2.0
+    MODE_TEST = 3.0
+
+    _robot = None
+    _users = (UserController.DRIVER, UserController.SCORING)
+    _capacity = 0
+    _flush_period = None
+    _buffer = None
+    _count = 0
+    _flushed = 0
+    _dropped = 0
+
+    _file = None
+    _lock = None
+    _thread = None
+    _stop = None
+
+    def __init__(self, robot, capacity=3000, flush_period=0.5):
+        """Create and initialize a FlightRecorder.
+
+        Args:
+            robot: Robot whose OI and subsystems are recorded.
+            capacity: Number of loops the ring buffer holds.
+            flush_period: Time in seconds between writes of the log file.
+        """
+        self._robot = robot
+        self._capacity = capacity
+        self._flush_period = flush_period
+        self._buffer = array('d', [0.0] * (capacity * len(FlightRecorder.FIELDS)))
+        self._count = 0
+        self._flushed = 0
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    @staticmethod
+    def next_log_path(directory):
+        """Return the path of the first unused numbered log file in a directory."""
+        index = 0
+        while os.path.exists(os.path.join(directory, "flight_%03d.bin" % index)):
+            index += 1
+        return os.path.join(directory, "flight_%03d.bin" % index)
+
+    def start(self, path):
+        """Open the log file, creating its directory if needed, and start the thread that writes it.
+
+        Return:
+            True if the log file was opened.
+        """
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._file = open(path, "wb")
+            self._file.write(_HEADER.pack(_MAGIC, FORMAT_VERSION, len(FlightRecorder.FIELDS),
+                                          _HEADER.size + _FIELD_NAME.size * len(FlightRecorder.FIELDS)))
+            for name in FlightRecorder.FIELDS:
+                self._file.write(_FIELD_NAME.pack(name.encode("ascii")))
+        except OSError:
+            logger.exception("Could not open flight log %s", path)
+            self._file = None
+            return False
+        self._flushed = self._count
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="FlightRecorder", daemon=True)
+        self._thread.start()
+        logger.info("Recording flight log to %s", path)
+        return True
+
+    def stop(self):
+        """Stop the writer thread, write the remaining records and close the log file."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+        self._file.close()
+        self._file = None
+
+    def record(self):
+        """Record the current loop.  Called by the robot after the scheduler has run."""
+        robot = self._robot
+        oi = robot.oi
+        drivetrain = robot.drivetrain
+        sensors = drivetrain.get_sensor_snapshot()
+        left_output, right_output = drivetrain.get_motor_outputs()
+
+        buffer = self._buffer
+        i = (self._count % self._capacity) * len(FlightRecorder.FIELDS)
+        buffer[i] = sensors.timestamp
+        i += 1
+        for user in self._users:
+            buffer[i] = oi.get_axis(user, JoystickAxis.LEFTX)
+            buffer[i + 1] = oi.get_axis(user, JoystickAxis.LEFTY)
+            buffer[i + 2] = oi.get_axis(user, JoystickAxis.RIGHTX)
+            buffer[i + 3] = oi.get_axis(user, JoystickAxis.RIGHTY)
+            buffer[i + 4] = oi.get_axis(user, JoystickAxis.DPADX)
+            buffer[i + 5] = oi.get_axis(user, JoystickAxis.DPADY)
+            i += 6
+        buffer[i] = left_output
+        buffer[i + 1] = right_output
+        buffer[i + 2] = sensors.left_encoder
+        buffer[i + 3] = sensors.right_encoder
+        buffer[i + 4] = sensors.gyro_angle
+        buffer[i + 5] = robot.winch.get_speed()
+        buffer[i + 6] = 1.0 if robot.gear_feeder.get_gear_release() else 0.0
+        i += 7
+        for user in self._users:
+            buffer[i] = oi.get_buttons(user)
+            i += 1
+        if robot.isAutonomous():
+            buffer[i] = FlightRecorder.MODE_AUTONOMOUS
+        elif robot.isTest():
+            buffer[i] = FlightRecorder.MODE_TEST
+        else:
+            buffer[i] = FlightRecorder.MODE_TELEOP
+        buffer[i + 1] = oi.get_auto_choice() or 0.0
+        buffer[i + 2] = oi.get_position() or 0.0
+        self._count += 1
+
+    def get_count(self):
+        """Return the number of loops recorded since the recorder was created."""
+        return self._count
+
+    def get_dropped(self):
+        """Return the number of records overwritten before they were written to the log file."""
+        return self._dropped
+
+    def get_record(self, age=0):
+        """Return the values of a record still in the buffer as a dict of field name to value.
+
+        Args:
+            age: 0 for the most recent record, 1 for the one before it, and so on.
+        """
+        if age >= min(self._count, self._capacity):
+            raise IndexError("record %d is not in the buffer" % age)
+        field_count = len(FlightRecorder.FIELDS)
+        start = ((self._count - 1 - age) % self._capacity) * field_count
+        return dict(zip(FlightRecorder.FIELDS, self._buffer[start:start + field_count]))
+
+    def flush(self):
+        """Append every record not yet written to the log file.
+
+        Return:
+            The number of records written.
+        """
+        with self._lock:
+            return self._write_pending()
+
+    def _write_pending(self):
+        if self._file is None:
+            return 0
+        field_count = len(FlightRecorder.FIELDS)
+        start = self._flushed
+        end = self._count
+        if end - start > self._capacity:
+            self._dropped += end - start - self._capacity
+            start = end - self._capacity
+        if start == end:
+            return 0
+
+        first = start % self._capacity
+        last = end % self._capacity
+        if first < last:
+            records = self._buffer[first * field_count:last * field_count]
+        else:
+            records = self._buffer[first * field_count:] + self._buffer[:last * field_count]
+
+        # The loop may have lapped the records while they were copied
+        overwritten = self._count - self._capacity - start
+        if overwritten > 0:
+            self._dropped += overwritten
+            start += overwritten
+            records = records[overwritten * field_count:]
+
+        if sys.byteorder != "little":
+            records.byteswap()
+        records.tofile(self._file)
+        self._file.flush()
+        self._flushed = end
+        return end - start
+
+    def _run(self):
+        while not self._stop.wait(self._flush_period):
+            try:
+                self.flush()
+            except OSError:
+                logger.exception("Could not write flight log")
+                return
+
+
+class FlightLog(object):
+    """Read-only, memory-mapped view of a log file written by FlightRecorder.
+
+    Values are read as little-endian doubles whatever the byte order of the
+    machine reading them, so a log from the robot reads the same anywhere.
+
+    """
+    fields = None
+    version = None
+    header_size = None
+
+    _file = None
+    _map = None
+    _record = None
+    _count = 0
+
+    def __init__(self, path):
+        """Open a log file.
+
+        Raises:
+            ValueError: The file is not a flight log, or is of another format version.
+        """
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size or self._map[:len(_MAGIC)] != _MAGIC:
+            self.close()
+            raise ValueError("%s is not a flight log" % path)
+        magic, self.version, field_count, self.header_size = _HEADER.unpack_from(self._map, 0)
+        if self.version != FORMAT_VERSION:
+            self.close()
+            raise ValueError("%s is a version %d flight log, not version %d this code reads" % (
+                path, self.version, FORMAT_VERSION))
+        self.fields = tuple(_FIELD_NAME.unpack_from(self._map, _HEADER.size + i * _FIELD_NAME.size)[0]
+                            .rstrip(b"\0").decode("ascii") for i in range(field_count))
+        self._record = struct.Struct("<%dd" % field_count)
+        # Ignore a partly written record at the end of the file
+        self._count = (len(self._map) - self.header_size) // self._record.size
+
+    def __len__(self):
+        return self._count
+
+    def get(self, index, field):
+        """Return the value of a field in a record."""
+        if index >= self._count:
+            raise IndexError("record %d is not in the log" % index)
+        return _VALUE.unpack_from(self._map, self.header_size + index * self._record.size +
+                                  _VALUE.size * self.fields.index(field))[0]
+
+    def get_record(self, index):
+        """Return a record as a dict of field name to value."""
+        if index >= self._count:
+            raise IndexError("record %d is not in the log" % index)
+        return dict(zip(self.fields, self._record.unpack_from(self._map, self.header_size +
+                                                                index * self._record.size)))
+
+    def close(self):
+        self._map.close()
+        self._file.close()
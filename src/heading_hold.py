@@ -0,0 +1,65 @@
+from collections import namedtuple
+from pid_controller import PIDFController
+
+
+# Gains of a HeadingHold.  gyro and encoder are the PIDGains used with the gyro (in degrees) and
+# with the encoder difference (in counts), and max_correction is the largest turn output applied.
+HeadingGains = namedtuple("HeadingGains", ["gyro", "encoder", "max_correction"])
+
+
+class HeadingHold(object):
+    """Keeps the drivetrain on the heading it had when a drive started.
+
+    The heading is read from the gyro when it is enabled.  Otherwise it falls
+    back to the difference between the left and right encoders, which changes
+    only when one side of the drivetrain travels further than the other.  With
+    neither, no correction is applied.
+
+    The signs of the turn output and the readings follow Drivetrain.
+
+    """
+    _gyro_controller = None
+    _encoder_controller = None
+    _controller = None
+    _use_gyro = False
+
+    def __init__(self, gains):
+        """Create and initialize a HeadingHold.
+
+        Args:
+            gains: HeadingGains to use.
+        """
+        self._gyro_controller = PIDFController(gains.gyro, 0.0, gains.max_correction)
+        self._encoder_controller = PIDFController(gains.encoder, 0.0, gains.max_correction)
+
+    def reset(self, drivetrain, sensors):
+        """Hold the heading in a sensor snapshot.
+
+        Args:
+            drivetrain: Drivetrain the sensors were read from.
+            sensors: DrivetrainSensors snapshot taken when the drive started.
+        """
+        self._use_gyro = drivetrain.is_gyro_enabled()
+        if self._use_gyro:
+            self._controller = self._gyro_controller
+        elif drivetrain.is_encoder_pair_enabled():
+            self._controller = self._encoder_controller
+        else:
+            self._controller = None
+            return
+        heading = self._get_heading(sensors)
+        self._controller.reset(heading, heading, sensors.timestamp)
+
+    def calculate(self, sensors):
+        """Return the turn output that brings the drivetrain back to the held heading."""
+        if self._controller is None:
+            return 0.0
+        return self._controller.calculate(self._get_heading(sensors), sensors.timestamp)
+
+    def is_using_gyro(self):
+        return self._controller is not None and self._use_gyro
+
+    def _get_heading(self, sensors):
+        if self._use_gyro:
+            return sensors.gyro_angle
+        return sensors.left_encoder - sensors.right_encoder
@@ -0,0 +1,166 @@
+import logging
+import time
+from stopwatch import Stopwatch
+from telemetry import Telemetry
+
+
+logger = logging.getLogger("loop_timer")
+
+
+class LoopTimer(object):
+    """Measures the duration and jitter of each robot loop.
+
+    Loop durations are counted into a fixed-size histogram of equal width
+    buckets, with the last bucket collecting every loop that ran longer than
+    the histogram covers.  Loops that take longer than the loop period are
+    counted as overruns.
+
+    """
+    _period = None
+    _bucket_width = None
+    _publish_period = None
+    _stopwatch = None
+    _telemetry = None
+
+    _histogram = None
+    _last_loop_start = None
+    _next_publish = 0.0
+
+    _count = 0
+    _total = 0.0
+    _max = 0.0
+    _overruns = 0
+    _max_jitter = 0.0
+
+    def __init__(self, period=0.02, bucket_width=0.001, bucket_count=50, publish_period=1.0, clock=time.perf_counter):
+        """Create and initialize a LoopTimer.
+
+        Args:
+            period: Loop time budget in seconds.
+            bucket_width: Width of each histogram bucket in seconds.
+            bucket_count: Number of histogram buckets.
+            publish_period: Time in seconds between SmartDashboard summaries.
+            clock: Function returning the current time in seconds.
+        """
+        self._period = period
+        self._bucket_width = bucket_width
+        self._publish_period = publish_period
+        self._stopwatch = Stopwatch(clock)
+        self._histogram = [0] * bucket_count
+        self._telemetry = Telemetry.get_instance()
+        for key in ("Loop p50 (ms)", "Loop p99 (ms)", "Loop Max (ms)", "Loop Overruns"):
+            self._telemetry.register(key, publish_period)
+        self.reset()
+
+    def reset(self):
+        """Clear all recorded loops."""
+        for i in range(len(self._histogram)):
+            self._histogram[i] = 0
+        self._stopwatch.stop()
+        self._last_loop_start = None
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+        self._overruns = 0
+        self._max_jitter = 0.0
+
+    def begin_loop(self):
+        """Mark the start of a loop."""
+        if self._stopwatch.is_running():
+            self._last_loop_start = self._stopwatch.get_start_time()
+        self._stopwatch.start()
+
+    def end_loop(self):
+        """Mark the end of a loop and record its duration.
+
+        Return:
+            The loop duration in seconds, or None if begin_loop() was not called.
+        """
+        if not self._stopwatch.is_running():
+            return None
+        duration = self._stopwatch.elapsed_time_in_secs()
+        loop_start = self._stopwatch.get_start_time()
+        now = loop_start + duration
+
+        bucket = int(duration / self._bucket_width)
+        if bucket >= len(self._histogram):
+            bucket = len(self._histogram) - 1
+        self._histogram[bucket] += 1
+
+        self._count += 1
+        self._total += duration
+        if duration > self._max:
+            self._max = duration
+        if duration > self._period:
+            self._overruns += 1
+        if self._last_loop_start is not None:
+            jitter = abs(loop_start - self._last_loop_start - self._period)
+            if jitter > self._max_jitter:
+                self._max_jitter = jitter
+
+        if now >= self._next_publish:
+            self._next_publish = now + self._publish_period
+            self.publish()
+        return duration
+
+    def get_percentile(self, percentile):
+        """Return the loop duration below which the given percent of loops fall.
+
+        The value is the upper edge of the histogram bucket holding the percentile,
+        so it is accurate to one bucket width.  Returns None if no loops were recorded.
+        """
+        if self._count == 0:
+            return None
+        target = self._count * percentile / 100.0
+        cumulative = 0
+        for i, count in enumerate(self._histogram):
+            cumulative += count
+            if cumulative >= target:
+                return (i + 1) * self._bucket_width
+        return len(self._histogram) * self._bucket_width
+
+    def get_count(self):
+        return self._count
+
+    def get_max(self):
+        return self._max
+
+    def get_mean(self):
+        if self._count == 0:
+            return None
+        return self._total / self._count
+
+    def get_overruns(self):
+        return self._overruns
+
+    def get_max_jitter(self):
+        return self._max_jitter
+
+    def get_histogram(self):
+        return list(self._histogram)
+
+    def publish(self):
+        """Post the p50/p99/max summary to the telemetry publisher."""
+        if self._count == 0:
+            return
+        self._telemetry.put_number("Loop p50 (ms)", self.get_percentile(50) * 1000)
+        self._telemetry.put_number("Loop p99 (ms)", self.get_percentile(99) * 1000)
+        self._telemetry.put_number("Loop Max (ms)", self._max * 1000)
+        self._telemetry.put_number("Loop Overruns", self._overruns)
+
+    def log_report(self):
+        """Log a summary and the full loop time distribution."""
+        if self._count == 0:
+            return
+        logger.info("Loops: %d, mean %.2f ms, p50 %.1f ms, p99 %.1f ms, max %.2f ms, max jitter %.2f ms, "
+                    "overruns %d", self._count, self.get_mean() * 1000, self.get_percentile(50) * 1000,
+                    self.get_percentile(99) * 1000, self._max * 1000, self._max_jitter * 1000, self._overruns)
+        last = len(self._histogram) - 1
+        for i, count in enumerate(self._histogram):
+            if count == 0:
+                continue
+            low = i * self._bucket_width * 1000
+            if i == last:
+                logger.info("  >= %5.1f ms: %d", low, count)
+            else:
+                logger.info("  %5.1f - %5.1f ms: %d", low, low + self._bucket_width * 1000, count)
@@ -0,0 +1,233 @@
+import argparse
+import logging
+from collections import namedtuple
+from wpilib.smartdashboard import SmartDashboard
+from hal_impl import mode_helpers
+from hal_impl.data import hal_data
+from flight_recorder import FlightLog, FlightRecorder
+from oi import OI, JoystickAxis, UserController
+from sim_runner import SimRunner
+
+
+logger = logging.getLogger("match_replay")
+
+# A replayed output that differs from the recorded one, by record index and field name
+Mismatch = namedtuple("Mismatch", ["index", "field", "recorded", "replayed"])
+
+# The outcome of a replay.  max_errors maps each compared field to its largest difference.
+ReplayResult = namedtuple("ReplayResult", ["records", "compared", "mismatches", "max_errors", "sim_time",
+                                           "wall_time", "speedup"])
+
+_MODES = {FlightRecorder.MODE_AUTONOMOUS: "auto", FlightRecorder.MODE_TELEOP: "teleop",
+          FlightRecorder.MODE_TEST: "test"}
+
+
+class MatchReplay(SimRunner):
+    """Replays a flight log through the robot code and compares its outputs with the recorded ones.
+
+    After a disabled period to build the autonomous plans, each recorded loop
+    is run in turn with the recorded inputs: the robot mode, the chooser
+    selections, every joystick axis, POV and button, the drivetrain encoders
+    and gyro, and the time of the loop.  The physics model is not run, so the
+    robot code reads exactly what it read when the log was recorded.  The
+    outputs the robot's own FlightRecorder holds after each loop are then
+    compared with the log, so any change in behavior shows up as a mismatch.
+
+    The replay runs on the virtual clock, as fast as the code allows.
+
+    """
+    # Outputs compared with the log
+    OUTPUT_FIELDS = ("left_output", "right_output", "winch_speed", "gear_release")
+
+    _log = None
+    _tolerance = None
+    _max_mismatches = None
+    _first_record = 0
+    _last_record = 0
+    _time_offset = None
+    _index = 0
+    _recorded_count = 0
+    _compared = 0
+    _mismatches = None
+    _max_errors = None
+    _auto_names = None
+    _position_names = None
+
+    def __init__(self, robot, fake_time, log, robot_path=None, disabled_period=1.0, tolerance=0.01,
+                 max_mismatches=100, first_record=0, last_record=None):
+        """Create and initialize a MatchReplay.
+
+        Args:
+            robot: Robot instance that has not been started yet.
+            fake_time: pyfrc FakeTime driving the HAL clock.
+            log: FlightLog to replay.
+            robot_path: Directory holding physics.py and sim/config.json.  Defaults to this directory.
+            disabled_period: Seconds spent disabled before the first record, used to build the autonomous plans.
+            tolerance: Largest difference between a replayed and a recorded output that is not a mismatch.
+            max_mismatches: Number of mismatches kept, the rest are only counted in max_errors.
+            first_record: Index of the first record to replay.
+            last_record: Index of the record after the last one to replay, or None for the end of the log.
+        """
+        if last_record is None:
+            last_record = len(log)
+        self._log = log
+        self._first_record = first_record
+        self._last_record = last_record
+        self._tolerance = tolerance
+        self._max_mismatches = max_mismatches
+        self._auto_names = {value: name for name, value in OI.AUTO_PROGRAMS}
+        self._position_names = {value: name for name, value in OI.STARTING_POSITIONS}
+        replay_period = 0.0
+        if last_record > first_record:
+            replay_period = (log.get(last_record - 1, "timestamp") - log.get(first_record, "timestamp") +
+                             SimRunner.LOOP_PERIOD)
+        super().__init__(robot, fake_time, robot_path, disabled_period=disabled_period,
+                         autonomous_period=replay_period, teleop_period=0.0)
+
+    def run(self):
+        """Replay the log.
+
+        Return:
+            ReplayResult with the number of records replayed and compared, the
+            mismatches, the largest error of each output and the simulated and
+            wall time of the replay.
+        """
+        self._index = self._first_record
+        self._recorded_count = 0
+        self._compared = 0
+        self._mismatches = []
+        self._max_errors = dict.fromkeys(MatchReplay.OUTPUT_FIELDS, 0.0)
+        self._time_offset = None
+        result = super().run()
+        return ReplayResult(self._index - self._first_record, self._compared, self._mismatches, self._max_errors,
+                            result.sim_time, result.wall_time, result.speedup)
+
+    def _step(self, now):
+        """Compare the outputs of the last loop and set up the inputs of the next one.
+
+        Return:
+            False once every record has been replayed, which ends the run.
+        """
+        self._compare()
+        if self._index >= self._last_record:
+            return False
+
+        record = self._log.get_record(self._index)
+        self._select_choices(record)
+        if self._loops < self._disabled_loops:
+            mode_helpers.set_mode(_MODES.get(record["mode"], "teleop"), False)
+            self._loops += 1
+            return True
+
+        mode_helpers.set_mode(_MODES.get(record["mode"], "teleop"), True)
+        self._set_inputs(record)
+        if self._time_offset is None:
+            self._time_offset = now - record["timestamp"]
+        if self._index + 1 < self._last_record:
+            # Start the next loop at its recorded time, or right after this one if it was late
+            next_time = self._log.get(self._index + 1, "timestamp") + self._time_offset
+            self._hooks.set_next_loop_time(max(next_time, now + 0.001) - SimRunner.LOOP_PERIOD)
+        self._recorded_count = self._robot.flight_recorder.get_count()
+        self._index += 1
+        self._loops += 1
+        return True
+
+    def _select_choices(self, record):
+        auto_name = self._auto_names.get(record["auto_choice"])
+        if auto_name is not None:
+            SmartDashboard.getTable().getSubTable("Autonomous").putString("selected", auto_name)
+        position_name = self._position_names.get(record["position_choice"])
+        if position_name is not None:
+            SmartDashboard.getTable().getSubTable("Starting_Position").putString("selected", position_name)
+
+    def _set_inputs(self, record):
+        oi = self._robot.oi
+        for user, controller in ((UserController.DRIVER, "driver"), (UserController.SCORING, "scoring")):
+            joystick = hal_data['joysticks'][oi.get_port(user)]
+            axes = joystick['axes']
+            axes[JoystickAxis.LEFTX] = record[controller + "_left_x"]
+            axes[JoystickAxis.LEFTY] = record[controller + "_left_y"]
+            axes[JoystickAxis.RIGHTX] = record[controller + "_right_x"]
+            axes[JoystickAxis.RIGHTY] = record[controller + "_right_y"]
+            joystick['povs'][0] = _get_pov(record[controller + "_dpad_x"], record[controller + "_dpad_y"])
+            buttons = int(record[controller + "_buttons"])
+            joystick['buttons'] = [None] + [(buttons >> i) & 1 == 1 for i in range(len(joystick['buttons']) - 1)]
+
+        engine = self._physics.engine
+        engine.set_encoder(hal_data, "left", record["left_encoder"])
+        engine.set_encoder(hal_data, "right", record["right_encoder"])
+        engine.set_gyro_angle(hal_data, record["gyro_angle"])
+
+    def _compare(self):
+        recorder = self._robot.flight_recorder
+        if recorder is None or recorder.get_count() <= self._recorded_count:
+            return
+        index = self._index - 1
+        replayed = recorder.get_record()
+        for field in MatchReplay.OUTPUT_FIELDS:
+            recorded = self._log.get(index, field)
+            error = abs(replayed[field] - recorded)
+            if error > self._max_errors[field]:
+                self._max_errors[field] = error
+            if error > self._tolerance and len(self._mismatches) < self._max_mismatches:
+                self._mismatches.append(Mismatch(index, field, recorded, replayed[field]))
+        self._compared += 1
+        self._recorded_count = recorder.get_count()
+
+
+def _get_pov(dpad_x, dpad_y):
+    """Return the POV angle OI reads as the given d-pad axis values."""
+    if dpad_x > 0.0:
+        return 90
+    if dpad_x < 0.0:
+        return 270
+    if dpad_y < 0.0:
+        return 0
+    if dpad_y > 0.0:
+        return 180
+    return -1
+
+
+def replay_log(path, disabled_period=1.0, tolerance=0.01):
+    """Replay a flight log through a new MyRobot in a simulation of its own.
+
+    Return:
+        ReplayResult of the replay.
+    """
+    from robot import MyRobot
+    from sim_runner import start_simulation, stop_simulation
+
+    log = FlightLog(path)
+    fake_time = start_simulation()
+    try:
+        return MatchReplay(MyRobot(), fake_time, log, disabled_period=disabled_period, tolerance=tolerance).run()
+    finally:
+        stop_simulation(fake_time)
+        log.close()
+
+
+def main():
+    """Replay a flight log from the command line and report every output that differs."""
+    parser = argparse.ArgumentParser(description="Replay a recorded flight log through the robot code.")
+    parser.add_argument("log", help="flight log written by the robot")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="largest output difference that matches")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    result = replay_log(args.log, tolerance=args.tolerance)
+    logger.info("Replayed %d records in %.2f s of wall time (%.0fx real time)", result.records, result.wall_time,
+                result.speedup)
+    for mismatch in result.mismatches:
+        logger.info("Record %d: %s was %.4f, replayed %.4f", mismatch.index, mismatch.field, mismatch.recorded,
+                    mismatch.replayed)
+    logger.info("Largest errors: %s", ", ".join("%s %.4f" % (field, result.max_errors[field])
+                                                for field in MatchReplay.OUTPUT_FIELDS))
+    if result.mismatches:
+        logger.info("%d of %d records compared did not match", len({m.index for m in result.mismatches}),
+                    result.compared)
+    else:
+        logger.info("All %d records compared matched", result.compared)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+import argparse
+import concurrent.futures
+import logging
+import math
+import multiprocessing
+import os
+import random
+from collections import namedtuple
+from auto_optimizer import simulate_autonomous
+from physics import PhysicsNoise
+
+
+logger = logging.getLogger("monte_carlo")
+
+# How much error is injected into the runs.  Each run draws its own motor scales from 1.0 +/- motor_spread
+# and its gyro drift from +/- gyro_drift degrees per second.  encoder_noise (counts), motor_lag (seconds)
+# and loop_jitter (standard deviation of the loop period in seconds) are the same for every run.
+NoiseLevels = namedtuple("NoiseLevels", ["encoder_noise", "gyro_drift", "motor_spread", "motor_lag", "loop_jitter"])
+
+DEFAULT_NOISE = NoiseLevels(2.0, 0.2, 0.1, 0.05, 0.002)
+
+# One run of a routine, as sent to a worker process.  noise is a plain tuple of the run's PhysicsNoise,
+# since pyfrc reloads the physics module it is from, or None with loop_jitter 0.0 for the noise-free run
+# the others are compared to.  subsystems_configfile is None for the robot's own.
+Trial = namedtuple("Trial", ["program", "position", "seed", "noise", "loop_jitter", "configfile",
+                             "autonomous_period", "subsystems_configfile"])
+
+# Outcome of a Trial.  nominal is True for the noise-free run.  completion_time is None if the routine
+# did not finish within the autonomous period.  x, y and angle are the final field position in feet and
+# degrees.  The Trial's PhysicsNoise is left out, since pyfrc reloads the physics module it is from.
+TrialResult = namedtuple("TrialResult", ["program", "position", "seed", "nominal", "completed", "completion_time",
+                                         "x", "y", "angle"])
+
+# Statistics of the noisy runs of one routine from one position.  Times are of the runs that finished,
+# in seconds, and errors are from where the noise-free run stops, in feet and degrees.  Statistics with
+# no runs to take them from are None.  If the noise-free run did not finish, nominal_time is None and so
+# are success_rate and the errors, since there is no stopping point to measure them from.
+RoutineSummary = namedtuple("RoutineSummary", [
+    "program", "position", "runs", "nominal_time", "success_rate", "completion_rate", "median_time", "p90_time",
+    "max_time", "mean_pose_error", "p90_pose_error", "max_pose_error", "p90_angle_error"])
+
+PROGRAMS = ("AutonomousCrossLine", "AutonomousHangCenter", "AutonomousHangGear")
+POSITIONS = (1, 2, 3)
+
+
+def draw_noise(levels, seed):
+    """Return the PhysicsNoise of a run, drawn from the noise levels with the run's seed."""
+    generator = random.Random(seed)
+    return PhysicsNoise(levels.encoder_noise, generator.uniform(-levels.gyro_drift, levels.gyro_drift),
+                        1.0 + generator.uniform(-levels.motor_spread, levels.motor_spread),
+                        1.0 + generator.uniform(-levels.motor_spread, levels.motor_spread), levels.motor_lag)
+
+
+def run_trial(trial):
+    """Simulate one Trial.  Runs in a worker process."""
+    noise = PhysicsNoise(*trial.noise) if trial.noise is not None else None
+    completion_time, x, y, angle = simulate_autonomous(trial.program, trial.position, trial.configfile,
+                                                       trial.autonomous_period, noise, trial.loop_jitter,
+                                                       trial.seed, trial.subsystems_configfile)
+    return TrialResult(trial.program, trial.position, trial.seed, trial.noise is None, completion_time is not None,
+                       completion_time, x, y, angle)
+
+
+def percentile(values, fraction):
+    """Return the value below which a fraction of the values fall, or None if there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = int(math.ceil(fraction * len(ordered))) - 1
+    return ordered[max(0, min(len(ordered) - 1, index))]
+
+
+class MonteCarlo(object):
+    """Runs autonomous routines many times with injected noise to see how often they still succeed.
+
+    Every routine is first run from every position without noise, which sets its target: a
+    noisy run succeeds if the routine finishes and the robot stops within a tolerance of
+    where the noise-free run stops it.  A routine that does not finish even without noise has
+    no target, so its success is not measured and the report flags it.  Each noisy run draws
+    its motor scales and gyro drift from its own seed, so any run can be repeated on its own.
+    The runs are spread across a pool of processes, one simulation per process at a time.
+
+    """
+    _programs = None
+    _positions = None
+    _runs = None
+    _levels = None
+    _configfile = None
+    _subsystems_configfile = None
+    _distance_tolerance = None
+    _angle_tolerance = None
+    _autonomous_period = None
+    _seed = None
+    _run_trial = None
+
+    _nominal = None
+    _results = None
+
+    def __init__(self, configfile, programs=PROGRAMS, positions=POSITIONS, runs=100, levels=DEFAULT_NOISE,
+                 distance_tolerance=0.5, angle_tolerance=5.0, autonomous_period=15.0, seed=0, run_trial=run_trial,
+                 subsystems_configfile=None):
+        """Create a MonteCarlo.
+
+        Args:
+            configfile: Path of the autonomous configuration file the routines read.
+            programs: Names of the autonomous command group classes to run.
+            positions: Starting positions to run each program from.
+            runs: Number of noisy runs of each program from each position.
+            levels: NoiseLevels of the noisy runs.
+            distance_tolerance: Largest distance in feet from the noise-free stopping point that succeeds.
+            angle_tolerance: Largest difference in degrees from the noise-free heading that succeeds.
+            autonomous_period: Time in seconds a routine has to finish.
+            seed: Seed of the first run.  Run i of every routine uses seed + i.
+            run_trial: Function simulating a Trial and returning its TrialResult.
+            subsystems_configfile: Path of the subsystem configuration file the robot and the physics model
+                read, or None for MyRobot.subsystems_config_file.  The encoder noise and gyro drift only
+                reach routines run with the sensors enabled in it.
+        """
+        self._configfile = configfile
+        self._subsystems_configfile = subsystems_configfile
+        self._programs = tuple(programs)
+        self._positions = tuple(positions)
+        self._runs = runs
+        self._levels = levels
+        self._distance_tolerance = distance_tolerance
+        self._angle_tolerance = angle_tolerance
+        self._autonomous_period = autonomous_period
+        self._seed = seed
+        self._run_trial = run_trial
+        self._nominal = {}
+        self._results = {}
+
+    def run(self, processes=None):
+        """Run every routine from every position, without noise and then with it.
+
+        Args:
+            processes: Number of worker processes, None for one per CPU, or 1 to run in this process.
+
+        Return:
+            List of RoutineSummary, as summarize() returns.
+        """
+        trials = []
+        for program in self._programs:
+            for position in self._positions:
+                trials.append(Trial(program, position, self._seed, None, 0.0, self._configfile,
+                                    self._autonomous_period, self._subsystems_configfile))
+                for i in range(self._runs):
+                    seed = self._seed + i
+                    trials.append(Trial(program, position, seed, tuple(draw_noise(self._levels, seed)),
+                                        self._levels.loop_jitter, self._configfile, self._autonomous_period,
+                                        self._subsystems_configfile))
+        executor = None
+        if processes != 1:
+            # Fresh worker processes, since a forked copy of a process with a running robot cannot start another
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=processes,
+                                                              mp_context=multiprocessing.get_context("spawn"))
+        try:
+            results = executor.map(self._run_trial, trials, chunksize=4) if executor else map(self._run_trial, trials)
+            for result in results:
+                key = (result.program, result.position)
+                if result.nominal:
+                    self._nominal[key] = result
+                else:
+                    self._results.setdefault(key, []).append(result)
+        finally:
+            if executor:
+                executor.shutdown()
+        summaries = self.summarize()
+        for summary in summaries:
+            if summary.success_rate is None:
+                logger.warning("%s from position %d did not finish without noise", summary.program, summary.position)
+            else:
+                logger.info("%s from position %d: %.0f%% succeeded", summary.program, summary.position,
+                            100.0 * summary.success_rate)
+        return summaries
+
+    def get_nominal(self, program, position):
+        """Return the TrialResult of the noise-free run of a routine."""
+        return self._nominal[(program, position)]
+
+    def get_results(self, program, position):
+        """Return the TrialResults of the noisy runs of a routine."""
+        return self._results.get((program, position), [])
+
+    def get_errors(self, result):
+        """Return the distance in feet and the angle in degrees from where the noise-free run stopped."""
+        nominal = self.get_nominal(result.program, result.position)
+        distance = math.hypot(result.x - nominal.x, result.y - nominal.y)
+        angle = abs((result.angle - nominal.angle + 180.0) % 360.0 - 180.0)
+        return distance, angle
+
+    def is_success(self, result):
+        """Return True if a run finished where the noise-free run stops the robot.
+
+        A run never succeeds if the noise-free run did not finish, since it has no stopping point to reach.
+        """
+        if not result.completed or not self.get_nominal(result.program, result.position).completed:
+            return False
+        distance, angle = self.get_errors(result)
+        return distance <= self._distance_tolerance and angle <= self._angle_tolerance
+
+    def summarize(self):
+        """Return a RoutineSummary of every routine and position that was run."""
+        summaries = []
+        for program in self._programs:
+            for position in self._positions:
+                results = self.get_results(program, position)
+                if not results:
+                    continue
+                times = [result.completion_time for result in results if result.completed]
+                nominal = self.get_nominal(program, position)
+                success_rate = mean_error = p90_error = max_error = p90_angle_error = None
+                if nominal.completed:
+                    errors = [self.get_errors(result) for result in results]
+                    distances = [distance for distance, angle in errors]
+                    success_rate = sum(1 for result in results if self.is_success(result)) / len(results)
+                    mean_error = sum(distances) / len(distances)
+                    p90_error = percentile(distances, 0.9)
+                    max_error = max(distances)
+                    p90_angle_error = percentile([angle for distance, angle in errors], 0.9)
+                summaries.append(RoutineSummary(
+                    program, position, len(results), nominal.completion_time, success_rate,
+                    len(times) / len(results), percentile(times, 0.5), percentile(times, 0.9),
+                    max(times) if times else None, mean_error, p90_error, max_error, p90_angle_error))
+        return summaries
+
+    def write_report(self, path):
+        """Write the summary of every routine to a text file, least robust first.
+
+        Routines that did not finish without noise come first, with a * for their nominal time.
+        """
+        levels = self._levels
+        lines = ["Monte Carlo report: %d runs of each routine from %s" % (self._runs, self._configfile),
+                 "Noise: encoders +/- %.1f counts, gyro drift up to %.2f deg/s, motors 1.0 +/- %.2f with %.3f s "
+                 "lag, loop jitter %.4f s" % (levels.encoder_noise, levels.gyro_drift, levels.motor_spread,
+                                              levels.motor_lag, levels.loop_jitter),
+                 "Success: finished within %.2f ft and %.1f deg of the noise-free run" % (
+                     self._distance_tolerance, self._angle_tolerance),
+                 "",
+                 "%-22s %-3s %8s %8s %9s %8s %8s %8s %10s %10s %10s %9s" % (
+                     "routine", "pos", "nominal", "success", "finished", "median", "p90", "max", "mean err",
+                     "p90 err", "max err", "p90 angle")]
+        unfinished = False
+        for summary in sorted(self.summarize(), key=lambda summary: (summary.success_rate is not None,
+                                                                     summary.success_rate, summary.program,
+                                                                     summary.position)):
+            nominal = _format_time(summary.nominal_time)
+            if summary.success_rate is None:
+                nominal = "*"
+                unfinished = True
+            lines.append("%-22s %-3d %8s %8s %8.1f%% %8s %8s %8s %10s %10s %10s %9s" % (
+                summary.program, summary.position, nominal, _format_value("%.1f%%", 100.0, summary.success_rate),
+                100.0 * summary.completion_rate,
+                _format_time(summary.median_time), _format_time(summary.p90_time), _format_time(summary.max_time),
+                _format_value("%.2f ft", 1.0, summary.mean_pose_error),
+                _format_value("%.2f ft", 1.0, summary.p90_pose_error),
+                _format_value("%.2f ft", 1.0, summary.max_pose_error),
+                _format_value("%.1f deg", 1.0, summary.p90_angle_error)))
+        if unfinished:
+            lines.extend(["", "* did not finish without noise, so there is no target to measure success from"])
+        with open(path, "w") as report:
+            report.write("\n".join(lines) + "\n")
+
+
+def _format_time(completion_time):
+    return _format_value("%.2f s", 1.0, completion_time)
+
+
+def _format_value(format, scale, value):
+    return format % (scale * value) if value is not None else "-"
+
+
+def main():
+    """Run the Monte Carlo evaluation from the command line."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Run the autonomous routines many times with injected noise.")
+    parser.add_argument("--program", action="append", choices=PROGRAMS,
+                        help="routine to run, may be repeated (default: all)")
+    parser.add_argument("--position", type=int, action="append", choices=POSITIONS,
+                        help="starting position, may be repeated (default: all)")
+    parser.add_argument("--config", default=os.path.join(directory, "configs", "autonomous.ini"),
+                        help="autonomous configuration file")
+    parser.add_argument("--subsystems", default=os.path.join(directory, "configs", "subsystems.ini"),
+                        help="subsystem configuration file, which must enable the encoders and gyro for their "
+                             "noise to have an effect")
+    parser.add_argument("--runs", type=int, default=100, help="noisy runs of each routine from each position")
+    parser.add_argument("--encoder-noise", type=float, default=DEFAULT_NOISE.encoder_noise,
+                        help="standard deviation of the encoder readings in counts")
+    parser.add_argument("--gyro-drift", type=float, default=DEFAULT_NOISE.gyro_drift,
+                        help="largest gyro drift in degrees per second")
+    parser.add_argument("--motor-spread", type=float, default=DEFAULT_NOISE.motor_spread,
+                        help="largest difference of a side's motor speed from nominal, as a fraction")
+    parser.add_argument("--motor-lag", type=float, default=DEFAULT_NOISE.motor_lag,
+                        help="time constant of the motors' response in seconds")
+    parser.add_argument("--loop-jitter", type=float, default=DEFAULT_NOISE.loop_jitter,
+                        help="standard deviation of the loop period in seconds")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="feet from the noise-free stopping point")
+    parser.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="monte_carlo.txt", help="report to write")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    # Only the evaluation's own progress is of interest, not every simulated robot's
+    logging.getLogger().setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    levels = NoiseLevels(args.encoder_noise, args.gyro_drift, args.motor_spread, args.motor_lag, args.loop_jitter)
+    monte_carlo = MonteCarlo(os.path.abspath(args.config), args.program or PROGRAMS, args.position or POSITIONS,
+                             args.runs, levels, distance_tolerance=args.tolerance, seed=args.seed,
+                             subsystems_configfile=os.path.abspath(args.subsystems))
+    monte_carlo.run(args.processes)
+    monte_carlo.write_report(args.output)
+    logger.info("Wrote %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
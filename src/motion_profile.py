@@ -0,0 +1,123 @@
+import math
+from array import array
+from collections import namedtuple
+
+
+# Limits of a profiled drive.  max_velocity is the velocity reached at full output, so a drive at
+# a lower speed is profiled up to that fraction of it.  max_jerk is 0.0 for a trapezoidal profile.
+MotionLimits = namedtuple("MotionLimits", ["max_velocity", "max_acceleration", "max_jerk"])
+
+
+class MotionProfile(object):
+    """Time-indexed position and velocity setpoints for a move of a given distance.
+
+    The profile accelerates at the maximum acceleration up to the maximum
+    velocity, cruises, and decelerates to a stop at the distance.  Moves too
+    short to reach the maximum velocity get a triangular profile.  With a
+    maximum jerk, the velocity is smoothed with a moving average so the
+    acceleration ramps up and down instead of stepping (an S-curve).
+
+    Setpoints are computed once, when the profile is created, at the loop
+    period.  Looking one up only interpolates between two stored samples.
+
+    """
+    _distance = 0.0
+    _max_velocity = 0.0
+    _period = None
+    _positions = None
+    _velocities = None
+
+    def __init__(self, distance, max_velocity, max_acceleration, max_jerk=0.0, period=0.02):
+        """Create a MotionProfile.
+
+        Args:
+            distance: Distance to move.  Negative distances move backwards.
+            max_velocity: Largest velocity magnitude, in distance units per second.
+            max_acceleration: Largest acceleration magnitude, in distance units per second squared.
+            max_jerk: Largest jerk magnitude, or 0.0 for a trapezoidal profile.
+            period: Time in seconds between setpoints.
+
+        Raises:
+            ValueError: The maximum velocity or acceleration is not positive.
+        """
+        if max_velocity <= 0.0 or max_acceleration <= 0.0:
+            raise ValueError("max_velocity and max_acceleration must be positive")
+        self._distance = distance
+        self._max_velocity = max_velocity
+        self._period = period
+
+        velocities = self._trapezoid(abs(distance), max_velocity, max_acceleration, period)
+        if max_jerk > 0.0:
+            window = int(round(max_acceleration / max_jerk / period))
+            if window > 1:
+                velocities = self._moving_average(velocities, window)
+
+        # Integrate, then scale out the rounding so the profile ends exactly at the distance
+        positions = [0.0]
+        for i in range(1, len(velocities)):
+            positions.append(positions[-1] + (velocities[i - 1] + velocities[i]) * period / 2)
+        scale = distance / positions[-1] if positions[-1] > 0.0 else 0.0
+        self._positions = array('d', (position * scale for position in positions))
+        self._velocities = array('d', (velocity * scale for velocity in velocities))
+
+    @staticmethod
+    def _trapezoid(distance, max_velocity, max_acceleration, period):
+        acceleration_time = max_velocity / max_acceleration
+        if max_acceleration * acceleration_time ** 2 > distance:
+            # Never reaches the maximum velocity
+            acceleration_time = math.sqrt(distance / max_acceleration)
+            cruise_time = 0.0
+        else:
+            cruise_time = (distance - max_acceleration * acceleration_time ** 2) / max_velocity
+        peak_velocity = max_acceleration * acceleration_time
+        total_time = 2 * acceleration_time + cruise_time
+
+        velocities = []
+        for i in range(int(math.ceil(total_time / period)) + 1):
+            t = min(i * period, total_time)
+            if t < acceleration_time:
+                velocities.append(max_acceleration * t)
+            elif t < acceleration_time + cruise_time:
+                velocities.append(peak_velocity)
+            else:
+                velocities.append(max(0.0, max_acceleration * (total_time - t)))
+        return velocities
+
+    @staticmethod
+    def _moving_average(values, window):
+        padded = values + [0.0] * (window - 1)
+        averaged = []
+        total = 0.0
+        for i, value in enumerate(padded):
+            total += value
+            if i >= window:
+                total -= padded[i - window]
+            averaged.append(total / window)
+        return averaged
+
+    def get_duration(self):
+        return (len(self._positions) - 1) * self._period
+
+    def get_distance(self):
+        return self._distance
+
+    def get_max_velocity(self):
+        return self._max_velocity
+
+    def get_position(self, t):
+        """Return the position setpoint t seconds into the profile."""
+        return self._interpolate(self._positions, t)
+
+    def get_velocity(self, t):
+        """Return the velocity setpoint t seconds into the profile."""
+        return self._interpolate(self._velocities, t)
+
+    def _interpolate(self, samples, t):
+        if t <= 0.0:
+            return samples[0]
+        index = t / self._period
+        i = int(index)
+        if i >= len(samples) - 1:
+            return samples[-1]
+        fraction = index - i
+        return samples[i] + (samples[i + 1] - samples[i]) * fraction
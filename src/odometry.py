@@ -0,0 +1,150 @@
+import math
+from array import array
+from collections import namedtuple
+
+
+# Position of the robot on the field at a point in time.  x is forward and y is to the right of the
+# robot's starting pose, and heading is in degrees, clockwise like the gyro.
+Pose = namedtuple("Pose", ["timestamp", "x", "y", "heading"])
+
+
+class Odometry(object):
+    """Estimates the robot's pose from the drivetrain encoders and gyro.
+
+    Each update adds the distance travelled by the two sides since the last
+    update along the average of the old and new headings.  The heading comes
+    from the gyro when there is one, and otherwise from the difference
+    between the distances travelled by the two sides.
+
+    The last poses are kept in preallocated arrays, so an update does a fixed
+    amount of arithmetic and allocates nothing.  They can be looked up by time
+    to find where the robot was when a delayed measurement was taken.
+
+    """
+    _distance_per_count = None
+    _track_width = None
+
+    _x = 0.0
+    _y = 0.0
+    _heading = 0.0
+    _last_left = None
+    _last_right = None
+    _last_gyro = None
+
+    _timestamps = None
+    _xs = None
+    _ys = None
+    _headings = None
+    _count = 0
+
+    def __init__(self, distance_per_count, track_width, history_length=50):
+        """Create and initialize an Odometry.
+
+        Args:
+            distance_per_count: Distance travelled per encoder count, in feet.
+            track_width: Distance between the left and right wheels, in feet.
+            history_length: Number of poses kept for get_pose_at().
+        """
+        self._distance_per_count = distance_per_count
+        self._track_width = track_width
+        self._timestamps = array('d', [0.0] * history_length)
+        self._xs = array('d', [0.0] * history_length)
+        self._ys = array('d', [0.0] * history_length)
+        self._headings = array('d', [0.0] * history_length)
+        self.reset()
+
+    def reset(self, x=0.0, y=0.0, heading=0.0):
+        """Set the current pose and forget the history.
+
+        The next update only takes its sensor readings as the starting point.
+        """
+        self._x = x
+        self._y = y
+        self._heading = heading
+        self._last_left = None
+        self._last_right = None
+        self._last_gyro = None
+        self._count = 0
+
+    def reset_sensors(self, left_count, right_count, gyro_angle=None):
+        """Take new sensor readings as the starting point without moving the pose.
+
+        Called when the encoders or gyro are reset, so the jump in their readings is not
+        mistaken for movement.
+        """
+        self._last_left = left_count
+        self._last_right = right_count
+        self._last_gyro = gyro_angle
+
+    def update(self, timestamp, left_count, right_count, gyro_angle=None):
+        """Add the movement since the last update to the pose.
+
+        Args:
+            timestamp: Time in seconds the sensors were read.
+            left_count: Left encoder count.
+            right_count: Right encoder count.
+            gyro_angle: Gyro angle in degrees, or None to take the heading from the encoders.
+        """
+        if self._last_left is not None:
+            left = (left_count - self._last_left) * self._distance_per_count
+            right = (right_count - self._last_right) * self._distance_per_count
+            if gyro_angle is not None and self._last_gyro is not None:
+                heading = self._heading + gyro_angle - self._last_gyro
+            else:
+                heading = self._heading + math.degrees((left - right) / self._track_width)
+            distance = (left + right) / 2
+            average_heading = math.radians((self._heading + heading) / 2)
+            self._x += distance * math.cos(average_heading)
+            self._y += distance * math.sin(average_heading)
+            self._heading = heading
+        self._last_left = left_count
+        self._last_right = right_count
+        self._last_gyro = gyro_angle
+
+        i = self._count % len(self._timestamps)
+        self._timestamps[i] = timestamp
+        self._xs[i] = self._x
+        self._ys[i] = self._y
+        self._headings[i] = self._heading
+        self._count += 1
+
+    def get_pose(self):
+        """Return the latest Pose, or None before the first update."""
+        if self._count == 0:
+            return None
+        i = (self._count - 1) % len(self._timestamps)
+        return Pose(self._timestamps[i], self._x, self._y, self._heading)
+
+    def get_pose_at(self, timestamp):
+        """Return the Pose at a time, interpolated between the poses in the history.
+
+        Times before the oldest pose in the history return the oldest pose, and times after the
+        latest return the latest.  Return None before the first update.
+        """
+        if self._count == 0:
+            return None
+        capacity = len(self._timestamps)
+        oldest = max(0, self._count - capacity)
+        # Binary search for the last pose at or before the time
+        low = oldest
+        high = self._count - 1
+        if timestamp <= self._timestamps[low % capacity]:
+            high = low
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self._timestamps[middle % capacity] <= timestamp:
+                low = middle
+            else:
+                high = middle - 1
+        i = low % capacity
+        if low == self._count - 1 or timestamp <= self._timestamps[i]:
+            return Pose(self._timestamps[i], self._xs[i], self._ys[i], self._headings[i])
+        j = (low + 1) % capacity
+        fraction = (timestamp - self._timestamps[i]) / (self._timestamps[j] - self._timestamps[i])
+        return Pose(timestamp, self._xs[i] + (self._xs[j] - self._xs[i]) * fraction,
+                    self._ys[i] + (self._ys[j] - self._ys[i]) * fraction,
+                    self._headings[i] + (self._headings[j] - self._headings[i]) * fraction)
+
+    def get_history_length(self):
+        """Return the number of poses held in the history."""
+        return min(self._count, len(self._timestamps))
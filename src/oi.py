@@ -1,10 +1,12 @@
-import configparser
+from array import array
 import wpilib
+from wpilib.driverstation import DriverStation
 from wpilib.smartdashboard import SmartDashboard
 from wpilib.sendablechooser import SendableChooser
-from wpilib.buttons.joystickbutton import JoystickButton
 from commands.release_gear import ReleaseGear
 from commands.activate_winch import ActivateWinch
+from config_store import ConfigField, ConfigStore, config_record
+from triggers.oi_button import OIButton
 
 
 class JoystickAxis(object):
@@ -37,6 +39,34 @@ class UserController(object):
     SCORING = 1
 
 
+JoystickBindingsConfig = config_record("JoystickBindingsConfig", [
+    ConfigField("leftx", "AxisBindings", "LEFTX", int),
+    ConfigField("lefty", "AxisBindings", "LEFTY", int),
+    ConfigField("rightx", "AxisBindings", "RIGHTX", int),
+    ConfigField("righty", "AxisBindings", "RIGHTY", int),
+    ConfigField("dpadx", "AxisBindings", "DPADX", int),
+    ConfigField("dpady", "AxisBindings", "DPADY", int),
+    ConfigField("x", "ButtonBindings", "X", int),
+    ConfigField("a", "ButtonBindings", "A", int),
+    ConfigField("b", "ButtonBindings", "B", int),
+    ConfigField("y", "ButtonBindings", "Y", int),
+    ConfigField("leftbumper", "ButtonBindings", "LEFTBUMPER", int),
+    ConfigField("rightbumper", "ButtonBindings", "RIGHTBUMPER", int),
+    ConfigField("lefttrigger", "ButtonBindings", "LEFTTRIGGER", int),
+    ConfigField("righttrigger", "ButtonBindings", "RIGHTTRIGGER", int),
+    ConfigField("back", "ButtonBindings", "BACK", int),
+    ConfigField("start", "ButtonBindings", "START", int),
+])
+
+# Loaded from the "JoyConfig<controller>" section of each controller
+JoystickConfig = config_record("JoystickConfig", [
+    ConfigField("port", None, "PORT", int),
+    ConfigField("axes", None, "AXES", int),
+    ConfigField("buttons", None, "BUTTONS", int),
+    ConfigField("dead_zone", None, "DEAD_ZONE", float),
+])
+
+
 class OI:
     """
     This class is the glue that binds the controls on the physical operator
@@ -44,27 +74,74 @@ class OI:
     """
     _config = None
     _command_config = None
+    _joystick_configs = None
     _controllers = []
     _auto_program_chooser = None
     _starting_chooser = None
 
+    # Chooser options as (name, value), the first being the default
+    AUTO_PROGRAMS = (("Cross Line", 1), ("Hang Gear", 2), ("Do Nothing", 3))
+    STARTING_POSITIONS = (("Left", 1), ("Center", 2), ("Right", 3))
+
+    # D-pad axis values for each POV angle, anything else reads as 0.0
+    _pov_x_values = {90: 1.0, 270: -1.0}
+    _pov_y_values = {0: -1.0, 180: 1.0}
+
+    # Per-loop input state, indexed by controller
+    _inputs_valid = False
+    _ports = None
+    _dead_zones = None
+    _raw_axes = None
+    _axis_values = None
+    _buttons = None
+    _previous_buttons = None
+
     def __init__(self, robot, configfile='/home/lvuser/py/configs/joysticks.ini'):
         self.robot = robot
-        self._config = configparser.ConfigParser()
-        self._config.read(configfile)
+        store = ConfigStore.get_instance()
+        self._config = store.get(JoystickBindingsConfig, configfile)
         self._init_joystick_binding()
 
+        self._joystick_configs = []
+        self._controllers = []
         for i in range(2):
+            self._joystick_configs.append(store.get(JoystickConfig, configfile, "JoyConfig" + str(i)))
             self._controllers.append(self._init_joystick(i))
+        self._init_input_state()
 
         self._create_smartdashboard_buttons()
 
     def setup_button_bindings(self):
-        release_gear_a_button = JoystickButton(self._controllers[UserController.SCORING], JoystickButtons.A)
+        release_gear_a_button = OIButton(self, UserController.SCORING, JoystickButtons.A)
         release_gear_a_button.whileHeld(ReleaseGear(self.robot))
-        release_gear_b_button = JoystickButton(self._controllers[UserController.SCORING], JoystickButtons.B)
+        release_gear_b_button = OIButton(self, UserController.SCORING, JoystickButtons.B)
         release_gear_b_button.whileHeld(ActivateWinch(self.robot))
 
+    def update_inputs(self):
+        """Poll every controller once and hold the inputs for the rest of the loop.
+
+        Called by the robot at the start of each periodic loop, before the scheduler
+        runs, so buttons and commands all see the same inputs.
+        """
+        ds = DriverStation.getInstance()
+        for user in range(len(self._controllers)):
+            controller = self._controllers[user]
+            values = self._axis_values[user]
+            dead_zone = self._dead_zones[user]
+            for axis in self._raw_axes[user]:
+                value = controller.getRawAxis(axis)
+                values[axis] = value if abs(value) >= dead_zone else 0.0
+            pov = controller.getPOV()
+            values[JoystickAxis.DPADX] = self._pov_x_values.get(pov, 0.0)
+            values[JoystickAxis.DPADY] = self._pov_y_values.get(pov, 0.0)
+            self._previous_buttons[user] = self._buttons[user]
+            self._buttons[user] = ds.getStickButtons(self._ports[user])
+        self._inputs_valid = True
+
+    def expire_inputs(self):
+        """Mark the polled inputs as stale so reads go to the controllers again."""
+        self._inputs_valid = False
+
     def get_axis(self, user, axis):
         """Read axis value for specified controller/axis.
 
@@ -75,49 +152,63 @@ class OI:
         Return:
             Current position for the specified axis. (Range [-1.0, 1.0])
         """
+        if self._inputs_valid:
+            values = self._axis_values[user]
+            # Axes past the configured count are not polled, so they are read from the controller
+            if axis < len(values):
+                return values[axis]
+
         controller = self._controllers[user]
-        value = 0.0
         if axis == JoystickAxis.DPADX:
-            value = controller.getPOV()
-            if value == 90:
-                value = 1.0
-            elif value == 270:
-                value = -1.0
-            else:
-                value = 0.0
+            value = self._pov_x_values.get(controller.getPOV(), 0.0)
         elif axis == JoystickAxis.DPADY:
-            value = controller.getPOV()
-            if value == 0:
-                value = -1.0
-            elif value == 180:
-                value = 1.0
-            else:
-                value = 0.0
+            value = self._pov_y_values.get(controller.getPOV(), 0.0)
         else:
-            config_section = "JoyConfig" + str(user)
-            dead_zone = self._config.getfloat(config_section, "DEAD_ZONE")
             value = controller.getRawAxis(axis)
-            if abs(value) < dead_zone:
+            if abs(value) < self._dead_zones[user]:
                 value = 0.0
 
         return value
 
     def get_button_state(self, user, button):
+        if self._inputs_valid:
+            return (self._buttons[user] >> (button - 1)) & 1 == 1
         return self._controllers[user].getRawButton(button)
 
+    def get_buttons(self, user):
+        """Return the state of every button of a controller polled this loop, as a mask with bit 0 for button 1."""
+        return self._buttons[user]
+
+    def get_port(self, user):
+        """Return the driver station port of a controller."""
+        return self._ports[user]
+
+    def get_button_pressed(self, user, button):
+        """Return True if the button went down since the previous loop."""
+        mask = 1 << (button - 1)
+        return self._buttons[user] & mask != 0 and self._previous_buttons[user] & mask == 0
+
+    def get_button_released(self, user, button):
+        """Return True if the button came up since the previous loop."""
+        mask = 1 << (button - 1)
+        return self._buttons[user] & mask == 0 and self._previous_buttons[user] & mask != 0
+
     def _create_smartdashboard_buttons(self):
-        self._auto_program_chooser = SendableChooser()
-        self._auto_program_chooser.addDefault("Cross Line", 1)
-        self._auto_program_chooser.addObject("Hang Gear", 2)
-        self._auto_program_chooser.addObject("Do Nothing", 3)
+        self._auto_program_chooser = self._create_chooser(OI.AUTO_PROGRAMS)
         SmartDashboard.putData("Autonomous", self._auto_program_chooser)
 
-        self._starting_chooser = SendableChooser()
-        self._starting_chooser.addDefault("Left", 1)
-        self._starting_chooser.addObject("Center", 2)
-        self._starting_chooser.addObject("Right", 3)
+        self._starting_chooser = self._create_chooser(OI.STARTING_POSITIONS)
         SmartDashboard.putData("Starting_Position", self._starting_chooser)
 
+    @staticmethod
+    def _create_chooser(options):
+        chooser = SendableChooser()
+        name, value = options[0]
+        chooser.addDefault(name, value)
+        for name, value in options[1:]:
+            chooser.addObject(name, value)
+        return chooser
+
     def get_auto_choice(self):
         return self._auto_program_chooser.getSelected()
 
@@ -126,29 +217,37 @@ class OI:
         return value
 
     def _init_joystick(self, driver):
-        config_section = "JoyConfig" + str(driver)
-        stick = wpilib.Joystick(self._config.getint(config_section, "PORT"),
-                                self._config.getint(config_section, "AXES"),
-                                self._config.getint(config_section, "BUTTONS"))
+        config = self._joystick_configs[driver]
+        stick = wpilib.Joystick(config.port, config.axes, config.buttons)
         return stick
 
+    def _init_input_state(self):
+        dpad_axes = (JoystickAxis.DPADX, JoystickAxis.DPADY)
+        self._ports = [config.port for config in self._joystick_configs]
+        self._dead_zones = [config.dead_zone for config in self._joystick_configs]
+        self._raw_axes = [tuple(axis for axis in range(config.axes) if axis not in dpad_axes)
+                          for config in self._joystick_configs]
+        self._axis_values = [array('d', [0.0] * max(config.axes, max(dpad_axes) + 1))
+                             for config in self._joystick_configs]
+        self._buttons = [0] * len(self._joystick_configs)
+        self._previous_buttons = [0] * len(self._joystick_configs)
+        self._inputs_valid = False
+
     def _init_joystick_binding(self):
-        axis_binding_section = "AxisBindings"
-        JoystickAxis.LEFTX = self._config.getint(axis_binding_section, "LEFTX")
-        JoystickAxis.LEFTY = self._config.getint(axis_binding_section, "LEFTY")
-        JoystickAxis.RIGHTX = self._config.getint(axis_binding_section, "RIGHTX")
-        JoystickAxis.RIGHTY = self._config.getint(axis_binding_section, "RIGHTY")
-        JoystickAxis.DPADX = self._config.getint(axis_binding_section, "DPADX")
-        JoystickAxis.DPADY = self._config.getint(axis_binding_section, "DPADY")
-
-        button_binding_section = "ButtonBindings"
-        JoystickButtons.X = self._config.getint(button_binding_section, "X")
-        JoystickButtons.A = self._config.getint(button_binding_section, "A")
-        JoystickButtons.B = self._config.getint(button_binding_section, "B")
-        JoystickButtons.Y = self._config.getint(button_binding_section, "Y")
-        JoystickButtons.LEFTBUMPER = self._config.getint(button_binding_section, "LEFTBUMPER")
-        JoystickButtons.RIGHTBUMPER = self._config.getint(button_binding_section, "RIGHTBUMPER")
-        JoystickButtons.LEFTTRIGGER = self._config.getint(button_binding_section, "LEFTTRIGGER")
-        JoystickButtons.RIGHTTRIGGER = self._config.getint(button_binding_section, "RIGHTTRIGGER")
-        JoystickButtons.BACK = self._config.getint(button_binding_section, "BACK")
-        JoystickButtons.START = self._config.getint(button_binding_section, "START")
+        JoystickAxis.LEFTX = self._config.leftx
+        JoystickAxis.LEFTY = self._config.lefty
+        JoystickAxis.RIGHTX = self._config.rightx
+        JoystickAxis.RIGHTY = self._config.righty
+        JoystickAxis.DPADX = self._config.dpadx
+        JoystickAxis.DPADY = self._config.dpady
+
+        JoystickButtons.X = self._config.x
+        JoystickButtons.A = self._config.a
+        JoystickButtons.B = self._config.b
+        JoystickButtons.Y = self._config.y
+        JoystickButtons.LEFTBUMPER = self._config.leftbumper
+        JoystickButtons.RIGHTBUMPER = self._config.rightbumper
+        JoystickButtons.LEFTTRIGGER = self._config.lefttrigger
+        JoystickButtons.RIGHTTRIGGER = self._config.righttrigger
+        JoystickButtons.BACK = self._config.back
+        JoystickButtons.START = self._config.start
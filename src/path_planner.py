@@ -0,0 +1,215 @@
+import argparse
+import hashlib
+import logging
+import math
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import namedtuple
+
+
+logger = logging.getLogger("path_planner")
+
+# A point the path passes through.  x is forward and y is to the right of the robot's starting pose,
+# in feet, and heading is the direction of travel in degrees, clockwise like the gyro.
+Waypoint = namedtuple("Waypoint", ["x", "y", "heading"])
+
+# Cache file layout: header, then the x and y of each point as little-endian doubles
+_MAGIC = b"PATH0001"
+_HEADER = struct.Struct("<8sId")
+# Samples of each spline segment used to measure its length
+_SAMPLES_PER_SEGMENT = 200
+
+
+class Path(object):
+    """Points along a path, evenly spaced by distance travelled.
+
+    Because the points are spaced by arc length, the point a given distance
+    further along the path is a fixed number of points ahead, and the
+    distance left is a multiplication.
+
+    """
+    _xs = None
+    _ys = None
+    _spacing = None
+
+    def __init__(self, xs, ys, spacing):
+        """Create a Path.
+
+        Args:
+            xs: array('d') of the x of each point.
+            ys: array('d') of the y of each point.
+            spacing: Distance in feet between consecutive points.
+        """
+        self._xs = xs
+        self._ys = ys
+        self._spacing = spacing
+
+    def __len__(self):
+        return len(self._xs)
+
+    def get_spacing(self):
+        return self._spacing
+
+    def get_length(self):
+        """Return the distance in feet along the path from the first point to the last."""
+        return (len(self._xs) - 1) * self._spacing
+
+    def get_point(self, index):
+        """Return the (x, y) of a point, clamped to the ends of the path."""
+        index = max(0, min(len(self._xs) - 1, index))
+        return self._xs[index], self._ys[index]
+
+    def get_closest_index(self, x, y, start, window):
+        """Return the index of the point closest to (x, y), searching window points from start."""
+        xs = self._xs
+        ys = self._ys
+        best = start
+        best_distance = float("inf")
+        for i in range(start, min(len(xs), start + window)):
+            distance = (xs[i] - x) ** 2 + (ys[i] - y) ** 2
+            if distance < best_distance:
+                best = i
+                best_distance = distance
+        return best
+
+    def save(self, path):
+        """Write the path to a cache file."""
+        points = array('d')
+        for x, y in zip(self._xs, self._ys):
+            points.append(x)
+            points.append(y)
+        if sys.byteorder != "little":
+            points.byteswap()
+        with open(path, "wb") as cache_file:
+            cache_file.write(_HEADER.pack(_MAGIC, len(self._xs), self._spacing))
+            points.tofile(cache_file)
+
+    @staticmethod
+    def load(path):
+        """Read a path from a cache file.
+
+        Raises:
+            ValueError: The file is not a path cache file.
+        """
+        with open(path, "rb") as cache_file:
+            magic, count, spacing = _HEADER.unpack(cache_file.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError("%s is not a path file" % path)
+            points = array('d')
+            points.fromfile(cache_file, count * 2)
+        if sys.byteorder != "little":
+            points.byteswap()
+        return Path(points[0::2], points[1::2], spacing)
+
+
+def generate_path(waypoints, spacing=0.05):
+    """Generate a Path through waypoints.
+
+    Consecutive waypoints are joined by cubic Hermite splines leaving and
+    arriving in the direction of their headings, which are then resampled at
+    even distances.
+
+    Args:
+        waypoints: Sequence of at least two Waypoints.
+        spacing: Distance in feet between the points of the path.
+    """
+    if len(waypoints) < 2:
+        raise ValueError("a path needs at least two waypoints")
+    # Points along each spline, with the distance travelled to each
+    xs = [waypoints[0].x]
+    ys = [waypoints[0].y]
+    distances = [0.0]
+    for start, end in zip(waypoints, waypoints[1:]):
+        chord = math.hypot(end.x - start.x, end.y - start.y)
+        start_tangent = (chord * math.cos(math.radians(start.heading)),
+                         chord * math.sin(math.radians(start.heading)))
+        end_tangent = (chord * math.cos(math.radians(end.heading)), chord * math.sin(math.radians(end.heading)))
+        for i in range(1, _SAMPLES_PER_SEGMENT + 1):
+            t = i / _SAMPLES_PER_SEGMENT
+            h00 = 2 * t ** 3 - 3 * t ** 2 + 1
+            h10 = t ** 3 - 2 * t ** 2 + t
+            h01 = -2 * t ** 3 + 3 * t ** 2
+            h11 = t ** 3 - t ** 2
+            x = h00 * start.x + h10 * start_tangent[0] + h01 * end.x + h11 * end_tangent[0]
+            y = h00 * start.y + h10 * start_tangent[1] + h01 * end.y + h11 * end_tangent[1]
+            distances.append(distances[-1] + math.hypot(x - xs[-1], y - ys[-1]))
+            xs.append(x)
+            ys.append(y)
+
+    # Resample at even distances
+    count = int(round(distances[-1] / spacing)) + 1
+    spacing = distances[-1] / (count - 1) if count > 1 else spacing
+    path_xs = array('d')
+    path_ys = array('d')
+    j = 0
+    for i in range(count):
+        distance = i * spacing
+        while j < len(distances) - 2 and distances[j + 1] < distance:
+            j += 1
+        span = distances[j + 1] - distances[j]
+        fraction = (distance - distances[j]) / span if span > 0.0 else 0.0
+        fraction = max(0.0, min(1.0, fraction))
+        path_xs.append(xs[j] + (xs[j + 1] - xs[j]) * fraction)
+        path_ys.append(ys[j] + (ys[j + 1] - ys[j]) * fraction)
+    return Path(path_xs, path_ys, spacing)
+
+
+def path_key(waypoints, spacing):
+    """Return the cache key of the path through waypoints, a hash of everything it is generated from."""
+    parameters = repr((_MAGIC, _SAMPLES_PER_SEGMENT, tuple(tuple(waypoint) for waypoint in waypoints), spacing))
+    return hashlib.sha1(parameters.encode("ascii")).hexdigest()[:16]
+
+
+def load_path(waypoints, spacing=0.05, cache_directory=None):
+    """Return the Path through waypoints, from the cache if it has been generated before.
+
+    A path missing from the cache is generated and written to it.  If the
+    cache cannot be written, the path is still returned.
+
+    Args:
+        waypoints: Sequence of at least two Waypoints.
+        spacing: Distance in feet between the points of the path.
+        cache_directory: Directory of the cache files, or None to always generate the path.
+    """
+    if cache_directory is None:
+        return generate_path(waypoints, spacing)
+    cache_path = os.path.join(cache_directory, "path_%s.bin" % path_key(waypoints, spacing))
+    try:
+        return Path.load(cache_path)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, struct.error):
+        logger.exception("Could not read path cache %s", cache_path)
+    start = time.perf_counter()
+    path = generate_path(waypoints, spacing)
+    logger.info("Generated path %s in %.1f ms", cache_path, (time.perf_counter() - start) * 1000)
+    try:
+        os.makedirs(cache_directory, exist_ok=True)
+        path.save(cache_path)
+    except OSError:
+        logger.exception("Could not write path cache %s", cache_path)
+    return path
+
+
+def main():
+    """Generate the autonomous paths into a cache directory ahead of the first disabled period."""
+    parser = argparse.ArgumentParser(description="Generate the autonomous paths ahead of time.")
+    parser.add_argument("--config", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "configs",
+                                                          "autonomous.ini"), help="autonomous configuration file")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "paths"),
+                        help="cache directory to write")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from commands.autonomous_config import AutonomousConfig, hang_gear_waypoints
+    from config_store import ConfigStore
+    config = ConfigStore.get_instance().get(AutonomousConfig, args.config)
+    for position in (1, 3):
+        load_path(hang_gear_waypoints(config, position), config.path_spacing, args.output)
+
+
+if __name__ == "__main__":
+    main()
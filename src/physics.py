@@ -1,23 +1,115 @@
+import math
+import random
+from collections import namedtuple
 from pyfrc.physics import drivetrains
+from config_store import ConfigStore
+from subsystems.drivetrain import DrivetrainConfig
+from subsystems.winch import WinchConfig
 
 
+# Errors added to the simulation, to see how the robot code copes with real conditions.  encoder_noise is
+# the standard deviation of each drivetrain encoder reading in counts and gyro_drift the gyro's drift in
+# degrees per second.  left_scale and right_scale multiply each side's speed, and motor_lag is the time
+# constant in seconds of the drivetrain motors' response to a change in output.
+PhysicsNoise = namedtuple("PhysicsNoise", ["encoder_noise", "gyro_drift", "left_scale", "right_scale", "motor_lag"])
+
+NO_NOISE = PhysicsNoise(0.0, 0.0, 1.0, 1.0, 0.0)
+
 class PhysicsEngine(object):
+    """Simulates the robot's motion and the sensors the robot code reads.
+
+    The motor, encoder and gyro channels are read from the same configuration
+    file as the subsystems, MyRobot.subsystems_config_file, so the simulation
+    follows the wiring.  SimRunner calls configure() with the file of the
+    robot it runs, in case that robot was given another one.  Encoders
+    count the travel of their side of the drivetrain (or of the winch) since
+    the last update, and the gyro turns with the robot, so encoder- and
+    gyro-based commands run in simulation as on the robot.
+
+    Each encoder's REVERSED setting flips its count, as on the robot.  The
+    encoders are mounted to count down as their side drives forward, so the
+    configuration reverses them to follow the sign convention of Drivetrain.
+
+    set_noise() adds encoder, gyro and motor errors, for testing how the
+    robot code copes with them.
+
+    """
+    # Speed in feet per second of each side of the drivetrain at full output
+    drivetrain_speed = 5.0
+    # Winch encoder counts per second at full output
+    winch_speed = 2000.0
+
+    physics_controller = None
+    _drivetrain_config = None
+    _winch_config = None
+    _gyro_key = None
+
+    _encoders = None
+    _travel = None
+
+    _noise = NO_NOISE
+    _random = None
+    _reading_errors = None
+    _left_response = 0.0
+    _right_response = 0.0
 
-    def __init__(self, physics_controller):
+    def __init__(self, physics_controller, configfile=None):
         """
             :param physics_controller: `pyfrc.physics.core.PhysicsInterface` object
                                        to communicate simulation effects to
+            :param configfile: Subsystem configuration file.  Defaults to MyRobot.subsystems_config_file.
         """
-        
+
         self.physics_controller = physics_controller
-        
-        self.physics_controller.add_analog_gyro_channel(1)
-            
+        if configfile is None:
+            from robot import MyRobot
+            configfile = MyRobot.subsystems_config_file
+        self.configure(configfile)
+
+    def configure(self, configfile):
+        """Read the motor, encoder and gyro channels from a subsystem configuration file.
+
+        Called by the simulation with the file a robot instance was given, before the robot starts.
+        """
+        store = ConfigStore.get_instance()
+        self._drivetrain_config = store.get(DrivetrainConfig, configfile)
+        self._winch_config = store.get(WinchConfig, configfile)
+
+        self._gyro_key = None
+        if self._drivetrain_config.gyro_enabled:
+            # The ADXRS450 simulation reads its angle from this key, by SPI port
+            self._gyro_key = "adxrs450_spi_%d_angle" % self._drivetrain_config.gyro_channel
+            self.physics_controller.add_device_gyro_channel(self._gyro_key)
+
+        # Encoders are found by their A channel once the robot has created them
+        self._encoders = {}
+        self._travel = {}
+        for name, enabled, a_channel in (
+                ("left", self._drivetrain_config.left_encoder_enabled, self._drivetrain_config.left_encoder_a_channel),
+                ("right", self._drivetrain_config.right_encoder_enabled,
+                 self._drivetrain_config.right_encoder_a_channel),
+                ("winch", self._winch_config.encoder_enabled, self._winch_config.encoder_a_channel)):
+            if enabled:
+                self._encoders[name] = a_channel
+                self._travel[name] = 0.0
+        self.set_noise(NO_NOISE)
+
+    def set_noise(self, noise, seed=0):
+        """Add errors to the simulation from now on.
+
+        Args:
+            noise: PhysicsNoise to add, or NO_NOISE.
+            seed: Seed of the random encoder errors, so a run can be repeated.
+        """
+        self._noise = noise
+        self._random = random.Random(seed)
+        self._reading_errors = dict.fromkeys(self._travel, 0)
+
     def update_sim(self, hal_data, now, tm_diff):
         """
             Called when the simulation parameters for the program need to be
             updated.
-            
+
             :param now: The current time as a float
             :param tm_diff: The amount of time that has passed since the last
                             time that this function was called
@@ -41,10 +133,100 @@ class PhysicsEngine(object):
             'type': 'talon'
         },...]
         """
+        noise = self._noise
+        if self._gyro_key and noise.gyro_drift:
+            hal_data['robot'][self._gyro_key] += noise.gyro_drift * tm_diff
+        if not self.physics_controller.robot_enabled:
+            return
+        config = self._drivetrain_config
+
+        # Simulate the drivetrain, with the motors approaching their output at the lag's rate
+        l_motor = self._get_pwm(hal_data, config.left_motor_enabled, config.left_motor_channel)
+        r_motor = self._get_pwm(hal_data, config.right_motor_enabled, config.right_motor_channel)
+        if noise.motor_lag > 0.0:
+            response = min(1.0, tm_diff / noise.motor_lag)
+            self._left_response += (l_motor - self._left_response) * response
+            self._right_response += (r_motor - self._right_response) * response
+            l_motor = self._left_response
+            r_motor = self._right_response
+        l_motor *= noise.left_scale
+        r_motor *= noise.right_scale
 
-        # Simulate the drivetrain
-        l_motor = hal_data['pwm'][5]['value']
-        r_motor = hal_data['pwm'][4]['value']
-        
-        speed, rotation = drivetrains.two_motor_drivetrain(l_motor, r_motor)
+        speed, rotation = drivetrains.two_motor_drivetrain(l_motor, r_motor, config.track_width,
+                                                           self.drivetrain_speed)
         self.physics_controller.drive(speed, rotation, tm_diff)
+
+        # Each side's encoder counts the distance its wheels travel forward
+        self._count(hal_data, "left", -l_motor * self.drivetrain_speed * tm_diff / config.distance_per_count,
+                    noise.encoder_noise)
+        self._count(hal_data, "right", r_motor * self.drivetrain_speed * tm_diff / config.distance_per_count,
+                    noise.encoder_noise)
+
+        winch = self._get_pwm(hal_data, self._winch_config.motor_enabled, self._winch_config.motor_channel)
+        self._count(hal_data, "winch", winch * self.winch_speed * tm_diff)
+
+    @staticmethod
+    def _get_pwm(hal_data, enabled, channel):
+        if not enabled:
+            return 0.0
+        return hal_data['pwm'][channel]['value'] or 0.0
+
+    def _count(self, hal_data, name, counts, deviation=0.0):
+        """Add whole counts to an encoder, keeping the fraction of a count for the next update.
+
+        The counts are those of a reversed encoder.
+
+        With a deviation, each reading is off by a random error that does not add up over time.
+        """
+        encoder = self._find_encoder(hal_data, name)
+        if encoder is None:
+            return
+        # As mounted, the encoders count down as their side drives forward or the winch winds in, so the
+        # configuration reverses them.  The simulated HAL stores REVERSED but does not apply it.
+        if not encoder['reverse_direction']:
+            counts = -counts
+        travel = self._travel[name] + counts
+        whole = math.floor(travel)
+        self._travel[name] = travel - whole
+        if deviation:
+            error = int(round(self._random.gauss(0.0, deviation)))
+            whole += error - self._reading_errors[name]
+            self._reading_errors[name] = error
+        encoder['count'] += whole
+
+    def set_encoder(self, hal_data, name, count):
+        """Set the count of an encoder, for replaying a recorded reading.
+
+        Args:
+            name: "left", "right" or "winch".
+            count: The count the encoder reads.
+
+        Return:
+            False if the encoder is disabled or has not been created.
+        """
+        encoder = self._find_encoder(hal_data, name)
+        if encoder is None:
+            return False
+        encoder['count'] = int(count)
+        self._travel[name] = 0.0
+        return True
+
+    def set_gyro_angle(self, hal_data, angle):
+        """Set the angle the gyro reads, for replaying a recorded reading.
+
+        Return:
+            False if the gyro is disabled.
+        """
+        if not self._gyro_key:
+            return False
+        hal_data['robot'][self._gyro_key] = angle
+        return True
+
+    def _find_encoder(self, hal_data, name):
+        a_channel = self._encoders.get(name)
+        if a_channel is None:
+            return None
+        for encoder in hal_data['encoder']:
+            if encoder['initialized'] and encoder['config'].get("ASource_Channel") == a_channel:
+                return encoder
+        return None
@@ -0,0 +1,119 @@
+import math
+from collections import namedtuple
+
+
+# Gains of a PIDFController.  kf is the output added in the direction of the error to overcome
+# friction, and settle_time is how long the error must stay within tolerance to count as settled.
+PIDGains = namedtuple("PIDGains", ["kp", "ki", "kd", "kf", "settle_time"])
+
+
+class PIDFController(object):
+    """PID controller with a static feedforward term, stepped once per robot loop.
+
+    Unlike wpilib.PIDController, it does not run in its own thread: commands
+    call calculate() from execute() with the loop's sensor snapshot.  It also
+    records the overshoot and settle time of each move, so gains can be
+    compared in simulation.
+
+    """
+    _gains = None
+    _tolerance = None
+    _max_output = None
+
+    _setpoint = 0.0
+    _integral = 0.0
+    _last_error = None
+    _last_time = None
+    _start_time = None
+    _initial_direction = 0.0
+    _in_tolerance_since = None
+    _settle_time = None
+    _overshoot = 0.0
+
+    def __init__(self, gains, tolerance, max_output=1.0):
+        """Create and initialize a PIDFController.
+
+        Args:
+            gains: PIDGains to use.
+            tolerance: Largest error that counts as on target.
+            max_output: Largest output magnitude.
+        """
+        self._gains = gains
+        self._tolerance = tolerance
+        self._max_output = max_output
+
+    def reset(self, setpoint, measurement, now):
+        """Start a new move toward a setpoint.
+
+        Args:
+            setpoint: Target value.
+            measurement: Current value.
+            now: Current time in seconds.
+        """
+        self._setpoint = setpoint
+        self._integral = 0.0
+        self._last_error = None
+        self._last_time = now
+        self._start_time = now
+        self._initial_direction = math.copysign(1.0, self._get_error(measurement))
+        self._in_tolerance_since = None
+        self._settle_time = None
+        self._overshoot = 0.0
+
+    def set_setpoint(self, setpoint):
+        """Move the setpoint without starting a new move, for following a motion profile."""
+        self._setpoint = setpoint
+
+    def calculate(self, measurement, now):
+        """Return the output for the current measurement, in the direction of the error.
+
+        Args:
+            measurement: Current value.
+            now: Current time in seconds.
+        """
+        gains = self._gains
+        error = self._get_error(measurement)
+        dt = now - self._last_time
+        derivative = 0.0
+        if dt > 0.0:
+            if self._last_error is not None:
+                derivative = (error - self._last_error) / dt
+            if gains.ki != 0.0:
+                # Limit the integral so it can never demand more than the maximum output on its own
+                limit = self._max_output / abs(gains.ki)
+                self._integral = max(-limit, min(limit, self._integral + error * dt))
+        self._last_error = error
+        self._last_time = now
+
+        output = gains.kp * error + gains.ki * self._integral + gains.kd * derivative
+        if abs(error) > self._tolerance:
+            output += math.copysign(gains.kf, error)
+        output = max(-self._max_output, min(self._max_output, output))
+
+        if abs(error) <= self._tolerance:
+            if self._in_tolerance_since is None:
+                self._in_tolerance_since = now
+        else:
+            self._in_tolerance_since = None
+        if error * self._initial_direction < 0.0 and abs(error) > self._overshoot:
+            self._overshoot = abs(error)
+        return output
+
+    def is_settled(self, now):
+        """Return True once the error has stayed within tolerance for the settle time."""
+        if self._in_tolerance_since is None or now - self._in_tolerance_since < self._gains.settle_time:
+            return False
+        if self._settle_time is None:
+            self._settle_time = self._in_tolerance_since - self._start_time
+        return True
+
+    def get_settle_time(self):
+        """Return the time in seconds from reset() until the error last entered tolerance, or None if not settled."""
+        return self._settle_time
+
+    def get_overshoot(self):
+        """Return the largest error past the setpoint since reset()."""
+        return self._overshoot
+
+    def _get_error(self, measurement):
+        return self._setpoint - measurement
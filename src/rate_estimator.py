@@ -0,0 +1,48 @@
+from array import array
+
+
+class RateEstimator(object):
+    """Estimates the rate of change of a sensor from its readings.
+
+    The rate is the change over the last few readings divided by the time
+    between them, which averages out the quantization of a single loop's
+    change in encoder counts.  Readings are kept in preallocated arrays, so an
+    update does not allocate.
+
+    """
+    _timestamps = None
+    _values = None
+    _count = 0
+    _rate = 0.0
+
+    def __init__(self, window=3):
+        """Create and initialize a RateEstimator.
+
+        Args:
+            window: Number of readings the rate is measured over.
+        """
+        self._timestamps = array('d', [0.0] * (window + 1))
+        self._values = array('d', [0.0] * (window + 1))
+        self.reset()
+
+    def reset(self):
+        """Forget every reading.  The rate is 0.0 until there are two new ones."""
+        self._count = 0
+        self._rate = 0.0
+
+    def update(self, timestamp, value):
+        """Add a reading and return the new rate, in units per second."""
+        size = len(self._timestamps)
+        i = self._count % size
+        self._timestamps[i] = timestamp
+        self._values[i] = value
+        self._count += 1
+        if self._count > 1:
+            oldest = (self._count - min(self._count, size)) % size
+            elapsed = timestamp - self._timestamps[oldest]
+            if elapsed > 0.0:
+                self._rate = (value - self._values[oldest]) / elapsed
+        return self._rate
+
+    def get_rate(self):
+        return self._rate
@@ -1,69 +1,153 @@
+import time
+# Startup is timed from here, before the slow wpilib imports
+_IMPORT_START = time.perf_counter()
+import threading
 from wpilib import command
 import wpilib
-from commands.do_nothing import DoNothing
 from oi import OI
 from subsystems.drivetrain import Drivetrain
 from subsystems.winch import Winch
 from subsystems.gear_feeder import GearFeeder
-from commands.autonomous_cross_line import AutonomousCrossLine
-from commands.autonomous_hang_center import AutonomousHangCenter
+from telemetry import Telemetry
+from loop_timer import LoopTimer
+from command_profiler import CommandProfiler
+from autonomous_plans import AutonomousPlans
+from config_store import ConfigStore
+from flight_recorder import FlightRecorder
+from startup_profiler import StartupProfiler
 
 
 class MyRobot(wpilib.IterativeRobot):
+    # Set to True to time every command's methods and log a report when disabled
+    profile_commands = False
+    # Set to True to run the drivetrain characterization in test mode instead of LiveWindow
+    characterize_in_test_mode = False
+    # Flight logs are written here on the real robot, and only kept in memory in simulation
+    flight_log_directory = "/home/lvuser/py/logs"
+    # Subsystems are configured from this file, which the physics model of the simulation reads too
+    subsystems_config_file = "/home/lvuser/py/configs/subsystems.ini"
+    # Autonomous programs are configured from this file, and chosen from these programs (None for all of them)
+    autonomous_config_file = "/home/lvuser/py/configs/autonomous.ini"
+    autonomous_programs = None
+
     oi = None
     drivetrain = None
     winch = None
     autonomous_command = None
     gear_feeder = None
+    telemetry = None
+    loop_timer = None
+    command_profiler = None
+    autonomous_plans = None
+    flight_recorder = None
+    startup_profiler = None
+    _autonomous_start_time = None
 
     def autonomousInit(self):
-        # Schedule the autonomous command
+        # Schedule the prebuilt autonomous command
+        self._autonomous_start_time = time.perf_counter()
         self.drivetrain.reset_gyro_angle()
-        starting_position = self.oi.get_position()
-        if self.oi.get_auto_choice() == 1:
-            self.autonomous_command = AutonomousCrossLine(self)
-            self.autonomous_command.set_match_configuration(starting_position)
-        elif self.oi.get_auto_choice() == 2:
-            self.autonomous_command = AutonomousHangCenter(self)
-            self.autonomous_command.set_match_configuration(starting_position)
-        else:
-            self.autonomous_command = DoNothing(self)
+        self.drivetrain.reset_pose()
+        self.autonomous_command = self.autonomous_plans.get_plan(self.oi.get_auto_choice(), self.oi.get_position())
         self.autonomous_command.start()
 
     def testInit(self):
-        pass
+        if self.characterize_in_test_mode:
+            # Only imported when used, so it does not slow down startup
+            from commands.characterize_drivetrain import CharacterizeDrivetrain
+            CharacterizeDrivetrain(self).start()
 
     def teleopInit(self):
         if self.autonomous_command:
             self.autonomous_command.cancel()
+        self._autonomous_start_time = None
         self.teleopInitialized = True
 
     def disabledInit(self):
         self.disabledInitialized = True
+        if self.loop_timer:
+            self.loop_timer.log_report()
+            self.loop_timer.reset()
+        if self.command_profiler:
+            self.command_profiler.log_report()
+            self.command_profiler.reset()
+
+    def disabledPeriodic(self):
+        """This function is called periodically while disabled."""
+        # Spread building the autonomous plans across the disabled loops
+        self.autonomous_plans.build_next()
+        # Publish what changed while disabled, or the dashboard shows stale values until the match starts
+        self.telemetry.flush()
 
     def robotInit(self):
         """
         This function is called upon program startup and
         should be used for any initialization code.
         """
+        # Time each step, so a slow start after a reboot mid-match can be traced
+        self.startup_profiler = StartupProfiler(start=_IMPORT_START)
+        self.startup_profiler.mark("imports and wpilib startup")
+        self.telemetry = Telemetry.get_instance()
+        self.loop_timer = LoopTimer()
+        if self.profile_commands:
+            self.command_profiler = CommandProfiler()
+            self.command_profiler.install()
+        self.startup_profiler.mark("telemetry and profiling")
         self.oi = OI(self)
-        self.drivetrain = Drivetrain(self)
-        self.winch = Winch(self)
-        self.gear_feeder = GearFeeder(self)
+        self.startup_profiler.mark("oi")
+        self.drivetrain = Drivetrain(self, None, self.subsystems_config_file)
+        self.startup_profiler.mark("drivetrain")
+        self.winch = Winch(self, None, self.subsystems_config_file)
+        self.startup_profiler.mark("winch")
+        self.gear_feeder = GearFeeder(self, None, self.subsystems_config_file)
+        self.startup_profiler.mark("gear_feeder")
         self.oi.setup_button_bindings()
-        wpilib.CameraServer.launch()
+        # The autonomous programs are imported and built while disabled, not here
+        self.autonomous_plans = AutonomousPlans(self, self.autonomous_config_file, self.autonomous_programs)
+        self.flight_recorder = FlightRecorder(self)
+        if wpilib.RobotBase.isReal():
+            self.flight_recorder.start(FlightRecorder.next_log_path(self.flight_log_directory))
+        self.startup_profiler.mark("autonomous plans and flight recorder")
+        self.logger.info("Configuration parsed in %.2f ms", ConfigStore.get_instance().get_parse_time() * 1000)
+        self.telemetry.register("Autonomous Start Latency (ms)")
+        # Launching the camera server starts a process, which the robot does not need to wait for
+        threading.Thread(target=wpilib.CameraServer.launch, name="CameraServerLaunch", daemon=True).start()
+        self.telemetry.flush()
+        self.startup_profiler.mark("camera server and telemetry")
+        self.startup_profiler.log_report()
 
     def autonomousPeriodic(self):
         """This function is called periodically during autonomous."""
-        command.Scheduler.getInstance().run()
+        self._run_scheduler()
 
     def teleopPeriodic(self):
         """This function is called periodically during operator control."""
-        command.Scheduler.getInstance().run()
+        self._run_scheduler()
 
     def testPeriodic(self):
         """This function is called periodically during test mode."""
-        wpilib.LiveWindow.run()
+        if self.characterize_in_test_mode:
+            self._run_scheduler()
+        else:
+            wpilib.LiveWindow.run()
+
+    def _run_scheduler(self):
+        self.loop_timer.begin_loop()
+        # Sample the inputs and sensors once so every command in this loop sees the same data
+        self.oi.update_inputs()
+        self.drivetrain.update_sensor_snapshot()
+        command.Scheduler.getInstance().run()
+        self.flight_recorder.record()
+        self.drivetrain.expire_sensor_snapshot()
+        self.oi.expire_inputs()
+        if self._autonomous_start_time is not None:
+            # The first autonomous loop has set the motors
+            latency = time.perf_counter() - self._autonomous_start_time
+            self._autonomous_start_time = None
+            self.logger.info("Autonomous start latency: %.2f ms", latency * 1000)
+            self.telemetry.put_number("Autonomous Start Latency (ms)", latency * 1000)
+        self.telemetry.flush()
+        self.loop_timer.end_loop()
 
 if __name__ == "__main__":
     wpilib.run(MyRobot)
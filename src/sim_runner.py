@@ -0,0 +1,343 @@
+import argparse
+import importlib
+import json
+import logging
+import math
+import os
+import random
+import time
+from collections import namedtuple
+from wpilib.smartdashboard import SmartDashboard
+from hal_impl import mode_helpers
+from hal_impl.data import hal_data
+import pyfrc
+from pyfrc.physics.core import PhysicsInterface
+from pyfrc.test_support.fake_time import TestEnded
+from stopwatch import Stopwatch
+
+
+logger = logging.getLogger("sim_runner")
+
+SimResult = namedtuple("SimResult", ["sim_time", "wall_time", "speedup", "loops", "x", "y", "angle"])
+
+# The pyfrc version whose internals PyfrcHooks uses, as pinned in requirements.txt
+PYFRC_VERSION = "2017.1.0"
+
+
+class PyfrcHooks(object):
+    """Every use of pyfrc and wpilib internals by the headless simulation, in one place.
+
+    pyfrc only runs the robot against its fake clock and physics model from its own
+    test runner, so running a match outside of it means reaching into private
+    attributes: the function FakeTime calls before each driver station packet, the
+    time of the next packet, the physics model's enabled flag, wpilib's reset of its
+    global state, the driver station's update and the NetworkTables mode the robot
+    sets.  These are only known to work with PYFRC_VERSION.  Those of an instance
+    are looked up when it is created, and those of the static methods before they
+    are used, so a pyfrc that has changed them fails with an error naming what is
+    missing, not partway through a run.
+
+    """
+    _fake_time = None
+    _physics = None
+    # NetworkTables.setServerMode while hold_networktables_test_mode() replaces it
+    _set_server_mode = None
+
+    def __init__(self, fake_time, physics=None):
+        """Create PyfrcHooks and check that the internals they use exist.
+
+        Args:
+            fake_time: Initialized pyfrc FakeTime driving the HAL clock.
+            physics: pyfrc PhysicsInterface, or None if the physics model is not used.
+
+        Raises:
+            RuntimeError: The installed pyfrc does not have one of the internals.
+        """
+        _check_attribute(getattr(fake_time, "ds_cond", None), "_on_step", "FakeTime.ds_cond._on_step")
+        _check_attribute(fake_time, "next_ds_time", "FakeTime.next_ds_time")
+        if physics is not None:
+            _check_attribute(physics, "_set_robot_enabled", "PhysicsInterface._set_robot_enabled")
+        self._fake_time = fake_time
+        self._physics = physics
+
+    def set_on_step(self, on_step):
+        """Call on_step with the time before each driver station packet, which starts a loop.
+
+        The run ends when on_step returns False.
+        """
+        self._fake_time.ds_cond._on_step = on_step
+
+    def get_next_loop_time(self):
+        """Return the time of the driver station packet after the next one."""
+        return self._fake_time.next_ds_time
+
+    def set_next_loop_time(self, next_time):
+        """Move the driver station packet after the next one."""
+        self._fake_time.next_ds_time = next_time
+
+    def set_robot_enabled(self, enabled):
+        """Tell the physics model whether the robot is enabled, since it only moves an enabled robot."""
+        self._physics._set_robot_enabled(enabled)
+
+    @staticmethod
+    def reset_wpilib():
+        """Reset wpilib's global state, so another robot can be started in this process.
+
+        Raises:
+            RuntimeError: The installed wpilib does not have the reset.
+        """
+        try:
+            utils = importlib.import_module("wpilib._impl.utils")
+        except ImportError:
+            utils = None
+        _check_attribute(utils, "reset_wpilib", "wpilib._impl.utils.reset_wpilib")
+        utils.reset_wpilib()
+
+    @staticmethod
+    def update_driver_station():
+        """Make the driver station read the mode and joysticks from the HAL now, not at its next packet.
+
+        Raises:
+            RuntimeError: The installed wpilib does not have the update.
+        """
+        from wpilib.driverstation import DriverStation
+        driver_station = DriverStation.getInstance()
+        _check_attribute(driver_station, "_getData", "DriverStation._getData")
+        driver_station._getData()
+
+    @staticmethod
+    def hold_networktables_test_mode(hold):
+        """Keep NetworkTables in test mode when the robot starts, or stop doing so.
+
+        RobotBase.__init__ sets NetworkTables to server mode, which undoes setTestMode() and
+        starts a server on the NetworkTables port.  That port is taken by the first simulation
+        on a machine, so any other simulation, dashboard or robot simulator fails to start.
+        While held, setting server mode sets test mode instead.
+
+        Raises:
+            RuntimeError: The installed NetworkTables does not have setServerMode.
+        """
+        from networktables import NetworkTables
+        _check_attribute(NetworkTables, "setServerMode", "NetworkTables.setServerMode")
+        if hold:
+            if PyfrcHooks._set_server_mode is None:
+                PyfrcHooks._set_server_mode = NetworkTables.__dict__["setServerMode"]
+            NetworkTables.setServerMode = classmethod(lambda cls: cls.setTestMode())
+        elif PyfrcHooks._set_server_mode is not None:
+            NetworkTables.setServerMode = PyfrcHooks._set_server_mode
+            PyfrcHooks._set_server_mode = None
+
+
+def _check_attribute(obj, name, description):
+    if obj is None or not hasattr(obj, name):
+        raise RuntimeError("The simulation needs %s, which pyfrc %s does not have.  It is written for pyfrc %s "
+                           "(see requirements.txt)." % (description, getattr(pyfrc, "__version__", "?"),
+                                                        PYFRC_VERSION))
+
+
+class SimRunner(object):
+    """Runs the robot code and the physics model headless on a virtual clock.
+
+    The robot's own main loop is run against pyfrc's fake time, so each 20 ms
+    loop takes only as long as the code needs to run.  Before every loop the
+    physics model is updated with the motor outputs of the previous loop and
+    the robot is moved through a disabled, autonomous and teleop period, the
+    same as during a match.
+
+    """
+    LOOP_PERIOD = 0.02
+
+    _robot = None
+    _fake_time = None
+    _physics = None
+    _hooks = None
+    _disabled_period = None
+    _autonomous_period = None
+    _teleop_period = None
+    _autonomous_choice = None
+    _position_choice = None
+    _on_step = None
+    _wall_clock = None
+    _loop_jitter = 0.0
+    _random = None
+
+    _disabled_loops = 0
+    _autonomous_loops = 0
+    _teleop_loops = 0
+    _last_time = None
+    _loops = 0
+
+    def __init__(self, robot, fake_time, robot_path=None, disabled_period=1.0, autonomous_period=15.0,
+                 teleop_period=135.0, autonomous_choice=None, position_choice=None, on_step=None,
+                 wall_clock=time.perf_counter, noise=None, loop_jitter=0.0, seed=0):
+        """Create and initialize a SimRunner.
+
+        Args:
+            robot: Robot instance that has not been started yet.
+            fake_time: pyfrc FakeTime driving the HAL clock.
+            robot_path: Directory holding physics.py and sim/config.json.  Defaults to this directory.
+            disabled_period: Seconds spent disabled before autonomous, used to build the autonomous plans.
+            autonomous_period: Seconds spent in autonomous.
+            teleop_period: Seconds spent in teleop.
+            autonomous_choice: Name of the autonomous program chooser option to select, or None for the default.
+            position_choice: Name of the starting position chooser option to select, or None for the default.
+            on_step: Function called with the virtual time before each loop, to script operator inputs.
+                Returning False ends the run early.
+            wall_clock: Function returning the current wall time in seconds.
+            noise: PhysicsNoise to add to the physics model, or None for none.
+            loop_jitter: Standard deviation in seconds of the time between loops.
+            seed: Seed of the noise and jitter, so a run can be repeated.
+        """
+        if robot_path is None:
+            robot_path = os.path.dirname(os.path.abspath(__file__))
+        with open(os.path.join(robot_path, "sim", "config.json")) as config_file:
+            config = json.load(config_file)
+
+        self._robot = robot
+        self._fake_time = fake_time
+        self._physics = PhysicsInterface(robot_path, fake_time, config)
+        self._physics.engine.configure(robot.subsystems_config_file)
+        self._hooks = PyfrcHooks(fake_time, self._physics)
+        self._disabled_period = disabled_period
+        self._autonomous_period = autonomous_period
+        self._teleop_period = teleop_period
+        self._disabled_loops = int(round(disabled_period / SimRunner.LOOP_PERIOD))
+        self._autonomous_loops = int(round(autonomous_period / SimRunner.LOOP_PERIOD))
+        self._teleop_loops = int(round(teleop_period / SimRunner.LOOP_PERIOD))
+        self._autonomous_choice = autonomous_choice
+        self._position_choice = position_choice
+        self._on_step = on_step
+        self._wall_clock = wall_clock
+        if noise is not None:
+            self._physics.engine.set_noise(noise, seed)
+        self._loop_jitter = loop_jitter
+        self._random = random.Random(seed)
+
+    def run(self):
+        """Run the robot through the disabled, autonomous and teleop periods.
+
+        Return:
+            SimResult with the simulated and wall time, the speedup, the number of
+            loops run and the final field position of the robot in feet and degrees.
+        """
+        if self._autonomous_choice is not None:
+            SmartDashboard.getTable().getSubTable("Autonomous").putString("selected", self._autonomous_choice)
+        if self._position_choice is not None:
+            SmartDashboard.getTable().getSubTable("Starting_Position").putString("selected",
+                                                                                 self._position_choice)
+
+        start_time = self._fake_time.get()
+        self._last_time = start_time
+        self._loops = 0
+        self._fake_time.set_time_limit(start_time + self.get_match_length() + 1.0)
+        self._hooks.set_on_step(self._step)
+
+        # Timed commands run on the virtual clock too
+        default_clock = Stopwatch.default_clock
+        Stopwatch.default_clock = self._fake_time.get
+        wall_start = self._wall_clock()
+        try:
+            self._robot.startCompetition()
+        except TestEnded:
+            pass
+        finally:
+            wall_time = self._wall_clock() - wall_start
+            Stopwatch.default_clock = default_clock
+
+        sim_time = self._fake_time.get() - start_time
+        speedup = sim_time / wall_time if wall_time > 0 else float("inf")
+        x, y, angle = self._physics.get_position()
+        return SimResult(sim_time, wall_time, speedup, self._loops, x, y, math.degrees(angle))
+
+    def get_match_length(self):
+        return self._disabled_period + self._autonomous_period + self._teleop_period
+
+    def _step(self, now):
+        """Advance the physics model and robot mode before the next loop.
+
+        Return:
+            False once the match is over, which ends the run.
+        """
+        tm_diff = now - self._last_time
+        self._last_time = now
+        if tm_diff > 0:
+            self._physics.engine.update_sim(hal_data, now, tm_diff)
+
+        # Count loops rather than compare times so periods are not cut short by rounding
+        if self._loops < self._disabled_loops:
+            mode_helpers.set_mode("auto", False)
+        elif self._loops < self._disabled_loops + self._autonomous_loops:
+            mode_helpers.set_mode("auto", True)
+        elif self._loops < self._disabled_loops + self._autonomous_loops + self._teleop_loops:
+            mode_helpers.set_mode("teleop", True)
+        else:
+            return False
+        # The physics model only moves the robot while it is enabled
+        self._hooks.set_robot_enabled(self._loops >= self._disabled_loops)
+
+        if self._on_step is not None and self._on_step(now) is False:
+            return False
+        if self._loop_jitter:
+            # Move the next driver station packet, which starts the next loop, by up to half a period
+            jitter = self._random.gauss(0.0, self._loop_jitter)
+            self._hooks.set_next_loop_time(self._hooks.get_next_loop_time() +
+                                           max(-0.5 * SimRunner.LOOP_PERIOD, min(0.5 * SimRunner.LOOP_PERIOD, jitter)))
+        self._loops += 1
+        return True
+
+
+def start_simulation():
+    """Set up the HAL, NetworkTables and a fake clock the way the pyfrc test runner does, without pytest.
+
+    Return:
+        The FakeTime driving the HAL clock.  Pass it to stop_simulation() after the run.
+    """
+    import hal_impl
+    import networktables
+    import wpilib
+    from pyfrc.test_support.fake_time import FakeTime
+    from pyfrc.test_support.pyfrc_fake_hooks import PyFrcFakeHooks
+
+    fake_time = FakeTime()
+    hal_impl.functions.hooks = PyFrcFakeHooks(fake_time)
+    networktables.NetworkTables.setTestMode()
+    PyfrcHooks.hold_networktables_test_mode(True)
+    fake_time.initialize()
+    hal_impl.functions.reset_hal()
+    wpilib.RobotBase.initializeHardwareConfiguration()
+    return fake_time
+
+
+def stop_simulation(fake_time):
+    """Tear down a simulation started by start_simulation(), so another can be started in this process."""
+    import networktables
+    fake_time.teardown()
+    PyfrcHooks.reset_wpilib()
+    networktables.NetworkTables.shutdown()
+    PyfrcHooks.hold_networktables_test_mode(False)
+
+
+def main():
+    """Run a simulated match from the command line and report the speedup."""
+    parser = argparse.ArgumentParser(description="Run a headless simulated match faster than real time.")
+    parser.add_argument("--autonomous", type=float, default=15.0, help="autonomous period in seconds")
+    parser.add_argument("--teleop", type=float, default=135.0, help="teleop period in seconds")
+    parser.add_argument("--program", help="name of the autonomous program to select, e.g. 'Hang Gear'")
+    parser.add_argument("--position", help="name of the starting position to select, e.g. 'Center'")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from robot import MyRobot
+
+    fake_time = start_simulation()
+    runner = SimRunner(MyRobot(), fake_time, disabled_period=1.0, autonomous_period=args.autonomous,
+                       teleop_period=args.teleop, autonomous_choice=args.program, position_choice=args.position)
+    result = runner.run()
+    logger.info("Simulated %.1f s in %.2f s of wall time (%.0fx real time), %d loops", result.sim_time,
+                result.wall_time, result.speedup, result.loops)
+    logger.info("Final position: x %.2f ft, y %.2f ft, angle %.1f deg", result.x, result.y, result.angle)
+    stop_simulation(fake_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import argparse
+import builtins
+import importlib.util
+import logging
+import sys
+import time
+
+
+logger = logging.getLogger("startup_profiler")
+
+
+class StartupProfiler(object):
+    """Times module imports and the steps of robot initialization.
+
+    Steps are timed with mark(), which records the time since the previous
+    mark, so robotInit can time each subsystem at the cost of one clock read.
+
+    Timing imports is opt-in: install() replaces the import function with one
+    that times each module imported for the first time, until uninstall().  A
+    module's own time leaves out the modules it imports in turn.
+
+    """
+    # Indexes into each import's stats list
+    _TOTAL = 0
+    _OWN = 1
+
+    _clock = None
+    _start = None
+    _last_mark = None
+    _steps = None
+    _imports = None
+    _children = None
+    _original_import = None
+
+    def __init__(self, clock=time.perf_counter, start=None):
+        """Create and initialize a StartupProfiler.
+
+        Args:
+            clock: Function returning the current time in seconds.
+            start: Time startup began, by the clock.  Defaults to now.
+        """
+        self._clock = clock
+        self._start = start if start is not None else clock()
+        self._last_mark = self._start
+        self._steps = []
+        self._imports = {}
+        self._children = []
+
+    def mark(self, step):
+        """Record the time since the previous mark (or the start) as the time of a step.
+
+        Return:
+            The time of the step in seconds.
+        """
+        now = self._clock()
+        elapsed = now - self._last_mark
+        self._last_mark = now
+        self._steps.append((step, elapsed))
+        return elapsed
+
+    def get_steps(self):
+        """Return a list of (step, seconds) in the order the steps were marked."""
+        return list(self._steps)
+
+    def get_elapsed(self):
+        """Return the time from the start to the last mark in seconds."""
+        return self._last_mark - self._start
+
+    def install(self):
+        """Start timing imports."""
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        """Stop timing imports and restore the original import function."""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def is_installed(self):
+        return self._original_import is not None
+
+    def get_imports(self):
+        """Return a list of (module, total seconds, own seconds) of every timed import, most own time first."""
+        imports = [(module, stats[StartupProfiler._TOTAL], stats[StartupProfiler._OWN])
+                   for module, stats in self._imports.items()]
+        imports.sort(key=lambda item: item[2], reverse=True)
+        return imports
+
+    def log_report(self, import_count=15):
+        """Log the time of every step and of the slowest imports."""
+        logger.info("Startup took %.1f ms", self.get_elapsed() * 1000)
+        for step, elapsed in self._steps:
+            logger.info("  %-40s %8.2f ms", step, elapsed * 1000)
+        imports = self.get_imports()
+        if imports:
+            logger.info("Slowest of %d imports (own time, with the modules they import):", len(imports))
+            for module, total, own in imports[:import_count]:
+                logger.info("  %-40s %8.2f ms %8.2f ms", module, own * 1000, total * 1000)
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module = name
+        if level > 0 and globals and globals.get("__package__"):
+            module = importlib.util.resolve_name("." * level + name, globals["__package__"])
+        if module in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        clock = self._clock
+        self._children.append(0.0)
+        start = clock()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            total = clock() - start
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += total
+            stats = self._imports.setdefault(module, [0.0, 0.0])
+            stats[StartupProfiler._TOTAL] += total
+            stats[StartupProfiler._OWN] += total - children
+
+
+def main():
+    """Profile importing and initializing the robot in simulation from the command line."""
+    parser = argparse.ArgumentParser(description="Time the robot code's imports and robotInit steps.")
+    parser.add_argument("--imports", type=int, default=15, help="number of slowest imports to report")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    profiler = StartupProfiler()
+    profiler.install()
+    try:
+        from robot import MyRobot
+        from sim_runner import start_simulation, stop_simulation
+    finally:
+        profiler.uninstall()
+    profiler.mark("import robot")
+
+    fake_time = start_simulation()
+    robot = MyRobot()
+    robot.robotInit()
+    profiler.mark("robotInit")
+    stop_simulation(fake_time)
+
+    profiler.log_report(args.imports)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,83 @@
 import time
+from array import array
 
 
 class Stopwatch(object):
     """Provides stopwatch timing functionality.
 
     This class provides simple time keeping functionality like a stopwatch.
+    The time is read from a clock function, which can be the monotonic
+    time.perf_counter (the default), wpilib.Timer.getFPGATimestamp or a
+    virtual simulation clock.
+
+    Laps are recorded into a buffer allocated when the Stopwatch is created,
+    so timing a loop with lap() does not allocate.  Once the buffer is full,
+    further laps are counted as dropped until clear_laps() is called.
 
     """
+    # Clock used by Stopwatches created without one.
+    # The headless simulator replaces it with its virtual clock.
+    default_clock = time.perf_counter
+
+    _clock = None
     _running = False
     _start = None
     _end = None
-    _secs = None
-    _msecs = None
+    _splits = None
+    _last_split = 0.0
+    _lap_count = 0
+    _dropped_laps = 0
+
+    def __init__(self, clock=None, lap_capacity=0):
+        """Create and initialize a Stopwatch.
 
-    def __init__(self):
-        """Create and initialize a Stopwatch."""
+        Args:
+            clock: Function returning the current time in seconds.  Defaults to Stopwatch.default_clock.
+            lap_capacity: Number of laps that can be recorded.
+        """
+        self._clock = clock if clock is not None else Stopwatch.default_clock
         self._start = None
         self._end = None
-        self._secs = None
-        self._msecs = None
         self._running = False
+        self._splits = array('d', [0.0] * lap_capacity)
+        self.clear_laps()
 
     def start(self):
-        """Mark current time as the starting time."""
-        self._start = time.time()
+        """Mark current time as the starting time and clear the recorded laps."""
+        self._start = self._clock()
         self._running = True
         self._end = None
-        self._secs = None
-        self._msecs = None
+        self.clear_laps()
 
     def reset(self):
         """Reset the timer to zero.
 
         This doesn't stop the timer, but simply moves the starting
-        time to the current time and clears the end and elapses times.
+        time to the current time and clears the end time and laps.
 
         """
-        self._start = time.time()
+        self._start = self._clock()
         self._end = None
-        self._secs = None
-        self._msecs = None
+        self.clear_laps()
 
     def stop(self):
-        """Mark current time as ending time and calculate duration.
+        """Mark current time as ending time.
 
-        If the stopwatch has been started, mark the current time as the end time
-        and calculate the time difference between the start and end points in
-        both seconds and milliseconds.  If the stopwatch was never started, do
-        nothing.
+        If the stopwatch has been started, mark the current time as the end
+        time.  If the stopwatch was never started, do nothing.
 
         """
         if self._running:
-            self._end = time.time()
+            self._end = self._clock()
             self._running = False
 
+    def is_running(self):
+        return self._running
+
+    def get_start_time(self):
+        """Return the clock time the stopwatch was started or reset at, or None if it never was."""
+        return self._start
+
     def elapsed_time_in_secs(self):
         """Return elapsed time in seconds.
 
@@ -63,10 +87,10 @@ class Stopwatch(object):
 
         """
         if self._running:
-            self._end = time.time()
-        if self._start and self._end:
-            self._secs = self._end - self._start
-        return self._secs
+            return self._clock() - self._start
+        if self._start is None or self._end is None:
+            return None
+        return self._end - self._start
 
     def elapsed_time_in_msecs(self):
         """Return elapsed time in milliseconds.
@@ -77,8 +101,55 @@ class Stopwatch(object):
         return None.
 
         """
-
         secs = self.elapsed_time_in_secs()
-        if secs:
-            self._msecs = secs * 1000
-        return self._msecs
+        if secs is None:
+            return None
+        return secs * 1000
+
+    def lap(self):
+        """Record a lap ending at the current time.
+
+        Return:
+            The lap time in seconds, measured from the end of the previous lap or
+            from the start, or None if the stopwatch is not running.
+        """
+        if not self._running:
+            return None
+        split = self._clock() - self._start
+        lap = split - self._last_split
+        self._last_split = split
+        count = self._lap_count
+        if count < len(self._splits):
+            self._splits[count] = split
+            self._lap_count = count + 1
+        else:
+            self._dropped_laps += 1
+        return lap
+
+    def get_lap_count(self):
+        return self._lap_count
+
+    def get_dropped_laps(self):
+        return self._dropped_laps
+
+    def get_split(self, index):
+        """Return the time in seconds from the start to the end of a recorded lap."""
+        if index >= self._lap_count:
+            raise IndexError("lap %d has not been recorded" % index)
+        return self._splits[index]
+
+    def get_lap(self, index):
+        """Return the time in seconds of a recorded lap."""
+        split = self.get_split(index)
+        if index == 0:
+            return split
+        return split - self._splits[index - 1]
+
+    def clear_laps(self):
+        """Forget every recorded lap, keeping the buffer.
+
+        The next lap is measured from the start.
+        """
+        self._last_split = 0.0
+        self._lap_count = 0
+        self._dropped_laps = 0
@@ -1,36 +1,89 @@
-import configparser
+from collections import namedtuple
 from wpilib.command.subsystem import Subsystem
 from wpilib.encoder import Encoder
 from wpilib.robotdrive import RobotDrive
 from wpilib.victorsp import VictorSP
 from wpilib.adxrs450_gyro import ADXRS450_Gyro
-from wpilib.smartdashboard import SmartDashboard
+from wpilib.timer import Timer
 from commands.tank_drive import TankDrive
+from config_store import ConfigField, ConfigStore, config_record
+from feedforward import Feedforward
+from odometry import Odometry
+from pid_controller import PIDGains
+from rate_estimator import RateEstimator
+from telemetry import Telemetry
+
+
+# Immutable view of every drivetrain sensor, sampled at a single point in a loop
+DrivetrainSensors = namedtuple("DrivetrainSensors", ["timestamp", "left_encoder", "right_encoder", "encoder",
+                                                     "gyro_angle"])
+
+
+DrivetrainConfig = config_record("DrivetrainConfig", [
+    ConfigField("max_speed", "DrivetrainGeneral", "MAX_SPEED", float),
+    ConfigField("modifier_scaling", "DrivetrainGeneral", "MODIFIER_SCALING", float, 0.5),
+    ConfigField("dpad_scaling", "DrivetrainGeneral", "DPAD_SCALING", float, 0.4),
+    ConfigField("left_motor_enabled", "DrivetrainLeftMotor", "ENABLED", bool),
+    ConfigField("left_motor_channel", "DrivetrainLeftMotor", "CHANNEL", int, enabled_by="left_motor_enabled"),
+    ConfigField("left_motor_inverted", "DrivetrainLeftMotor", "INVERTED", bool, False),
+    ConfigField("right_motor_enabled", "DrivetrainRightMotor", "ENABLED", bool),
+    ConfigField("right_motor_channel", "DrivetrainRightMotor", "CHANNEL", int, enabled_by="right_motor_enabled"),
+    ConfigField("right_motor_inverted", "DrivetrainRightMotor", "INVERTED", bool, False),
+    ConfigField("left_encoder_enabled", "DrivetrainLeftEncoder", "ENABLED", bool),
+    ConfigField("left_encoder_a_channel", "DrivetrainLeftEncoder", "A_CHANNEL", int,
+                enabled_by="left_encoder_enabled"),
+    ConfigField("left_encoder_b_channel", "DrivetrainLeftEncoder", "B_CHANNEL", int,
+                enabled_by="left_encoder_enabled"),
+    ConfigField("left_encoder_reversed", "DrivetrainLeftEncoder", "REVERSED", bool, False),
+    ConfigField("left_encoder_type", "DrivetrainLeftEncoder", "TYPE", int, enabled_by="left_encoder_enabled"),
+    ConfigField("right_encoder_enabled", "DrivetrainRightEncoder", "ENABLED", bool),
+    ConfigField("right_encoder_a_channel", "DrivetrainRightEncoder", "A_CHANNEL", int,
+                enabled_by="right_encoder_enabled"),
+    ConfigField("right_encoder_b_channel", "DrivetrainRightEncoder", "B_CHANNEL", int,
+                enabled_by="right_encoder_enabled"),
+    ConfigField("right_encoder_reversed", "DrivetrainRightEncoder", "REVERSED", bool, False),
+    ConfigField("right_encoder_type", "DrivetrainRightEncoder", "TYPE", int, enabled_by="right_encoder_enabled"),
+    ConfigField("gyro_enabled", "DrivetrainGyro", "ENABLED", bool),
+    ConfigField("gyro_channel", "DrivetrainGyro", "CHANNEL", int, enabled_by="gyro_enabled"),
+    ConfigField("distance_per_count", "DrivetrainOdometry", "DISTANCE_PER_COUNT", float, 0.00218),
+    ConfigField("track_width", "DrivetrainOdometry", "TRACK_WIDTH", float, 2.0),
+    ConfigField("pose_history_length", "DrivetrainOdometry", "HISTORY_LENGTH", int, 50),
+    ConfigField("velocity_control_enabled", "DrivetrainVelocity", "ENABLED", bool, False),
+    ConfigField("max_velocity", "DrivetrainVelocity", "MAX_VELOCITY", float, enabled_by="velocity_control_enabled"),
+    ConfigField("velocity_kp", "DrivetrainVelocity", "KP", float, enabled_by="velocity_control_enabled"),
+    ConfigField("velocity_ki", "DrivetrainVelocity", "KI", float, 0.0),
+    ConfigField("velocity_kd", "DrivetrainVelocity", "KD", float, 0.0),
+    ConfigField("velocity_ks", "DrivetrainVelocity", "KS", float, 0.0),
+    ConfigField("velocity_kv", "DrivetrainVelocity", "KV", float, 0.0),
+    ConfigField("velocity_ka", "DrivetrainVelocity", "KA", float, 0.0),
+])
 
 
 class Drivetrain(Subsystem):
-    # Config file section names
-    _general_section = "DrivetrainGeneral"
-    _left_motor_section = "DrivetrainLeftMotor"
-    _right_motor_section = "DrivetrainRightMotor"
-    _left_encoder_section = "DrivetrainLeftEncoder"
-    _right_encoder_section = "DrivetrainRightEncoder"
-    _gyro_section = "DrivetrainGyro"
-    _enabled_key = "ENABLED"
-    _a_channel_key = "A_CHANNEL"
-    _b_channel_key = "B_CHANNEL"
-    _inverted_key = "INVERTED"
-    _type_key = "TYPE"
-    _channel_key = "CHANNEL"
-    _reversed_key = "REVERSED"
-    _max_speed_key = "MAX_SPEED"
-    _modifier_scaling_key = "MODIFIER_SCALING"
-    _dpad_scaling_key = "DPAD_SCALING"
+    """Drives the robot and reads its encoders and gyro.
+
+    Sign convention, which the drive commands, controllers and simulations
+    follow: a negative tank_drive() or arcade_drive() output drives forward,
+    and the motors' INVERTED and the encoders' REVERSED settings are
+    configured so that the encoders count up as it does.  The direction
+    that counts the encoders up is therefore the opposite of the output.  A
+    positive turn output turns clockwise, which increases both the gyro
+    angle and the left minus right encoder difference.  RobotDrive inverts
+    the right motor, so its motor controller output has the sign of its
+    encoder rate and the left one the opposite.
+
+    """
+    # Minimum time between SmartDashboard writes of each group of values
+    _drive_telemetry_period = 0.05
+    _sensor_telemetry_period = 0.1
+    # Number of loops the encoder rates are measured over
+    _encoder_rate_window = 3
 
     _max_speed = 0
 
     _robot = None
     _config = None
+    _telemetry = None
 
     _left_motor = None
     _right_motor = None
@@ -56,11 +109,24 @@ class Drivetrain(Subsystem):
     _gyro = None
     _gyro_angle = 0.0
 
+    _odometry = None
+    _left_encoder_rate = None
+    _right_encoder_rate = None
+
+    _sensors = None
+    _sensors_valid = False
+    _sensor_hits = 0
+    _sensor_misses = 0
+
     def __init__(self, robot, name=None, configfile='/home/lvuser/py/configs/subsystems.ini'):
         self._robot = robot
-        self._config = configparser.ConfigParser()
-        self._config.read(configfile)
+        self._config = ConfigStore.get_instance().get(DrivetrainConfig, configfile)
         self._init_components()
+        self._init_telemetry()
+        self._sensors = None
+        self._sensors_valid = False
+        self._sensor_hits = 0
+        self._sensor_misses = 0
         self._update_smartdashboard_sensors()
         self._update_smartdashboard_tank_drive(0.0, 0.0)
         self._update_smartdashboard_arcade_drive(0.0, 0.0)
@@ -68,7 +134,9 @@ class Drivetrain(Subsystem):
 
     def initDefaultCommand(self):
         self.setDefaultCommand(TankDrive(self._robot, self._robot.oi, modifier_scaling=self._modifier_scaling,
-                                         dpad_scaling=self._dpad_scaling))
+                                         dpad_scaling=self._dpad_scaling, velocity_gains=self.get_velocity_gains(),
+                                         max_velocity=self._config.max_velocity,
+                                         feedforward=self.get_velocity_feedforward()))
 
     def get_left_encoder_value(self):
         if self._left_encoder:
@@ -92,15 +160,63 @@ class Drivetrain(Subsystem):
         else:
             return 0
 
+    def update_sensor_snapshot(self):
+        """Sample every drivetrain sensor once and hold the result for the rest of the loop.
+
+        Called by the robot at the start of each periodic loop, before the scheduler runs,
+        so every command in the loop makes its decisions from the same data.
+
+        Return:
+            The new DrivetrainSensors snapshot.
+        """
+        self._sensors = self._sample_sensors()
+        self._sensors_valid = True
+        self._update_odometry(self._sensors)
+        self._left_encoder_rate.update(self._sensors.timestamp, self._sensors.left_encoder)
+        self._right_encoder_rate.update(self._sensors.timestamp, self._sensors.right_encoder)
+        return self._sensors
+
+    def expire_sensor_snapshot(self):
+        """Mark the current snapshot as stale so the next read samples the hardware again."""
+        self._sensors_valid = False
+
+    def get_sensor_snapshot(self):
+        """Return the sensor snapshot for the current loop.
+
+        If no snapshot is held for the current loop (for example, the command is run outside
+        of the robot loop), the sensors are sampled on demand.
+
+        Return:
+            A DrivetrainSensors snapshot.
+        """
+        if self._sensors_valid:
+            self._sensor_hits += 1
+            return self._sensors
+        self._sensor_misses += 1
+        self._sensors = self._sample_sensors()
+        return self._sensors
+
+    def get_sensor_snapshot_stats(self):
+        """Return the number of snapshot reads served from the cache and from the hardware."""
+        return self._sensor_hits, self._sensor_misses
+
     def reset_left_encoder_value(self):
         if self._left_encoder:
-            self._left_encoder_count = 0
+            self._left_encoder.reset()
+            self._left_encoder_count = self._left_encoder.get()
+        self._sensors_valid = False
+        self._reset_odometry_sensors()
+        self._left_encoder_rate.reset()
         self._update_smartdashboard_sensors()
         return self._left_encoder_count
 
     def reset_right_encoder_value(self):
         if self._right_encoder:
-            self._right_encoder_count = 0
+            self._right_encoder.reset()
+            self._right_encoder_count = self._right_encoder.get()
+        self._sensors_valid = False
+        self._reset_odometry_sensors()
+        self._right_encoder_rate.reset()
         self._update_smartdashboard_sensors()
         return self._right_encoder_count
 
@@ -117,86 +233,169 @@ class Drivetrain(Subsystem):
         if self._gyro:
             self._gyro.reset()
             self._gyro_angle = self._gyro.getAngle()
+        self._sensors_valid = False
+        self._reset_odometry_sensors()
         self._update_smartdashboard_sensors()
         return self._gyro_angle
 
     def is_encoder_enabled(self):
         return self._left_encoder is not None or self._right_encoder is not None
 
+    def get_encoder_rates(self):
+        """Return the (left, right) encoder rates in counts per second, measured over the last sensor snapshots."""
+        return self._left_encoder_rate.get_rate(), self._right_encoder_rate.get_rate()
+
+    def get_velocity_gains(self):
+        """Return the PIDGains of teleop velocity control, or None if it is disabled or lacks encoders."""
+        if not self._config.velocity_control_enabled or not self.is_encoder_pair_enabled():
+            return None
+        return PIDGains(self._config.velocity_kp, self._config.velocity_ki, self._config.velocity_kd, 0.0, 0.0)
+
+    def get_velocity_feedforward(self):
+        """Return the Feedforward of teleop velocity control, or None if it has not been characterized."""
+        if self._config.velocity_kv <= 0.0:
+            return None
+        return Feedforward(self._config.velocity_ks, self._config.velocity_kv, self._config.velocity_ka)
+
+    def get_distance_per_count(self):
+        """Return the distance in feet travelled per encoder count."""
+        return self._config.distance_per_count
+
+    def get_pose(self):
+        """Return the Pose estimated at the last sensor snapshot, or None before the first one."""
+        return self._odometry.get_pose()
+
+    def get_pose_at(self, timestamp):
+        """Return the Pose estimated at a recent time, or None before the first sensor snapshot."""
+        return self._odometry.get_pose_at(timestamp)
+
+    def get_track_width(self):
+        """Return the distance between the left and right wheels, in feet."""
+        return self._config.track_width
+
+    def reset_pose(self, x=0.0, y=0.0, heading=0.0):
+        """Set the estimated pose, in feet and degrees, and forget the pose history."""
+        self._odometry.reset(x, y, heading)
+
+    def is_encoder_pair_enabled(self):
+        """Return True if both the left and right encoders are enabled."""
+        return self._left_encoder is not None and self._right_encoder is not None
+
     def is_gyro_enabled(self):
         return self._gyro is not None
 
+    def get_motor_outputs(self):
+        """Return the (left, right) speeds last set on the motor controllers."""
+        left = self._left_motor.get() if self._left_motor else 0.0
+        right = self._right_motor.get() if self._right_motor else 0.0
+        return left, right
+
     def tank_drive(self, left_speed, right_speed):
         left = left_speed * self._max_speed
         right = right_speed * self._max_speed
         self._robot_drive.tankDrive(left, right, False)
         self._update_smartdashboard_tank_drive(left_speed, right_speed)
-        self.get_gyro_angle()
-        self.get_left_encoder_value()
-        self.get_right_encoder_value()
-        self._update_smartdashboard_sensors()
 
     def arcade_drive(self, linear_distance, turn_angle, squared_inputs=True):
         if self._robot_drive:
             self._robot_drive.arcadeDrive(linear_distance, turn_angle, squared_inputs)
         self._update_smartdashboard_arcade_drive(linear_distance, turn_angle)
-        self.get_gyro_angle()
-        self.get_left_encoder_value()
-        self.get_right_encoder_value()
+
+    def _sample_sensors(self):
+        sensors = DrivetrainSensors(Timer.getFPGATimestamp(), self.get_left_encoder_value(),
+                                    self.get_right_encoder_value(), self._combine_encoder_values(),
+                                    self.get_gyro_angle())
         self._update_smartdashboard_sensors()
+        return sensors
+
+    def _update_odometry(self, sensors):
+        left, right, gyro_angle = self._get_odometry_inputs(sensors.left_encoder, sensors.right_encoder,
+                                                            sensors.encoder, sensors.gyro_angle)
+        self._odometry.update(sensors.timestamp, left, right, gyro_angle)
+
+    def _reset_odometry_sensors(self):
+        left, right, gyro_angle = self._get_odometry_inputs(self._left_encoder_count, self._right_encoder_count,
+                                                            self._combine_encoder_values(), self._gyro_angle)
+        self._odometry.reset_sensors(left, right, gyro_angle)
+
+    def _get_odometry_inputs(self, left, right, encoder, gyro_angle):
+        if not self.is_encoder_pair_enabled():
+            # A single encoder measures distance for both sides, so the heading must come from the gyro
+            left = right = encoder
+        return left, right, gyro_angle if self._gyro else None
+
+    def _combine_encoder_values(self):
+        if self._left_encoder and self._right_encoder:
+            return int(round((self._left_encoder_count + self._right_encoder_count) / 2))
+        elif self._left_encoder:
+            return self._left_encoder_count
+        elif self._right_encoder:
+            return self._right_encoder_count
+        else:
+            return 0
 
     def _update_smartdashboard_tank_drive(self, left, right):
-        SmartDashboard.putNumber("Drivetrain Left Speed", left)
-        SmartDashboard.putNumber("Drivetrain Right Speed", right)
+        self._telemetry.put_number("Drivetrain Left Speed", left)
+        self._telemetry.put_number("Drivetrain Right Speed", right)
 
     def _update_smartdashboard_arcade_drive(self, linear, turn):
-        SmartDashboard.putNumber("Drivetrain Linear Speed", linear)
-        SmartDashboard.putNumber("Drivetrain Turn Speed", turn)
+        self._telemetry.put_number("Drivetrain Linear Speed", linear)
+        self._telemetry.put_number("Drivetrain Turn Speed", turn)
 
     def _update_smartdashboard_sensors(self):
-        SmartDashboard.putNumber("Drivetrain Left Encoder", self._left_encoder_count)
-        SmartDashboard.putNumber("Drivetrain Right Encoder", self._right_encoder_count)
-        SmartDashboard.putNumber("Gyro Angle", self._gyro_angle)
+        self._telemetry.put_number("Drivetrain Left Encoder", self._left_encoder_count)
+        self._telemetry.put_number("Drivetrain Right Encoder", self._right_encoder_count)
+        self._telemetry.put_number("Gyro Angle", self._gyro_angle)
+
+    def _init_telemetry(self):
+        self._telemetry = Telemetry.get_instance()
+        for key in ("Drivetrain Left Speed", "Drivetrain Right Speed", "Drivetrain Linear Speed",
+                    "Drivetrain Turn Speed"):
+            self._telemetry.register(key, Drivetrain._drive_telemetry_period)
+        for key in ("Drivetrain Left Encoder", "Drivetrain Right Encoder", "Gyro Angle"):
+            self._telemetry.register(key, Drivetrain._sensor_telemetry_period)
 
     def _init_components(self):
-        self._max_speed = self._config.getfloat(self._general_section, Drivetrain._max_speed_key)
-        self._modifier_scaling = self._config.getfloat(self._general_section, Drivetrain._modifier_scaling_key)
-        self._dpad_scaling = self._config.getfloat(self._general_section, Drivetrain._dpad_scaling_key)
-
-        if self._config.getboolean(Drivetrain._left_encoder_section, Drivetrain._enabled_key):
-            self._left_encoder_a_channel = self._config.getint(self._left_encoder_section, Drivetrain._a_channel_key)
-            self._left_encoder_b_channel = self._config.getint(self._left_encoder_section, Drivetrain._b_channel_key)
-            self._left_encoder_reversed = self._config.getboolean(self._left_encoder_section, Drivetrain._reversed_key)
-            self._left_encoder_type = self._config.getint(self._left_encoder_section, Drivetrain._type_key)
-            if self._left_encoder_a_channel and self._left_encoder_b_channel and self._left_encoder_type:
+        self._max_speed = self._config.max_speed
+        self._odometry = Odometry(self._config.distance_per_count, self._config.track_width,
+                                  self._config.pose_history_length)
+        self._left_encoder_rate = RateEstimator(Drivetrain._encoder_rate_window)
+        self._right_encoder_rate = RateEstimator(Drivetrain._encoder_rate_window)
+        self._modifier_scaling = self._config.modifier_scaling
+        self._dpad_scaling = self._config.dpad_scaling
+
+        if self._config.left_encoder_enabled:
+            self._left_encoder_a_channel = self._config.left_encoder_a_channel
+            self._left_encoder_b_channel = self._config.left_encoder_b_channel
+            self._left_encoder_reversed = self._config.left_encoder_reversed
+            self._left_encoder_type = self._config.left_encoder_type
+            # Channel 0 is a valid channel
+            if (self._left_encoder_a_channel is not None and self._left_encoder_b_channel is not None and
+                    self._left_encoder_type is not None):
                 self._left_encoder = Encoder(self._left_encoder_a_channel, self._left_encoder_b_channel,
                                         self._left_encoder_reversed, self._left_encoder_type)
 
-        if self._config.getboolean(Drivetrain._right_encoder_section, Drivetrain._enabled_key):
-            self._right_encoder_a_channel = self._config.getint(self._right_encoder_section, Drivetrain._a_channel_key)
-            self._right_encoder_b_channel = self._config.getint(self._right_encoder_section, Drivetrain._b_channel_key)
-            self._right_encoder_reversed = self._config.getboolean(self._right_encoder_section, Drivetrain._reversed_key)
-            self._right_encoder_type = self._config.getint(self._right_encoder_section, Drivetrain._type_key)
-            if self._right_encoder_a_channel and self._right_encoder_b_channel and self._right_encoder_type:
+        if self._config.right_encoder_enabled:
+            self._right_encoder_a_channel = self._config.right_encoder_a_channel
+            self._right_encoder_b_channel = self._config.right_encoder_b_channel
+            self._right_encoder_reversed = self._config.right_encoder_reversed
+            self._right_encoder_type = self._config.right_encoder_type
+            if (self._right_encoder_a_channel is not None and self._right_encoder_b_channel is not None and
+                    self._right_encoder_type is not None):
                 self._right_encoder = Encoder(self._right_encoder_a_channel, self._right_encoder_b_channel,
                                         self._right_encoder_reversed, self._right_encoder_type)
 
-        if self._config.getboolean(Drivetrain._gyro_section, Drivetrain._enabled_key):
-            gyro_channel = self._config.getint(self._gyro_section, Drivetrain._channel_key)
-            self._gyro = ADXRS450_Gyro(gyro_channel)
+        if self._config.gyro_enabled:
+            self._gyro = ADXRS450_Gyro(self._config.gyro_channel)
 
-        if self._config.getboolean(Drivetrain._left_motor_section, Drivetrain._enabled_key):
-            self._left_motor = VictorSP(self._config.getint(self._left_motor_section, Drivetrain._channel_key))
+        if self._config.left_motor_enabled:
+            self._left_motor = VictorSP(self._config.left_motor_channel)
 
-        if self._config.getboolean(Drivetrain._right_motor_section, Drivetrain._enabled_key):
-            self._right_motor = VictorSP(self._config.getint(self._right_motor_section, Drivetrain._channel_key))
+        if self._config.right_motor_enabled:
+            self._right_motor = VictorSP(self._config.right_motor_channel)
 
         if self._left_motor and self._right_motor:
             self._robot_drive = RobotDrive(self._left_motor, self._right_motor)
             self._robot_drive.setSafetyEnabled(False)
-            self._robot_drive.setInvertedMotor(RobotDrive.MotorType.kRearLeft,
-                                               self._config.getboolean(Drivetrain._left_motor_section,
-                                                                       Drivetrain._inverted_key))
-            self._robot_drive.setInvertedMotor(RobotDrive.MotorType.kRearRight,
-                                               self._config.getboolean(Drivetrain._right_motor_section,
-                                                                       Drivetrain._inverted_key))
+            self._robot_drive.setInvertedMotor(RobotDrive.MotorType.kRearLeft, self._config.left_motor_inverted)
+            self._robot_drive.setInvertedMotor(RobotDrive.MotorType.kRearRight, self._config.right_motor_inverted)
@@ -1,7 +1,13 @@
-import configparser
 from wpilib.command.subsystem import Subsystem
 from wpilib.solenoid import Solenoid
 from commands.do_nothing_gear import DoNothingGear
+from config_store import ConfigField, ConfigStore, config_record
+
+
+GearFeederConfig = config_record("GearFeederConfig", [
+    ConfigField("enabled", "GearFeeder", "ENABLED", bool),
+    ConfigField("solenoid_channel", "GearFeeder", "SOLENOID_CHANNEL", int, enabled_by="enabled"),
+])
 
 
 class GearFeeder(Subsystem):
@@ -12,19 +18,14 @@ class GearFeeder(Subsystem):
     in cases where the robot program needs a more detailed status of the compressor or to
     enable/disable closed loop control.
     """
-    # Config file section names
-    _release_section = "GearFeeder"
-    _enabled_key = "ENABLED"
-    _solenoid_channel_key = "SOLENOID_CHANNEL"
-
     _robot = None
     _config = None
     _solenoid = None
+    _gear_release = False
 
     def __init__(self, robot, name=None, configfile='/home/lvuser/py/configs/subsystems.ini'):
         self._robot = robot
-        self._config = configparser.ConfigParser()
-        self._config.read(configfile)
+        self._config = ConfigStore.get_instance().get(GearFeederConfig, configfile)
         self._init_components()
         super().__init__(name=name)
 
@@ -34,8 +35,11 @@ class GearFeeder(Subsystem):
     def set_gear_release(self, state):
         if self._solenoid:
             self._solenoid.set(state)
+        self._gear_release = state
+
+    def get_gear_release(self):
+        return self._gear_release
 
     def _init_components(self):
-        if self._config.getboolean(GearFeeder._release_section, GearFeeder._enabled_key):
-            solenoid_channel = self._config.getint(GearFeeder._release_section, GearFeeder._solenoid_channel_key)
-            self._solenoid = Solenoid(solenoid_channel)
+        if self._config.enabled:
+            self._solenoid = Solenoid(self._config.solenoid_channel)
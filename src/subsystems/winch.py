@@ -1,35 +1,41 @@
-import configparser
 from wpilib.command.subsystem import Subsystem
 from wpilib.encoder import Encoder
-from wpilib.smartdashboard import SmartDashboard
 from wpilib.spark import Spark
 from commands.move_winch import MoveWinch
+from config_store import ConfigField, ConfigStore, config_record
+from telemetry import Telemetry
+
+
+WinchConfig = config_record("WinchConfig", [
+    ConfigField("motor_enabled", "WinchMotor", "ENABLED", bool),
+    ConfigField("motor_channel", "WinchMotor", "CHANNEL", int, enabled_by="motor_enabled"),
+    ConfigField("motor_inverted", "WinchMotor", "INVERTED", bool, False),
+    ConfigField("encoder_enabled", "WinchEncoder", "ENABLED", bool),
+    ConfigField("encoder_a_channel", "WinchEncoder", "A_CHANNEL", int, enabled_by="encoder_enabled"),
+    ConfigField("encoder_b_channel", "WinchEncoder", "B_CHANNEL", int, enabled_by="encoder_enabled"),
+    ConfigField("encoder_reversed", "WinchEncoder", "REVERSED", bool, False),
+    ConfigField("encoder_type", "WinchEncoder", "TYPE", int, enabled_by="encoder_enabled"),
+])
 
 
 class Winch(Subsystem):
-    # Config file section names
-    _motor_section = "WinchMotor"
-    _encoder_section = "WinchEncoder"
-    _enabled_key = "ENABLED"
-    _a_channel_key = "A_CHANNEL"
-    _b_channel_key = "B_CHANNEL"
-    _inverted_key = "INVERTED"
-    _type_key = "TYPE"
-    _channel_key = "CHANNEL"
-    _reversed_key = "REVERSED"
+    # Minimum time between SmartDashboard writes
+    _telemetry_period = 0.1
 
     _robot = None
     _config = None
+    _telemetry = None
 
     _motor = None
     _encoder = None
     _encoder_count = 0
+    _speed = 0.0
 
     def __init__(self, robot, name=None, configfile='/home/lvuser/py/configs/subsystems.ini'):
         self._robot = robot
-        self._config = configparser.ConfigParser()
-        self._config.read(configfile)
+        self._config = ConfigStore.get_instance().get(WinchConfig, configfile)
         self._init_components()
+        self._init_telemetry()
         self._update_smartdashboard(0.0)
         super().__init__(name=name)
 
@@ -39,9 +45,13 @@ class Winch(Subsystem):
     def move_winch(self, speed):
         if self._motor:
             self._motor.setSpeed(speed)
+        self._speed = speed
         self.get_encoder_value()
         self._update_smartdashboard(speed)
 
+    def get_speed(self):
+        return self._speed
+
     def get_encoder_value(self):
         if self._encoder:
             self._encoder_count = self._encoder.get()
@@ -55,20 +65,20 @@ class Winch(Subsystem):
         return self._encoder_count
 
     def _update_smartdashboard(self, speed):
-        SmartDashboard.putNumber("Winch Encoder", self._encoder_count)
-        SmartDashboard.putNumber("Winch Speed", speed)
+        self._telemetry.put_number("Winch Encoder", self._encoder_count)
+        self._telemetry.put_number("Winch Speed", speed)
+
+    def _init_telemetry(self):
+        self._telemetry = Telemetry.get_instance()
+        self._telemetry.register("Winch Encoder", Winch._telemetry_period)
+        self._telemetry.register("Winch Speed", Winch._telemetry_period)
 
     def _init_components(self):
-        if self._config.getboolean(Winch._motor_section, Winch._enabled_key):
-            motor_channel = self._config.getint(Winch._motor_section, Winch._channel_key)
-            motor_inverted = self._config.getboolean(Winch._motor_section, Winch._inverted_key)
-            self._motor = Spark(motor_channel)
+        if self._config.motor_enabled:
+            self._motor = Spark(self._config.motor_channel)
             if self._motor:
-                self._motor.setInverted(motor_inverted)
-
-        if self._config.getboolean(Winch._encoder_section, Winch._enabled_key):
-            encoder_a_channel = self._config.getint(Winch._encoder_section, Winch._a_channel_key)
-            encoder_b_channel = self._config.getint(Winch._encoder_section, Winch._b_channel_key)
-            encoder_inverted = self._config.getboolean(Winch._encoder_section, Winch._reversed_key)
-            encoder_type = self._config.getint(Winch._encoder_section, Winch._type_key)
-            self._encoder = Encoder(encoder_a_channel, encoder_b_channel, encoder_inverted, encoder_type)
+                self._motor.setInverted(self._config.motor_inverted)
+
+        if self._config.encoder_enabled:
+            self._encoder = Encoder(self._config.encoder_a_channel, self._config.encoder_b_channel,
+                                    self._config.encoder_reversed, self._config.encoder_type)
@@ -0,0 +1,325 @@
+import argparse
+import concurrent.futures
+import logging
+import math
+from array import array
+from collections import namedtuple
+from feedforward import Feedforward
+
+
+logger = logging.getLogger("sysid")
+
+# Outputs of a characterization run.  The ramps slowly increase the output by ramp_rate per second, so
+# the drivetrain barely accelerates and the output only pays for friction and velocity.  The steps jump
+# to step_output, where most of the output goes into accelerating.  The turn spins in place at
+# turn_output to compare the distance the wheels travel with the gyro's change in heading.
+Schedule = namedtuple("Schedule", ["ramp_rate", "ramp_duration", "step_output", "step_duration", "turn_output",
+                                   "turn_duration", "rest_duration"])
+
+DEFAULT_SCHEDULE = Schedule(0.05, 7.0, 0.6, 2.0, 0.4, 2.0, 1.0)
+
+# Result of fitting a characterization run.  track_width is in feet, and r_squared is the fraction of
+# the variance of the output explained by the feedforward.
+Characterization = namedtuple("Characterization", ["feedforward", "track_width", "r_squared"])
+
+# Drivetrain simulated by simulate_characterization
+Variant = namedtuple("Variant", ["feedforward", "track_width", "distance_per_count"])
+
+# Phases of a run: kind, then the direction of the left and right sides
+_PHASES = (("ramp", 1.0, 1.0), ("ramp", -1.0, -1.0), ("step", 1.0, 1.0), ("step", -1.0, -1.0), ("turn", 1.0, -1.0))
+
+
+def get_schedule_duration(schedule):
+    """Return the length in seconds of a characterization run, including the rests."""
+    durations = {"ramp": schedule.ramp_duration, "step": schedule.step_duration, "turn": schedule.turn_duration}
+    return sum(durations[kind] + schedule.rest_duration for kind, left, right in _PHASES)
+
+
+def get_schedule_output(schedule, elapsed):
+    """Return the (left, right) outputs at a time into a characterization run, or None after it.
+
+    Outputs are negated drivetrain outputs (see Drivetrain), with the sign of the encoder rates.
+    Each phase starts with a rest, so the drivetrain is stopped when it starts.
+    """
+    for kind, left, right in _PHASES:
+        if elapsed < schedule.rest_duration:
+            return 0.0, 0.0
+        elapsed -= schedule.rest_duration
+        if kind == "ramp":
+            if elapsed < schedule.ramp_duration:
+                output = schedule.ramp_rate * elapsed
+                return left * output, right * output
+            elapsed -= schedule.ramp_duration
+        elif kind == "step":
+            if elapsed < schedule.step_duration:
+                return left * schedule.step_output, right * schedule.step_output
+            elapsed -= schedule.step_duration
+        else:
+            if elapsed < schedule.turn_duration:
+                return left * schedule.turn_output, right * schedule.turn_output
+            elapsed -= schedule.turn_duration
+    return None
+
+
+class CharacterizationData(object):
+    """Sensor readings and outputs of a characterization run, one sample per robot loop.
+
+    Outputs are negated drivetrain outputs, as get_schedule_output() returns.
+
+    """
+    timestamps = None
+    left_outputs = None
+    right_outputs = None
+    left_counts = None
+    right_counts = None
+    gyro_angles = None
+
+    def __init__(self):
+        self.timestamps = array('d')
+        self.left_outputs = array('d')
+        self.right_outputs = array('d')
+        self.left_counts = array('d')
+        self.right_counts = array('d')
+        self.gyro_angles = array('d')
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, timestamp, left_output, right_output, left_count, right_count, gyro_angle):
+        self.timestamps.append(timestamp)
+        self.left_outputs.append(left_output)
+        self.right_outputs.append(right_output)
+        self.left_counts.append(left_count)
+        self.right_counts.append(right_count)
+        self.gyro_angles.append(gyro_angle)
+
+    @staticmethod
+    def from_flight_log(log):
+        """Read the samples of a FlightLog.
+
+        The log's outputs are the motor controller outputs, so only the left one is negated (see
+        Drivetrain).
+        """
+        data = CharacterizationData()
+        for i in range(len(log)):
+            record = log.get_record(i)
+            data.append(record["timestamp"], -record["left_output"], record["right_output"],
+                        record["left_encoder"], record["right_encoder"], record["gyro_angle"])
+        return data
+
+
+def fit(data, distance_per_count, window=5, min_velocity=20.0):
+    """Fit the feedforward constants and effective track width of a characterization run.
+
+    The velocity and acceleration of each side are differences of the encoder counts over
+    window loops on either side of each sample, which smooths out the quantization of the
+    counts.  Samples where the drivetrain is turning, stopped, or where the output changed
+    within the window are left out of the feedforward fit.
+
+    Args:
+        data: CharacterizationData of the run.
+        distance_per_count: Distance travelled per encoder count, in feet.
+        window: Number of loops on either side of a sample used to measure it.
+        min_velocity: Slowest velocity in counts per second counted as moving.
+
+    Return:
+        Characterization, with the feedforward in counts per second.
+
+    Raises:
+        ValueError: The run does not have enough samples to fit.
+    """
+    rows = []
+    for outputs, counts in ((data.left_outputs, data.left_counts), (data.right_outputs, data.right_counts)):
+        rows.extend(_feedforward_rows(data, outputs, counts, window, min_velocity))
+    ks, kv, ka = _least_squares(rows)
+
+    mean = sum(row[3] for row in rows) / len(rows)
+    total = sum((row[3] - mean) ** 2 for row in rows)
+    residual = sum((row[3] - ks * row[0] - kv * row[1] - ka * row[2]) ** 2 for row in rows)
+    r_squared = 1.0 - residual / total if total > 0.0 else 0.0
+    return Characterization(Feedforward(ks, kv, ka), _fit_track_width(data, distance_per_count), r_squared)
+
+
+def _feedforward_rows(data, outputs, counts, window, min_velocity):
+    """Return (sign of velocity, velocity, acceleration, output) of each usable sample of a side."""
+    timestamps = data.timestamps
+    rows = []
+    for i in range(2 * window, len(timestamps) - 2 * window):
+        output = outputs[i]
+        if output == 0.0 or data.left_outputs[i] * data.right_outputs[i] < 0.0:
+            continue
+        # The acceleration spans twice the window, and the output must be from the same phase throughout
+        if outputs[i - 2 * window] * output <= 0.0 or outputs[i + 2 * window] * output <= 0.0:
+            continue
+        if abs(outputs[i + 2 * window] - outputs[i - 2 * window]) > 0.5 * abs(output):
+            continue
+        # Weigh each loop's velocity and output the same way the acceleration weighs its acceleration
+        velocity = 0.0
+        weighted_output = 0.0
+        total_weight = 0.0
+        for j in range(i - 2 * window, i + 2 * window):
+            weight = 2 * window - abs(j + 0.5 - i)
+            velocity += weight * (counts[j + 1] - counts[j]) / (timestamps[j + 1] - timestamps[j])
+            weighted_output += weight * outputs[j]
+            total_weight += weight
+        velocity /= total_weight
+        if abs(velocity) < min_velocity:
+            continue
+        before = (counts[i] - counts[i - 2 * window]) / (timestamps[i] - timestamps[i - 2 * window])
+        after = (counts[i + 2 * window] - counts[i]) / (timestamps[i + 2 * window] - timestamps[i])
+        acceleration = (after - before) / ((timestamps[i + 2 * window] - timestamps[i - 2 * window]) / 2)
+        rows.append((math.copysign(1.0, velocity), velocity, acceleration, weighted_output / total_weight))
+    return rows
+
+
+def _least_squares(rows):
+    """Return the (ks, kv, ka) minimizing the squared error of output = ks * sign + kv * v + ka * a."""
+    matrix = [[0.0] * 4 for _ in range(3)]
+    for row in rows:
+        for j in range(3):
+            for k in range(4):
+                matrix[j][k] += row[j] * row[k]
+    # Gaussian elimination with partial pivoting
+    for column in range(3):
+        pivot = max(range(column, 3), key=lambda j: abs(matrix[j][column]))
+        if abs(matrix[pivot][column]) < 1e-12:
+            raise ValueError("not enough moving samples to fit the feedforward")
+        matrix[column], matrix[pivot] = matrix[pivot], matrix[column]
+        for j in range(column + 1, 3):
+            factor = matrix[j][column] / matrix[column][column]
+            for k in range(column, 4):
+                matrix[j][k] -= factor * matrix[column][k]
+    solution = [0.0] * 3
+    for j in range(2, -1, -1):
+        solution[j] = (matrix[j][3] - sum(matrix[j][k] * solution[k] for k in range(j + 1, 3))) / matrix[j][j]
+    return tuple(solution)
+
+
+def _fit_track_width(data, distance_per_count):
+    """Return the track width in feet that turns the wheel travel of the turn into the gyro's heading change."""
+    turn = [i for i in range(len(data)) if data.left_outputs[i] * data.right_outputs[i] < 0.0]
+    if not turn:
+        raise ValueError("no turn to fit the track width")
+    first, last = turn[0], turn[-1]
+    # Like the heading hold, the left minus right difference increases with the gyro angle
+    travel = ((data.left_counts[last] - data.left_counts[first]) -
+              (data.right_counts[last] - data.right_counts[first])) * distance_per_count
+    heading = math.radians(data.gyro_angles[last] - data.gyro_angles[first])
+    if heading == 0.0:
+        raise ValueError("the gyro did not turn")
+    return travel / heading
+
+
+def simulate_characterization(variant, schedule=DEFAULT_SCHEDULE, period=0.02, substeps=10):
+    """Run a characterization on a model of a drivetrain.
+
+    Each side accelerates by whatever output is left after static friction and velocity are
+    paid for, divided by ka.  Static friction holds a stopped side still until the output
+    exceeds ks.  The encoders count whole counts, and the gyro turns by the difference in wheel
+    travel over the track width.
+
+    Return:
+        CharacterizationData of the run.
+    """
+    feedforward = variant.feedforward
+    data = CharacterizationData()
+    velocities = [0.0, 0.0]
+    positions = [0.0, 0.0]
+    dt = period / substeps
+    time = 0.0
+    while True:
+        outputs = get_schedule_output(schedule, time)
+        if outputs is None:
+            return data
+        heading = math.degrees((positions[0] - positions[1]) * variant.distance_per_count / variant.track_width)
+        data.append(time, outputs[0], outputs[1], math.floor(positions[0]), math.floor(positions[1]), heading)
+        for side in (0, 1):
+            output = outputs[side]
+            for _ in range(substeps):
+                velocity = velocities[side]
+                if velocity == 0.0:
+                    if abs(output) <= feedforward.ks:
+                        continue
+                    friction = math.copysign(feedforward.ks, output)
+                else:
+                    friction = math.copysign(feedforward.ks, velocity)
+                new_velocity = velocity + (output - friction - feedforward.kv * velocity) / feedforward.ka * dt
+                # Friction stops a side rather than reversing it
+                if velocity != 0.0 and new_velocity * velocity < 0.0:
+                    new_velocity = 0.0
+                velocities[side] = new_velocity
+                positions[side] += new_velocity * dt
+        time += period
+
+
+def characterize_variant(variant, schedule=DEFAULT_SCHEDULE):
+    """Simulate and fit a characterization of a drivetrain variant."""
+    return fit(simulate_characterization(variant, schedule), variant.distance_per_count)
+
+
+def sweep(variants, schedule=DEFAULT_SCHEDULE, processes=None):
+    """Characterize many drivetrain variants, spread across a pool of processes.
+
+    Args:
+        variants: Sequence of Variants.
+        schedule: Schedule of each run.
+        processes: Number of worker processes, None for one per CPU, or 1 to run in this process.
+
+    Return:
+        List of the Characterization of each variant, in order.
+    """
+    if processes == 1:
+        return [characterize_variant(variant, schedule) for variant in variants]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(characterize_variant, variants, [schedule] * len(variants)))
+
+
+def main():
+    """Fit a characterization flight log, or check the fit against simulated drivetrains."""
+    parser = argparse.ArgumentParser(description="Measure the drivetrain's feedforward constants and track width.")
+    parser.add_argument("--distance-per-count", type=float, default=0.00218, help="feet per encoder count")
+    subparsers = parser.add_subparsers(dest="action")
+    fit_parser = subparsers.add_parser("fit", help="fit a flight log recorded during a characterization run")
+    fit_parser.add_argument("log", help="flight log file")
+    sweep_parser = subparsers.add_parser("sweep", help="fit simulated runs of drivetrains around given constants")
+    sweep_parser.add_argument("--ks", type=float, default=0.05)
+    sweep_parser.add_argument("--kv", type=float, default=0.001)
+    sweep_parser.add_argument("--ka", type=float, default=0.0002)
+    sweep_parser.add_argument("--track-width", type=float, default=2.3)
+    sweep_parser.add_argument("--spread", type=float, default=0.3, help="fraction each constant is varied by")
+    sweep_parser.add_argument("--steps", type=int, default=3, help="values of each constant")
+    sweep_parser.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.action == "fit":
+        from flight_recorder import FlightLog
+        log = FlightLog(args.log)
+        try:
+            result = fit(CharacterizationData.from_flight_log(log), args.distance_per_count)
+        finally:
+            log.close()
+        logger.info("KS: %.4f", result.feedforward.ks)
+        logger.info("KV: %.6f", result.feedforward.kv)
+        logger.info("KA: %.6f", result.feedforward.ka)
+        logger.info("Effective track width: %.3f ft (r squared %.3f)", result.track_width, result.r_squared)
+    elif args.action == "sweep":
+        scales = [1.0 - args.spread + 2 * args.spread * i / max(1, args.steps - 1) for i in range(args.steps)]
+        variants = [Variant(Feedforward(args.ks * s, args.kv * v, args.ka * a), args.track_width * w,
+                            args.distance_per_count)
+                    for s in scales for v in scales for a in scales for w in scales]
+        results = sweep(variants, processes=args.processes)
+        worst = [0.0] * 4
+        for variant, result in zip(variants, results):
+            errors = [abs(fitted / actual - 1.0) for fitted, actual in
+                      zip(tuple(result.feedforward) + (result.track_width,),
+                          tuple(variant.feedforward) + (variant.track_width,))]
+            worst = [max(w, e) for w, e in zip(worst, errors)]
+        logger.info("Fitted %d variants; worst error KS %.1f%%, KV %.1f%%, KA %.1f%%, track width %.1f%%",
+                    len(variants), *[100 * w for w in worst])
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
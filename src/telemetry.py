@@ -0,0 +1,102 @@
+from wpilib.smartdashboard import SmartDashboard
+from wpilib.timer import Timer
+
+
+class Telemetry(object):
+    """Batches SmartDashboard number updates and publishes them once per loop.
+
+    Subsystems register the keys they publish and post new values as often as
+    they like.  Values are only written to NetworkTables when flush() is called,
+    and only if they changed since the last write and the key's minimum publish
+    period has elapsed.
+
+    """
+    _instance = None
+
+    _entries = None
+    _writes = 0
+    _skipped = 0
+
+    # Indexes into each entry list
+    _VALUE = 0
+    _PUBLISHED = 1
+    _PERIOD = 2
+    _NEXT_PUBLISH = 3
+    _PENDING = 4
+
+    @staticmethod
+    def get_instance():
+        """Return the shared Telemetry instance, creating it if needed."""
+        if Telemetry._instance is None:
+            Telemetry._instance = Telemetry()
+        return Telemetry._instance
+
+    def __init__(self):
+        """Create and initialize a Telemetry publisher."""
+        self._entries = {}
+        self._writes = 0
+        self._skipped = 0
+
+    def register(self, key, period=0.0):
+        """Register a SmartDashboard key.
+
+        Args:
+            key: SmartDashboard key to publish.
+            period: Minimum time in seconds between writes of this key.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = [None, None, period, 0.0, False]
+        else:
+            entry[Telemetry._PERIOD] = period
+
+    def put_number(self, key, value):
+        """Post a new value for a key to be published at the next flush.
+
+        Unregistered keys are registered with no rate limit.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = [value, None, 0.0, 0.0, True]
+            return
+        if entry[Telemetry._PENDING]:
+            # The previous value was never published
+            self._skipped += 1
+        entry[Telemetry._VALUE] = value
+        entry[Telemetry._PENDING] = True
+
+    def flush(self, now=None):
+        """Write every pending value that changed and is due to SmartDashboard.
+
+        Args:
+            now: Current time in seconds.  Defaults to the FPGA timestamp.
+
+        Return:
+            The number of values written.
+        """
+        if now is None:
+            now = Timer.getFPGATimestamp()
+        written = 0
+        for key, entry in self._entries.items():
+            if not entry[Telemetry._PENDING]:
+                continue
+            value = entry[Telemetry._VALUE]
+            if value == entry[Telemetry._PUBLISHED]:
+                entry[Telemetry._PENDING] = False
+                self._skipped += 1
+            elif now >= entry[Telemetry._NEXT_PUBLISH]:
+                SmartDashboard.putNumber(key, value)
+                entry[Telemetry._PUBLISHED] = value
+                entry[Telemetry._NEXT_PUBLISH] = now + entry[Telemetry._PERIOD]
+                entry[Telemetry._PENDING] = False
+                written += 1
+        self._writes += written
+        return written
+
+    def get_write_count(self):
+        """Return the number of values written to SmartDashboard."""
+        return self._writes
+
+    def get_skipped_count(self):
+        """Return the number of posted values that never needed to be written."""
+        return self._skipped
@@ -0,0 +1,25 @@
+from wpilib.buttons.button import Button
+
+
+class OIButton(Button):
+    """A controller button that reads its state through the OI.
+
+    Unlike JoystickButton, this uses the inputs the OI polled at the start of
+    the loop instead of reading the joystick again.
+    """
+
+    def __init__(self, oi, user, button):
+        """Create a button for triggering commands.
+
+        Args:
+            oi: The OI to read the button state from.
+            user: Controller ID of the button.
+            button: Button number (starting at 1).
+        """
+        super().__init__()
+        self._oi = oi
+        self._user = user
+        self._button = button
+
+    def get(self):
+        return self._oi.get_button_state(self._user, self._button)
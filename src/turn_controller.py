@@ -0,0 +1,68 @@
+import math
+from collections import namedtuple
+from pid_controller import PIDFController, PIDGains
+
+
+# Gains of a TurnController.  min_output is the smallest output applied outside the tolerance, to
+# overcome static friction, and rate_limit is the largest change in output per second (0.0 for none).
+TurnGains = namedtuple("TurnGains", ["kp", "ki", "kd", "min_output", "settle_time", "rate_limit"])
+
+
+def wrap_degrees(angle):
+    """Return an angle in degrees normalized to the range (-180, 180]."""
+    angle = angle % 360.0
+    if angle > 180.0:
+        angle -= 360.0
+    return angle
+
+
+class TurnController(PIDFController):
+    """PID controller for turning to a gyro angle.
+
+    When turning to a heading, the error is taken the short way around the
+    circle, so a target of 10 degrees is reached from 350 (or 710) by turning
+    20 degrees, not 340.  When turning by an angle, it is not wrapped, so a
+    turn of 270 degrees goes all the way around rather than 90 degrees back.
+    The output steps up to at least min_output, and changes no faster than
+    the rate limit so the wheels do not break traction at the start of a turn.
+
+    """
+    _min_output = 0.0
+    _rate_limit = 0.0
+    _wrap = True
+    _last_output = 0.0
+
+    def __init__(self, gains, tolerance, max_output=1.0, wrap=True):
+        """Create and initialize a TurnController.
+
+        Args:
+            gains: TurnGains to use.
+            tolerance: Largest error in degrees that counts as on target.
+            max_output: Largest output magnitude.
+            wrap: True to turn the short way to a heading, False to turn by the whole angle to the setpoint.
+        """
+        super().__init__(PIDGains(gains.kp, gains.ki, gains.kd, 0.0, gains.settle_time), tolerance, max_output)
+        self._min_output = min(gains.min_output, max_output)
+        self._rate_limit = gains.rate_limit
+        self._wrap = wrap
+
+    def reset(self, setpoint, measurement, now):
+        super().reset(setpoint, measurement, now)
+        self._last_output = 0.0
+
+    def calculate(self, measurement, now):
+        dt = now - self._last_time
+        output = super().calculate(measurement, now)
+        error = self._last_error
+        if abs(error) > self._tolerance and abs(output) < self._min_output:
+            output = math.copysign(self._min_output, error)
+        if self._rate_limit > 0.0:
+            step = self._rate_limit * dt
+            output = max(self._last_output - step, min(self._last_output + step, output))
+        self._last_output = output
+        return output
+
+    def _get_error(self, measurement):
+        if self._wrap:
+            return wrap_degrees(self._setpoint - measurement)
+        return self._setpoint - measurement
@@ -0,0 +1,17 @@
+import pytest
+
+
+class FakeClock(object):
+    """Clock for timing code under test, which only moves when a test sets now or by step on every read."""
+    def __init__(self, step=0.0):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+@pytest.fixture(scope="function")
+def clock():
+    return FakeClock()
@@ -0,0 +1,145 @@
+import pytest
+from auto_optimizer import ENCODER, TIMED_DRIVE, AutonomousOptimizer, Evaluation, Parameter, SEARCH_SPACES, \
+    evaluate, get_parameter_type, get_search_space, write_candidate_config
+
+CONFIG = '../tests/test_configs/autonomous_default.ini'
+SPACE = (Parameter("Approach", "APPROACH_SPEED", -1.0, -0.3, None),
+         Parameter("Approach", "APPROACH_ENCODER_THRESHOLD", 5, 60, ENCODER))
+
+
+def evaluate_model(task):
+    """Stand-in for the simulator: faster with more speed, but overshoots with a loose threshold."""
+    values = dict(task.overrides)
+    speed = abs(values.get(("Approach", "APPROACH_SPEED"), -0.5))
+    threshold = values.get(("Approach", "APPROACH_ENCODER_THRESHOLD"), 20)
+    overshoot = max(0.0, speed - 0.8) * threshold * 0.1
+    return Evaluation(task.overrides, True, 2.0 / speed, 5.0 + overshoot, 20.0, 0.0)
+
+
+def test_get_parameter_type():
+    assert get_parameter_type(Parameter("Approach", "APPROACH_SPEED", -1.0, -0.3, None)) is float
+    assert get_parameter_type(Parameter("Approach", "APPROACH_ENCODER_THRESHOLD", 5, 60, ENCODER)) is int
+    with pytest.raises(ValueError):
+        get_parameter_type(Parameter("Approach", "MISSING", 0, 1, None))
+
+
+@pytest.mark.parametrize("program", sorted(SEARCH_SPACES))
+def test_search_spaces(tmpdir, program):
+    # Every value searched is in the configuration file, with a range of its type
+    space = SEARCH_SPACES[program]
+    overrides = tuple(((parameter.section, parameter.key), parameter.low) for parameter in space)
+    write_candidate_config(CONFIG, overrides, str(tmpdir.join("candidate.ini")))
+    for parameter in space:
+        assert parameter.low < parameter.high
+        assert isinstance(parameter.low, get_parameter_type(parameter))
+
+
+def test_get_search_space():
+    # Without the encoders and gyro the program runs on timers, so only speeds and times matter
+    keys = [parameter.key for parameter in get_search_space("AutonomousCrossLine",
+                                                             '../tests/test_configs/physics_default.ini')]
+    assert "APPROACH_ENCODER_COUNTS" in keys
+    assert "CROSS_ANGLE_THRESHOLD" in keys
+    assert "APPROACH_TIME" not in keys
+    assert "CROSS_CENTER_TURN_TIME" not in keys
+    keys = [parameter.key for parameter in get_search_space("AutonomousCrossLine",
+                                                             '../tests/test_configs/drivetrain_half_speed.ini')]
+    assert "APPROACH_SPEED" in keys
+    assert "APPROACH_ENCODER_COUNTS" not in keys
+    assert "CROSS_ANGLE_THRESHOLD" not in keys
+    assert "APPROACH_TIME" in keys
+    assert "CROSS_CENTER_TURN_TIME" in keys
+    assert all(parameter.sensor != TIMED_DRIVE for parameter in get_search_space(
+        "AutonomousHangGear", '../tests/test_configs/physics_default.ini'))
+
+
+def test_write_candidate_config(tmpdir):
+    path = tmpdir.join("candidate.ini")
+    write_candidate_config(CONFIG, ((("Approach", "APPROACH_SPEED"), -0.8), (("Hang", "HANG_GEAR_TIMEOUT"), 4.0)),
+                           str(path))
+    with open(CONFIG) as original:
+        original_lines = original.readlines()
+    lines = path.readlines()
+    assert len(lines) == len(original_lines)
+    changed = [(before, after) for before, after in zip(original_lines, lines) if before != after]
+    assert changed == [("APPROACH_SPEED: -0.5\n", "APPROACH_SPEED: -0.8\n"),
+                       ("HANG_GEAR_TIMEOUT = 5.0\n", "HANG_GEAR_TIMEOUT = 4.0\n")]
+
+
+def test_write_candidate_config_missing(tmpdir):
+    with pytest.raises(ValueError):
+        write_candidate_config(CONFIG, ((("Approach", "MISSING"), 1.0),), str(tmpdir.join("candidate.ini")))
+
+
+def test_run(tmpdir):
+    optimizer = AutonomousOptimizer("AutonomousCrossLine", 2, CONFIG, SPACE, evaluate=evaluate_model)
+    ranking = optimizer.run(rounds=3, candidates=10, keep=3, processes=1)
+    assert len(ranking) == 30
+    assert optimizer.get_baseline().overrides == ()
+    assert optimizer.get_baseline().completion_time == pytest.approx(4.0)
+    best = ranking[0]
+    assert optimizer.is_success(best) is True
+    # Faster than the baseline, without going so fast the loose threshold overshoots
+    assert best.completion_time < 2.6
+    for evaluation in ranking:
+        if not optimizer.is_success(evaluation):
+            assert evaluation.x > 5.5
+    # Successful runs are ranked first, fastest first
+    successes = [evaluation.completion_time for evaluation in ranking if optimizer.is_success(evaluation)]
+    assert successes == sorted(successes)
+    assert ranking[:len(successes)] == [evaluation for evaluation in ranking if optimizer.is_success(evaluation)]
+
+    optimizer.write_report(str(tmpdir.join("report.txt")))
+    report = tmpdir.join("report.txt").read()
+    assert "AutonomousCrossLine from position 2, 30 runs" in report
+    assert "APPROACH_SPEED=%s" % dict(best.overrides)[("Approach", "APPROACH_SPEED")] in report
+    assert optimizer.write_best_config(str(tmpdir.join("autonomous.ini"))) is best
+    assert "APPROACH_SPEED: %s\n" % dict(best.overrides)[("Approach", "APPROACH_SPEED")] in \
+        tmpdir.join("autonomous.ini").readlines()
+
+
+def test_run_repeatable():
+    rankings = []
+    for i in range(2):
+        optimizer = AutonomousOptimizer("AutonomousCrossLine", 2, CONFIG, SPACE, seed=7, evaluate=evaluate_model)
+        rankings.append(optimizer.run(rounds=2, candidates=5, processes=1))
+    assert rankings[0] == rankings[1]
+
+
+def test_write_best_config_none_succeeded(tmpdir):
+    optimizer = AutonomousOptimizer("AutonomousCrossLine", 2, CONFIG, SPACE, distance_tolerance=-1.0,
+                                    evaluate=evaluate_model)
+    optimizer.run(rounds=1, candidates=2, processes=1)
+    assert optimizer.write_best_config(str(tmpdir.join("autonomous.ini"))) is None
+    assert not tmpdir.join("autonomous.ini").exists()
+
+
+def test_run_simulated():
+    # Each candidate runs the robot in a simulation of its own, in a worker process
+    # The robot's sensors are disabled, so the program's times are what can change how fast it runs
+    space = (Parameter("Approach", "APPROACH_TIME", 0.5, 2.0, TIMED_DRIVE),)
+    optimizer = AutonomousOptimizer("AutonomousCrossLine", 1, CONFIG, space, autonomous_period=5.0)
+    ranking = optimizer.run(rounds=1, candidates=2, processes=2)
+    assert len(ranking) == 2
+    assert optimizer.get_baseline() in ranking
+
+
+def test_run_no_effect():
+    # A simulation whose sensors never move ends every run the same way, whatever the values
+    def evaluate_stuck(task):
+        return Evaluation(task.overrides, False, None, 0.0, 0.0, 0.0)
+
+    optimizer = AutonomousOptimizer("AutonomousCrossLine", 2, CONFIG, SPACE, evaluate=evaluate_stuck)
+    with pytest.raises(RuntimeError):
+        optimizer.run(rounds=2, candidates=4, processes=1)
+
+
+def test_run_same_time():
+    # Timed commands finish at the same time wherever the values searched stop the robot
+    def evaluate_timed(task):
+        return Evaluation(task.overrides, True, 3.82, len(task.overrides) and dict(task.overrides)[
+            ("Approach", "APPROACH_SPEED")], 0.0, 0.0)
+
+    optimizer = AutonomousOptimizer("AutonomousCrossLine", 2, CONFIG, SPACE, evaluate=evaluate_timed)
+    with pytest.raises(RuntimeError):
+        optimizer.run(rounds=2, candidates=4, processes=1)
@@ -0,0 +1,89 @@
+import pytest
+from autonomous_plans import AutonomousPlans
+from commands.autonomous_cross_line import AutonomousCrossLine
+from commands.autonomous_hang_center import AutonomousHangCenter
+from commands.do_nothing import DoNothing
+from subsystems.drivetrain import Drivetrain
+from subsystems.gear_feeder import GearFeeder
+from subsystems.winch import Winch
+
+
+@pytest.fixture(scope="function")
+def drivetrain_default(robot):
+    return Drivetrain(robot, None, '../tests/test_configs/drivetrain_default.ini')
+
+
+@pytest.fixture(scope="function")
+def plans_default(robot, drivetrain_default):
+    robot.drivetrain = drivetrain_default
+    robot.winch = Winch(robot, None, '../tests/test_configs/winch_default.ini')
+    robot.gear_feeder = GearFeeder(robot, None, '../tests/test_configs/gear_feeder_default.ini')
+    return AutonomousPlans(robot, '../tests/test_configs/autonomous_default.ini')
+
+
+def test_plans_default(plans_default):
+    assert plans_default is not None
+    assert plans_default.is_complete() is False
+
+
+def test_build_all(plans_default):
+    plans_default.build_all()
+    assert plans_default.is_complete() is True
+    assert plans_default.build_next() is False
+
+
+def test_build_next(plans_default):
+    for i in range(len(AutonomousPlans.PROGRAMS) * len(AutonomousPlans.POSITIONS)):
+        assert plans_default.build_next() is True
+    assert plans_default.is_complete() is True
+
+
+@pytest.mark.parametrize("program,position,plan_class", [
+    (1, 1, AutonomousCrossLine),
+    (1, 2, AutonomousCrossLine),
+    (2, 3, AutonomousHangCenter),
+    (3, 1, DoNothing),
+    (None, None, DoNothing),
+])
+def test_get_plan(plans_default, program, position, plan_class):
+    plans_default.build_all()
+    plan = plans_default.get_plan(program, position)
+    assert isinstance(plan, plan_class)
+    assert plans_default.get_plan(program, position) is plan
+
+
+def test_get_plan_unbuilt(plans_default):
+    plan = plans_default.get_plan(2, 2)
+    assert isinstance(plan, AutonomousHangCenter)
+    assert plan._starting_position == 2
+    plans_default.build_all()
+    assert plans_default.get_plan(2, 2) is plan
+
+
+def test_get_plan_build_failure(robot, drivetrain_default):
+    robot.drivetrain = drivetrain_default
+    plans = AutonomousPlans(robot, '../tests/test_configs/missing.ini')
+    plans.build_all()
+    assert isinstance(plans.get_plan(1, 1), DoNothing)
+
+
+def test_get_plan_programs(robot, drivetrain_default):
+    robot.drivetrain = drivetrain_default
+    robot.winch = Winch(robot, None, '../tests/test_configs/winch_default.ini')
+    robot.gear_feeder = GearFeeder(robot, None, '../tests/test_configs/gear_feeder_default.ini')
+    plans = AutonomousPlans(robot, '../tests/test_configs/autonomous_default.ini', {1: AutonomousHangCenter})
+    plans.build_all()
+    assert isinstance(plans.get_plan(1, 2), AutonomousHangCenter)
+    assert isinstance(plans.get_plan(2, 2), DoNothing)
+
+
+def test_programs_by_class(plans_default, robot):
+    plans = AutonomousPlans(robot, '../tests/test_configs/autonomous_default.ini', {1: AutonomousHangCenter})
+    assert isinstance(plans.get_plan(1, 2), AutonomousHangCenter)
+
+
+def test_program_import_error(plans_default, robot):
+    plans = AutonomousPlans(robot, '../tests/test_configs/autonomous_default.ini', {1: "commands.missing.Missing"})
+    plans.build_all()
+    assert plans.is_complete() is True
+    assert isinstance(plans.get_plan(1, 2), DoNothing)
@@ -0,0 +1,217 @@
+import math
+import pytest
+from pid_controller import PIDFController, PIDGains
+from subsystems.drivetrain import Drivetrain
+from turn_controller import TurnController, TurnGains
+
+numpy = pytest.importorskip("numpy")
+from batch_sim import BatchDrivetrain, BatchDriveEncoderCounts, BatchDriveTime, BatchPIDController, \
+    BatchTurnDegrees, BatchTurnTime, arcade_outputs, run_commands
+
+
+@pytest.fixture(scope="function")
+def drivetrain_default(robot):
+    return Drivetrain(robot, None, '../tests/test_configs/drivetrain_default.ini')
+
+
+def batch_drivetrain(count, **kwargs):
+    return BatchDrivetrain(count, 0.01, 2.0, **kwargs)
+
+
+def run(drivetrain, seconds, dt=0.02):
+    for i in range(int(round(seconds / dt))):
+        drivetrain.step(dt)
+
+
+def test_arcade_outputs(drivetrain_default, hal_data):
+    moves = [0.0, 0.5, -0.5, 1.0, 0.3, -0.3, 0.8, -0.8, 1.5]
+    rotates = [0.0, 0.5, 0.5, -0.2, -0.7, -0.7, 0.3, 0.3, 0.0]
+    left, right = arcade_outputs(numpy.array(moves), numpy.array(rotates))
+    for i in range(len(moves)):
+        drivetrain_default.arcade_drive(moves[i], rotates[i], False)
+        assert left[i] == pytest.approx(hal_data['pwm'][1]['value'])
+        assert right[i] == pytest.approx(-hal_data['pwm'][2]['value'])
+
+
+def test_drive_forward():
+    drivetrain = batch_drivetrain(2, speed=[5.0, 10.0])
+    drivetrain.tank_drive(-0.5, -0.5)
+    run(drivetrain, 1.0)
+    x, y, heading = drivetrain.get_pose()
+    assert x == pytest.approx([2.5, 5.0])
+    assert y == pytest.approx([0.0, 0.0])
+    assert heading == pytest.approx([0.0, 0.0])
+    assert drivetrain.get_left_encoder_value() == pytest.approx([250, 500], abs=1)
+    assert drivetrain.get_right_encoder_value() == pytest.approx([250, 500], abs=1)
+    assert drivetrain.get_encoder_value() == pytest.approx([250, 500], abs=1)
+    assert drivetrain.get_timestamp() == pytest.approx(1.0)
+
+
+def test_turn():
+    drivetrain = batch_drivetrain(1, heading=90.0)
+    drivetrain.tank_drive(-0.5, 0.5)
+    run(drivetrain, 0.5)
+    x, y, heading = drivetrain.get_pose()
+    # 2.5 ft/s on each side of a 2 ft track turns 2.5 rad/s clockwise
+    assert heading[0] == pytest.approx(90.0 + math.degrees(1.25))
+    assert drivetrain.get_gyro_angle()[0] == pytest.approx(math.degrees(1.25))
+    assert x[0] == pytest.approx(0.0)
+    assert drivetrain.get_left_encoder_value()[0] > 0
+    assert drivetrain.get_right_encoder_value()[0] < 0
+
+
+def test_scale_and_friction():
+    drivetrain = batch_drivetrain(3, left_scale=[1.0, 0.5, 1.0], friction=[0.0, 0.0, 0.5])
+    drivetrain.tank_drive(-0.5, -0.5)
+    run(drivetrain, 1.0)
+    x, y, heading = drivetrain.get_pose()
+    assert heading[0] == pytest.approx(0.0)
+    # A slower left side curves to the left
+    assert heading[1] < 0.0
+    assert x[2] == 0.0
+    assert drivetrain.get_left_encoder_value()[1] == pytest.approx(125, abs=1)
+
+
+def test_mask():
+    drivetrain = batch_drivetrain(3)
+    drivetrain.tank_drive(-0.5, -0.5, numpy.array([True, False, True]))
+    run(drivetrain, 1.0)
+    x, y, heading = drivetrain.get_pose()
+    assert x == pytest.approx([2.5, 0.0, 2.5])
+
+
+def test_noise():
+    first = batch_drivetrain(1000, encoder_noise=2.0, gyro_noise=0.5, seed=3)
+    second = batch_drivetrain(1000, encoder_noise=2.0, gyro_noise=0.5, seed=3)
+    run(first, 0.1)
+    run(second, 0.1)
+    assert numpy.array_equal(first.get_left_encoder_value(), second.get_left_encoder_value())
+    assert first.get_left_encoder_value().std() == pytest.approx(2.0, rel=0.2)
+    assert first.get_gyro_angle().std() == pytest.approx(0.5, rel=0.2)
+
+
+def test_reset():
+    drivetrain = batch_drivetrain(2)
+    drivetrain.tank_drive(-0.5, -0.5)
+    run(drivetrain, 1.0)
+    drivetrain.reset(x=[1.0, 2.0])
+    x, y, heading = drivetrain.get_pose()
+    assert x == pytest.approx([1.0, 2.0])
+    assert drivetrain.get_encoder_value() == pytest.approx([0, 0])
+    assert drivetrain.get_timestamp() == 0.0
+    run(drivetrain, 1.0)
+    assert drivetrain.get_pose()[0] == pytest.approx([1.0, 2.0])
+
+
+def test_pid_controller_matches():
+    gains = PIDGains(0.01, 0.5, 0.002, 0.1, 0.1)
+    single = PIDFController(gains, 5.0, 0.8)
+    batch = BatchPIDController(1, gains, 5.0, 0.8)
+    single.reset(100.0, 0.0, 0.0)
+    batch.reset(100.0, 0.0, numpy.array([True]))
+    for i, measurement in enumerate([0.0, 10.0, 30.0, 60.0, 90.0, 98.0, 101.0, 102.0, 100.0, 99.0]):
+        now = (i + 1) * 0.02
+        assert batch.calculate(numpy.array([measurement]), now, numpy.array([True]))[0] == \
+            pytest.approx(single.calculate(measurement, now))
+        assert batch.is_settled(now)[0] == single.is_settled(now)
+
+
+def test_turn_controller_matches():
+    gains = TurnGains(0.02, 0.0, 0.001, 0.1, 0.1, 5.0)
+    single = TurnController(gains, 3.0, 0.5)
+    batch = BatchPIDController(1, None, 3.0, 0.5, turn_gains=gains)
+    single.reset(350.0, 0.0, 0.0)
+    batch.reset(350.0, 0.0, numpy.array([True]))
+    for i, measurement in enumerate([0.0, -1.0, -3.0, -6.0, -8.0, -9.0, -10.0, -9.5, -10.0, -10.0]):
+        now = (i + 1) * 0.02
+        assert batch.calculate(numpy.array([measurement]), now, numpy.array([True]))[0] == \
+            pytest.approx(single.calculate(measurement, now))
+
+
+def test_turn_controller_matches_no_wrap():
+    gains = TurnGains(0.02, 0.0, 0.001, 0.1, 0.1, 5.0)
+    single = TurnController(gains, 3.0, 0.5, wrap=False)
+    batch = BatchPIDController(1, None, 3.0, 0.5, turn_gains=gains, wrap=False)
+    single.reset(350.0, 0.0, 0.0)
+    batch.reset(350.0, 0.0, numpy.array([True]))
+    for i, measurement in enumerate([0.0, 1.0, 3.0, 6.0, 8.0, 9.0, 10.0]):
+        now = (i + 1) * 0.02
+        assert batch.calculate(numpy.array([measurement]), now, numpy.array([True]))[0] == \
+            pytest.approx(single.calculate(measurement, now))
+
+
+def test_run_drive_time():
+    drivetrain = batch_drivetrain(2)
+    result = run_commands(drivetrain, [BatchDriveTime([0.5, 1.0], -0.5)])
+    assert result.completed.all()
+    assert result.completion_time == pytest.approx([0.5, 1.0])
+    assert result.x == pytest.approx([1.25, 2.5])
+
+
+def test_run_drive_time_timeout():
+    drivetrain = batch_drivetrain(2)
+    result = run_commands(drivetrain, [BatchDriveTime([0.5, 1.0], -0.5, timeout=0.6)])
+    assert result.completion_time == pytest.approx([0.5, 0.6])
+    assert result.x == pytest.approx([1.25, 1.5])
+
+
+def test_run_drive_encoder_counts():
+    drivetrain = batch_drivetrain(3, left_scale=[1.0, 0.8, 1.2])
+    result = run_commands(drivetrain, [BatchDriveEncoderCounts([100, 200, 300], 0.5, 5)])
+    assert result.completed.all()
+    assert drivetrain.get_encoder_value() == pytest.approx([100, 200, 300], abs=5)
+    assert numpy.all(result.completion_time > 0.0)
+
+
+def test_run_drive_encoder_counts_pid():
+    gains = PIDGains(0.01, 0.0, 0.0, 0.05, 0.1)
+    drivetrain = batch_drivetrain(2)
+    result = run_commands(drivetrain, [BatchDriveEncoderCounts(300, [0.5, 1.0], 5, pid_gains=gains)])
+    assert result.completed.all()
+    assert drivetrain.get_encoder_value() == pytest.approx([300, 300], abs=5)
+    # The faster robot gets there first
+    assert result.completion_time[1] < result.completion_time[0]
+
+
+def test_run_sequence():
+    gains = TurnGains(0.02, 0.0, 0.001, 0.1, 0.1, 5.0)
+    drivetrain = batch_drivetrain(2)
+    commands = [BatchDriveEncoderCounts(200, 0.5, 5),
+                BatchTurnDegrees([60.0, -60.0], 0.5, 3.0, turn_gains=gains),
+                BatchTurnTime(0.2, 0.0),
+                BatchDriveEncoderCounts(100, 0.5, 5)]
+    result = run_commands(drivetrain, commands)
+    assert result.completed.all()
+    assert result.heading == pytest.approx([60.0, -60.0], abs=3.0)
+    assert result.x == pytest.approx([2.0 + 0.5, 2.0 + 0.5], abs=0.1)
+    assert result.y == pytest.approx([math.sqrt(3) / 2.0, -math.sqrt(3) / 2.0], abs=0.1)
+
+
+def test_run_turn_degrees():
+    drivetrain = batch_drivetrain(2)
+    result = run_commands(drivetrain, [BatchTurnDegrees([45.0, -90.0], 0.3, 2.0)])
+    assert result.completed.all()
+    assert result.heading == pytest.approx([45.0, -90.0], abs=2.0)
+
+
+def test_run_turn_degrees_pid():
+    # A relative turn goes the whole way, even past 180 degrees
+    drivetrain = batch_drivetrain(2)
+    gains = TurnGains(0.02, 0.0, 0.001, 0.1, 0.1, 5.0)
+    result = run_commands(drivetrain, [BatchTurnDegrees([90.0, 270.0], 0.5, 2.0, turn_gains=gains)])
+    assert result.completed.all()
+    assert drivetrain.get_gyro_angle() == pytest.approx([90.0, 270.0], abs=3.0)
+
+
+def test_run_timeout():
+    drivetrain = batch_drivetrain(2, friction=[0.0, 1.0])
+    result = run_commands(drivetrain, [BatchDriveEncoderCounts(100, 0.5, 5, timeout=1.0)], time_limit=3.0)
+    assert result.completed.all()
+    assert result.completion_time[1] == pytest.approx(1.0)
+
+
+def test_run_time_limit():
+    drivetrain = batch_drivetrain(2, friction=[0.0, 1.0])
+    result = run_commands(drivetrain, [BatchDriveEncoderCounts(100, 0.5, 5)], time_limit=2.0)
+    assert list(result.completed) == [True, False]
+    assert math.isnan(result.completion_time[1])
@@ -0,0 +1,62 @@
+import pytest
+from benchmarks import Benchmark, BenchmarkResult, compare_results, create_benchmarks, load_results, \
+    measure_allocations, run_benchmarks, save_results, time_function
+
+
+def test_time_function():
+    times = iter([0.0, 1.0, 0.0, 3.0, 0.0, 2.0])
+    calls = []
+    per_call, best = time_function(lambda: calls.append(1), 10, 3, clock=lambda: next(times))
+    assert len(calls) == 30
+    assert per_call == pytest.approx(0.2)
+    assert best == pytest.approx(0.1)
+
+
+def test_measure_allocations():
+    kept = []
+    alloc_bytes, retained_blocks = measure_allocations(lambda: kept.append(object()), 100)
+    assert retained_blocks >= 1.0
+    alloc_bytes, retained_blocks = measure_allocations(lambda: [0.0] * 10000, 100)
+    assert alloc_bytes >= 80000
+    assert retained_blocks < 0.5
+
+
+def test_run_benchmarks():
+    results = run_benchmarks([Benchmark("sum", lambda: sum(range(10)))], calls=10, repeats=3)
+    assert len(results) == 1
+    assert results[0].name == "sum"
+    assert results[0].calls == 10
+    assert 0.0 < results[0].best <= results[0].per_call
+
+
+def test_robot_benchmarks(robot):
+    robot.robotInit()
+    results = run_benchmarks(create_benchmarks(robot), calls=10, repeats=1)
+    assert [result.name for result in results] == [
+        "oi_update_inputs", "oi_get_axis", "drivetrain_tank_drive", "drivetrain_arcade_drive", "winch_move_winch",
+        "tank_drive_execute", "scheduler_run", "robot_loop"]
+    assert all(result.per_call > 0.0 for result in results)
+    assert robot.drivetrain.getCurrentCommand() is robot.drivetrain.getDefaultCommand()
+
+
+def test_save_load(tmpdir):
+    results = [BenchmarkResult("a", 10, 1e-6, 9e-7, 100, 0.0), BenchmarkResult("b", 10, 2e-6, 2e-6, 0, 0.5)]
+    path = str(tmpdir.join("baseline.json"))
+    save_results(results, path)
+    assert load_results(path) == {"a": results[0], "b": results[1]}
+
+
+def test_compare_results():
+    baseline = {"a": BenchmarkResult("a", 10, 1e-6, 1e-6, 1000, 0.0),
+                "b": BenchmarkResult("b", 10, 1e-6, 1e-6, 0, 0.0)}
+    results = [BenchmarkResult("a", 10, 1.1e-6, 1e-6, 1100, 0.0),
+               BenchmarkResult("b", 10, 1.5e-6, 1e-6, 32, 0.0),
+               BenchmarkResult("c", 10, 1.0, 1.0, 10000, 0.0)]
+    # Within the threshold, and below the smallest allocation counted
+    regressions = compare_results(results, baseline, threshold=0.2)
+    assert [(regression.name, regression.metric) for regression in regressions] == [("b", "per_call")]
+    assert regressions[0].change == pytest.approx(0.5)
+
+    regressions = compare_results(results, baseline, threshold=0.05)
+    assert [(regression.name, regression.metric) for regression in regressions] == [
+        ("a", "per_call"), ("a", "alloc_bytes"), ("b", "per_call")]
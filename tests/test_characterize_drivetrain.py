@@ -0,0 +1,81 @@
+import math
+import pytest
+from commands.characterize_drivetrain import CharacterizeDrivetrain
+from subsystems.drivetrain import Drivetrain
+from stopwatch import Stopwatch
+from sysid import Schedule, fit
+
+
+@pytest.fixture(scope="function")
+def drivetrain_default(robot):
+    return Drivetrain(robot, None, '../tests/test_configs/drivetrain_default.ini')
+
+
+@pytest.fixture(scope="function")
+def command_default(robot, drivetrain_default):
+    robot.drivetrain = drivetrain_default
+    return CharacterizeDrivetrain(robot)
+
+
+def test_init_default(command_default):
+    assert command_default is not None
+    assert command_default.robot is not None
+    assert command_default.name == "CharacterizeDrivetrain"
+    assert command_default.timeout == 60
+
+
+def test_execute(robot, drivetrain_default, hal_data, fake_time):
+    robot.drivetrain = drivetrain_default
+    schedule = Schedule(0.1, 2.0, 0.6, 1.0, 0.4, 1.0, 0.5)
+    cd = CharacterizeDrivetrain(robot, schedule)
+    cd._stopwatch = Stopwatch(fake_time.get)
+    cd.initialize()
+    fake_time.increment_time_by(1.5)
+    drivetrain_default.update_sensor_snapshot()
+    cd.execute()
+    # Halfway up the first ramp, counting the encoders up
+    assert hal_data['pwm'][1]['value'] == pytest.approx(-0.1)
+    assert hal_data['pwm'][2]['value'] == pytest.approx(0.1)
+    assert cd.isFinished() is False
+    fake_time.increment_time_by(9.0)
+    cd.execute()
+    assert cd.isFinished() is True
+    assert hal_data['pwm'][1]['value'] == 0.0
+    assert len(cd.get_data()) == 1
+
+
+def test_run(robot, drivetrain_default, hal_data, fake_time):
+    robot.drivetrain = drivetrain_default
+    cd = CharacterizeDrivetrain(robot)
+    cd._stopwatch = Stopwatch(fake_time.get)
+    # Each side has a first-order response: 1000 counts/s at full output, with a 0.2 s time constant
+    left_rate = 0.0
+    right_rate = 0.0
+    left = 0.0
+    right = 0.0
+    drivetrain_default.update_sensor_snapshot()
+    cd.initialize()
+    while not cd.isFinished():
+        cd.execute()
+        for _ in range(10):
+            left_rate += (-hal_data['pwm'][1]['value'] * 1000.0 - left_rate) * 0.002 / 0.2
+            right_rate += (hal_data['pwm'][2]['value'] * 1000.0 - right_rate) * 0.002 / 0.2
+            left += left_rate * 0.002
+            right += right_rate * 0.002
+        hal_data['encoder'][0]['count'] = int(left)
+        hal_data['encoder'][1]['count'] = int(right)
+        hal_data['robot']['adxrs450_spi_1_angle'] = math.degrees((left - right) * 0.00218 / 2.5)
+        fake_time.increment_time_by(0.02)
+        drivetrain_default.update_sensor_snapshot()
+    cd.end()
+    assert fake_time.get() == pytest.approx(25.0, abs=0.5)
+    result = fit(cd.get_data(), 0.00218)
+    assert result.feedforward.ks == pytest.approx(0.0, abs=0.01)
+    assert result.feedforward.kv == pytest.approx(0.001, rel=0.02)
+    assert result.feedforward.ka == pytest.approx(0.0002, rel=0.1)
+    assert result.track_width == pytest.approx(2.5, rel=0.02)
+
+
+def test_interrupted(command_default, hal_data):
+    command_default.interrupted()
+    assert hal_data['pwm'][1]['value'] == 0.0
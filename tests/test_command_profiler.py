@@ -0,0 +1,62 @@
+import pytest
+from command_profiler import CommandProfiler
+from commands.drive_time import DriveTime
+from commands.move_winch import MoveWinch
+from commands.tank_drive import TankDrive
+from commands.autonomous_cross_line import AutonomousCrossLine
+from subsystems.drivetrain import Drivetrain
+from conftest import FakeClock
+
+
+@pytest.fixture(scope="function")
+def drivetrain_default(robot):
+    return Drivetrain(robot, None, '../tests/test_configs/drivetrain_default.ini')
+
+
+@pytest.fixture(scope="function")
+def profiler_default(robot):
+    profiler = CommandProfiler(FakeClock(step=0.001))
+    yield profiler
+    profiler.uninstall()
+
+
+def test_find_command_classes(robot):
+    classes = CommandProfiler.find_command_classes()
+    assert TankDrive in classes
+    assert MoveWinch in classes
+    assert AutonomousCrossLine in classes
+
+
+def test_install(profiler_default):
+    original = DriveTime.execute
+    profiler_default.install([DriveTime])
+    assert profiler_default.is_installed() is True
+    assert DriveTime.execute is not original
+    assert DriveTime.execute.__doc__ == original.__doc__
+    profiler_default.uninstall()
+    assert profiler_default.is_installed() is False
+    assert DriveTime.execute is original
+
+
+def test_install_inherited_methods(profiler_default):
+    profiler_default.install([AutonomousCrossLine])
+    assert "execute" not in AutonomousCrossLine.__dict__
+    assert "initialize" in AutonomousCrossLine.__dict__
+
+
+def test_stats(robot, drivetrain_default, profiler_default):
+    robot.drivetrain = drivetrain_default
+    profiler_default.install([DriveTime])
+    dt = DriveTime(robot, 1.0, 0.5)
+    dt.initialize()
+    for i in range(3):
+        dt.execute()
+    calls, total, maximum = profiler_default.get_stats("DriveTime", "execute")
+    assert calls == 3
+    assert total == pytest.approx(0.003)
+    assert maximum == pytest.approx(0.001)
+    assert profiler_default.get_stats("DriveTime", "initialize")[0] == 1
+    assert profiler_default.get_stats("DriveTime", "end")[0] == 0
+    profiler_default.log_report()
+    profiler_default.reset()
+    assert profiler_default.get_stats("DriveTime", "execute") == (0, 0.0, 0.0)
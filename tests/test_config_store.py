@@ -0,0 +1,73 @@
+import pytest
+from config_store import ConfigField, ConfigStore, config_record
+
+
+SampleConfig = config_record("SampleConfig", [
+    ConfigField("speed", "General", "SPEED", float),
+    ConfigField("count", "General", "COUNT", int, 10),
+    ConfigField("enabled", "Motor", "ENABLED", bool),
+    ConfigField("channel", "Motor", "CHANNEL", int, enabled_by="enabled"),
+])
+
+SectionConfig = config_record("SectionConfig", [
+    ConfigField("port", None, "PORT", int),
+])
+
+
+def write_config(tmp_path, text):
+    configfile = tmp_path / "test.ini"
+    configfile.write_text(text)
+    return str(configfile)
+
+
+@pytest.fixture(scope="function")
+def store_default(robot):
+    return ConfigStore()
+
+
+def test_get_instance(robot):
+    assert ConfigStore.get_instance() is ConfigStore.get_instance()
+
+
+def test_get(store_default, tmp_path):
+    configfile = write_config(tmp_path, "[General]\nSPEED: 0.5\nCOUNT: 3\n[Motor]\nENABLED: True\nCHANNEL: 2\n")
+    config = store_default.get(SampleConfig, configfile)
+    assert config.speed == 0.5
+    assert config.count == 3
+    assert config.enabled is True
+    assert config.channel == 2
+    assert store_default.get(SampleConfig, configfile) is config
+    assert store_default.get_parse_time() > 0.0
+    with pytest.raises(AttributeError):
+        config.speed = 1.0
+
+
+def test_get_defaults(store_default, tmp_path):
+    configfile = write_config(tmp_path, "[General]\nSPEED: 0.5\n[Motor]\nENABLED: False\n")
+    config = store_default.get(SampleConfig, configfile)
+    assert config.count == 10
+    assert config.channel is None
+
+
+@pytest.mark.parametrize("text", [
+    "[General]\nCOUNT: 3\n[Motor]\nENABLED: False\n",
+    "[General]\nSPEED: 0.5\n[Motor]\nENABLED: True\n",
+    "[General]\nSPEED: fast\n[Motor]\nENABLED: False\n",
+])
+def test_get_invalid(store_default, tmp_path, text):
+    configfile = write_config(tmp_path, text)
+    with pytest.raises(ValueError):
+        store_default.get(SampleConfig, configfile)
+
+
+def test_get_section(store_default, tmp_path):
+    configfile = write_config(tmp_path, "[Joy0]\nPORT: 0\n[Joy1]\nPORT: 1\n")
+    assert store_default.get(SectionConfig, configfile, "Joy0").port == 0
+    assert store_default.get(SectionConfig, configfile, "Joy1").port == 1
+
+
+def test_clear(store_default, tmp_path):
+    configfile = write_config(tmp_path, "[Joy0]\nPORT: 0\n")
+    config = store_default.get(SectionConfig, configfile, "Joy0")
+    store_default.clear()
+    assert store_default.get(SectionConfig, configfile, "Joy0") is not config
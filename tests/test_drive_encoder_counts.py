@@ -1,5 +1,8 @@
 import pytest
 from commands.drive_encoder_counts import DriveEncoderCounts
+from heading_hold import HeadingGains
+from motion_profile import MotionLimits
+from pid_controller import PIDGains
 from subsystems.drivetrain import Drivetrain
 
 
@@ -149,3 +152,96 @@ def test_command_full(robot, drivetrain_default, hal_data, initial_count, count_
     dec.end()
     assert isclose(hal_data['encoder'][0]['count'], initial_count + count_change, threshold)
     assert isclose(hal_data['encoder'][1]['count'], initial_count + count_change, threshold)
+
+
+def test_init_pid(robot, drivetrain_default):
+    robot.drivetrain = drivetrain_default
+    dec = DriveEncoderCounts(robot, 500.0, -0.5, 20.0, pid_gains=PIDGains(0.005, 0.0, 0.0, 0.0, 0.1))
+    assert dec.get_controller() is not None
+    assert dec.get_controller()._max_output == 0.5
+    assert dec.get_controller()._tolerance == 20.0
+
+
+@pytest.mark.parametrize("count_change,speed,left_ex_speed,right_ex_speed", [
+    (500, 1.0, -1.0, 1.0),
+    (50, 1.0, -0.25, 0.25),
+    (-50, 1.0, 0.25, -0.25),
+    (50, -1.0, 0.25, -0.25),
+    (500, 0.5, -0.5, 0.5),
+])
+def test_execute_pid(robot, drivetrain_default, hal_data, count_change, speed, left_ex_speed, right_ex_speed):
+    robot.drivetrain = drivetrain_default
+    dec = DriveEncoderCounts(robot, count_change, speed, 5, pid_gains=PIDGains(0.005, 0.0, 0.0, 0.0, 0.1))
+    dec.initialize()
+    dec.execute()
+    assert hal_data['pwm'][1]['value'] == pytest.approx(left_ex_speed, abs=0.01)
+    assert hal_data['pwm'][2]['value'] == pytest.approx(right_ex_speed, abs=0.01)
+
+
+def test_command_full_pid(robot, drivetrain_default, hal_data, fake_time):
+    # Drive a simple first order model of the drivetrain on the virtual clock
+    robot.drivetrain = drivetrain_default
+    dec = DriveEncoderCounts(robot, 450, 0.5, 20, pid_gains=PIDGains(0.005, 0.0, 0.0003, 0.08, 0.1))
+    dec.initialize()
+    position = 0.0
+    velocity = 0.0
+    for i in range(250):
+        dec.execute()
+        fake_time.increment_time_by(0.02)
+        # A negative left output drives toward positive counts, at up to 900 counts/s
+        velocity += (-hal_data['pwm'][1]['value'] * 900.0 - velocity) * 0.02 / 0.15
+        position += velocity * 0.02
+        hal_data['encoder'][0]['count'] = int(position)
+        hal_data['encoder'][1]['count'] = int(position)
+        if dec.isFinished():
+            break
+    dec.end()
+    controller = dec.get_controller()
+    assert controller.get_settle_time() is not None
+    assert controller.get_settle_time() < 2.0
+    assert controller.get_overshoot() <= 20
+    assert abs(hal_data['encoder'][0]['count'] - 450) <= 20
+    assert hal_data['pwm'][1]['value'] == 0.0
+
+
+def test_command_full_profile(robot, drivetrain_default, hal_data, fake_time):
+    # Same model as above, following a profile instead of stepping to full output
+    robot.drivetrain = drivetrain_default
+    dec = DriveEncoderCounts(robot, 450, 0.5, 20, pid_gains=PIDGains(0.005, 0.0, 0.0003, 0.08, 0.1),
+                             motion_limits=MotionLimits(900.0, 1800.0, 9000.0))
+    dec.initialize()
+    position = 0.0
+    velocity = 0.0
+    last_output = 0.0
+    largest_step = 0.0
+    for i in range(250):
+        dec.execute()
+        fake_time.increment_time_by(0.02)
+        output = -hal_data['pwm'][1]['value']
+        largest_step = max(largest_step, abs(output - last_output))
+        last_output = output
+        velocity += (output * 900.0 - velocity) * 0.02 / 0.15
+        position += velocity * 0.02
+        hal_data['encoder'][0]['count'] = int(position)
+        hal_data['encoder'][1]['count'] = int(position)
+        if dec.isFinished():
+            break
+    dec.end()
+    controller = dec.get_controller()
+    assert controller.get_settle_time() is not None
+    assert abs(hal_data['encoder'][0]['count'] - 450) <= 20
+    # The output ramps instead of stepping to full speed
+    assert largest_step < 0.25
+
+
+def test_execute_heading_hold(robot, drivetrain_default, hal_data):
+    robot.drivetrain = drivetrain_default
+    gains = HeadingGains(PIDGains(0.02, 0.0, 0.0, 0.0, 0.0), PIDGains(0.002, 0.0, 0.0, 0.0, 0.0), 0.3)
+    hal_data['robot']['adxrs450_spi_1_angle'] = 0.0
+    dec = DriveEncoderCounts(robot, 500, 0.5, 20, heading_gains=gains)
+    dec.initialize()
+    hal_data['robot']['adxrs450_spi_1_angle'] = 5.0
+    drivetrain_default.expire_sensor_snapshot()
+    dec.execute()
+    assert hal_data['pwm'][1]['value'] == pytest.approx(-0.4)
+    assert hal_data['pwm'][2]['value'] == pytest.approx(0.5)
@@ -1,6 +1,9 @@
 import pytest
 from commands.drive_time import DriveTime
 from subsystems.drivetrain import Drivetrain
+from heading_hold import HeadingGains
+from pid_controller import PIDGains
+from motion_profile import MotionLimits
 from stopwatch import Stopwatch
 
 
@@ -123,3 +126,50 @@ def test_command_full(robot, drivetrain_default, hal_data, duration, speed, time
     else:
         # TODO: Timeouts don't seem to work in testing?
         assert isclose(sw.elapsed_time_in_secs(), timeout)
+
+
+def test_init_profile(robot, drivetrain_default):
+    robot.drivetrain = drivetrain_default
+    dt = DriveTime(robot, 2.0, -0.5, motion_limits=MotionLimits(900.0, 1800.0, 0.0))
+    # 900 counts at 450 counts/s, with 0.25 s to ramp up and down
+    assert dt._profile.get_distance() == pytest.approx(900.0)
+    assert dt._duration == pytest.approx(2.25, abs=0.02)
+    assert DriveTime(robot, 2.0, 0.0, motion_limits=MotionLimits(900.0, 1800.0, 0.0))._profile is None
+
+
+def test_command_full_profile(robot, drivetrain_default, hal_data, fake_time):
+    robot.drivetrain = drivetrain_default
+    dt = DriveTime(robot, 1.0, -0.5, motion_limits=MotionLimits(900.0, 1800.0, 0.0))
+    dt._stopwatch = Stopwatch(fake_time.get)
+    dt.initialize()
+    outputs = []
+    while not dt.isFinished():
+        dt.execute()
+        outputs.append(hal_data['pwm'][1]['value'])
+        fake_time.increment_time_by(0.02)
+    dt.end()
+    # Ramps from a stop up to the speed and back down
+    assert outputs[0] == 0.0
+    assert min(outputs) == pytest.approx(-0.5, abs=0.01)
+    assert outputs[len(outputs) // 2] == pytest.approx(-0.5, abs=0.01)
+    assert abs(outputs[-1]) < 0.1
+    assert len(outputs) == pytest.approx(62, abs=2)
+
+
+def test_execute_heading_hold(robot, drivetrain_default, hal_data):
+    robot.drivetrain = drivetrain_default
+    gains = HeadingGains(PIDGains(0.02, 0.0, 0.0, 0.0, 0.0), PIDGains(0.002, 0.0, 0.0, 0.0, 0.0), 0.3)
+    hal_data['robot']['adxrs450_spi_1_angle'] = 10.0
+    dt = DriveTime(robot, 5, 0.5, heading_gains=gains)
+    dt.initialize()
+    dt.execute()
+    assert hal_data['pwm'][1]['value'] == 0.5
+    assert hal_data['pwm'][2]['value'] == -0.5
+    # Drifted 5 degrees: turn back
+    hal_data['robot']['adxrs450_spi_1_angle'] = 5.0
+    drivetrain_default.expire_sensor_snapshot()
+    dt.execute()
+    assert hal_data['pwm'][1]['value'] == pytest.approx(0.4)
+    assert hal_data['pwm'][2]['value'] == pytest.approx(-0.5)
+    # Waiting in place does not turn
+    assert DriveTime(robot, 5, 0.0, heading_gains=gains)._heading_hold is None
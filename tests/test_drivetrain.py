@@ -33,6 +33,7 @@ def test_drivetrain_default(drivetrain_default, hal_data):
     assert drivetrain_default._robot_drive is not None
     assert drivetrain_default.is_encoder_enabled() is True
     assert drivetrain_default.is_gyro_enabled() is True
+    assert drivetrain_default.is_encoder_pair_enabled() is True
 
 
 def test_drivetrain_channels_0_1(hal_data, robot):
@@ -144,6 +145,7 @@ def test_drivetrain_full_speed(hal_data, robot, left_speed, right_speed, left_ex
     dt.tank_drive(left_speed, right_speed)
     assert hal_data['pwm'][1]['value'] == left_ex_speed
     assert hal_data['pwm'][2]['value'] == right_ex_speed
+    assert dt.get_motor_outputs() == (left_ex_speed, right_ex_speed)
 
 
 def test_drivetrain_left_inverted(hal_data, robot):
@@ -188,6 +190,8 @@ def test_drivetrain_left_disabled(hal_data, robot):
     assert dt._left_motor is None
     assert dt._right_motor is not None
     assert dt._robot_drive is None
+    assert dt.get_motor_outputs() == (0.0, 0.0)
+    assert dt.is_encoder_pair_enabled() is False
 
 
 def test_drivetrain_right_disabled(hal_data, robot):
@@ -196,3 +200,125 @@ def test_drivetrain_right_disabled(hal_data, robot):
     assert dt._left_motor is not None
     assert dt._right_motor is None
     assert dt._robot_drive is None
+
+
+def test_sensor_snapshot_outside_loop(drivetrain_default, hal_data):
+    hal_data['encoder'][0]['count'] = 100
+    hal_data['encoder'][1]['count'] = 200
+    sensors = drivetrain_default.get_sensor_snapshot()
+    assert sensors.left_encoder == 100
+    assert sensors.right_encoder == 200
+    assert sensors.encoder == 150
+    hal_data['encoder'][0]['count'] = 300
+    hal_data['encoder'][1]['count'] = 300
+    assert drivetrain_default.get_sensor_snapshot().encoder == 300
+    assert drivetrain_default.get_sensor_snapshot_stats() == (0, 2)
+
+
+def test_sensor_snapshot_in_loop(drivetrain_default, hal_data):
+    hal_data['encoder'][0]['count'] = 100
+    hal_data['encoder'][1]['count'] = 100
+    drivetrain_default.update_sensor_snapshot()
+    hal_data['encoder'][0]['count'] = 300
+    hal_data['encoder'][1]['count'] = 300
+    assert drivetrain_default.get_sensor_snapshot().encoder == 100
+    drivetrain_default.tank_drive(0.5, 0.5)
+    assert drivetrain_default.get_sensor_snapshot().encoder == 100
+    assert drivetrain_default.get_sensor_snapshot_stats() == (2, 0)
+    drivetrain_default.expire_sensor_snapshot()
+    assert drivetrain_default.get_sensor_snapshot().encoder == 300
+    assert drivetrain_default.get_sensor_snapshot_stats() == (2, 1)
+
+
+def test_sensor_snapshot_reset_expires(drivetrain_default, hal_data):
+    drivetrain_default.update_sensor_snapshot()
+    drivetrain_default.reset_gyro_angle()
+    drivetrain_default.get_sensor_snapshot()
+    assert drivetrain_default.get_sensor_snapshot_stats() == (0, 1)
+
+
+def test_pose(drivetrain_default, hal_data, fake_time):
+    hal_data['encoder'][0]['count'] = 100
+    hal_data['encoder'][1]['count'] = 100
+    hal_data['robot']['adxrs450_spi_1_angle'] = 0.0
+    assert drivetrain_default.get_pose() is None
+    drivetrain_default.update_sensor_snapshot()
+    assert drivetrain_default.get_pose().x == 0.0
+    hal_data['encoder'][0]['count'] = 1100
+    hal_data['encoder'][1]['count'] = 1100
+    fake_time.increment_time_by(0.02)
+    drivetrain_default.update_sensor_snapshot()
+    pose = drivetrain_default.get_pose()
+    assert pose.x == pytest.approx(1000 * 0.00218)
+    assert pose.y == 0.0
+    assert drivetrain_default.get_pose_at(pose.timestamp - 0.01).x == pytest.approx(500 * 0.00218)
+
+
+def test_pose_sensor_reset(drivetrain_default, hal_data, fake_time):
+    hal_data['robot']['adxrs450_spi_1_angle'] = 30.0
+    drivetrain_default.update_sensor_snapshot()
+    drivetrain_default.reset_pose(1.0, 2.0, 90.0)
+    drivetrain_default.update_sensor_snapshot()
+    # Resetting the gyro does not turn the pose
+    hal_data['robot']['adxrs450_spi_1_angle'] = 0.0
+    drivetrain_default.reset_gyro_angle()
+    fake_time.increment_time_by(0.02)
+    drivetrain_default.update_sensor_snapshot()
+    assert drivetrain_default.get_pose().heading == pytest.approx(90.0)
+    hal_data['robot']['adxrs450_spi_1_angle'] = 10.0
+    fake_time.increment_time_by(0.02)
+    drivetrain_default.update_sensor_snapshot()
+    assert drivetrain_default.get_pose().heading == pytest.approx(100.0)
+    assert drivetrain_default.get_pose().x == 1.0
+
+
+def test_pose_encoder_reset(drivetrain_default, hal_data, fake_time):
+    hal_data['encoder'][0]['count'] = 500
+    hal_data['encoder'][1]['count'] = 500
+    drivetrain_default.update_sensor_snapshot()
+    drivetrain_default.reset_pose(1.0, 2.0, 0.0)
+    drivetrain_default.reset_encoder_value()
+    assert hal_data['encoder'][0]['count'] == 0
+    assert hal_data['encoder'][1]['count'] == 0
+    # Resetting the encoders does not move the pose
+    fake_time.increment_time_by(0.02)
+    drivetrain_default.update_sensor_snapshot()
+    assert drivetrain_default.get_pose().x == pytest.approx(1.0)
+    assert drivetrain_default.get_pose().y == pytest.approx(2.0)
+    hal_data['encoder'][0]['count'] = 100
+    hal_data['encoder'][1]['count'] = 100
+    fake_time.increment_time_by(0.02)
+    drivetrain_default.update_sensor_snapshot()
+    assert drivetrain_default.get_pose().x == pytest.approx(1.0 + 100 * 0.00218)
+
+
+def test_encoder_rates(drivetrain_default, hal_data, fake_time):
+    assert drivetrain_default.get_encoder_rates() == (0.0, 0.0)
+    drivetrain_default.update_sensor_snapshot()
+    hal_data['encoder'][0]['count'] = 10
+    hal_data['encoder'][1]['count'] = -20
+    fake_time.increment_time_by(0.02)
+    drivetrain_default.update_sensor_snapshot()
+    left, right = drivetrain_default.get_encoder_rates()
+    assert left == pytest.approx(500.0)
+    assert right == pytest.approx(-1000.0)
+    # Resetting an encoder is not mistaken for movement
+    drivetrain_default.reset_left_encoder_value()
+    assert drivetrain_default.get_encoder_rates()[0] == 0.0
+
+
+def test_velocity_gains_disabled(drivetrain_default):
+    assert drivetrain_default.get_velocity_gains() is None
+
+
+def test_velocity_gains(robot):
+    dt = Drivetrain(robot, None, '../tests/test_configs/drivetrain_velocity.ini')
+    gains = dt.get_velocity_gains()
+    assert gains.kp == 0.0005
+    assert gains.ki == 0.002
+    assert gains.kd == 0.0
+
+
+def test_velocity_feedforward(drivetrain_default):
+    assert drivetrain_default.get_velocity_feedforward() is None
+    assert drivetrain_default.get_distance_per_count() == 0.00218
@@ -0,0 +1,15 @@
+import pytest
+from feedforward import Feedforward, calculate_feedforward
+
+
+@pytest.mark.parametrize("velocity,acceleration,expected", [
+    (0.0, 0.0, 0.0),
+    (500.0, 0.0, 0.55),
+    (-500.0, 0.0, -0.55),
+    (500.0, 1000.0, 0.75),
+    (0.0, 1000.0, 0.25),
+    (0.0, -1000.0, -0.25),
+])
+def test_calculate_feedforward(velocity, acceleration, expected):
+    feedforward = Feedforward(0.05, 0.001, 0.0002)
+    assert calculate_feedforward(feedforward, velocity, acceleration) == pytest.approx(expected)
@@ -0,0 +1,125 @@
+import struct
+import pytest
+from flight_recorder import FORMAT_VERSION, FlightLog, FlightRecorder
+from oi import OI, JoystickAxis
+from sim_runner import PyfrcHooks
+from subsystems.drivetrain import Drivetrain
+from subsystems.gear_feeder import GearFeeder
+from subsystems.winch import Winch
+
+
+@pytest.fixture(scope="function")
+def recorder_default(robot):
+    robot.oi = OI(robot, '../tests/test_configs/joysticks_default.ini')
+    robot.drivetrain = Drivetrain(robot, None, '../tests/test_configs/drivetrain_default.ini')
+    robot.winch = Winch(robot, None, '../tests/test_configs/winch_default.ini')
+    robot.gear_feeder = GearFeeder(robot, None, '../tests/test_configs/gear_feeder_default.ini')
+    return FlightRecorder(robot, capacity=4, flush_period=60.0)
+
+
+def test_recorder_default(recorder_default):
+    assert recorder_default is not None
+    assert recorder_default.get_count() == 0
+    assert recorder_default.get_dropped() == 0
+    assert recorder_default.flush() == 0
+    with pytest.raises(IndexError):
+        recorder_default.get_record()
+
+
+def test_record(robot, recorder_default, hal_data):
+    hal_data['joysticks'][1]['axes'][JoystickAxis.LEFTY] = 0.5
+    hal_data['joysticks'][2]['povs'][0] = 90
+    PyfrcHooks.update_driver_station()
+    robot.oi.update_inputs()
+    robot.drivetrain.update_sensor_snapshot()
+    robot.drivetrain.tank_drive(0.25, -0.25)
+    robot.winch.move_winch(0.75)
+    robot.gear_feeder.set_gear_release(True)
+    recorder_default.record()
+
+    record = recorder_default.get_record()
+    assert recorder_default.get_count() == 1
+    assert len(record) == len(FlightRecorder.FIELDS)
+    assert record["driver_left_y"] == 0.5
+    assert record["driver_left_x"] == 0.0
+    assert record["scoring_dpad_x"] == 1.0
+    assert record["left_output"] == pytest.approx(0.25)
+    assert record["right_output"] == pytest.approx(0.25)
+    assert record["winch_speed"] == 0.75
+    assert record["gear_release"] == 1.0
+
+
+def test_record_wraps(robot, recorder_default):
+    for speed in (0.1, 0.2, 0.3, 0.4, 0.5, 0.6):
+        robot.winch.move_winch(speed)
+        recorder_default.record()
+    assert recorder_default.get_count() == 6
+    assert recorder_default.get_record(0)["winch_speed"] == 0.6
+    assert recorder_default.get_record(3)["winch_speed"] == 0.3
+    with pytest.raises(IndexError):
+        recorder_default.get_record(4)
+
+
+def test_flight_log(robot, recorder_default, tmp_path):
+    path = FlightRecorder.next_log_path(str(tmp_path / "logs"))
+    assert path.endswith("flight_000.bin")
+    assert recorder_default.start(path) is True
+    for speed in (0.1, 0.2, 0.3):
+        robot.winch.move_winch(speed)
+        recorder_default.record()
+    assert recorder_default.flush() == 3
+    # More records than the buffer holds between flushes
+    for speed in (0.4, 0.5, 0.6, 0.7, 0.8, 0.9):
+        robot.winch.move_winch(speed)
+        recorder_default.record()
+    recorder_default.stop()
+    assert recorder_default.get_dropped() == 2
+    assert FlightRecorder.next_log_path(str(tmp_path / "logs")).endswith("flight_001.bin")
+
+    log = FlightLog(path)
+    assert log.version == FORMAT_VERSION
+    assert log.fields == FlightRecorder.FIELDS
+    assert len(log) == 7
+    assert [log.get(i, "winch_speed") for i in range(len(log))] == [0.1, 0.2, 0.3, 0.6, 0.7, 0.8, 0.9]
+    assert log.get_record(6)["winch_speed"] == 0.9
+    log.close()
+
+
+def test_flight_log_not_a_log(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        FlightLog(str(path))
+
+
+def write_log(path, header, fields, records):
+    """Write a flight log by hand, in little-endian byte order."""
+    with open(path, "wb") as log_file:
+        log_file.write(header)
+        for name in fields:
+            log_file.write(struct.pack("<32s", name.encode("ascii")))
+        for record in records:
+            log_file.write(struct.pack("<%dd" % len(fields), *record))
+
+
+def test_flight_log_byte_order(tmp_path):
+    path = str(tmp_path / "flight_000.bin")
+    header_size = 20 + 32 * 2
+    write_log(path, struct.pack("<8sIII", b"FLTLOG\0\0", FORMAT_VERSION, 2, header_size), ("a", "b"),
+              [(1.5, -2.0), (3.0, 4.25)])
+    with open(path, "ab") as log_file:
+        # A record cut short by a crash is ignored
+        log_file.write(b"\0" * 4)
+    log = FlightLog(path)
+    assert log.header_size == header_size
+    assert len(log) == 2
+    assert log.get(0, "b") == -2.0
+    assert log.get_record(1) == {"a": 3.0, "b": 4.25}
+    log.close()
+
+
+def test_flight_log_newer_version(tmp_path):
+    path = str(tmp_path / "flight_000.bin")
+    write_log(path, struct.pack("<8sIII", b"FLTLOG\0\0", FORMAT_VERSION + 1, 1, 20 + 32), ("a",), [(1.0,)])
+    with pytest.raises(ValueError):
+        FlightLog(path)
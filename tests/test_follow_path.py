@@ -0,0 +1,122 @@
+import math
+import pytest
+from commands.autonomous_hang_gear import AutonomousHangGear
+from commands.follow_path import FollowPath
+from path_planner import Waypoint, generate_path
+from subsystems.drivetrain import Drivetrain
+from subsystems.gear_feeder import GearFeeder
+from subsystems.winch import Winch
+
+
+@pytest.fixture(scope="function")
+def drivetrain_default(robot):
+    return Drivetrain(robot, None, '../tests/test_configs/drivetrain_default.ini')
+
+
+def simulate(command, drivetrain, hal_data, fake_time, max_loops=500):
+    """Run a command against a model of the drivetrain and return the number of loops it ran for, or None."""
+    # Each side moves up to 10 ft/s, with the signs of Drivetrain
+    left = float(hal_data['encoder'][0]['count'])
+    right = float(hal_data['encoder'][1]['count'])
+    angle = hal_data['robot']['adxrs450_spi_1_angle']
+    drivetrain.update_sensor_snapshot()
+    command.initialize()
+    for i in range(max_loops):
+        command.execute()
+        fake_time.increment_time_by(0.02)
+        left_speed = -hal_data['pwm'][1]['value'] * 10.0
+        right_speed = hal_data['pwm'][2]['value'] * 10.0
+        left += left_speed * 0.02 / 0.00218
+        right += right_speed * 0.02 / 0.00218
+        angle += math.degrees((left_speed - right_speed) / 2.0 * 0.02)
+        hal_data['encoder'][0]['count'] = int(round(left))
+        hal_data['encoder'][1]['count'] = int(round(right))
+        hal_data['robot']['adxrs450_spi_1_angle'] = angle
+        drivetrain.update_sensor_snapshot()
+        if command.isFinished():
+            command.end()
+            return i + 1
+    command.end()
+    return None
+
+
+def test_init(robot, drivetrain_default):
+    robot.drivetrain = drivetrain_default
+    path = generate_path([Waypoint(0.0, 0.0, 0.0), Waypoint(5.0, 0.0, 0.0)], 0.1)
+    fp = FollowPath(robot, path, -0.5, 1.5, 0.25)
+    assert fp.name == "FollowPath"
+    assert fp._speed == 0.5
+    assert fp._lookahead_points == 15
+    assert fp._track_width == 2.0
+
+
+def test_execute_straight(robot, drivetrain_default, hal_data):
+    robot.drivetrain = drivetrain_default
+    path = generate_path([Waypoint(0.0, 0.0, 0.0), Waypoint(5.0, 0.0, 0.0)], 0.1)
+    fp = FollowPath(robot, path, 0.5, 1.5, 0.25)
+    drivetrain_default.update_sensor_snapshot()
+    fp.initialize()
+    fp.execute()
+    assert hal_data['pwm'][1]['value'] == pytest.approx(-0.5)
+    assert hal_data['pwm'][2]['value'] == pytest.approx(0.5)
+    assert fp.isFinished() is False
+
+
+@pytest.mark.parametrize("end", [
+    Waypoint(5.0, 0.0, 0.0),
+    Waypoint(7.0, 3.0, 60.0),
+    Waypoint(7.0, -3.0, -60.0),
+])
+def test_command_full(robot, drivetrain_default, hal_data, fake_time, end):
+    robot.drivetrain = drivetrain_default
+    hal_data['encoder'][0]['count'] = 1000
+    hal_data['encoder'][1]['count'] = 500
+    hal_data['robot']['adxrs450_spi_1_angle'] = 30.0
+    path = generate_path([Waypoint(0.0, 0.0, 0.0), end], 0.05)
+    fp = FollowPath(robot, path, 0.5, 1.5, 0.25)
+    # Starts from wherever the robot is
+    drivetrain_default.update_sensor_snapshot()
+    drivetrain_default.reset_pose(3.0, 4.0, 30.0)
+    loops = simulate(fp, drivetrain_default, hal_data, fake_time)
+    assert loops is not None
+    # In one continuous motion at close to the path speed
+    assert loops * 0.02 < path.get_length() / 5.0 + 1.0
+    pose = drivetrain_default.get_pose()
+    heading = math.radians(30.0)
+    x = 3.0 + end.x * math.cos(heading) - end.y * math.sin(heading)
+    y = 4.0 + end.x * math.sin(heading) + end.y * math.cos(heading)
+    assert math.hypot(pose.x - x, pose.y - y) <= 0.3
+    assert pose.heading == pytest.approx(30.0 + end.heading, abs=10.0)
+    assert hal_data['pwm'][1]['value'] == 0.0
+
+
+@pytest.mark.parametrize("position,path_commands", [
+    (1, 1),
+    (2, 0),
+    (3, 1),
+])
+def test_hang_gear_plan(robot, drivetrain_default, tmpdir, position, path_commands):
+    robot.drivetrain = drivetrain_default
+    robot.winch = Winch(robot, None, '../tests/test_configs/winch_default.ini')
+    robot.gear_feeder = GearFeeder(robot, None, '../tests/test_configs/gear_feeder_default.ini')
+    plan = AutonomousHangGear(robot, '../tests/test_configs/autonomous_default.ini')
+    plan.path_cache_directory = str(tmpdir)
+    plan.set_match_configuration(position)
+    hang_gear_commands = plan.commands[1].command
+    commands = [entry.command for entry in hang_gear_commands.commands]
+    assert sum(isinstance(command, FollowPath) for command in commands) == path_commands
+    assert len(tmpdir.listdir()) == path_commands
+
+
+def test_hang_gear_plan_no_heading(robot, tmpdir):
+    # One encoder and no gyro cannot track the heading, so the plan drives and turns to the lift instead
+    robot.drivetrain = Drivetrain(robot, None, '../tests/test_configs/drivetrain_left_encoder_only.ini')
+    robot.winch = Winch(robot, None, '../tests/test_configs/winch_default.ini')
+    robot.gear_feeder = GearFeeder(robot, None, '../tests/test_configs/gear_feeder_default.ini')
+    plan = AutonomousHangGear(robot, '../tests/test_configs/autonomous_default.ini')
+    plan.path_cache_directory = str(tmpdir)
+    plan.set_match_configuration(1)
+    hang_gear_commands = plan.commands[1].command
+    commands = [entry.command for entry in hang_gear_commands.commands]
+    assert not any(isinstance(command, FollowPath) for command in commands)
+    assert tmpdir.listdir() == []
@@ -48,6 +48,7 @@ def test_set_gear_feeder(robot, hal_data, state, ex_state):
     assert gr._solenoid is not None
     gr.set_gear_release(state)
     assert hal_data['solenoid'][0]['value'] == ex_state
+    assert gr.get_gear_release() == ex_state
 
 
 def test_gear_feeder_disabled(robot, hal_data):
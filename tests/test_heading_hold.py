@@ -0,0 +1,57 @@
+import pytest
+from commands.autonomous_config import AutonomousConfig, heading_gains
+from config_store import ConfigStore
+from heading_hold import HeadingGains, HeadingHold
+from pid_controller import PIDGains
+from subsystems.drivetrain import Drivetrain, DrivetrainSensors
+
+
+GAINS = HeadingGains(PIDGains(0.02, 0.0, 0.0, 0.0, 0.0), PIDGains(0.002, 0.0, 0.0, 0.0, 0.0), 0.3)
+
+
+@pytest.fixture(scope="function")
+def drivetrain_default(robot):
+    return Drivetrain(robot, None, '../tests/test_configs/drivetrain_default.ini')
+
+
+@pytest.fixture(scope="function")
+def drivetrain_left_disabled(robot):
+    return Drivetrain(robot, None, '../tests/test_configs/drivetrain_left_disabled.ini')
+
+
+def test_gyro(drivetrain_default):
+    heading_hold = HeadingHold(GAINS)
+    heading_hold.reset(drivetrain_default, DrivetrainSensors(0.0, 0, 0, 0, 10.0))
+    assert heading_hold.is_using_gyro()
+    assert heading_hold.calculate(DrivetrainSensors(0.02, 0, 0, 0, 10.0)) == 0.0
+    # Turned to a smaller angle: turn back with a positive output
+    assert heading_hold.calculate(DrivetrainSensors(0.04, 0, 0, 0, 5.0)) == pytest.approx(0.1)
+    assert heading_hold.calculate(DrivetrainSensors(0.06, 0, 0, 0, 12.0)) == pytest.approx(-0.04)
+    # Limited to the maximum correction
+    assert heading_hold.calculate(DrivetrainSensors(0.08, 0, 0, 0, 50.0)) == pytest.approx(-0.3)
+
+
+def test_encoder_fallback(drivetrain_default):
+    drivetrain_default._gyro = None
+    heading_hold = HeadingHold(GAINS)
+    heading_hold.reset(drivetrain_default, DrivetrainSensors(0.0, 100, 100, 100, 45.0))
+    assert not heading_hold.is_using_gyro()
+    # The gyro angle is ignored
+    assert heading_hold.calculate(DrivetrainSensors(0.02, 200, 200, 200, 0.0)) == 0.0
+    # The right side travelled further
+    assert heading_hold.calculate(DrivetrainSensors(0.04, 300, 350, 325, 0.0)) == pytest.approx(0.1)
+    assert heading_hold.calculate(DrivetrainSensors(0.06, 400, 375, 388, 0.0)) == pytest.approx(-0.05)
+
+
+def test_no_sensors(drivetrain_left_disabled):
+    heading_hold = HeadingHold(GAINS)
+    heading_hold.reset(drivetrain_left_disabled, DrivetrainSensors(0.0, 0, 100, 100, 0.0))
+    assert not heading_hold.is_using_gyro()
+    assert heading_hold.calculate(DrivetrainSensors(0.02, 0, 300, 300, 20.0)) == 0.0
+
+
+def test_heading_gains(robot):
+    config = ConfigStore.get_instance().get(AutonomousConfig, '../tests/test_configs/autonomous_default.ini')
+    assert heading_gains(config) == HeadingGains(PIDGains(0.02, 0.0, 0.001, 0.0, 0.0),
+                                                 PIDGains(0.002, 0.0, 0.0, 0.0, 0.0), 0.3)
+    assert heading_gains(config._replace(heading_hold_enabled=False)) is None
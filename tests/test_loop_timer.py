@@ -0,0 +1,67 @@
+import pytest
+from loop_timer import LoopTimer
+
+
+@pytest.fixture(scope="function")
+def loop_timer_default(robot, clock):
+    return LoopTimer(clock=clock)
+
+
+def run_loop(loop_timer, clock, start, duration):
+    clock.now = start
+    loop_timer.begin_loop()
+    clock.now = start + duration
+    return loop_timer.end_loop()
+
+
+def test_loop_timer_default(loop_timer_default):
+    assert loop_timer_default is not None
+    assert loop_timer_default.get_count() == 0
+    assert loop_timer_default.get_percentile(50) is None
+    assert loop_timer_default.get_mean() is None
+    assert len(loop_timer_default.get_histogram()) == 50
+
+
+def test_end_loop_without_begin(loop_timer_default):
+    assert loop_timer_default.end_loop() is None
+    assert loop_timer_default.get_count() == 0
+
+
+@pytest.mark.parametrize("duration,bucket,overrun", [
+    (0.0005, 0, 0),
+    (0.0105, 10, 0),
+    (0.0205, 20, 1),
+    (0.5, 49, 1),
+])
+def test_end_loop(loop_timer_default, clock, duration, bucket, overrun):
+    assert run_loop(loop_timer_default, clock, 1.0, duration) == pytest.approx(duration)
+    assert loop_timer_default.get_histogram()[bucket] == 1
+    assert loop_timer_default.get_overruns() == overrun
+    assert loop_timer_default.get_max() == pytest.approx(duration)
+
+
+def test_percentiles(loop_timer_default, clock):
+    for i in range(99):
+        run_loop(loop_timer_default, clock, i * 0.02, 0.0015)
+    run_loop(loop_timer_default, clock, 2.0, 0.0305)
+    assert loop_timer_default.get_count() == 100
+    assert loop_timer_default.get_percentile(50) == pytest.approx(0.002)
+    assert loop_timer_default.get_percentile(99) == pytest.approx(0.002)
+    assert loop_timer_default.get_percentile(100) == pytest.approx(0.031)
+    assert loop_timer_default.get_overruns() == 1
+
+
+def test_jitter(loop_timer_default, clock):
+    run_loop(loop_timer_default, clock, 0.0, 0.001)
+    run_loop(loop_timer_default, clock, 0.02, 0.001)
+    run_loop(loop_timer_default, clock, 0.045, 0.001)
+    assert loop_timer_default.get_max_jitter() == pytest.approx(0.005)
+
+
+def test_reset(loop_timer_default, clock):
+    run_loop(loop_timer_default, clock, 0.0, 0.03)
+    loop_timer_default.log_report()
+    loop_timer_default.reset()
+    assert loop_timer_default.get_count() == 0
+    assert loop_timer_default.get_overruns() == 0
+    assert sum(loop_timer_default.get_histogram()) == 0
@@ -0,0 +1,84 @@
+import concurrent.futures
+import multiprocessing
+import struct
+from flight_recorder import FlightLog, FlightRecorder
+from match_replay import MatchReplay, _get_pov, replay_log
+from oi import JoystickAxis, JoystickButtons
+from sim_runner import SimRunner
+
+
+def record_match(robot, fake_time, hal_data, path):
+    """Run a short simulated match with scripted driver inputs, recording it to a flight log."""
+    steps = []
+
+    def on_step(tm):
+        if not steps:
+            robot.flight_recorder.start(path)
+        steps.append(tm)
+        driver = hal_data['joysticks'][robot.oi.get_port(0)]
+        scoring = hal_data['joysticks'][robot.oi.get_port(1)]
+        driver['axes'][JoystickAxis.LEFTY] = -0.5 if len(steps) % 20 < 10 else 0.3
+        driver['axes'][JoystickAxis.RIGHTY] = -0.6
+        driver['povs'][0] = 0 if 80 <= len(steps) < 85 else -1
+        scoring['axes'][JoystickAxis.RIGHTY] = 0.4 if len(steps) > 90 else 0.0
+        scoring['buttons'][JoystickButtons.A] = 70 <= len(steps) < 75
+
+    runner = SimRunner(robot, fake_time, disabled_period=0.2, autonomous_period=1.0, teleop_period=1.0,
+                       autonomous_choice="Cross Line", position_choice="Center", on_step=on_step)
+    runner.run()
+    robot.flight_recorder.stop()
+
+
+def write_value(path, index, field, value):
+    """Change one value of a flight log."""
+    log = FlightLog(path)
+    fields = log.fields
+    header_size = log.header_size
+    log.close()
+    with open(path, "r+b") as log_file:
+        log_file.seek(header_size + 8 * (index * len(fields) + fields.index(field)))
+        log_file.write(struct.pack("<d", value))
+
+
+def test_get_pov():
+    assert _get_pov(0.0, 0.0) == -1
+    assert _get_pov(1.0, 0.0) == 90
+    assert _get_pov(-1.0, 0.0) == 270
+    assert _get_pov(0.0, -1.0) == 0
+    assert _get_pov(0.0, 1.0) == 180
+
+
+def test_replay(robot, fake_time, hal_data, tmp_path):
+    path = str(tmp_path / "flight_000.bin")
+    record_match(robot, fake_time, hal_data, path)
+    log = FlightLog(path)
+    assert len(log) == 100
+    assert log.get(0, "mode") == FlightRecorder.MODE_AUTONOMOUS
+    assert log.get(0, "auto_choice") == 1.0
+    assert log.get(0, "position_choice") == 2.0
+    assert log.get(99, "mode") == FlightRecorder.MODE_TELEOP
+    assert [log.get(i, "scoring_buttons") for i in range(100)].count(1 << (JoystickButtons.A - 1)) == 5
+    assert [log.get(i, "driver_dpad_y") for i in range(100)].count(-1.0) == 5
+    log.close()
+
+    # Perturb a drive input, which changes that loop's drive outputs
+    perturbed = str(tmp_path / "flight_001.bin")
+    with open(path, "rb") as source, open(perturbed, "wb") as target:
+        target.write(source.read())
+    write_value(perturbed, 65, "driver_left_y", 1.0)
+
+    # Each replay starts a robot in a simulation of its own, in a worker process
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2,
+                                                mp_context=multiprocessing.get_context("spawn")) as executor:
+        result, perturbed_result = executor.map(replay_log, [path, perturbed], [0.2, 0.2])
+
+    assert result.records == 100
+    assert result.compared == 100
+    assert result.mismatches == []
+    assert all(error < 0.01 for error in result.max_errors.values())
+    assert result.speedup > 1.0
+
+    assert perturbed_result.compared == 100
+    assert {mismatch.index for mismatch in perturbed_result.mismatches} == {65}
+    assert perturbed_result.mismatches[0].field == "left_output"
+    assert set(MatchReplay.OUTPUT_FIELDS) == set(perturbed_result.max_errors)
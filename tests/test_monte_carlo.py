@@ -0,0 +1,144 @@
+import pytest
+from monte_carlo import MonteCarlo, NoiseLevels, Trial, TrialResult, draw_noise, percentile
+
+CONFIG = '../tests/test_configs/autonomous_default.ini'
+LEVELS = NoiseLevels(2.0, 0.2, 0.1, 0.05, 0.002)
+
+
+def run_trial_model(trial):
+    """Stand-in for the simulator: the stopping point moves with the motor scales."""
+    if trial.noise is None:
+        return TrialResult(trial.program, trial.position, trial.seed, True, True, 3.0, 10.0, 0.0, 0.0)
+    encoder_noise, gyro_drift, left_scale, right_scale, motor_lag = trial.noise
+    error = (left_scale + right_scale - 2.0) * 10.0
+    completed = trial.program != "AutonomousHangGear"
+    return TrialResult(trial.program, trial.position, trial.seed, False, completed, 3.0 + error if completed else None,
+                       10.0 + error, 0.0, gyro_drift * 10.0)
+
+
+def test_draw_noise():
+    noise = draw_noise(LEVELS, 3)
+    assert noise == draw_noise(LEVELS, 3)
+    assert noise != draw_noise(LEVELS, 4)
+    assert noise.encoder_noise == 2.0
+    assert noise.motor_lag == 0.05
+    assert -0.2 <= noise.gyro_drift <= 0.2
+    assert 0.9 <= noise.left_scale <= 1.1
+    assert 0.9 <= noise.right_scale <= 1.1
+
+
+def test_percentile():
+    assert percentile([], 0.5) is None
+    assert percentile([3.0], 0.9) == 3.0
+    assert percentile([5, 1, 4, 2, 3], 0.5) == 3
+    assert percentile(list(range(1, 11)), 0.9) == 9
+    assert percentile(list(range(1, 11)), 0.0) == 1
+    assert percentile(list(range(1, 11)), 1.0) == 10
+
+
+def test_run():
+    monte_carlo = MonteCarlo(CONFIG, positions=(1, 2), runs=20, levels=LEVELS, distance_tolerance=1.0,
+                             run_trial=run_trial_model)
+    summaries = monte_carlo.run(processes=1)
+    assert len(summaries) == 6
+    assert monte_carlo.get_nominal("AutonomousCrossLine", 1).x == 10.0
+    assert len(monte_carlo.get_results("AutonomousCrossLine", 1)) == 20
+    # Every routine and position gets the same draws
+    assert [result.seed for result in monte_carlo.get_results("AutonomousHangCenter", 2)] == list(range(20))
+    for summary in summaries:
+        assert summary.runs == 20
+        assert summary.nominal_time == 3.0
+        if summary.program == "AutonomousHangGear":
+            assert summary.success_rate == 0.0
+            assert summary.completion_rate == 0.0
+            assert summary.median_time is None
+        else:
+            assert 0.0 < summary.success_rate < 1.0
+            assert summary.completion_rate == 1.0
+            assert summary.median_time <= summary.p90_time <= summary.max_time
+            assert summary.mean_pose_error <= summary.p90_pose_error <= summary.max_pose_error
+            assert summary.p90_angle_error <= 2.0
+
+
+def test_is_success():
+    monte_carlo = MonteCarlo(CONFIG, programs=("AutonomousCrossLine",), positions=(2,), runs=1,
+                             run_trial=run_trial_model)
+    monte_carlo.run(processes=1)
+    assert monte_carlo.get_errors(TrialResult("AutonomousCrossLine", 2, 0, False, True, 3.0, 10.3, 0.4, 359.0)) == \
+        (pytest.approx(0.5), pytest.approx(1.0))
+    assert monte_carlo.is_success(TrialResult("AutonomousCrossLine", 2, 0, False, True, 3.0, 10.2, 0.3, 359.0))
+    assert not monte_carlo.is_success(TrialResult("AutonomousCrossLine", 2, 0, False, False, None, 10.0, 0.0, 0.0))
+    assert not monte_carlo.is_success(TrialResult("AutonomousCrossLine", 2, 0, False, True, 3.0, 11.0, 0.0, 0.0))
+    assert not monte_carlo.is_success(TrialResult("AutonomousCrossLine", 2, 0, False, True, 3.0, 10.0, 0.0, 10.0))
+
+
+def test_write_report(tmpdir):
+    monte_carlo = MonteCarlo(CONFIG, runs=5, levels=LEVELS, run_trial=run_trial_model)
+    monte_carlo.run(processes=1)
+    path = tmpdir.join("report.txt")
+    monte_carlo.write_report(str(path))
+    lines = path.readlines()
+    assert lines[0].startswith("Monte Carlo report: 5 runs")
+    assert len(lines) == 5 + 9
+    # Least robust first
+    assert lines[5].startswith("AutonomousHangGear")
+
+
+def test_run_simulated():
+    # Each run starts the robot in a simulation of its own, in a worker process
+    monte_carlo = MonteCarlo(CONFIG, programs=("AutonomousCrossLine",), positions=(2,), runs=2, levels=LEVELS,
+                             autonomous_period=2.0)
+    summaries = monte_carlo.run(processes=2)
+    assert len(summaries) == 1
+    assert summaries[0].runs == 2
+    nominal = monte_carlo.get_nominal("AutonomousCrossLine", 2)
+    noisy = monte_carlo.get_results("AutonomousCrossLine", 2)
+    assert nominal.x != 0.0 or nominal.y != 0.0
+    # The motors of each noisy run are off by a different amount, so it stops somewhere else
+    assert (noisy[0].x, noisy[0].y) != (nominal.x, nominal.y)
+    assert (noisy[0].x, noisy[0].y) != (noisy[1].x, noisy[1].y)
+
+
+def run_trial_unfinished(trial):
+    """Stand-in for the simulator in which AutonomousHangGear never finishes, even without noise."""
+    result = run_trial_model(trial)
+    if trial.program == "AutonomousHangGear":
+        result = result._replace(completed=False, completion_time=None)
+    return result
+
+
+def test_nominal_unfinished(tmpdir):
+    monte_carlo = MonteCarlo(CONFIG, positions=(1,), runs=5, levels=LEVELS, run_trial=run_trial_unfinished)
+    summaries = {summary.program: summary for summary in monte_carlo.run(processes=1)}
+    hang_gear = summaries["AutonomousHangGear"]
+    assert hang_gear.nominal_time is None
+    assert hang_gear.success_rate is None
+    assert hang_gear.mean_pose_error is None
+    assert hang_gear.p90_angle_error is None
+    # A run that stops where an unfinished noise-free run stopped has not succeeded
+    nominal = monte_carlo.get_nominal("AutonomousHangGear", 1)
+    assert not monte_carlo.is_success(nominal._replace(nominal=False, completed=True, completion_time=3.0))
+    assert summaries["AutonomousCrossLine"].success_rate is not None
+
+    path = tmpdir.join("report.txt")
+    monte_carlo.write_report(str(path))
+    lines = path.readlines()
+    assert lines[5].split()[:3] == ["AutonomousHangGear", "1", "*"]
+    assert lines[-1].startswith("* did not finish without noise")
+
+
+def test_run_simulated_sensors():
+    # Encoder noise only reaches the routines when the subsystems enable the encoders
+    levels = NoiseLevels(5.0, 0.0, 0.0, 0.0, 0.0)
+    runs = []
+    for subsystems in (None, '../tests/test_configs/subsystems_sensors.ini'):
+        monte_carlo = MonteCarlo(CONFIG, programs=("AutonomousCrossLine",), positions=(1,), runs=1, levels=levels,
+                                 autonomous_period=4.0, subsystems_configfile=subsystems)
+        monte_carlo.run(processes=2)
+        nominal = monte_carlo.get_nominal("AutonomousCrossLine", 1)
+        noisy = monte_carlo.get_results("AutonomousCrossLine", 1)[0]
+        assert nominal.completed
+        runs.append(((nominal.completion_time, nominal.x), (noisy.completion_time, noisy.x)))
+    (nominal, noisy), (sensors_nominal, sensors_noisy) = runs
+    assert noisy == nominal
+    assert sensors_noisy != sensors_nominal
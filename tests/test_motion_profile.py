@@ -0,0 +1,75 @@
+import pytest
+from commands.autonomous_config import AutonomousConfig, motion_limits
+from config_store import ConfigStore
+from motion_profile import MotionLimits, MotionProfile
+
+
+def test_trapezoid():
+    profile = MotionProfile(1000.0, 500.0, 1000.0)
+    # 0.5 s up to 500, 1.5 s cruise, 0.5 s down
+    assert profile.get_duration() == pytest.approx(2.5, abs=0.02)
+    assert profile.get_distance() == 1000.0
+    assert profile.get_max_velocity() == 500.0
+    assert profile.get_position(0.0) == 0.0
+    assert profile.get_velocity(0.0) == 0.0
+    assert profile.get_velocity(0.25) == pytest.approx(250.0, rel=0.02)
+    assert profile.get_velocity(1.25) == pytest.approx(500.0, rel=0.02)
+    assert profile.get_position(1.25) == pytest.approx(500.0, rel=0.02)
+    assert profile.get_position(profile.get_duration()) == pytest.approx(1000.0)
+    assert profile.get_velocity(profile.get_duration()) == 0.0
+    # Past the end the profile holds its last setpoint
+    assert profile.get_position(10.0) == pytest.approx(1000.0)
+
+
+def test_triangle():
+    profile = MotionProfile(100.0, 500.0, 1000.0)
+    # Too short to reach 500: peaks at sqrt(100 * 1000) halfway through
+    assert profile.get_duration() == pytest.approx(0.64, abs=0.02)
+    peak = max(profile.get_velocity(i * 0.02) for i in range(40))
+    assert peak == pytest.approx(316.0, rel=0.05)
+    assert profile.get_position(profile.get_duration()) == pytest.approx(100.0)
+
+
+def test_s_curve():
+    trapezoid = MotionProfile(1000.0, 500.0, 1000.0)
+    s_curve = MotionProfile(1000.0, 500.0, 1000.0, 5000.0)
+    # The acceleration ramps up over 0.2 s, so the move takes longer
+    assert s_curve.get_duration() > trapezoid.get_duration()
+    assert s_curve.get_position(s_curve.get_duration()) == pytest.approx(1000.0)
+    # No step in acceleration at the start
+    assert s_curve.get_velocity(0.02) < trapezoid.get_velocity(0.02)
+    last_acceleration = 0.0
+    for i in range(1, 10):
+        acceleration = (s_curve.get_velocity(i * 0.02) - s_curve.get_velocity((i - 1) * 0.02)) / 0.02
+        assert acceleration - last_acceleration <= 5000.0 * 0.02 + 1.0
+        last_acceleration = acceleration
+
+
+def test_negative_distance():
+    profile = MotionProfile(-1000.0, 500.0, 1000.0)
+    assert profile.get_duration() == pytest.approx(2.5, abs=0.02)
+    assert profile.get_velocity(1.25) == pytest.approx(-500.0, rel=0.02)
+    assert profile.get_position(profile.get_duration()) == pytest.approx(-1000.0)
+
+
+def test_zero_distance():
+    profile = MotionProfile(0.0, 500.0, 1000.0)
+    assert profile.get_duration() == 0.0
+    assert profile.get_position(0.5) == 0.0
+    assert profile.get_velocity(0.5) == 0.0
+
+
+@pytest.mark.parametrize("max_velocity,max_acceleration", [
+    (0.0, 1000.0),
+    (500.0, 0.0),
+    (-500.0, 1000.0),
+])
+def test_invalid_limits(max_velocity, max_acceleration):
+    with pytest.raises(ValueError):
+        MotionProfile(1000.0, max_velocity, max_acceleration)
+
+
+def test_motion_limits(robot):
+    config = ConfigStore.get_instance().get(AutonomousConfig, '../tests/test_configs/autonomous_default.ini')
+    assert motion_limits(config) == MotionLimits(900.0, 1800.0, 9000.0)
+    assert motion_limits(config._replace(profile_enabled=False)) is None
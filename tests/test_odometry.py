@@ -0,0 +1,87 @@
+import math
+import pytest
+from odometry import Odometry, Pose
+
+
+@pytest.fixture(scope="function")
+def odometry():
+    return Odometry(0.01, 2.0, 10)
+
+
+def test_first_update(odometry):
+    assert odometry.get_pose() is None
+    assert odometry.get_pose_at(0.0) is None
+    odometry.update(1.0, 500, 300, 45.0)
+    # Only sets the starting point
+    assert odometry.get_pose() == Pose(1.0, 0.0, 0.0, 0.0)
+
+
+def test_straight(odometry):
+    odometry.update(0.0, 0, 0, 0.0)
+    odometry.update(0.02, 100, 100, 0.0)
+    assert odometry.get_pose() == pytest.approx(Pose(0.02, 1.0, 0.0, 0.0))
+    odometry.update(0.04, 0, 0, 0.0)
+    assert odometry.get_pose() == pytest.approx(Pose(0.04, 0.0, 0.0, 0.0))
+
+
+def test_gyro_heading(odometry):
+    odometry.update(0.0, 0, 0, 10.0)
+    odometry.update(0.02, 0, 0, 100.0)
+    assert odometry.get_pose().heading == pytest.approx(90.0)
+    # Heading 90 is to the right
+    odometry.update(0.04, 100, 100, 100.0)
+    assert odometry.get_pose() == pytest.approx(Pose(0.04, 0.0, 1.0, 90.0))
+
+
+def test_encoder_heading(odometry):
+    # Turning in place: the left side forward and the right side back by a quarter circle each
+    quarter = int(round(math.pi / 2 * 1.0 / 0.01))
+    odometry.update(0.0, 0, 0)
+    odometry.update(0.02, quarter, -quarter)
+    assert odometry.get_pose().heading == pytest.approx(90.0, abs=0.5)
+    assert odometry.get_pose().x == pytest.approx(0.0)
+
+
+def test_arc(odometry):
+    # A quarter circle of radius 1 ft to the right in small steps
+    odometry.update(0.0, 0, 0, 0.0)
+    steps = 100
+    for i in range(1, steps + 1):
+        odometry.update(i * 0.02, i * math.pi / 2 * 1.0 / 0.01 / steps, i * math.pi / 2 * 1.0 / 0.01 / steps,
+                        90.0 * i / steps)
+    pose = odometry.get_pose()
+    assert pose.x == pytest.approx(1.0, abs=0.001)
+    assert pose.y == pytest.approx(1.0, abs=0.001)
+    assert pose.heading == pytest.approx(90.0)
+
+
+def test_reset(odometry):
+    odometry.update(0.0, 0, 0, 0.0)
+    odometry.update(0.02, 100, 100, 0.0)
+    odometry.reset(5.0, 2.0, 180.0)
+    odometry.update(0.04, 200, 200, 0.0)
+    assert odometry.get_pose() == pytest.approx(Pose(0.04, 5.0, 2.0, 180.0))
+    assert odometry.get_history_length() == 1
+    odometry.update(0.06, 300, 300, 0.0)
+    assert odometry.get_pose() == pytest.approx(Pose(0.06, 4.0, 2.0, 180.0))
+
+
+def test_reset_sensors(odometry):
+    odometry.update(0.0, 0, 0, 0.0)
+    odometry.update(0.02, 100, 100, 0.0)
+    odometry.update(0.04, 100, 100, 30.0)
+    odometry.reset_sensors(0, 0, 0.0)
+    odometry.update(0.06, 0, 0, 0.0)
+    assert odometry.get_pose() == pytest.approx(Pose(0.06, 1.0, 0.0, 30.0))
+
+
+def test_history(odometry):
+    for i in range(25):
+        odometry.update(i * 0.02, i * 10, i * 10, 0.0)
+    assert odometry.get_history_length() == 10
+    assert odometry.get_pose_at(0.40) == pytest.approx(Pose(0.40, 2.0, 0.0, 0.0))
+    assert odometry.get_pose_at(0.41) == pytest.approx(Pose(0.41, 2.05, 0.0, 0.0))
+    assert odometry.get_pose_at(0.48) == pytest.approx(Pose(0.48, 2.4, 0.0, 0.0))
+    # Outside the history
+    assert odometry.get_pose_at(1.0) == pytest.approx(Pose(0.48, 2.4, 0.0, 0.0))
+    assert odometry.get_pose_at(0.0) == pytest.approx(Pose(0.30, 1.5, 0.0, 0.0))
@@ -1,14 +1,105 @@
 import pytest
-from oi import UserController, JoystickAxis, JoystickButtons
+from oi import OI, UserController, JoystickAxis, JoystickButtons
+from sim_runner import PyfrcHooks
+from triggers.oi_button import OIButton
 
 
-#@pytest.fixture(scope="function")
-#def oi(robot):
-#    from oi import OI
-#    return OI(robot)
+@pytest.fixture(scope="function")
+def oi_default(robot):
+    return OI(robot, '../tests/test_configs/joysticks_default.ini')
 
 
-#def test_get_axis(oi):
-    # TODO set mock joystick value
-#    value = oi.get_axis(UserController.DRIVER, JoystickAxis.LEFTX)
-#    assert value == -1.0
+def set_joystick(hal_data, port, axes=None, buttons=None, pov=-1):
+    joystick = hal_data['joysticks'][port]
+    for axis, value in (axes or {}).items():
+        joystick['axes'][axis] = value
+    for button in (buttons or []):
+        joystick['buttons'][button] = True
+    joystick['povs'][0] = pov
+    PyfrcHooks.update_driver_station()
+
+
+def clear_buttons(hal_data, port):
+    hal_data['joysticks'][port]['buttons'] = [None] + [False] * 12
+    PyfrcHooks.update_driver_station()
+
+
+@pytest.mark.parametrize("value,ex_value", [
+    (0.0, 0.0),
+    (0.04, 0.0),
+    (-0.04, 0.0),
+    (0.05, 0.05),
+    (-0.5, -0.5),
+    (1.0, 1.0),
+])
+def test_get_axis(oi_default, hal_data, value, ex_value):
+    set_joystick(hal_data, 1, {JoystickAxis.LEFTY: value})
+    assert oi_default.get_axis(UserController.DRIVER, JoystickAxis.LEFTY) == pytest.approx(ex_value)
+    oi_default.update_inputs()
+    assert oi_default.get_axis(UserController.DRIVER, JoystickAxis.LEFTY) == pytest.approx(ex_value)
+
+
+@pytest.mark.parametrize("pov,ex_x,ex_y", [
+    (-1, 0.0, 0.0),
+    (0, 0.0, -1.0),
+    (90, 1.0, 0.0),
+    (180, 0.0, 1.0),
+    (270, -1.0, 0.0),
+    (45, 0.0, 0.0),
+])
+def test_get_axis_dpad(oi_default, hal_data, pov, ex_x, ex_y):
+    set_joystick(hal_data, 2, pov=pov)
+    assert oi_default.get_axis(UserController.SCORING, JoystickAxis.DPADX) == ex_x
+    assert oi_default.get_axis(UserController.SCORING, JoystickAxis.DPADY) == ex_y
+    oi_default.update_inputs()
+    assert oi_default.get_axis(UserController.SCORING, JoystickAxis.DPADX) == ex_x
+    assert oi_default.get_axis(UserController.SCORING, JoystickAxis.DPADY) == ex_y
+
+
+def test_update_inputs(oi_default, hal_data):
+    set_joystick(hal_data, 1, {JoystickAxis.RIGHTY: 0.5})
+    oi_default.update_inputs()
+    set_joystick(hal_data, 1, {JoystickAxis.RIGHTY: -0.5})
+    assert oi_default.get_axis(UserController.DRIVER, JoystickAxis.RIGHTY) == 0.5
+    oi_default.expire_inputs()
+    assert oi_default.get_axis(UserController.DRIVER, JoystickAxis.RIGHTY) == -0.5
+
+
+def test_get_axis_not_polled(oi_default, hal_data):
+    # An axis past the configured axis count reads the controller, as it does without polled inputs
+    set_joystick(hal_data, 1, {8: 0.5})
+    oi_default.update_inputs()
+    assert oi_default.get_axis(UserController.DRIVER, 8) == 0.5
+    set_joystick(hal_data, 1, {8: 0.02})
+    assert oi_default.get_axis(UserController.DRIVER, 8) == 0.0
+
+
+def test_get_button_state(oi_default, hal_data):
+    set_joystick(hal_data, 2, buttons=[JoystickButtons.A])
+    assert oi_default.get_button_state(UserController.SCORING, JoystickButtons.A) is True
+    assert oi_default.get_button_state(UserController.SCORING, JoystickButtons.B) is False
+    oi_default.update_inputs()
+    assert oi_default.get_button_state(UserController.SCORING, JoystickButtons.A) is True
+    assert oi_default.get_button_state(UserController.SCORING, JoystickButtons.B) is False
+    assert oi_default.get_button_state(UserController.DRIVER, JoystickButtons.A) is False
+
+
+def test_button_edges(oi_default, hal_data):
+    oi_default.update_inputs()
+    set_joystick(hal_data, 1, buttons=[JoystickButtons.RIGHTTRIGGER])
+    oi_default.update_inputs()
+    assert oi_default.get_button_pressed(UserController.DRIVER, JoystickButtons.RIGHTTRIGGER) is True
+    assert oi_default.get_button_released(UserController.DRIVER, JoystickButtons.RIGHTTRIGGER) is False
+    oi_default.update_inputs()
+    assert oi_default.get_button_pressed(UserController.DRIVER, JoystickButtons.RIGHTTRIGGER) is False
+    clear_buttons(hal_data, 1)
+    oi_default.update_inputs()
+    assert oi_default.get_button_released(UserController.DRIVER, JoystickButtons.RIGHTTRIGGER) is True
+
+
+def test_oi_button(oi_default, hal_data):
+    button = OIButton(oi_default, UserController.SCORING, JoystickButtons.B)
+    assert button.get() is False
+    set_joystick(hal_data, 2, buttons=[JoystickButtons.B])
+    oi_default.update_inputs()
+    assert button.get() is True
@@ -0,0 +1,96 @@
+import math
+import os
+import pytest
+from commands.autonomous_config import AutonomousConfig, hang_gear_waypoints
+from config_store import ConfigStore
+from path_planner import Path, Waypoint, generate_path, load_path, path_key
+
+
+def test_straight():
+    path = generate_path([Waypoint(0.0, 0.0, 0.0), Waypoint(5.0, 0.0, 0.0)], 0.1)
+    assert len(path) == 51
+    assert path.get_length() == pytest.approx(5.0)
+    assert path.get_point(0) == pytest.approx((0.0, 0.0))
+    assert path.get_point(25) == pytest.approx((2.5, 0.0))
+    assert path.get_point(50) == pytest.approx((5.0, 0.0))
+    # Clamped to the ends
+    assert path.get_point(100) == pytest.approx((5.0, 0.0))
+
+
+def test_even_spacing():
+    path = generate_path([Waypoint(0.0, 0.0, 0.0), Waypoint(7.0, 3.0, 60.0)], 0.05)
+    assert path.get_point(len(path) - 1) == pytest.approx((7.0, 3.0))
+    for i in range(1, len(path)):
+        x0, y0 = path.get_point(i - 1)
+        x1, y1 = path.get_point(i)
+        assert math.hypot(x1 - x0, y1 - y0) == pytest.approx(path.get_spacing(), rel=0.01)
+    # Leaves straight ahead and arrives at the heading
+    x, y = path.get_point(2)
+    assert math.degrees(math.atan2(y, x)) == pytest.approx(0.0, abs=1.0)
+    x0, y0 = path.get_point(len(path) - 3)
+    x1, y1 = path.get_point(len(path) - 1)
+    assert math.degrees(math.atan2(y1 - y0, x1 - x0)) == pytest.approx(60.0, abs=1.0)
+
+
+def test_closest_index():
+    path = generate_path([Waypoint(0.0, 0.0, 0.0), Waypoint(5.0, 0.0, 0.0)], 0.1)
+    assert path.get_closest_index(1.02, 0.3, 0, 100) == 10
+    # Only searches the window
+    assert path.get_closest_index(4.0, 0.0, 0, 10) == 9
+    assert path.get_closest_index(0.0, 0.0, 20, 10) == 20
+
+
+def test_too_few_waypoints():
+    with pytest.raises(ValueError):
+        generate_path([Waypoint(0.0, 0.0, 0.0)])
+
+
+def test_path_key():
+    waypoints = [Waypoint(0.0, 0.0, 0.0), Waypoint(7.0, 3.0, 60.0)]
+    assert path_key(waypoints, 0.05) == path_key(list(waypoints), 0.05)
+    assert path_key(waypoints, 0.05) != path_key(waypoints, 0.1)
+    assert path_key(waypoints, 0.05) != path_key([Waypoint(0.0, 0.0, 0.0), Waypoint(7.0, -3.0, -60.0)], 0.05)
+
+
+def test_save_load(tmpdir):
+    path = generate_path([Waypoint(0.0, 0.0, 0.0), Waypoint(7.0, 3.0, 60.0)], 0.05)
+    filename = str(tmpdir.join("path.bin"))
+    path.save(filename)
+    loaded = Path.load(filename)
+    assert len(loaded) == len(path)
+    assert loaded.get_spacing() == path.get_spacing()
+    for i in range(len(path)):
+        assert loaded.get_point(i) == path.get_point(i)
+
+
+def test_load_bad_file(tmpdir):
+    filename = str(tmpdir.join("path.bin"))
+    with open(filename, "wb") as bad_file:
+        bad_file.write(b"NOTAPATH" + bytes(12))
+    with pytest.raises(ValueError):
+        Path.load(filename)
+
+
+def test_load_path_cache(tmpdir):
+    waypoints = [Waypoint(0.0, 0.0, 0.0), Waypoint(7.0, 3.0, 60.0)]
+    directory = str(tmpdir.join("paths"))
+    path = load_path(waypoints, 0.05, directory)
+    cache_file = os.path.join(directory, "path_%s.bin" % path_key(waypoints, 0.05))
+    assert os.path.exists(cache_file)
+    # Served from the cache file from then on
+    os.utime(cache_file, (0, 0))
+    cached = load_path(waypoints, 0.05, directory)
+    assert os.path.getmtime(cache_file) == 0
+    assert len(cached) == len(path)
+    assert cached.get_point(len(path) // 2) == path.get_point(len(path) // 2)
+    # Generated again if the cache is damaged
+    with open(cache_file, "wb") as bad_file:
+        bad_file.write(b"NOTAPATH" + bytes(12))
+    assert len(load_path(waypoints, 0.05, directory)) == len(path)
+    assert Path.load(cache_file).get_point(1) == path.get_point(1)
+
+
+def test_hang_gear_waypoints(robot):
+    config = ConfigStore.get_instance().get(AutonomousConfig, '../tests/test_configs/autonomous_default.ini')
+    assert hang_gear_waypoints(config, 1) == (Waypoint(0.0, 0.0, 0.0), Waypoint(7.0, 3.0, 60.0))
+    assert hang_gear_waypoints(config, 3) == (Waypoint(0.0, 0.0, 0.0), Waypoint(7.0, -3.0, -60.0))
@@ -0,0 +1,180 @@
+import math
+import pytest
+from pyfrc.physics.core import PhysicsInterface
+from physics import NO_NOISE, PhysicsEngine, PhysicsNoise
+from subsystems.drivetrain import Drivetrain
+from subsystems.winch import Winch
+
+
+@pytest.fixture(scope="function")
+def physics_controller(tmpdir, fake_time):
+    # No physics.py in the robot path, so the interface does not create the robot's engine
+    config = {'pyfrc': {'robot': {'starting_x': 0.0, 'starting_y': 0.0, 'starting_angle': 0.0}}}
+    controller = PhysicsInterface(str(tmpdir), fake_time, config)
+    controller._set_robot_enabled(True)
+    return controller
+
+
+@pytest.fixture(scope="function")
+def physics_default(physics_controller):
+    return PhysicsEngine(physics_controller, '../tests/test_configs/physics_default.ini')
+
+
+@pytest.fixture(scope="function")
+def drivetrain_default(robot):
+    return Drivetrain(robot, None, '../tests/test_configs/drivetrain_default.ini')
+
+
+def run(physics, hal_data, seconds, tm_diff=0.02):
+    for i in range(int(round(seconds / tm_diff))):
+        physics.update_sim(hal_data, i * tm_diff, tm_diff)
+
+
+def test_physics_default(physics_default, physics_controller, hal_data):
+    assert physics_default is not None
+    assert physics_controller.device_gyro_channels == ['adxrs450_spi_1_angle']
+    assert hal_data['robot']['adxrs450_spi_1_angle'] == 0
+
+
+def test_physics_drive_forward(physics_default, physics_controller, drivetrain_default, hal_data):
+    drivetrain_default.tank_drive(-0.5, -0.5)
+    run(physics_default, hal_data, 1.0)
+    x, y, angle = physics_controller.get_position()
+    # 2.5 feet at half of the full output speed
+    assert math.hypot(x, y) == pytest.approx(2.5)
+    assert hal_data['robot']['adxrs450_spi_1_angle'] == pytest.approx(0.0)
+    counts = int(2.5 / drivetrain_default.get_distance_per_count())
+    assert hal_data['encoder'][0]['count'] == pytest.approx(counts, abs=1)
+    assert hal_data['encoder'][1]['count'] == pytest.approx(counts, abs=1)
+
+
+def test_physics_drive_backward(physics_default, drivetrain_default, hal_data):
+    drivetrain_default.tank_drive(0.5, 0.5)
+    run(physics_default, hal_data, 1.0)
+    assert hal_data['encoder'][0]['count'] < 0
+    assert hal_data['encoder'][1]['count'] < 0
+
+
+def test_physics_turn(physics_default, drivetrain_default, hal_data):
+    drivetrain_default.tank_drive(-0.5, 0.5)
+    run(physics_default, hal_data, 0.5)
+    left = hal_data['encoder'][0]['count']
+    right = hal_data['encoder'][1]['count']
+    assert left > 0
+    assert right == pytest.approx(-left, abs=1)
+    # A turn that counts the left encoder up turns the gyro clockwise
+    assert hal_data['robot']['adxrs450_spi_1_angle'] > 0.0
+    drivetrain_default.update_sensor_snapshot()
+    assert drivetrain_default.get_gyro_angle() == pytest.approx(hal_data['robot']['adxrs450_spi_1_angle'])
+
+
+def test_physics_encoder_not_reversed(physics_default, drivetrain_default, hal_data):
+    # The simulated HAL does not apply REVERSED to the count, so the physics does
+    drivetrain_default._left_encoder.setReverseDirection(False)
+    drivetrain_default.tank_drive(-0.5, -0.5)
+    run(physics_default, hal_data, 1.0)
+    assert hal_data['encoder'][0]['count'] < 0
+    assert hal_data['encoder'][1]['count'] > 0
+
+
+def test_physics_shipped_drive_direction(physics_controller, robot, hal_data):
+    # With the shipped motors and encoders, DriveEncoderCounts at the shipped negative speeds drives its
+    # output of -speed toward a higher count, and the encoders count up
+    config = '../tests/test_configs/subsystems_sensors.ini'
+    physics = PhysicsEngine(physics_controller, config)
+    drivetrain = Drivetrain(robot, None, config)
+    drivetrain.arcade_drive(0.5, 0.0, False)
+    run(physics, hal_data, 1.0)
+    drivetrain.update_sensor_snapshot()
+    assert drivetrain.get_right_encoder_value() > 0
+    x, y, angle = physics_controller.get_position()
+    assert x > 0.0
+
+
+def test_physics_encoder_reset(physics_default, drivetrain_default, hal_data):
+    drivetrain_default.tank_drive(-0.5, -0.5)
+    run(physics_default, hal_data, 0.5)
+    drivetrain_default._left_encoder.reset()
+    assert hal_data['encoder'][0]['count'] == 0
+    run(physics_default, hal_data, 0.5)
+    counts = int(1.25 / drivetrain_default.get_distance_per_count())
+    assert hal_data['encoder'][0]['count'] == pytest.approx(counts, abs=1)
+
+
+def test_physics_disabled(physics_default, physics_controller, drivetrain_default, hal_data):
+    physics_controller._set_robot_enabled(False)
+    drivetrain_default.tank_drive(-0.5, -0.5)
+    run(physics_default, hal_data, 1.0)
+    assert physics_controller.get_position() == (0.0, 0.0, 0.0)
+    assert hal_data['encoder'][0]['count'] == 0
+
+
+def test_physics_winch(physics_default, drivetrain_default, robot, hal_data):
+    winch = Winch(robot, None, '../tests/test_configs/physics_default.ini')
+    winch.move_winch(0.5)
+    run(physics_default, hal_data, 1.0)
+    assert hal_data['encoder'][0]['count'] == 0
+    assert hal_data['encoder'][2]['count'] == pytest.approx(PhysicsEngine.winch_speed * 0.5, abs=1)
+
+
+def test_physics_encoder_noise(physics_default, drivetrain_default, hal_data):
+    physics_default.set_noise(NO_NOISE._replace(encoder_noise=3.0), seed=1)
+    drivetrain_default.tank_drive(-0.5, -0.5)
+    readings = []
+    for i in range(50):
+        physics_default.update_sim(hal_data, i * 0.02, 0.02)
+        readings.append(hal_data['encoder'][0]['count'])
+    counts = int(2.5 / drivetrain_default.get_distance_per_count())
+    # Each reading is off, but the errors do not add up
+    assert readings[-1] == pytest.approx(counts, abs=15)
+    steps = [later - earlier for earlier, later in zip(readings, readings[1:])]
+    assert max(steps) - min(steps) > 2
+
+
+def test_physics_encoder_noise_seed(physics_controller, drivetrain_default, hal_data):
+    physics = PhysicsEngine(physics_controller, '../tests/test_configs/physics_default.ini')
+    drivetrain_default.tank_drive(-0.5, -0.5)
+    readings = []
+    for seed in (4, 4, 5):
+        hal_data['encoder'][0]['count'] = 0
+        physics.set_noise(NO_NOISE._replace(encoder_noise=3.0), seed)
+        run(physics, hal_data, 0.2)
+        readings.append(hal_data['encoder'][0]['count'])
+    assert readings[0] == readings[1]
+
+
+def test_physics_gyro_drift(physics_default, physics_controller, hal_data):
+    physics_default.set_noise(NO_NOISE._replace(gyro_drift=0.5))
+    run(physics_default, hal_data, 2.0)
+    assert hal_data['robot']['adxrs450_spi_1_angle'] == pytest.approx(1.0)
+    assert physics_controller.get_position() == (0.0, 0.0, 0.0)
+
+
+def test_physics_motor_scale(physics_default, physics_controller, drivetrain_default, hal_data):
+    physics_default.set_noise(PhysicsNoise(0.0, 0.0, 0.8, 1.0, 0.0))
+    drivetrain_default.tank_drive(-0.5, -0.5)
+    run(physics_default, hal_data, 1.0)
+    # The slow left side turns the robot to the left
+    assert hal_data['robot']['adxrs450_spi_1_angle'] < 0.0
+    left = hal_data['encoder'][0]['count']
+    right = hal_data['encoder'][1]['count']
+    assert left == pytest.approx(0.8 * right, abs=2)
+
+
+def test_physics_motor_lag(physics_default, drivetrain_default, hal_data):
+    physics_default.set_noise(NO_NOISE._replace(motor_lag=0.1))
+    drivetrain_default.tank_drive(-0.5, -0.5)
+    run(physics_default, hal_data, 0.1)
+    counts_per_step = 0.5 * PhysicsEngine.drivetrain_speed * 0.02 / drivetrain_default.get_distance_per_count()
+    # The motors are still getting up to speed
+    assert hal_data['encoder'][0]['count'] < 0.75 * 5 * counts_per_step
+    start = hal_data['encoder'][0]['count']
+    run(physics_default, hal_data, 1.0)
+    assert hal_data['encoder'][0]['count'] - start == pytest.approx(50 * counts_per_step, rel=0.05)
+
+
+def test_physics_configure(physics_default, physics_controller, hal_data):
+    physics_default.configure('../tests/test_configs/subsystems_sensors.ini')
+    assert 'adxrs450_spi_0_angle' in physics_controller.device_gyro_channels
+    assert physics_default.set_gyro_angle(hal_data, 10.0)
+    assert hal_data['robot']['adxrs450_spi_0_angle'] == 10.0
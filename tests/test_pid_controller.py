@@ -0,0 +1,89 @@
+import pytest
+from commands.autonomous_config import AutonomousConfig, distance_pid_gains
+from config_store import ConfigStore
+from pid_controller import PIDFController, PIDGains
+
+
+@pytest.fixture(scope="function")
+def controller_p():
+    controller = PIDFController(PIDGains(0.01, 0.0, 0.0, 0.0, 0.1), 5.0, 0.5)
+    controller.reset(100.0, 0.0, 0.0)
+    return controller
+
+
+@pytest.mark.parametrize("measurement,ex_output", [
+    (0.0, 0.5),
+    (80.0, 0.2),
+    (100.0, 0.0),
+    (130.0, -0.3),
+    (200.0, -0.5),
+])
+def test_calculate_proportional(controller_p, measurement, ex_output):
+    assert controller_p.calculate(measurement, 0.02) == pytest.approx(ex_output)
+
+
+@pytest.mark.parametrize("measurement,ex_output", [
+    (90.0, 0.2),
+    (97.0, 0.03),
+    (110.0, -0.2),
+])
+def test_calculate_feedforward(measurement, ex_output):
+    controller = PIDFController(PIDGains(0.01, 0.0, 0.0, 0.1, 0.0), 5.0)
+    controller.reset(100.0, 0.0, 0.0)
+    assert controller.calculate(measurement, 0.02) == pytest.approx(ex_output)
+
+
+def test_calculate_derivative():
+    controller = PIDFController(PIDGains(0.0, 0.0, 0.01, 0.0, 0.0), 5.0)
+    controller.reset(100.0, 0.0, 0.0)
+    assert controller.calculate(0.0, 0.0) == 0.0
+    # Error shrinking by 10 over 0.1 s
+    assert controller.calculate(10.0, 0.1) == pytest.approx(-1.0)
+
+
+def test_calculate_integral_limited():
+    controller = PIDFController(PIDGains(0.0, 1.0, 0.0, 0.0, 0.0), 5.0, 0.5)
+    controller.reset(100.0, 0.0, 0.0)
+    for i in range(1, 10):
+        output = controller.calculate(0.0, i * 0.02)
+    assert output == pytest.approx(0.5)
+    # The integral unwinds as soon as the error changes sign
+    assert controller.calculate(101.0, 0.2) < 0.5
+
+
+def test_settle(controller_p):
+    controller_p.calculate(50.0, 0.5)
+    assert controller_p.is_settled(0.5) is False
+    controller_p.calculate(98.0, 1.0)
+    assert controller_p.is_settled(1.0) is False
+    controller_p.calculate(99.0, 1.05)
+    assert controller_p.is_settled(1.05) is False
+    controller_p.calculate(101.0, 1.1)
+    assert controller_p.is_settled(1.1) is True
+    assert controller_p.get_settle_time() == pytest.approx(1.0)
+
+
+def test_settle_reentered(controller_p):
+    controller_p.calculate(98.0, 1.0)
+    controller_p.calculate(110.0, 1.05)
+    controller_p.calculate(100.0, 1.1)
+    assert controller_p.is_settled(1.15) is False
+    assert controller_p.is_settled(1.25) is True
+    assert controller_p.get_settle_time() == pytest.approx(1.1)
+    assert controller_p.get_overshoot() == pytest.approx(10.0)
+
+
+def test_overshoot_reset(controller_p):
+    controller_p.calculate(120.0, 0.5)
+    assert controller_p.get_overshoot() == pytest.approx(20.0)
+    controller_p.reset(0.0, 120.0, 1.0)
+    assert controller_p.get_overshoot() == 0.0
+    assert controller_p.get_settle_time() is None
+    controller_p.calculate(-5.0, 1.5)
+    assert controller_p.get_overshoot() == pytest.approx(5.0)
+
+
+def test_distance_pid_gains(robot):
+    config = ConfigStore.get_instance().get(AutonomousConfig, '../tests/test_configs/autonomous_default.ini')
+    assert distance_pid_gains(config) == PIDGains(0.005, 0.0, 0.0003, 0.08, 0.1)
+    assert distance_pid_gains(config._replace(distance_pid_enabled=False)) is None
@@ -0,0 +1,35 @@
+import pytest
+from rate_estimator import RateEstimator
+
+
+def test_init():
+    estimator = RateEstimator()
+    assert estimator.get_rate() == 0.0
+
+
+def test_update():
+    estimator = RateEstimator(3)
+    assert estimator.update(0.0, 0.0) == 0.0
+    assert estimator.update(0.02, 10.0) == pytest.approx(500.0)
+    assert estimator.update(0.04, 30.0) == pytest.approx(750.0)
+    assert estimator.update(0.06, 30.0) == pytest.approx(500.0)
+    # The oldest reading drops out of the window
+    assert estimator.update(0.08, 30.0) == pytest.approx(20.0 / 0.06)
+    assert estimator.get_rate() == pytest.approx(20.0 / 0.06)
+
+
+def test_update_same_time():
+    estimator = RateEstimator(3)
+    estimator.update(0.0, 0.0)
+    estimator.update(0.02, 10.0)
+    assert estimator.update(0.0, 10.0) == pytest.approx(500.0)
+
+
+def test_reset():
+    estimator = RateEstimator(3)
+    estimator.update(0.0, 0.0)
+    estimator.update(0.02, 10.0)
+    estimator.reset()
+    assert estimator.get_rate() == 0.0
+    assert estimator.update(0.04, 0.0) == 0.0
+    assert estimator.update(0.06, -10.0) == pytest.approx(-500.0)
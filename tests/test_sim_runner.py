@@ -0,0 +1,133 @@
+import concurrent.futures
+import multiprocessing
+import time
+import pytest
+from wpilib.driverstation import DriverStation
+from physics import PhysicsNoise
+from sim_runner import PyfrcHooks, SimRunner, start_simulation, stop_simulation
+from stopwatch import Stopwatch
+
+
+@pytest.fixture(scope="function")
+def sim_runner_default(robot, fake_time):
+    return SimRunner(robot, fake_time, disabled_period=0.2, autonomous_period=0.4, teleop_period=0.4)
+
+
+def test_sim_runner_default(sim_runner_default):
+    assert sim_runner_default is not None
+    assert sim_runner_default.get_match_length() == pytest.approx(1.0)
+
+
+def test_run(robot, sim_runner_default):
+    result = sim_runner_default.run()
+    assert result.loops == 50
+    assert result.sim_time == pytest.approx(1.0, abs=0.03)
+    assert result.wall_time > 0.0
+    assert result.speedup == pytest.approx(result.sim_time / result.wall_time)
+    assert robot.teleopInitialized is True
+    assert robot.loop_timer.get_count() > 0
+
+
+def test_run_modes(robot, fake_time, control):
+    modes = []
+    runner = SimRunner(robot, fake_time, disabled_period=0.1, autonomous_period=0.1, teleop_period=0.1,
+                       on_step=lambda tm: modes.append(control.get_mode()))
+    runner.run()
+    assert modes == ["disabled"] * 5 + ["autonomous"] * 5 + ["teleop"] * 5
+
+
+def test_run_virtual_clock(robot, fake_time):
+    stopwatches = []
+    runner = SimRunner(robot, fake_time, disabled_period=0.1, autonomous_period=0.0, teleop_period=0.0,
+                       on_step=lambda tm: stopwatches.append(Stopwatch()))
+    runner.run()
+    assert stopwatches[0]._clock == fake_time.get
+    assert Stopwatch.default_clock is time.perf_counter
+
+
+def test_run_stop_early(robot, fake_time):
+    steps = []
+
+    def on_step(tm):
+        steps.append(tm)
+        return len(steps) <= 5
+
+    runner = SimRunner(robot, fake_time, disabled_period=0.1, autonomous_period=0.1, teleop_period=0.1,
+                       on_step=on_step)
+    result = runner.run()
+    assert result.loops == 5
+
+
+def test_run_loop_jitter(robot, fake_time):
+    steps = []
+    runner = SimRunner(robot, fake_time, disabled_period=0.1, autonomous_period=0.4, teleop_period=0.0,
+                       on_step=lambda tm: steps.append(tm), loop_jitter=0.004, seed=1)
+    result = runner.run()
+    assert result.loops == 25
+    periods = [later - earlier for earlier, later in zip(steps, steps[1:])]
+    assert min(periods) >= 0.01 - 1e-9
+    assert max(periods) <= 0.03 + 1e-9
+    assert max(periods) - min(periods) > 0.005
+
+
+def test_run_noise(robot, fake_time):
+    noise = PhysicsNoise(2.0, 0.5, 0.9, 1.1, 0.05)
+    runner = SimRunner(robot, fake_time, disabled_period=0.1, autonomous_period=0.1, teleop_period=0.0,
+                       noise=noise, seed=3)
+    assert runner._physics.engine._noise == noise
+
+
+def test_pyfrc_hooks(fake_time):
+    hooks = PyfrcHooks(fake_time)
+    next_time = hooks.get_next_loop_time()
+    hooks.set_next_loop_time(next_time + 0.005)
+    assert fake_time.next_ds_time == pytest.approx(next_time + 0.005)
+
+
+def test_pyfrc_hooks_update_driver_station(hal_data):
+    hal_data['joysticks'][1]['axes'][0] = 0.5
+    PyfrcHooks.update_driver_station()
+    assert DriverStation.getInstance().getStickAxis(1, 0) == 0.5
+
+
+def test_pyfrc_hooks_missing(fake_time):
+    # A pyfrc without one of the internals the simulation uses fails when the hooks are created
+    class ChangedPhysics(object):
+        pass
+
+    with pytest.raises(RuntimeError) as error:
+        PyfrcHooks(fake_time, ChangedPhysics())
+    assert "PhysicsInterface._set_robot_enabled" in str(error.value)
+
+
+def test_run_subsystems_config(robot, fake_time, hal_data):
+    # The robot's subsystems and the physics model read the same configuration file
+    robot.subsystems_config_file = '../tests/test_configs/subsystems_sensors.ini'
+    runner = SimRunner(robot, fake_time, disabled_period=0.1, autonomous_period=0.0, teleop_period=0.0)
+    runner.run()
+    # The left encoder is on channel 0
+    assert robot.drivetrain.is_encoder_pair_enabled()
+    assert robot.drivetrain.is_gyro_enabled()
+    assert 'adxrs450_spi_0_angle' in hal_data['robot']
+
+
+def start_robots():
+    """Start the robot in two simulations in turn and return the NetworkTables mode of each, in a worker process."""
+    from networktables import NetworkTables
+    from robot import MyRobot
+    modes = []
+    for i in range(2):
+        fake_time = start_simulation()
+        try:
+            MyRobot()
+            modes.append(NetworkTables._mode)
+        finally:
+            stop_simulation(fake_time)
+    return modes
+
+
+def test_simulation_networktables_test_mode():
+    # No simulation starts a NetworkTables server, which would take the port from other simulations
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) \
+            as executor:
+        assert executor.submit(start_robots).result() == ["test-server", "test-server"]
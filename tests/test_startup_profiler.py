@@ -0,0 +1,65 @@
+import builtins
+import sys
+import pytest
+from startup_profiler import StartupProfiler
+
+
+def test_startup_profiler_default():
+    profiler = StartupProfiler()
+    assert profiler.get_steps() == []
+    assert profiler.get_elapsed() == 0.0
+    assert profiler.get_imports() == []
+    assert profiler.is_installed() is False
+
+
+def test_mark():
+    times = iter([1.0, 1.5, 2.25, 4.0])
+    profiler = StartupProfiler(clock=lambda: next(times))
+    assert profiler.mark("first") == pytest.approx(0.5)
+    assert profiler.mark("second") == pytest.approx(0.75)
+    assert profiler.get_steps() == [("first", pytest.approx(0.5)), ("second", pytest.approx(0.75))]
+    assert profiler.get_elapsed() == pytest.approx(1.25)
+
+
+def test_mark_start():
+    profiler = StartupProfiler(clock=lambda: 3.0, start=1.0)
+    assert profiler.mark("imports") == 2.0
+
+
+def test_imports(tmpdir, monkeypatch):
+    tmpdir.join("startup_outer.py").write("import startup_inner\nimport time\ntime.sleep(0.01)\n")
+    tmpdir.join("startup_inner.py").write("import time\ntime.sleep(0.02)\n")
+    monkeypatch.syspath_prepend(str(tmpdir))
+    original_import = builtins.__import__
+    profiler = StartupProfiler()
+    profiler.install()
+    assert profiler.is_installed() is True
+    try:
+        import startup_outer
+    finally:
+        profiler.uninstall()
+        sys.modules.pop("startup_outer", None)
+        sys.modules.pop("startup_inner", None)
+    assert builtins.__import__ is original_import
+    assert profiler.is_installed() is False
+
+    imports = {module: (total, own) for module, total, own in profiler.get_imports()}
+    # Modules already imported are not timed
+    assert "time" not in imports
+    outer_total, outer_own = imports["startup_outer"]
+    inner_total, inner_own = imports["startup_inner"]
+    assert inner_own == pytest.approx(inner_total)
+    assert inner_total >= 0.02
+    assert outer_own >= 0.01
+    assert outer_total == pytest.approx(outer_own + inner_total)
+    assert profiler.get_imports()[0][0] == "startup_inner"
+
+
+def test_robot_init(robot):
+    robot.robotInit()
+    steps = [step for step, elapsed in robot.startup_profiler.get_steps()]
+    assert steps[0] == "imports and wpilib startup"
+    assert "drivetrain" in steps
+    assert all(elapsed >= 0.0 for step, elapsed in robot.startup_profiler.get_steps())
+    # The autonomous programs are built later, while disabled
+    assert robot.autonomous_plans.is_complete() is False
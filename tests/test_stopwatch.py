@@ -1,18 +1,25 @@
+import time
 import pytest
 from stopwatch import Stopwatch
 
+
 @pytest.fixture(scope="function")
 def stopwatch_default(robot):
     return Stopwatch()
 
 
+@pytest.fixture(scope="function")
+def stopwatch_laps(robot, clock):
+    return Stopwatch(clock, lap_capacity=3)
+
+
 def test_stopwatch_default(stopwatch_default):
     assert stopwatch_default is not None
+    assert stopwatch_default._clock is time.perf_counter
     assert stopwatch_default._start is None
     assert stopwatch_default._end is None
-    assert stopwatch_default._secs is None
-    assert stopwatch_default._msecs is None
     assert stopwatch_default._running is False
+    assert stopwatch_default.get_lap_count() == 0
 
 
 def test_start(stopwatch_default):
@@ -20,8 +27,6 @@ def test_start(stopwatch_default):
     assert stopwatch_default._start is not None
     assert stopwatch_default._running is True
     assert stopwatch_default._end is None
-    assert stopwatch_default._secs is None
-    assert stopwatch_default._msecs is None
 
 
 def test_reset(stopwatch_default):
@@ -32,8 +37,6 @@ def test_reset(stopwatch_default):
     assert stopwatch_default._start != start_time
     assert stopwatch_default._running is True
     assert stopwatch_default._end is None
-    assert stopwatch_default._secs is None
-    assert stopwatch_default._msecs is None
 
 
 @pytest.mark.parametrize("started", [
@@ -50,8 +53,6 @@ def test_stop(stopwatch_default, started):
     else:
         assert stopwatch_default._start is None
         assert stopwatch_default._end is None
-    assert stopwatch_default._secs is None
-    assert stopwatch_default._msecs is None
     assert stopwatch_default._running is False
 
 
@@ -65,17 +66,13 @@ def test_elapsed_time_in_secs(stopwatch_default, started):
     time_in_sec = stopwatch_default.elapsed_time_in_secs()
     if started:
         assert stopwatch_default._start is not None
-        assert stopwatch_default._end is not None
         assert stopwatch_default._running is True
-        assert stopwatch_default._secs is not None
         assert time_in_sec is not None
     else:
         assert stopwatch_default._start is None
         assert stopwatch_default._end is None
         assert stopwatch_default._running is False
-        assert stopwatch_default._secs is None
         assert time_in_sec is None
-    assert stopwatch_default._msecs is None
 
 
 @pytest.mark.parametrize("started", [
@@ -87,17 +84,61 @@ def test_elapsed_time_in_msecs(stopwatch_default, started):
         stopwatch_default.start()
     time_in_msec = stopwatch_default.elapsed_time_in_msecs()
     if started:
-        assert stopwatch_default._start is not None
-        assert stopwatch_default._end is not None
         assert stopwatch_default._running is True
-        assert stopwatch_default._secs is not None
-        assert stopwatch_default._msecs is not None
         assert time_in_msec is not None
-        assert stopwatch_default._msecs == stopwatch_default._secs * 1000
     else:
-        assert stopwatch_default._start is None
-        assert stopwatch_default._end is None
         assert stopwatch_default._running is False
-        assert stopwatch_default._secs is None
-        assert stopwatch_default._msecs is None
         assert time_in_msec is None
+
+
+def test_elapsed_time_clock(stopwatch_laps, clock):
+    # A clock starting at zero is a valid start time
+    stopwatch_laps.start()
+    clock.now = 1.5
+    assert stopwatch_laps.elapsed_time_in_secs() == pytest.approx(1.5)
+    assert stopwatch_laps.elapsed_time_in_msecs() == pytest.approx(1500.0)
+    clock.now = 2.0
+    stopwatch_laps.stop()
+    clock.now = 5.0
+    assert stopwatch_laps.elapsed_time_in_secs() == pytest.approx(2.0)
+
+
+def test_lap_not_running(stopwatch_laps):
+    assert stopwatch_laps.lap() is None
+    assert stopwatch_laps.get_lap_count() == 0
+
+
+def test_lap(stopwatch_laps, clock):
+    clock.now = 10.0
+    stopwatch_laps.start()
+    clock.now = 10.5
+    assert stopwatch_laps.lap() == pytest.approx(0.5)
+    clock.now = 10.75
+    assert stopwatch_laps.lap() == pytest.approx(0.25)
+    assert stopwatch_laps.get_lap_count() == 2
+    assert stopwatch_laps.get_lap(0) == pytest.approx(0.5)
+    assert stopwatch_laps.get_lap(1) == pytest.approx(0.25)
+    assert stopwatch_laps.get_split(1) == pytest.approx(0.75)
+    with pytest.raises(IndexError):
+        stopwatch_laps.get_lap(2)
+
+
+def test_lap_buffer_full(stopwatch_laps, clock):
+    stopwatch_laps.start()
+    for i in range(5):
+        clock.now += 0.25
+        assert stopwatch_laps.lap() == pytest.approx(0.25)
+    assert stopwatch_laps.get_lap_count() == 3
+    assert stopwatch_laps.get_dropped_laps() == 2
+    assert stopwatch_laps.get_split(2) == pytest.approx(0.75)
+
+
+def test_start_clears_laps(stopwatch_laps, clock):
+    stopwatch_laps.start()
+    clock.now = 1.0
+    stopwatch_laps.lap()
+    clock.now = 2.0
+    stopwatch_laps.start()
+    assert stopwatch_laps.get_lap_count() == 0
+    clock.now = 2.5
+    assert stopwatch_laps.lap() == pytest.approx(0.5)
@@ -0,0 +1,82 @@
+import pytest
+from feedforward import Feedforward
+from sysid import CharacterizationData, DEFAULT_SCHEDULE, Schedule, Variant, fit, get_schedule_duration, \
+    get_schedule_output, simulate_characterization, sweep
+
+
+@pytest.mark.parametrize("elapsed,expected", [
+    (0.5, (0.0, 0.0)),
+    (3.0, (0.1, 0.1)),
+    (11.0, (-0.1, -0.1)),
+    (17.5, (0.6, 0.6)),
+    (20.5, (-0.6, -0.6)),
+    (23.5, (0.4, -0.4)),
+    (25.0, None),
+])
+def test_get_schedule_output(elapsed, expected):
+    outputs = get_schedule_output(DEFAULT_SCHEDULE, elapsed)
+    if expected is None:
+        assert outputs is None
+    else:
+        assert outputs == pytest.approx(expected)
+
+
+def test_get_schedule_duration():
+    assert get_schedule_duration(DEFAULT_SCHEDULE) == pytest.approx(25.0)
+    assert get_schedule_output(DEFAULT_SCHEDULE, get_schedule_duration(DEFAULT_SCHEDULE) - 0.01) is not None
+
+
+@pytest.mark.parametrize("feedforward,track_width", [
+    (Feedforward(0.05, 0.001, 0.0002), 2.3),
+    (Feedforward(0.08, 0.0007, 0.0003), 1.8),
+    (Feedforward(0.02, 0.0012, 0.0001), 2.6),
+])
+def test_fit(feedforward, track_width):
+    result = fit(simulate_characterization(Variant(feedforward, track_width, 0.00218)), 0.00218)
+    assert result.feedforward.ks == pytest.approx(feedforward.ks, rel=0.05)
+    assert result.feedforward.kv == pytest.approx(feedforward.kv, rel=0.02)
+    assert result.feedforward.ka == pytest.approx(feedforward.ka, rel=0.1)
+    assert result.track_width == pytest.approx(track_width, rel=0.01)
+    assert result.r_squared > 0.99
+
+
+def test_fit_no_data():
+    data = CharacterizationData()
+    with pytest.raises(ValueError):
+        fit(data, 0.00218)
+
+
+def test_fit_no_turn():
+    schedule = DEFAULT_SCHEDULE._replace(turn_output=0.0)
+    data = simulate_characterization(Variant(Feedforward(0.05, 0.001, 0.0002), 2.3, 0.00218), schedule)
+    with pytest.raises(ValueError):
+        fit(data, 0.00218)
+
+
+def test_from_flight_log():
+    class Log:
+        records = [{"timestamp": 0.0, "left_output": -0.5, "right_output": 0.5, "left_encoder": 10.0,
+                    "right_encoder": 12.0, "gyro_angle": 3.0}]
+
+        def __len__(self):
+            return len(self.records)
+
+        def get_record(self, index):
+            return self.records[index]
+
+    data = CharacterizationData.from_flight_log(Log())
+    assert len(data) == 1
+    assert data.left_outputs[0] == 0.5
+    assert data.right_outputs[0] == 0.5
+    assert data.left_counts[0] == 10.0
+    assert data.right_counts[0] == 12.0
+    assert data.gyro_angles[0] == 3.0
+
+
+def test_sweep():
+    schedule = Schedule(0.1, 4.0, 0.6, 1.5, 0.4, 1.0, 0.5)
+    variants = [Variant(Feedforward(0.05, kv, 0.0002), 2.3, 0.00218) for kv in (0.0008, 0.001, 0.0012)]
+    in_process = sweep(variants, schedule, processes=1)
+    assert [result.feedforward.kv for result in in_process] == pytest.approx([0.0008, 0.001, 0.0012], rel=0.02)
+    # The pool returns the same results, in the same order
+    assert sweep(variants, schedule, processes=2) == in_process
@@ -1,6 +1,8 @@
 import pytest
 import oi
 from commands.tank_drive import TankDrive
+from feedforward import Feedforward
+from pid_controller import PIDGains
 from subsystems.drivetrain import Drivetrain
 
 """
@@ -149,3 +151,78 @@ def test_interrupted(command_default):
 
 def test_end(command_default):
     pass  # end method is empty
+
+
+def simulate_drive(robot, hal_data, fake_time, td, free_velocity, loops=100, period=0.02):
+    """Drive the encoders with a first-order model of the wheels for a number of loops.
+
+    Each side's rate approaches free_velocity counts/s per unit of output, with a 0.1 s time
+    constant, with the signs of Drivetrain.
+    """
+    left_rate = 0.0
+    right_rate = 0.0
+    left_count = 0.0
+    right_count = 0.0
+    alpha = period / 0.1
+    td.initialize()
+    for _ in range(loops):
+        robot.drivetrain.update_sensor_snapshot()
+        td.execute()
+        left_rate += (-hal_data['pwm'][1]['value'] * free_velocity - left_rate) * alpha
+        right_rate += (hal_data['pwm'][2]['value'] * free_velocity - right_rate) * alpha
+        left_count += left_rate * period
+        right_count += right_rate * period
+        hal_data['encoder'][0]['count'] = int(left_count)
+        hal_data['encoder'][1]['count'] = int(right_count)
+        fake_time.increment_time_by(period)
+    return left_rate, right_rate
+
+
+def test_init_velocity(robot, drivetrain_default):
+    robot.drivetrain = drivetrain_default
+    td = TankDrive(robot, None, velocity_gains=PIDGains(0.0005, 0.002, 0.0, 0.0, 0.0), max_velocity=900.0)
+    assert td._max_velocity == 900.0
+    assert td._left_controller is not None
+    assert td._right_controller is not None
+
+
+@pytest.mark.parametrize("free_velocity", [1000.0, 800.0, 600.0])
+def test_execute_velocity(mock_oi, drivetrain_default, robot, hal_data, fake_time, free_velocity):
+    robot.drivetrain = drivetrain_default
+    robot.oi = mock_oi
+    td = TankDrive(robot, None, 1.0, 1.0, velocity_gains=PIDGains(0.0005, 0.002, 0.0, 0.0, 0.0),
+                   max_velocity=900.0)
+    mock_oi.set_mock_axis_value(oi.UserController.DRIVER, oi.JoystickAxis.LEFTY, -0.5)
+    mock_oi.set_mock_axis_value(oi.UserController.DRIVER, oi.JoystickAxis.RIGHTY, -0.5)
+    mock_oi.set_mock_axis_value(oi.UserController.DRIVER, oi.JoystickAxis.DPADY, 0.0)
+    # Whatever the motors can do on the battery, half stick holds half the maximum velocity
+    left_rate, right_rate = simulate_drive(robot, hal_data, fake_time, td, free_velocity)
+    assert left_rate == pytest.approx(450.0, rel=0.05)
+    assert right_rate == pytest.approx(450.0, rel=0.05)
+
+
+def test_execute_velocity_open_loop(mock_oi, drivetrain_default, robot, hal_data, fake_time):
+    robot.drivetrain = drivetrain_default
+    robot.oi = mock_oi
+    td = TankDrive(robot, None, 1.0, 1.0)
+    mock_oi.set_mock_axis_value(oi.UserController.DRIVER, oi.JoystickAxis.LEFTY, -0.5)
+    mock_oi.set_mock_axis_value(oi.UserController.DRIVER, oi.JoystickAxis.RIGHTY, -0.5)
+    mock_oi.set_mock_axis_value(oi.UserController.DRIVER, oi.JoystickAxis.DPADY, 0.0)
+    # Without velocity control, the velocity drops with the battery
+    left_rate, right_rate = simulate_drive(robot, hal_data, fake_time, td, 600.0)
+    assert left_rate == pytest.approx(300.0, rel=0.05)
+    assert right_rate == pytest.approx(300.0, rel=0.05)
+
+
+@pytest.mark.parametrize("free_velocity", [1000.0, 600.0])
+def test_execute_velocity_feedforward(mock_oi, drivetrain_default, robot, hal_data, fake_time, free_velocity):
+    robot.drivetrain = drivetrain_default
+    robot.oi = mock_oi
+    td = TankDrive(robot, None, 1.0, 1.0, velocity_gains=PIDGains(0.0005, 0.002, 0.0, 0.0, 0.0),
+                   max_velocity=900.0, feedforward=Feedforward(0.0, 0.001, 0.0))
+    mock_oi.set_mock_axis_value(oi.UserController.DRIVER, oi.JoystickAxis.LEFTY, -0.5)
+    mock_oi.set_mock_axis_value(oi.UserController.DRIVER, oi.JoystickAxis.RIGHTY, -0.5)
+    mock_oi.set_mock_axis_value(oi.UserController.DRIVER, oi.JoystickAxis.DPADY, 0.0)
+    left_rate, right_rate = simulate_drive(robot, hal_data, fake_time, td, free_velocity)
+    assert left_rate == pytest.approx(450.0, rel=0.05)
+    assert right_rate == pytest.approx(450.0, rel=0.05)
@@ -0,0 +1,66 @@
+import pytest
+from wpilib.smartdashboard import SmartDashboard
+from telemetry import Telemetry
+
+
+@pytest.fixture(scope="function")
+def telemetry_default(robot):
+    return Telemetry()
+
+
+def test_telemetry_default(telemetry_default):
+    assert telemetry_default is not None
+    assert telemetry_default.get_write_count() == 0
+    assert telemetry_default.get_skipped_count() == 0
+
+
+def test_get_instance(robot):
+    assert Telemetry.get_instance() is Telemetry.get_instance()
+
+
+def test_flush(telemetry_default):
+    telemetry_default.register("Test Value")
+    telemetry_default.put_number("Test Value", 1.0)
+    assert telemetry_default.flush(0.0) == 1
+    assert SmartDashboard.getNumber("Test Value", None) == 1.0
+    assert telemetry_default.flush(0.02) == 0
+
+
+def test_flush_unchanged(telemetry_default):
+    telemetry_default.put_number("Test Value", 1.0)
+    telemetry_default.flush(0.0)
+    telemetry_default.put_number("Test Value", 1.0)
+    assert telemetry_default.flush(0.02) == 0
+    assert telemetry_default.get_write_count() == 1
+    assert telemetry_default.get_skipped_count() == 1
+
+
+def test_flush_latest_value(telemetry_default):
+    telemetry_default.put_number("Test Value", 1.0)
+    telemetry_default.put_number("Test Value", 2.0)
+    telemetry_default.put_number("Test Value", 3.0)
+    assert telemetry_default.flush(0.0) == 1
+    assert SmartDashboard.getNumber("Test Value", None) == 3.0
+    assert telemetry_default.get_skipped_count() == 2
+
+
+@pytest.mark.parametrize("period,now,written", [
+    (0.0, 0.02, 1),
+    (0.1, 0.02, 0),
+    (0.1, 0.1, 1),
+    (0.5, 0.4, 0),
+])
+def test_flush_period(telemetry_default, period, now, written):
+    telemetry_default.register("Test Value", period)
+    telemetry_default.put_number("Test Value", 1.0)
+    telemetry_default.flush(0.0)
+    telemetry_default.put_number("Test Value", 2.0)
+    assert telemetry_default.flush(now) == written
+
+
+def test_flush_disabled(robot):
+    # Values posted while disabled are published by the disabled loop
+    robot.robotInit()
+    robot.telemetry.put_number("Test Disabled Value", 3.0)
+    robot.disabledPeriodic()
+    assert SmartDashboard.getNumber("Test Disabled Value", None) == 3.0
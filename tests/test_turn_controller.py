@@ -0,0 +1,85 @@
+import pytest
+from commands.autonomous_config import AutonomousConfig, turn_gains
+from config_store import ConfigStore
+from turn_controller import TurnController, TurnGains, wrap_degrees
+
+
+@pytest.fixture(scope="function")
+def controller():
+    controller = TurnController(TurnGains(0.01, 0.0, 0.0, 0.15, 0.1, 0.0), 2.0, 0.5)
+    return controller
+
+
+@pytest.mark.parametrize("angle,wrapped", [
+    (0.0, 0.0),
+    (90.0, 90.0),
+    (180.0, 180.0),
+    (-180.0, 180.0),
+    (190.0, -170.0),
+    (-190.0, 170.0),
+    (720.0, 0.0),
+    (-350.0, 10.0),
+])
+def test_wrap_degrees(angle, wrapped):
+    assert wrap_degrees(angle) == pytest.approx(wrapped)
+
+
+def test_short_way(controller):
+    # From 350 to 10 is a 20 degree turn in the positive direction
+    controller.reset(10.0, 350.0, 0.0)
+    assert controller.calculate(350.0, 0.02) == pytest.approx(0.2)
+    controller.reset(10.0, 710.0, 0.0)
+    assert controller.calculate(710.0, 0.02) == pytest.approx(0.2)
+    controller.reset(350.0, 10.0, 0.0)
+    assert controller.calculate(10.0, 0.02) == pytest.approx(-0.2)
+
+
+def test_no_wrap():
+    # Turning by an angle goes the whole way, even past 180 degrees
+    controller = TurnController(TurnGains(0.01, 0.0, 0.0, 0.15, 0.1, 0.0), 2.0, 0.5, wrap=False)
+    controller.reset(270.0, 0.0, 0.0)
+    assert controller.calculate(0.0, 0.02) == pytest.approx(0.5)
+    controller.reset(360.0, 0.0, 0.0)
+    assert controller.calculate(0.0, 0.02) == pytest.approx(0.5)
+    assert not controller.is_settled(1.0)
+
+
+def test_min_output(controller):
+    controller.reset(90.0, 85.0, 0.0)
+    assert controller.calculate(85.0, 0.02) == pytest.approx(0.15)
+    assert controller.calculate(95.0, 0.04) == pytest.approx(-0.15)
+    # Within tolerance only the PID output is applied
+    assert controller.calculate(89.0, 0.06) == pytest.approx(0.01)
+
+
+def test_max_output(controller):
+    controller.reset(180.0, 0.0, 0.0)
+    assert controller.calculate(0.0, 0.02) == pytest.approx(0.5)
+
+
+def test_rate_limit():
+    controller = TurnController(TurnGains(0.01, 0.0, 0.0, 0.15, 0.1, 5.0), 2.0, 1.0)
+    controller.reset(90.0, 0.0, 0.0)
+    assert controller.calculate(0.0, 0.02) == pytest.approx(0.1)
+    assert controller.calculate(0.0, 0.04) == pytest.approx(0.2)
+    assert controller.calculate(0.0, 0.06) == pytest.approx(0.3)
+    assert controller.calculate(80.0, 0.08) == pytest.approx(0.2)
+    controller.reset(-90.0, 0.0, 1.0)
+    assert controller.calculate(0.0, 1.02) == pytest.approx(-0.1)
+
+
+def test_settled(controller):
+    controller.reset(90.0, 0.0, 0.0)
+    controller.calculate(89.0, 1.0)
+    assert not controller.is_settled(1.0)
+    controller.calculate(91.0, 1.05)
+    assert not controller.is_settled(1.05)
+    assert controller.is_settled(1.15)
+    assert controller.get_settle_time() == pytest.approx(1.0)
+    assert controller.get_overshoot() == pytest.approx(1.0)
+
+
+def test_turn_gains(robot):
+    config = ConfigStore.get_instance().get(AutonomousConfig, '../tests/test_configs/autonomous_default.ini')
+    assert turn_gains(config) == TurnGains(0.02, 0.0, 0.001, 0.1, 0.1, 5.0)
+    assert turn_gains(config._replace(turn_pid_enabled=False)) is None
@@ -1,6 +1,7 @@
 import pytest
 from commands.turn_degrees import TurnDegrees
 from subsystems.drivetrain import Drivetrain
+from turn_controller import TurnGains
 
 
 """
@@ -143,3 +144,66 @@ def test_end(command_default, hal_data):
 #         assert hal_data['pwm'][2]['value'] == right_ex_speed
 #     td.end()
 #     assert isclose(hal_data['analog_gyro'][1]['angle'], initial_angle + target_angle, threshold)
+
+
+def simulate_turn(command, drivetrain, hal_data, fake_time, max_loops=500):
+    """Run a turn against a simple model of the drivetrain.
+
+    Return:
+        The seconds until the command finished (or None if it did not), and the angle
+        the drivetrain came to rest at after it finished.
+    """
+    # Turns at up to 360 deg/s, lagging the output by 0.1 s, and not at all below 0.1 output
+    rate = 0.0
+    angle = hal_data['robot']['adxrs450_spi_1_angle']
+    finish_time = None
+    command.initialize()
+    for i in range(max_loops + 25):
+        if finish_time is None:
+            command.execute()
+        fake_time.increment_time_by(0.02)
+        turn = -hal_data['pwm'][1]['value']
+        target_rate = turn * 360.0 if abs(turn) >= 0.1 else 0.0
+        rate += (target_rate - rate) * 0.02 / 0.1
+        angle += rate * 0.02
+        hal_data['robot']['adxrs450_spi_1_angle'] = angle
+        drivetrain.expire_sensor_snapshot()
+        if finish_time is None:
+            if command.isFinished():
+                command.end()
+                finish_time = (i + 1) * 0.02
+            elif i + 1 == max_loops:
+                command.end()
+                break
+    return finish_time, angle
+
+
+def test_init_pid(robot, drivetrain_default):
+    robot.drivetrain = drivetrain_default
+    td = TurnDegrees(robot, 90.0, -0.5, 2.0, turn_gains=TurnGains(0.02, 0.0, 0.001, 0.1, 0.1, 5.0))
+    assert td.get_controller() is not None
+    assert td.get_controller()._max_output == 0.5
+    assert td.get_controller()._tolerance == 2.0
+
+
+@pytest.mark.parametrize("degrees_change", [15.0, 45.0, 90.0, -90.0, 135.0, 180.0, 270.0, -360.0])
+def test_command_full_pid(robot, drivetrain_default, hal_data, fake_time, degrees_change):
+    robot.drivetrain = drivetrain_default
+    hal_data['robot']['adxrs450_spi_1_angle'] = 0.0
+    td = TurnDegrees(robot, degrees_change, 0.5, 1.0, turn_gains=TurnGains(0.02, 0.0, 0.001, 0.1, 0.1, 5.0))
+    settle_time, angle = simulate_turn(td, drivetrain_default, hal_data, fake_time)
+    assert settle_time is not None
+    assert settle_time < 0.6 + abs(degrees_change) / 180.0
+    assert td.get_controller().get_overshoot() <= 3.0
+    # Comes to rest on target
+    assert abs(angle - degrees_change) <= 1.0
+
+
+@pytest.mark.parametrize("degrees_change", [15.0, 45.0, 90.0, 180.0])
+def test_command_full_fixed_speed(robot, drivetrain_default, hal_data, fake_time, degrees_change):
+    # The fixed speed turn finishes as soon as it passes the target and coasts well past it
+    robot.drivetrain = drivetrain_default
+    hal_data['robot']['adxrs450_spi_1_angle'] = 0.0
+    td = TurnDegrees(robot, degrees_change, 0.5, 1.0)
+    settle_time, angle = simulate_turn(td, drivetrain_default, hal_data, fake_time)
+    assert abs(angle - degrees_change) > 5.0
@@ -1,6 +1,7 @@
 import pytest
 from commands.turn_degrees_absolute import TurnDegreesAbsolute
 from subsystems.drivetrain import Drivetrain
+from turn_controller import TurnGains
 
 
 """
@@ -142,3 +143,20 @@ def test_end(command_default, hal_data):
 #         assert hal_data['pwm'][2]['value'] == right_ex_speed
 #     td.end()
 #     assert isclose(hal_data['analog_gyro'][1]['angle'], target_angle, threshold)
+
+
+@pytest.mark.parametrize("initial_angle,target_angle,left_ex_speed,right_ex_speed", [
+    (350.0, 10.0, -0.4, -0.4),
+    (-350.0, 0.0, 0.2, 0.2),
+    (720.0, 30.0, -0.5, -0.5),
+])
+def test_execute_pid(robot, drivetrain_default, hal_data, initial_angle, target_angle, left_ex_speed,
+                     right_ex_speed):
+    robot.drivetrain = drivetrain_default
+    hal_data['robot']['adxrs450_spi_1_angle'] = initial_angle
+    td = TurnDegreesAbsolute(robot, target_angle, 0.5, 1.0, turn_gains=TurnGains(0.02, 0.0, 0.0, 0.1, 0.1, 0.0))
+    td.initialize()
+    td.execute()
+    # Turns the short way around
+    assert hal_data['pwm'][1]['value'] == pytest.approx(left_ex_speed)
+    assert hal_data['pwm'][2]['value'] == pytest.approx(right_ex_speed)
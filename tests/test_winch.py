@@ -62,6 +62,7 @@ def test_winch_full_speed(robot, hal_data, speed, ex_speed):
     assert wnch._motor is not None
     wnch.move_winch(speed)
     assert hal_data['pwm'][3]['value'] == ex_speed
+    assert wnch.get_speed() == speed
 
 
 def test_winch_inverted(robot, hal_data):